@@ -0,0 +1,55 @@
+"""add field activity daily stats rollup
+
+Revision ID: 7c3e5b9d2a14
+Revises: 4d2f8c1a9b77
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e5b9d2a14'
+down_revision: Union[str, None] = '4d2f8c1a9b77'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'field_activity_daily_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_key', sa.String(length=64), nullable=False),
+        sa.Column('workspace_id', sa.Integer(), nullable=False),
+        sa.Column('activity_date', sa.Date(), nullable=False),
+        sa.Column('support_staff_id', sa.Integer(), nullable=False),
+        sa.Column('task_category_id', sa.Integer(), nullable=True),
+        sa.Column('customer_id', sa.String(), nullable=True),
+        sa.Column('customer_name', sa.String(), nullable=False),
+        sa.Column('location_type', postgresql.ENUM('OFFICE', 'ON_SITE', name='locationtype', create_type=False), nullable=False),
+        sa.Column('activity_count', sa.Integer(), nullable=False),
+        sa.Column('total_hours', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bucket_key', name='uq_field_activity_daily_stats_bucket_key')
+    )
+    op.create_index(op.f('ix_field_activity_daily_stats_id'), 'field_activity_daily_stats', ['id'], unique=False)
+    op.create_index('ix_field_activity_daily_stats_workspace_date', 'field_activity_daily_stats', ['workspace_id', 'activity_date'], unique=False)
+    op.create_index('ix_field_activity_daily_stats_workspace_customer', 'field_activity_daily_stats', ['workspace_id', 'customer_id'], unique=False)
+
+    # Backfill from existing activities so the rollup is complete as soon as it exists
+    from app.services.field_activity_stats_service import FieldActivityStatsService
+    FieldActivityStatsService.rebuild(Session(bind=op.get_bind()))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_field_activity_daily_stats_workspace_customer', table_name='field_activity_daily_stats')
+    op.drop_index('ix_field_activity_daily_stats_workspace_date', table_name='field_activity_daily_stats')
+    op.drop_index(op.f('ix_field_activity_daily_stats_id'), table_name='field_activity_daily_stats')
+    op.drop_table('field_activity_daily_stats')
@@ -0,0 +1,75 @@
+"""add composite and partial indexes for hot filter paths
+
+Revision ID: 9a4e6c2f1b38
+Revises: 7c3e5b9d2a14
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6c2f1b38'
+down_revision: Union[str, None] = '7c3e5b9d2a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial predicate, postgres only)
+# Descending / NULLS LAST columns match the keyset order of the list
+# endpoints so Postgres can walk the index instead of sorting; that syntax
+# is Postgres-only, other dialects skip those indexes.
+INDEXES = [
+    ('ix_field_activities_workspace_date', 'field_activities',
+     ['workspace_id', sa.text('activity_date DESC'), sa.text('start_time DESC NULLS LAST'), sa.text('id DESC')],
+     None, True),
+    ('ix_field_activities_workspace_staff_date', 'field_activities',
+     ['workspace_id', 'support_staff_id', 'activity_date'], None, False),
+    ('ix_field_activities_workspace_customer', 'field_activities',
+     ['workspace_id', 'customer_id'], "customer_id IS NOT NULL", False),
+    ('ix_field_activities_pending', 'field_activities',
+     ['workspace_id', 'support_staff_id', 'activity_date', 'start_time', 'id'], "status = 'PENDING'", False),
+    ('ix_tasks_assignee_status', 'tasks', ['assignee_id', 'status'], None, False),
+    ('ix_tasks_parent_task_id', 'tasks', ['parent_task_id'], None, False),
+    ('ix_tasks_project_updated', 'tasks',
+     ['project_id', sa.text('updated_at DESC NULLS LAST'), sa.text('id DESC')], None, True),
+    ('ix_tasks_updated', 'tasks', [sa.text('updated_at DESC NULLS LAST'), sa.text('id DESC')], None, True),
+    ('ix_workspace_members_workspace_user', 'workspace_members', ['workspace_id', 'user_id'], None, False),
+    ('ix_workspace_members_user_id', 'workspace_members', ['user_id'], None, False),
+    ('ix_meeting_minutes_workspace_date', 'meeting_minutes',
+     ['workspace_id', sa.text('meeting_date DESC'), sa.text('id DESC')], None, False),
+    ('ix_push_subscriptions_user_active', 'push_subscriptions', ['user_id', 'active'], None, False),
+    ('ix_comments_task_created', 'comments', ['task_id', 'created_at', 'id'], None, False),
+]
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes this way keeps the tables writable while the migration runs.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where, postgres_only in INDEXES:
+            if postgres_only and not is_postgres:
+                continue
+            predicate = sa.text(where) if where else None
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=predicate,
+                sqlite_where=predicate
+            )
+
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _, postgres_only in reversed(INDEXES):
+            if postgres_only and not is_postgres:
+                continue
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,78 @@
+"""add search_text columns and full-text/trigram search indexes
+
+Revision ID: b5d17e3a6c90
+Revises: 9a4e6c2f1b38
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d17e3a6c90'
+down_revision: Union[str, None] = '9a4e6c2f1b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic")
+
+
+# Expressions must match app.services.search_service so the planner uses them
+FTS = "to_tsvector('english'::regconfig, COALESCE(search_text, ''))"
+USER_SEARCH = "lower(COALESCE(full_name, '') || ' ' || username || ' ' || email)"
+
+FTS_INDEXES = [
+    ('ix_field_activities_search_fts', 'field_activities', f"USING gin ({FTS})"),
+    ('ix_meeting_minutes_search_fts', 'meeting_minutes', f"USING gin ({FTS})"),
+]
+
+# pg_trgm indexes serve the ILIKE substring filters and user search
+TRIGRAM_INDEXES = [
+    ('ix_field_activities_search_trgm', 'field_activities', "USING gin (search_text gin_trgm_ops)"),
+    ('ix_field_activities_customer_name_trgm', 'field_activities', "USING gin (customer_name gin_trgm_ops)"),
+    ('ix_meeting_minutes_search_trgm', 'meeting_minutes', "USING gin (search_text gin_trgm_ops)"),
+    ('ix_users_search_trgm', 'users', f"USING gin ({USER_SEARCH} gin_trgm_ops)"),
+]
+
+
+def upgrade() -> None:
+    from app.services.search_service import SearchService
+
+    op.add_column('field_activities', sa.Column('search_text', sa.Text(), nullable=True))
+    op.add_column('meeting_minutes', sa.Column('search_text', sa.Text(), nullable=True))
+
+    # HTML stripping happens in Python (bleach), so the backfill can't be plain SQL
+    SearchService.rebuild(Session(bind=op.get_bind()))
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    indexes = list(FTS_INDEXES)
+    # pg_trgm ships with contrib (always present on Supabase); without it
+    # substring filters still work, just without an index
+    if bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        indexes += TRIGRAM_INDEXES
+    else:
+        logger.warning("pg_trgm is not available on this server, skipping trigram indexes")
+
+    # GIN builds over large tables take a while; CONCURRENTLY keeps them writable
+    with op.get_context().autocommit_block():
+        for name, table, definition in indexes:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _, _ in reversed(FTS_INDEXES + TRIGRAM_INDEXES):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    op.drop_column('meeting_minutes', 'search_text')
+    op.drop_column('field_activities', 'search_text')
@@ -0,0 +1,179 @@
+"""add blobs and dedupe attachments
+
+Revision ID: 4b8d2e6f1a93
+Revises: 7c3e91b8d2f4
+Create Date: 2026-10-18 17:00:00.000000
+
+Moves every attachment, field photo and minute attachment onto a blob:
+
+- local files (attachments, field_activity_photos) are hashed in place; rows
+  with the same content share one blob, the first file is kept and the rows
+  are pointed at it. The other copies are deleted by the outbox worker via
+  file.delete messages, so nothing is removed unless this migration commits.
+  Paths are resolved from the working directory, as the app does: run it
+  from backend/.
+- files that can't be read, and Cloudinary attachments (their content is not
+  available here), get a blob each without a hash
+"""
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8d2e6f1a93'
+down_revision: Union[str, None] = '7c3e91b8d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCING_TABLES = ('attachments', 'field_activity_photos', 'minute_attachments')
+
+blobs = sa.table(
+    'blobs',
+    sa.column('id', sa.Integer),
+    sa.column('sha256', sa.String),
+    sa.column('storage', sa.String),
+    sa.column('location', sa.String),
+    sa.column('url', sa.String),
+    sa.column('resource_type', sa.String),
+    sa.column('size', sa.Integer),
+    sa.column('mime_type', sa.String),
+    sa.column('ref_count', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+outbox_messages = sa.table(
+    'outbox_messages',
+    sa.column('topic', sa.String),
+    sa.column('payload', sa.JSON),
+    sa.column('status', sa.String),
+    sa.column('attempts', sa.Integer),
+    sa.column('max_attempts', sa.Integer),
+    sa.column('available_at', sa.DateTime),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def _sha256(path: str):
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _insert_blob(bind, **values) -> int:
+    values.setdefault('created_at', datetime.utcnow())
+    return bind.execute(blobs.insert().values(**values).returning(blobs.c.id)).scalar()
+
+
+def _dedupe_local(bind, now):
+    rows = []
+    for table in ('attachments', 'field_activity_photos'):
+        for row in bind.execute(sa.text(f'SELECT id, file_path, file_size, mime_type FROM {table} ORDER BY id')):
+            rows.append((table, row))
+
+    groups = OrderedDict()
+    for table, row in rows:
+        sha256 = _sha256(row.file_path)
+        key = sha256 or ('unreadable', table, row.id)
+        groups.setdefault(key, []).append((table, row))
+
+    for key, members in groups.items():
+        _, first = members[0]
+        blob_id = _insert_blob(
+            bind,
+            sha256=key if isinstance(key, str) else None,
+            storage='local',
+            location=first.file_path,
+            size=first.file_size,
+            mime_type=first.mime_type,
+            ref_count=len(members),
+        )
+        kept = first.file_path
+        for table, row in members:
+            bind.execute(
+                sa.text(f'UPDATE {table} SET blob_id = :blob_id, file_path = :path WHERE id = :id'),
+                {'blob_id': blob_id, 'path': kept, 'id': row.id},
+            )
+        # Distinct duplicate files, removed after commit by the outbox worker
+        for path in OrderedDict.fromkeys(row.file_path for _, row in members[1:]):
+            if path != kept:
+                bind.execute(outbox_messages.insert().values(
+                    topic='file.delete',
+                    payload={'path': path},
+                    status='pending',
+                    attempts=0,
+                    max_attempts=8,
+                    available_at=now,
+                    created_at=now,
+                ))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('storage', sa.String(length=16), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=True),
+        sa.Column('resource_type', sa.String(), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('mime_type', sa.String(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('storage', 'sha256', name='uq_blobs_storage_sha256')
+    )
+    op.create_index(op.f('ix_blobs_id'), 'blobs', ['id'], unique=False)
+
+    for table in REFERENCING_TABLES:
+        op.add_column(table, sa.Column(
+            'blob_id', sa.Integer(), sa.ForeignKey('blobs.id', name=f'fk_{table}_blob_id_blobs'), nullable=True
+        ))
+        op.create_index(op.f(f'ix_{table}_blob_id'), table, ['blob_id'], unique=False)
+
+    if op.get_context().as_sql:
+        return  # The data step needs the files and the rows
+
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    _dedupe_local(bind, now)
+
+    for row in bind.execute(sa.text(
+        'SELECT id, cloudinary_public_id, cloudinary_url, resource_type, file_size, mime_type '
+        'FROM minute_attachments ORDER BY id'
+    )).fetchall():
+        blob_id = _insert_blob(
+            bind,
+            sha256=None,
+            storage='cloudinary',
+            location=row.cloudinary_public_id,
+            url=row.cloudinary_url,
+            resource_type=row.resource_type,
+            size=row.file_size,
+            mime_type=row.mime_type,
+            ref_count=1,
+        )
+        bind.execute(
+            sa.text('UPDATE minute_attachments SET blob_id = :blob_id WHERE id = :id'),
+            {'blob_id': blob_id, 'id': row.id},
+        )
+
+
+def downgrade() -> None:
+    # Rows keep pointing at the kept copy of deduplicated files
+    for table in REFERENCING_TABLES:
+        op.drop_index(op.f(f'ix_{table}_blob_id'), table_name=table)
+        op.drop_constraint(f'fk_{table}_blob_id_blobs', table, type_='foreignkey')
+        op.drop_column(table, 'blob_id')
+
+    op.drop_index(op.f('ix_blobs_id'), table_name='blobs')
+    op.drop_table('blobs')
@@ -0,0 +1,37 @@
+"""add field activity photo variants
+
+Revision ID: 9e5a7c3d1b64
+Revises: 4b8d2e6f1a93
+Create Date: 2026-10-18 18:00:00.000000
+
+Existing photos get a photo.variants outbox message each, so the outbox
+worker renders their thumbnails after the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5a7c3d1b64'
+down_revision: Union[str, None] = '4b8d2e6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('field_activity_photos', sa.Column('variants', sa.JSON(), nullable=True))
+
+    op.execute("""
+        INSERT INTO outbox_messages (topic, payload, status, attempts, max_attempts, available_at, created_at)
+        SELECT 'photo.variants', json_build_object('photo_id', id), 'pending', 0, 8, timezone('utc', now()), timezone('utc', now())
+        FROM field_activity_photos
+        ORDER BY id
+    """)
+
+
+def downgrade() -> None:
+    # Rendered variant files are left in place, and removed with their blob
+    op.execute("DELETE FROM outbox_messages WHERE topic = 'photo.variants' AND status = 'pending'")
+    op.drop_column('field_activity_photos', 'variants')
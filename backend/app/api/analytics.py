@@ -1,169 +1,49 @@
 from typing import List, Dict
-from datetime import datetime, timedelta
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from app.database import get_db
+from sqlalchemy import func, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User, UserRole
-from app.models.workspace import Workspace, WorkspaceMember
+from app.models.workspace import WorkspaceMember
 from app.models.project import Project
-from app.models.task import Task, TaskStatus, TaskPriority
-from app.models.field_activity import FieldActivity, TaskCategory, LocationType
+from app.models.task import Task, TaskStatus
+from app.models.field_activity import FieldActivity
 from app.schemas.analytics import (
     TaskAnalytics,
     ProjectAnalytics,
     UserProductivity,
-    WorkspaceAnalytics,
     ExecutiveDashboard,
     FieldActivityAnalytics
 )
 from app.utils.auth import get_current_active_user, require_role
+from app.services.analytics_service import AnalyticsAggregationService, calculate_completion_rate
+from app.services.field_activity_stats_service import FieldActivityStatsService
+from app.services.access_cache import AccessCache
 
 router = APIRouter()
 
 
-def calculate_completion_rate(completed: int, total: int) -> float:
-    """Calculate completion rate as percentage"""
-    return round((completed / total * 100) if total > 0 else 0, 2)
-
-
-def get_field_activity_analytics(db: Session, workspace_id: int) -> FieldActivityAnalytics:
+async def get_field_activity_analytics(db: AsyncSession, workspace_id: int) -> FieldActivityAnalytics:
     """Get field activity analytics for a workspace"""
-    activities = db.query(FieldActivity).filter(
-        FieldActivity.workspace_id == workspace_id
-    )
-
-    total_activities = activities.count()
-
-    # Calculate total hours
-    all_activities = activities.all()
-    total_hours = sum([activity.duration_hours for activity in all_activities])
-
-    # Activities this week
-    now = datetime.utcnow()
-    week_start = now - timedelta(days=now.weekday())
-    activities_this_week = activities.filter(
-        FieldActivity.activity_date >= week_start.date()
-    ).count()
-
-    # Activities this month
-    month_start = now.replace(day=1)
-    activities_this_month = activities.filter(
-        FieldActivity.activity_date >= month_start.date()
-    ).count()
-
-    # Top staff by activity count
-    staff_stats = db.query(
-        User.id,
-        User.full_name,
-        User.username,
-        func.count(FieldActivity.id).label('activity_count')
-    ).join(
-        FieldActivity, FieldActivity.support_staff_id == User.id
-    ).filter(
-        FieldActivity.workspace_id == workspace_id
-    ).group_by(User.id, User.full_name, User.username).order_by(
-        func.count(FieldActivity.id).desc()
-    ).limit(5).all()
-
-    top_staff = [
-        {
-            "user_id": user_id,
-            "name": full_name or username,
-            "activity_count": count
-        }
-        for user_id, full_name, username, count in staff_stats
-    ]
-
-    # Category distribution
-    category_stats = db.query(
-        TaskCategory.title,
-        func.count(FieldActivity.id).label('count')
-    ).join(
-        FieldActivity, FieldActivity.task_category_id == TaskCategory.id
-    ).filter(
-        FieldActivity.workspace_id == workspace_id
-    ).group_by(TaskCategory.title).all()
-
-    category_distribution = {title: count for title, count in category_stats}
-
-    # Add uncategorized activities
-    uncategorized = activities.filter(FieldActivity.task_category_id.is_(None)).count()
-    if uncategorized > 0:
-        category_distribution["Uncategorized"] = uncategorized
-
-    # Top customers by visit count
-    top_customers_stats = db.query(
-        FieldActivity.customer_name,
-        func.count(FieldActivity.id).label('visit_count')
-    ).filter(
-        FieldActivity.workspace_id == workspace_id,
-        FieldActivity.customer_name.isnot(None)
-    ).group_by(
-        FieldActivity.customer_name
-    ).order_by(
-        func.count(FieldActivity.id).desc()
-    ).limit(6).all()
-
-    top_customers = [
-        {
-            "customer_name": name,
-            "visit_count": count
-        }
-        for name, count in top_customers_stats
-    ]
-
-    # Unique customers served
-    unique_customers = db.query(
-        func.count(func.distinct(FieldActivity.customer_id))
-    ).filter(
-        FieldActivity.workspace_id == workspace_id,
-        FieldActivity.customer_id.isnot(None)
-    ).scalar() or 0
-
-    # Billing metrics (ON_SITE vs OFFICE)
-    billable_hours = 0.0
-    non_billable_hours = 0.0
-    billable_visits = 0
-    office_activities = 0
-
-    for activity in all_activities:
-        hours = activity.duration_hours
-        if activity.location_type == LocationType.ON_SITE:
-            billable_hours += hours
-            billable_visits += 1
-        else:  # OFFICE
-            non_billable_hours += hours
-            office_activities += 1
-
-    # Calculate billing rate percentage
-    billing_rate = (billable_hours / total_hours * 100) if total_hours > 0 else 0.0
-
-    return FieldActivityAnalytics(
-        total_activities=total_activities,
-        total_hours=round(total_hours, 2),
-        activities_this_week=activities_this_week,
-        activities_this_month=activities_this_month,
-        top_staff=top_staff,
-        category_distribution=category_distribution,
-        top_customers=top_customers,
-        unique_customers=unique_customers,
-        billable_hours=round(billable_hours, 2),
-        non_billable_hours=round(non_billable_hours, 2),
-        billable_visits=billable_visits,
-        office_activities=office_activities,
-        billing_rate=round(billing_rate, 1)
+    analytics = await AnalyticsAggregationService.field_activity_analytics_by_workspace(db, [workspace_id])
+    return analytics.get(workspace_id) or FieldActivityAnalytics(
+        total_activities=0,
+        total_hours=0.0,
+        activities_this_week=0,
+        activities_this_month=0
     )
 
 
 @router.get("/field-activities/overview", response_model=FieldActivityAnalytics)
 async def get_field_activity_analytics_endpoint(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get field activity analytics for a workspace"""
-    return get_field_activity_analytics(db, workspace_id)
+    return await get_field_activity_analytics(db, workspace_id)
 
 
 @router.get("/customers/top-customers", response_model=List[Dict])
@@ -171,84 +51,91 @@ async def get_top_customers(
     workspace_id: int,
     limit: int = 10,
     date_from: datetime = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get top customers by activity count"""
-    query = db.query(
-        FieldActivity.customer_id,
-        FieldActivity.customer_name,
+    source = FieldActivityStatsService.source(await FieldActivityStatsService.is_available_async(db))
+    activity_count = source.count()
+
+    query = select(
+        source.customer_id,
+        func.max(source.customer_name).label('customer_name'),
+        activity_count.label('activity_count'),
+        source.hours().label('total_hours')
     ).filter(
-        FieldActivity.workspace_id == workspace_id,
-        FieldActivity.customer_id.isnot(None)
+        source.workspace_id == workspace_id,
+        source.customer_id.isnot(None)
     )
 
     if date_from:
-        query = query.filter(FieldActivity.activity_date >= date_from.date())
+        query = query.filter(source.activity_date >= date_from.date())
 
-    # Get all activities grouped by customer
-    activities = query.all()
+    # Group by customer and calculate stats in the database
+    customer_stats = (await db.execute(
+        query.group_by(source.customer_id).order_by(
+            activity_count.desc(), source.customer_id
+        ).limit(limit)
+    )).all()
 
-    # Group by customer and calculate stats
-    customer_stats = {}
-    for activity in db.query(FieldActivity).filter(
-        FieldActivity.workspace_id == workspace_id,
-        FieldActivity.customer_id.isnot(None)
-    ).all():
-        if date_from and activity.activity_date < date_from.date():
-            continue
-
-        cust_id = activity.customer_id
-        if cust_id not in customer_stats:
-            customer_stats[cust_id] = {
-                "customer_id": cust_id,
-                "customer_name": activity.customer_name,
-                "activity_count": 0,
-                "total_hours": 0.0
-            }
-        customer_stats[cust_id]["activity_count"] += 1
-        customer_stats[cust_id]["total_hours"] += activity.duration_hours
-
-    # Sort by activity count and limit
-    result = sorted(
-        customer_stats.values(),
-        key=lambda x: x['activity_count'],
-        reverse=True
-    )[:limit]
-
-    # Round hours
-    for item in result:
-        item["total_hours"] = round(item["total_hours"], 2)
-
-    return result
+    return [
+        {
+            "customer_id": row.customer_id,
+            "customer_name": row.customer_name,
+            "activity_count": row.activity_count,
+            "total_hours": round(float(row.total_hours or 0.0), 2)
+        }
+        for row in customer_stats
+    ]
 
 
 @router.get("/customers/{customer_id}/timeline", response_model=Dict)
 async def get_customer_timeline(
     customer_id: str,
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get activity timeline for a specific customer"""
-    activities = db.query(FieldActivity).filter(
+    customer_filter = (
         FieldActivity.workspace_id == workspace_id,
         FieldActivity.customer_id == customer_id
-    ).order_by(FieldActivity.activity_date.desc()).all()
+    )
 
-    if not activities:
+    # Totals come from the daily rollup when it exists
+    source = FieldActivityStatsService.source(await FieldActivityStatsService.is_available_async(db))
+    totals = (await db.execute(select(
+        source.count().label('total_visits'),
+        source.hours().label('total_hours'),
+        func.min(source.activity_date).label('first_visit'),
+        func.max(source.activity_date).label('last_visit'),
+        func.max(source.customer_name).label('customer_name')
+    ).filter(
+        source.workspace_id == workspace_id,
+        source.customer_id == customer_id
+    ))).one()
+
+    if not totals.total_visits:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No activities found for this customer"
         )
 
+    activities = (await db.scalars(
+        select(FieldActivity).options(
+            selectinload(FieldActivity.task_category)
+        ).filter(*customer_filter).order_by(FieldActivity.activity_date.desc()).limit(5)
+    )).all()
+
+    # The rollup can hold buckets whose raw rows are gone (or not yet
+    # rebuilt), so the name falls back to the rollup when none are left
     return {
         "customer_id": customer_id,
-        "customer_name": activities[0].customer_name,
-        "last_visit": activities[0].activity_date.isoformat(),
-        "first_visit": activities[-1].activity_date.isoformat(),
-        "total_visits": len(activities),
-        "total_hours": round(sum(a.duration_hours for a in activities), 2),
+        "customer_name": activities[0].customer_name if activities else totals.customer_name,
+        "last_visit": totals.last_visit.isoformat(),
+        "first_visit": totals.first_visit.isoformat(),
+        "total_visits": totals.total_visits,
+        "total_hours": round(float(totals.total_hours or 0.0), 2),
         "recent_activities": [
             {
                 "id": a.id,
@@ -258,7 +145,7 @@ async def get_customer_timeline(
                 "hours": round(a.duration_hours, 2),
                 "status": a.status.value
             }
-            for a in activities[:5]  # Last 5 activities
+            for a in activities  # Last 5 activities
         ]
     }
 
@@ -267,26 +154,28 @@ async def get_customer_timeline(
 async def get_customer_health_check(
     workspace_id: int,
     days_threshold: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Identify customers at risk (not visited recently)"""
 
+    source = FieldActivityStatsService.source(await FieldActivityStatsService.is_available_async(db))
+
     # Get last visit date per customer
-    subquery = db.query(
-        FieldActivity.customer_id,
-        FieldActivity.customer_name,
-        func.max(FieldActivity.activity_date).label('last_visit'),
-        func.count(FieldActivity.id).label('total_visits')
+    subquery = select(
+        source.customer_id,
+        source.customer_name,
+        func.max(source.activity_date).label('last_visit'),
+        source.count().label('total_visits')
     ).filter(
-        FieldActivity.workspace_id == workspace_id,
-        FieldActivity.customer_id.isnot(None)
+        source.workspace_id == workspace_id,
+        source.customer_id.isnot(None)
     ).group_by(
-        FieldActivity.customer_id,
-        FieldActivity.customer_name
+        source.customer_id,
+        source.customer_name
     ).subquery()
 
-    results = db.query(subquery).all()
+    results = (await db.execute(select(subquery))).all()
 
     now = datetime.utcnow().date()
     customer_health = []
@@ -312,41 +201,46 @@ async def get_customer_health_check(
 @router.get("/customers/visit-frequency", response_model=List[Dict])
 async def get_customer_visit_frequency(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Calculate average days between visits per customer"""
-    customers = db.query(
-        FieldActivity.customer_id,
-        FieldActivity.customer_name
-    ).filter(
-        FieldActivity.workspace_id == workspace_id,
-        FieldActivity.customer_id.isnot(None)
-    ).distinct().all()
+    source = FieldActivityStatsService.source(await FieldActivityStatsService.is_available_async(db))
+    in_workspace = (
+        source.workspace_id == workspace_id,
+        source.customer_id.isnot(None)
+    )
+
+    # The gaps between consecutive visits telescope to (last - first), so the
+    # average gap is (last - first) / (visits - 1): no per-visit rows needed
+    visit_stats = {
+        row.customer_id: row
+        for row in (await db.execute(select(
+            source.customer_id,
+            source.count().label('total_visits'),
+            func.min(source.activity_date).label('first_visit'),
+            func.max(source.activity_date).label('last_visit')
+        ).filter(*in_workspace).group_by(source.customer_id))).all()
+    }
+
+    customers = (await db.execute(select(
+        source.customer_id,
+        source.customer_name
+    ).filter(*in_workspace).distinct())).all()
 
     frequency_data = []
 
     for cust_id, cust_name in customers:
-        visits = db.query(FieldActivity.activity_date).filter(
-            FieldActivity.workspace_id == workspace_id,
-            FieldActivity.customer_id == cust_id
-        ).order_by(FieldActivity.activity_date).all()
-
-        if len(visits) < 2:
+        stats = visit_stats[cust_id]
+        if stats.total_visits < 2:
             continue
 
-        # Calculate gaps between visits
-        gaps = [
-            (visits[i+1][0] - visits[i][0]).days
-            for i in range(len(visits) - 1)
-        ]
-
-        avg_gap = sum(gaps) / len(gaps) if gaps else 0
+        avg_gap = (stats.last_visit - stats.first_visit).days / (stats.total_visits - 1)
 
         frequency_data.append({
             "customer_id": cust_id,
             "customer_name": cust_name,
-            "total_visits": len(visits),
+            "total_visits": stats.total_visits,
             "avg_days_between_visits": round(avg_gap, 1),
             "frequency_category": (
                 "weekly" if avg_gap <= 7 else
@@ -363,11 +257,11 @@ async def get_customer_visit_frequency(
 @router.get("/overview", response_model=TaskAnalytics)
 async def get_task_analytics(
     workspace_id: int = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get overall task analytics"""
-    query = db.query(Task)
+    query = select(func.count(Task.id))
 
     # Filter by workspace if provided
     if workspace_id:
@@ -375,23 +269,28 @@ async def get_task_analytics(
             Project.workspace_id == workspace_id
         )
 
-    total_tasks = query.count()
-    completed_tasks = query.filter(Task.status == TaskStatus.COMPLETED).count()
-    in_progress_tasks = query.filter(Task.status == TaskStatus.IN_PROGRESS).count()
+    total_tasks = await db.scalar(query)
+    completed_tasks = await db.scalar(query.filter(Task.status == TaskStatus.COMPLETED))
+    in_progress_tasks = await db.scalar(query.filter(Task.status == TaskStatus.IN_PROGRESS))
 
     # Overdue tasks
     now = datetime.utcnow()
-    overdue_tasks = query.filter(
+    overdue_tasks = await db.scalar(query.filter(
         Task.due_date < now,
         Task.status != TaskStatus.COMPLETED
-    ).count()
+    ))
 
     # Average completion time
-    completed_with_dates = query.filter(
+    completed_query = select(Task).filter(
         Task.status == TaskStatus.COMPLETED,
         Task.completed_at.isnot(None),
         Task.created_at.isnot(None)
-    ).all()
+    )
+    if workspace_id:
+        completed_query = completed_query.join(Task.project).filter(
+            Project.workspace_id == workspace_id
+        )
+    completed_with_dates = (await db.scalars(completed_query)).all()
 
     avg_completion_time = None
     if completed_with_dates:
@@ -414,11 +313,11 @@ async def get_task_analytics(
 @router.get("/projects/{project_id}", response_model=ProjectAnalytics)
 async def get_project_analytics(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get analytics for a specific project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -426,12 +325,12 @@ async def get_project_analytics(
         )
 
     # Get tasks in this project
-    tasks = db.query(Task).filter(
+    tasks = select(func.count(Task.id)).filter(
         Task.project_id == project_id
     )
 
-    total_tasks = tasks.count()
-    completed_tasks = tasks.filter(Task.status == TaskStatus.COMPLETED).count()
+    total_tasks = await db.scalar(tasks)
+    completed_tasks = await db.scalar(tasks.filter(Task.status == TaskStatus.COMPLETED))
 
     return ProjectAnalytics(
         project_id=project.id,
@@ -446,17 +345,13 @@ async def get_project_analytics(
 async def get_user_productivity(
     workspace_id: int = None,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user productivity metrics"""
     #check is user is in the workspace if workspace_id is provided
     if workspace_id:
-        membership = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id,
-            WorkspaceMember.user_id == current_user.id
-        ).first()
-        if not membership:
+        if not await AccessCache.is_member_async(db, workspace_id, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a member of this workspace"
@@ -469,31 +364,32 @@ async def get_user_productivity(
         )
 
     # Get workspace members
-    users_query = db.query(User)
+    users_query = select(User)
     if workspace_id:
         users_query = users_query.join(WorkspaceMember).filter(
             WorkspaceMember.workspace_id == workspace_id
         )
 
-    users = users_query.all()
+    users = (await db.scalars(users_query)).all()
     productivity_data = []
 
     for user in users:
-        tasks_query = db.query(Task).filter(Task.assignee_id == user.id)
+        tasks_query = select(Task).filter(Task.assignee_id == user.id)
 
         if workspace_id:
             tasks_query = tasks_query.join(Task.project).filter(
                 Project.workspace_id == workspace_id
             )
 
-        tasks_assigned = tasks_query.count()
-        tasks_completed = tasks_query.filter(Task.status == TaskStatus.COMPLETED).count()
+        count_query = tasks_query.with_only_columns(func.count(Task.id))
+        tasks_assigned = await db.scalar(count_query)
+        tasks_completed = await db.scalar(count_query.filter(Task.status == TaskStatus.COMPLETED))
 
         # Calculate average hours per task
-        completed_with_hours = tasks_query.filter(
+        completed_with_hours = (await db.scalars(tasks_query.filter(
             Task.status == TaskStatus.COMPLETED,
             Task.actual_hours.isnot(None)
-        ).all()
+        ))).all()
 
         avg_hours = None
         if completed_with_hours:
@@ -516,143 +412,8 @@ async def get_user_productivity(
 
 @router.get("/executive-dashboard", response_model=ExecutiveDashboard)
 async def get_executive_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXECUTIVE]))
 ):
     """Get executive dashboard with comprehensive analytics"""
-    # Overall task analytics
-    total_tasks = db.query(Task).count()
-    completed_tasks = db.query(Task).filter(Task.status == TaskStatus.COMPLETED).count()
-    in_progress_tasks = db.query(Task).filter(Task.status == TaskStatus.IN_PROGRESS).count()
-
-    now = datetime.utcnow()
-    overdue_tasks = db.query(Task).filter(
-        Task.due_date < now,
-        Task.status != TaskStatus.COMPLETED
-    ).count()
-
-    overview = TaskAnalytics(
-        total_tasks=total_tasks,
-        completed_tasks=completed_tasks,
-        in_progress_tasks=in_progress_tasks,
-        overdue_tasks=overdue_tasks,
-        completion_rate=calculate_completion_rate(completed_tasks, total_tasks),
-        average_completion_time=None
-    )
-
-    # Workspace analytics
-    workspaces = db.query(Workspace).all()
-    workspace_analytics = []
-
-    for workspace in workspaces:
-        projects = db.query(Project).filter(Project.workspace_id == workspace.id).all()
-
-        workspace_tasks = db.query(Task).join(Task.project).filter(
-            Project.workspace_id == workspace.id
-        )
-
-        ws_total = workspace_tasks.count()
-        ws_completed = workspace_tasks.filter(Task.status == TaskStatus.COMPLETED).count()
-
-        active_members = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace.id
-        ).count()
-
-        project_analytics = []
-        for project in projects:
-            proj_tasks = db.query(Task).filter(
-                Task.project_id == project.id
-            )
-            proj_total = proj_tasks.count()
-            proj_completed = proj_tasks.filter(Task.status == TaskStatus.COMPLETED).count()
-
-            project_analytics.append(ProjectAnalytics(
-                project_id=project.id,
-                project_name=project.name,
-                total_tasks=proj_total,
-                completed_tasks=proj_completed,
-                completion_rate=calculate_completion_rate(proj_completed, proj_total)
-            ))
-
-        # Include field activities for this workspace
-        field_activity_count = db.query(FieldActivity).filter(
-            FieldActivity.workspace_id == workspace.id
-        ).count()
-
-        field_analytics = None
-        if field_activity_count > 0:
-            field_analytics = get_field_activity_analytics(db, workspace.id)
-
-        workspace_analytics.append(WorkspaceAnalytics(
-            workspace_id=workspace.id,
-            workspace_name=workspace.name,
-            total_projects=len(projects),
-            total_tasks=ws_total,
-            completed_tasks=ws_completed,
-            active_members=active_members,
-            completion_rate=calculate_completion_rate(ws_completed, ws_total),
-            projects=project_analytics,
-            field_activities=field_analytics
-        ))
-
-    # Top performers (top 5)
-    users = db.query(User).all()
-    user_productivity = []
-
-    for user in users:
-        tasks_assigned = db.query(Task).filter(Task.assignee_id == user.id).count()
-        tasks_completed = db.query(Task).filter(
-            Task.assignee_id == user.id,
-            Task.status == TaskStatus.COMPLETED
-        ).count()
-
-        if tasks_assigned > 0:
-            user_productivity.append(UserProductivity(
-                user_id=user.id,
-                user_name=user.full_name or user.username,
-                tasks_assigned=tasks_assigned,
-                tasks_completed=tasks_completed,
-                completion_rate=calculate_completion_rate(tasks_completed, tasks_assigned),
-                average_hours_per_task=None
-            ))
-
-    user_productivity.sort(key=lambda x: x.completion_rate, reverse=True)
-    top_performers = user_productivity[:5]
-
-    # Task completion trend (last 7 days)
-    completion_trend = []
-    for i in range(6, -1, -1):
-        date = now - timedelta(days=i)
-        day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-
-        completed_on_day = db.query(Task).filter(
-            Task.completed_at >= day_start,
-            Task.completed_at < day_end
-        ).count()
-
-        completion_trend.append({
-            "date": day_start.strftime("%Y-%m-%d"),
-            "completed": completed_on_day
-        })
-
-    # Priority distribution
-    priority_dist = {}
-    for priority in TaskPriority:
-        count = db.query(Task).filter(Task.priority == priority).count()
-        priority_dist[priority.value] = count
-
-    # Status distribution
-    status_dist = {}
-    for status_enum in TaskStatus:
-        count = db.query(Task).filter(Task.status == status_enum).count()
-        status_dist[status_enum.value] = count
-
-    return ExecutiveDashboard(
-        overview=overview,
-        workspaces=workspace_analytics,
-        top_performers=top_performers,
-        task_completion_trend=completion_trend,
-        priority_distribution=priority_dist,
-        status_distribution=status_dist
-    )
+    return await AnalyticsAggregationService.build_executive_dashboard(db)
@@ -1,15 +1,19 @@
 from typing import List
+from dataclasses import asdict
 import os
-import uuid
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.config import settings
+from app.database import get_async_db
+from app.models.blob import Blob
 from app.models.user import User
 from app.models.comment import Attachment
 from app.schemas.comment import AttachmentResponse
+from app.schemas.upload import DirectUploadComplete, DirectUploadRequest, PresignedUploadResponse
 from app.utils.auth import get_current_active_user
-from app.config import settings
-import aiofiles
+from app.services.blob_store import BlobStore
 
 router = APIRouter()
 
@@ -28,50 +32,68 @@ ALLOWED_EXTENSIONS = {
 async def upload_attachment(
     task_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Upload a file attachment to a task"""
-    # Validate file size
-    file_content = await file.read()
-    file_size = len(file_content)
+    # Validate size and (sniffed) type; identical content is stored once
+    blob = await BlobStore.store(db, file, ALLOWED_EXTENSIONS, storage=settings.FILE_STORAGE)
+    return await create_attachment(db, blob, task_id, file.filename, current_user)
 
-    if file_size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
-        )
 
-    # Validate file type
-    if file.content_type not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type {file.content_type} not allowed"
-        )
+@router.post("/presign", response_model=PresignedUploadResponse)
+async def presign_attachment(
+    task_id: int,
+    upload: DirectUploadRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start uploading an attachment straight to storage; finish with /complete"""
+    token, request = BlobStore.presign(
+        db,
+        settings.FILE_STORAGE,
+        scope=f"attachment:{task_id}",
+        user_id=current_user.id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        sha256=upload.sha256,
+        allowed_types=ALLOWED_EXTENSIONS
+    )
+    await db.commit()
+    return PresignedUploadResponse(upload_token=token, **asdict(request))
 
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
 
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(file_content)
+@router.post("/complete", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
+async def complete_attachment(
+    task_id: int,
+    upload: DirectUploadComplete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Attach a file uploaded with /presign to the task"""
+    blob, claims = await BlobStore.complete(
+        db, upload.upload_token, f"attachment:{task_id}", current_user.id, ALLOWED_EXTENSIONS
+    )
+    return await create_attachment(db, blob, task_id, claims["filename"], current_user)
+
 
-    # Create attachment record
+async def create_attachment(db: AsyncSession, blob: Blob, task_id: int, filename: str, current_user: User) -> AttachmentResponse:
+    """Attachment record for a stored blob (commits)"""
     attachment = Attachment(
-        filename=unique_filename,
-        original_filename=file.filename,
-        file_path=file_path,
-        file_size=file_size,
-        mime_type=file.content_type,
+        filename=os.path.basename(blob.location),
+        original_filename=filename,
+        file_path=blob.location,
+        file_size=blob.size,
+        mime_type=blob.mime_type,
+        blob_id=blob.id,
         task_id=task_id,
         uploaded_by=current_user.id
     )
 
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    await db.commit()
+    await db.refresh(attachment)
 
     # Add uploader info to response
     response = AttachmentResponse.model_validate(attachment)
@@ -83,11 +105,13 @@ async def upload_attachment(
 @router.get("/task/{task_id}", response_model=List[AttachmentResponse])
 async def get_task_attachments(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all attachments for a task"""
-    attachments = db.query(Attachment).filter(Attachment.task_id == task_id).all()
+    attachments = (await db.scalars(
+        select(Attachment).options(selectinload(Attachment.uploader)).filter(Attachment.task_id == task_id)
+    )).all()
 
     # Add uploader info to each attachment
     response_attachments = []
@@ -103,11 +127,11 @@ async def get_task_attachments(
 @router.delete("/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_attachment(
     attachment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an attachment"""
-    attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
+    attachment = await db.get(Attachment, attachment_id)
     if not attachment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,10 +144,7 @@ async def delete_attachment(
             detail="Can only delete your own attachments"
         )
 
-    # Delete file from filesystem
-    if os.path.exists(attachment.file_path):
-        os.remove(attachment.file_path)
-
-    db.delete(attachment)
-    db.commit()
+    # The file goes with its last reference (BlobStore), after the commit
+    await db.delete(attachment)
+    await db.commit()
     return None
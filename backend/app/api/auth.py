@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import secrets
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.user import (
     UserCreate,
@@ -26,12 +27,12 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).filter(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ).limit(1))
 
     if existing_user:
         raise HTTPException(
@@ -49,8 +50,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
@@ -58,13 +59,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login and get access token"""
     # Find user by username or email
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).filter(
         (User.username == form_data.username) | (User.email == form_data.username)
-    ).first()
+    ).limit(1))
 
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -96,11 +97,11 @@ async def get_current_user_info(current_user: User = Depends(get_current_active_
 @router.post("/forgot-password")
 async def forgot_password(
     request: ForgotPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Request password reset - returns reset link directly"""
     # Find user by email
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).filter(User.email == request.email).limit(1))
 
     # Always return success to prevent email enumeration
     if not user:
@@ -116,7 +117,7 @@ async def forgot_password(
     user.reset_token = reset_token
     user.reset_token_expires = datetime.utcnow() + timedelta(hours=1)
 
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Password reset link generated successfully.",
@@ -127,11 +128,11 @@ async def forgot_password(
 @router.post("/reset-password", response_model=MessageResponse)
 async def reset_password(
     request: ResetPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reset password using the token from email"""
     # Find user by reset token
-    user = db.query(User).filter(User.reset_token == request.token).first()
+    user = await db.scalar(select(User).filter(User.reset_token == request.token).limit(1))
 
     if not user:
         raise HTTPException(
@@ -153,6 +154,6 @@ async def reset_password(
     user.reset_token = None
     user.reset_token_expires = None
 
-    db.commit()
+    await db.commit()
 
     return {"message": "Password has been reset successfully"}
@@ -1,19 +1,31 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User
 from app.models.comment import Comment
 from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
 from app.utils.auth import get_current_active_user
+from app.schemas.pagination import Page
+from app.utils.pagination import (
+    CURSOR_DESCRIPTION, LIMIT_DESCRIPTION, Keyset, fetch_size, page_body, resolve_page_size
+)
 
 router = APIRouter()
 
+# Keyset order for the paginated comment thread
+COMMENT_KEYSET = Keyset(
+    (Comment.created_at, False, True),
+    (Comment.id, False, False)
+)
+
 
 @router.post("/", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 async def create_comment(
     comment_data: CommentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new comment"""
@@ -25,8 +37,8 @@ async def create_comment(
     )
 
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
 
     # Add user info to response
     response = CommentResponse.model_validate(comment)
@@ -36,14 +48,24 @@ async def create_comment(
     return response
 
 
-@router.get("/task/{task_id}", response_model=List[CommentResponse])
+@router.get("/task/{task_id}", response_model=Union[List[CommentResponse], Page[CommentResponse]])
 async def get_task_comments(
     task_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all comments for a task"""
-    comments = db.query(Comment).filter(Comment.task_id == task_id).order_by(Comment.created_at).all()
+    """Get comments for a task (paginated, oldest first)"""
+    page_size = resolve_page_size(limit, cursor)
+    comments = (await db.scalars(select(Comment).options(
+        selectinload(Comment.user)
+    ).filter(
+        Comment.task_id == task_id,
+        *COMMENT_KEYSET.after(cursor)
+    ).order_by(*COMMENT_KEYSET.order_by()).limit(fetch_size(page_size)))).all()
+    comments, next_cursor = COMMENT_KEYSET.page(comments, page_size)
 
     # Add user info to each comment
     response_comments = []
@@ -54,18 +76,18 @@ async def get_task_comments(
             comment_response.user_avatar = comment.user.avatar_url
         response_comments.append(comment_response)
 
-    return response_comments
+    return page_body(response, response_comments, next_cursor, cursor, limit)
 
 
 @router.patch("/{comment_id}", response_model=CommentResponse)
 async def update_comment(
     comment_id: int,
     comment_data: CommentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a comment"""
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -79,8 +101,8 @@ async def update_comment(
         )
 
     comment.content = comment_data.content
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
 
     response = CommentResponse.model_validate(comment)
     response.user_name = current_user.full_name or current_user.username
@@ -92,11 +114,11 @@ async def update_comment(
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(
     comment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a comment"""
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -109,6 +131,6 @@ async def delete_comment(
             detail="Can only delete your own comments"
         )
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
     return None
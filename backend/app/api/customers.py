@@ -1,8 +1,9 @@
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Dict, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 import httpx
-from app.database import get_db
-from sqlalchemy.orm import Session
+from app.database import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.models.customers import Licence
 from app.schemas.customers import (
@@ -12,9 +13,19 @@ from app.schemas.customers import (
 )
 from app.config import settings
 from app.utils.auth import get_current_active_user
+from app.schemas.pagination import Page
+from app.utils.pagination import (
+    CURSOR_DESCRIPTION, LIMIT_DESCRIPTION, Keyset, fetch_size, page_body, resolve_page_size
+)
 
 router = APIRouter()
 
+# Keyset order for the paginated licence list
+LICENCE_KEYSET = Keyset(
+    (Licence.updated_at, True, True),
+    (Licence.id, True, False)
+)
+
 
 @router.get("/companies", response_model=List[Dict])
 async def get_companies(
@@ -77,42 +88,49 @@ async def get_all_companies(
 @router.post("/licences")
 async def create_licence(
     licence_payload: LicenceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a licence"""
     licence = Licence(**licence_payload.model_dump())
     db.add(licence)
-    db.commit()
-    db.refresh(licence)
+    await db.commit()
+    await db.refresh(licence)
     return licence
 
-@router.get("/licences", response_model=List[LicenceResponse])
+@router.get("/licences", response_model=Union[List[LicenceResponse], Page[LicenceResponse]])
 async def get_licences(
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all licences"""
-    licences = db.query(Licence).all()
-    return licences
+    """Get licences (paginated, most recently updated first)"""
+    page_size = resolve_page_size(limit, cursor)
+    licences = (await db.scalars(select(Licence).filter(
+        *LICENCE_KEYSET.after(cursor)
+    ).order_by(*LICENCE_KEYSET.order_by()).limit(fetch_size(page_size)))).all()
+    licences, next_cursor = LICENCE_KEYSET.page(licences, page_size)
+    return page_body(response, licences, next_cursor, cursor, limit)
 
 @router.patch("/licences/{licence_id}", response_model=LicenceResponse)
 async def update_licence(
     licence_id: int,
     licence_payload: LicenceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a licence"""
-    licence = db.query(Licence).filter(Licence.id == licence_id).first()
+    licence = await db.get(Licence, licence_id)
     if not licence:
         raise HTTPException(status_code=404, detail="Licence not found")
 
     for key, value in licence_payload.model_dump(exclude_unset=True).items():
         setattr(licence, key, value)
 
-    db.commit()
-    db.refresh(licence)
+    await db.commit()
+    await db.refresh(licence)
     return licence
 
 #put request to update licence
@@ -120,32 +138,32 @@ async def update_licence(
 async def replace_licence(
     licence_id: int,
     licence_payload: LicenceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Replace a licence"""
-    licence = db.query(Licence).filter(Licence.id == licence_id).first()
+    licence = await db.get(Licence, licence_id)
     if not licence:
         raise HTTPException(status_code=404, detail="Licence not found")
 
     for key, value in licence_payload.model_dump(exclude_unset=False).items():
         setattr(licence, key, value)
 
-    db.commit()
-    db.refresh(licence)
+    await db.commit()
+    await db.refresh(licence)
     return licence
 
 @router.delete("/licences/{licence_id}")
 async def delete_licence(
     licence_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a licence"""
-    licence = db.query(Licence).filter(Licence.id == licence_id).first()
+    licence = await db.get(Licence, licence_id)
     if not licence:
         raise HTTPException(status_code=404, detail="Licence not found")
 
-    db.delete(licence)
-    db.commit()
+    await db.delete(licence)
+    await db.commit()
     return {"detail": "Licence deleted successfully"}
\ No newline at end of file
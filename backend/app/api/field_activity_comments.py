@@ -1,8 +1,9 @@
 from typing import List
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User
 from app.models.field_activity import FieldActivity, FieldActivityComment
 from app.schemas.field_activity import (
@@ -14,7 +15,9 @@ from app.utils.auth import get_current_active_user
 from app.utils.sanitizer import sanitize_html
 from app.api.field_operations import check_workspace_access
 from app.api.websocket import notify_workspace
-from app.services.push_notification_service import PushNotificationService
+from app.services.outbox import Outbox
+from app.services.outbox_handlers import TOPIC_PUSH_USERS
+from app.services.response_assembler import ResponseAssembler, UserNameMap
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -27,8 +30,8 @@ def format_comment_title(content: str, max_len: int = 80) -> str:
     return f"{cleaned[:max_len - 1].rstrip()}…"
 
 
-def get_activity_or_404(activity_id: int, db: Session) -> FieldActivity:
-    activity = db.query(FieldActivity).filter(FieldActivity.id == activity_id).first()
+async def get_activity_or_404(activity_id: int, db: AsyncSession) -> FieldActivity:
+    activity = await db.scalar(select(FieldActivity).filter(FieldActivity.id == activity_id))
     if not activity:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,30 +59,21 @@ def ensure_participant(activity: FieldActivity, current_user: User) -> None:
 @router.get("/{activity_id}/comments", response_model=List[FieldActivityCommentResponse])
 async def get_activity_comments(
     activity_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    activity = get_activity_or_404(activity_id, db)
-    check_workspace_access(activity.workspace_id, current_user, db)
+    activity = await get_activity_or_404(activity_id, db)
+    await check_workspace_access(activity.workspace_id, current_user, db)
     ensure_assigned_activity(activity)
     ensure_participant(activity, current_user)
 
-    comments = (
-        db.query(FieldActivityComment)
+    comments = (await db.scalars(
+        select(FieldActivityComment)
         .filter(FieldActivityComment.field_activity_id == activity_id)
         .order_by(FieldActivityComment.created_at)
-        .all()
-    )
-
-    response_comments = []
-    for comment in comments:
-        comment_response = FieldActivityCommentResponse.model_validate(comment)
-        if comment.user:
-            comment_response.user_name = comment.user.full_name or comment.user.username
-            comment_response.user_avatar = comment.user.avatar_url
-        response_comments.append(comment_response)
+    )).all()
 
-    return response_comments
+    return await ResponseAssembler.activity_comments(db, comments, UserNameMap(current_user))
 
 
 @router.post(
@@ -90,20 +84,19 @@ async def get_activity_comments(
 async def create_activity_comment(
     activity_id: int,
     comment_data: FieldActivityCommentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    activity = get_activity_or_404(activity_id, db)
-    check_workspace_access(activity.workspace_id, current_user, db)
+    activity = await get_activity_or_404(activity_id, db)
+    await check_workspace_access(activity.workspace_id, current_user, db)
     ensure_assigned_activity(activity)
     ensure_participant(activity, current_user)
 
     parent_comment_id = comment_data.parent_comment_id
     if parent_comment_id:
-        parent_comment = (
-            db.query(FieldActivityComment)
+        parent_comment = await db.scalar(
+            select(FieldActivityComment)
             .filter(FieldActivityComment.id == parent_comment_id)
-            .first()
         )
         if not parent_comment or parent_comment.field_activity_id != activity_id:
             raise HTTPException(
@@ -120,8 +113,24 @@ async def create_activity_comment(
     )
 
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.flush()
+
+    # Push notification goes out from the outbox worker once this commits
+    push_targets = {
+        activity.support_staff_id,
+        activity.created_by,
+    }
+    Outbox.enqueue(db, TOPIC_PUSH_USERS, {
+        "user_ids": sorted(push_targets),
+        "title": format_comment_title(content) or "New Activity Comment",
+        "message": f"{current_user.full_name or current_user.username} commented on {activity.title}",
+        "data": {
+            "tag": f"field-activity-comment-{activity.id}",
+            "url": f"/field/activities/{activity.id}",
+        },
+    })
+    await db.commit()
+    await db.refresh(comment)
 
     response = FieldActivityCommentResponse.model_validate(comment)
     response.user_name = current_user.full_name or current_user.username
@@ -135,38 +144,6 @@ async def create_activity_comment(
         "target_user_ids": [activity.created_by, activity.support_staff_id],
     })
 
-    push_targets = {
-        activity.support_staff_id,
-        activity.created_by,
-    }
-
-    for user_id in push_targets:
-        try:
-            sent = PushNotificationService.send_notification(
-                db=db,
-                user_id=user_id,
-                title=format_comment_title(response.content) or "New Activity Comment",
-                message=f"{response.user_name} commented on {activity.title}",
-                data={
-                    "tag": f"field-activity-comment-{activity.id}",
-                    "url": f"/field/activities/{activity.id}",
-                },
-            )
-            logger.info(
-                "Push notification for field activity comment sent=%s user_id=%s activity_id=%s comment_id=%s",
-                sent,
-                user_id,
-                activity.id,
-                comment.id,
-            )
-        except Exception:
-            logger.exception(
-                "Failed to send push notification user_id=%s activity_id=%s comment_id=%s",
-                user_id,
-                activity.id,
-                comment.id,
-            )
-
     return response
 
 
@@ -174,18 +151,18 @@ async def create_activity_comment(
 async def update_activity_comment(
     comment_id: int,
     comment_data: FieldActivityCommentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    comment = db.query(FieldActivityComment).filter(FieldActivityComment.id == comment_id).first()
+    comment = await db.scalar(select(FieldActivityComment).filter(FieldActivityComment.id == comment_id))
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Comment not found",
         )
 
-    activity = get_activity_or_404(comment.field_activity_id, db)
-    check_workspace_access(activity.workspace_id, current_user, db)
+    activity = await get_activity_or_404(comment.field_activity_id, db)
+    await check_workspace_access(activity.workspace_id, current_user, db)
     ensure_assigned_activity(activity)
     ensure_participant(activity, current_user)
 
@@ -196,8 +173,8 @@ async def update_activity_comment(
         )
 
     comment.content = sanitize_html(comment_data.content)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
 
     response = FieldActivityCommentResponse.model_validate(comment)
     response.user_name = current_user.full_name or current_user.username
@@ -209,18 +186,18 @@ async def update_activity_comment(
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_activity_comment(
     comment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    comment = db.query(FieldActivityComment).filter(FieldActivityComment.id == comment_id).first()
+    comment = await db.scalar(select(FieldActivityComment).filter(FieldActivityComment.id == comment_id))
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Comment not found",
         )
 
-    activity = get_activity_or_404(comment.field_activity_id, db)
-    check_workspace_access(activity.workspace_id, current_user, db)
+    activity = await get_activity_or_404(comment.field_activity_id, db)
+    await check_workspace_access(activity.workspace_id, current_user, db)
     ensure_assigned_activity(activity)
     ensure_participant(activity, current_user)
 
@@ -230,6 +207,6 @@ async def delete_activity_comment(
             detail="Can only delete your own comments",
         )
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
     return None
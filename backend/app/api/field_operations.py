@@ -1,61 +1,87 @@
-from typing import List, Optional
-import os
-import uuid
+from typing import Dict, FrozenSet, Iterable, List, Optional, Union
+from dataclasses import asdict
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Body
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-import aiofiles
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Body, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, insert, or_, select
+from app.config import settings
+from app.database import get_async_db
+from app.models.blob import Blob
 from app.models.user import User, UserRole
-from app.models.workspace import WorkspaceMember
 from app.models.field_activity import FieldActivity, TaskCategory, FieldActivityPhoto, ActivityStatus
 from app.schemas.field_activity import (
     FieldActivityCreate,
     FieldActivityUpdate,
     FieldActivityResponse,
     FieldActivityDetailResponse,
-    FieldActivityPhotoResponse
+    FieldActivityPhotoResponse,
+    FieldActivityStatusUpdate,
+    FieldActivityBulkResponse
+)
+from app.schemas.bulk import bulk_item_error
+from app.schemas.search import SearchResult
+from app.schemas.upload import (
+    DirectUploadComplete,
+    DirectUploadRequest,
+    PresignedUploadResponse,
+    ResumableUploadRequest,
+    ResumableUploadResponse
 )
 from app.utils.auth import get_current_active_user, require_role
-from app.utils.sanitizer import sanitize_html
-from app.services.field_activity_service import FieldActivityReportService
-from app.config import settings
+from app.utils.sanitizer import sanitize_html, sanitize_html_many
+from app.schemas.pagination import Page
+from app.utils.pagination import (
+    CURSOR_DESCRIPTION, LIMIT_DESCRIPTION, Keyset, fetch_size, page_body, resolve_page_size
+)
+from app.services.field_activity_stats_service import FieldActivityStatsService
+from app.services.response_assembler import ResponseAssembler, UserNameMap
+from app.services.search_service import SearchService
+from app.services.access_cache import AccessCache
+from app.services.blob_store import BlobStore
+from app.services.resumable_uploads import ResumableUploads
+from app.services.outbox import Outbox
+from app.services.outbox_handlers import TOPIC_ACTIVITY_REPORT, TOPIC_PHOTO_VARIANTS, TOPIC_WEEKLY_REPORTS
 
 router = APIRouter()
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/heic"}
+MAX_PHOTO_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Keyset orders for paginated activity lists
+ACTIVITY_KEYSET_DESC = Keyset(
+    (FieldActivity.activity_date, True, False),
+    (FieldActivity.start_time, True, True),
+    (FieldActivity.id, True, False)
+)
+ACTIVITY_KEYSET_ASC = Keyset(
+    (FieldActivity.activity_date, False, False),
+    (FieldActivity.start_time, False, True),
+    (FieldActivity.id, False, False)
+)
 
 # Special cross-workspace access configuration
 WORKSPACE_DEV_TEAM = 2
 WORKSPACE_FIELD_TEAM = 7
 
 
-def check_workspace_access(workspace_id: int, current_user: User, db: Session) -> None:
+async def check_workspace_access(workspace_id: int, current_user: User, db: AsyncSession) -> None:
     """
     Check if user has access to a workspace.
     Special case: Allow cross-access between workspace 2 (Dev Team) and workspace 7 (Field Team)
     """
-    # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    # One cached lookup covers both the direct and the linked workspace
+    workspace_ids = await AccessCache.workspace_ids_async(db, current_user.id)
 
     # If already a member, grant access
-    if is_member:
+    if workspace_id in workspace_ids:
         return
 
     # Special case: Allow cross-access between workspace 2 and workspace 7
     if workspace_id in [WORKSPACE_DEV_TEAM, WORKSPACE_FIELD_TEAM]:
         # Check if user is member of the other workspace
         other_workspace_id = WORKSPACE_FIELD_TEAM if workspace_id == WORKSPACE_DEV_TEAM else WORKSPACE_DEV_TEAM
-        is_member_of_linked = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == other_workspace_id,
-            WorkspaceMember.user_id == current_user.id
-        ).first()
-        
-        if is_member_of_linked:
+        if other_workspace_id in workspace_ids:
             return
 
     # No access granted
@@ -65,20 +91,46 @@ def check_workspace_access(workspace_id: int, current_user: User, db: Session) -
     )
 
 
-@router.post("/", response_model=FieldActivityResponse, status_code=status.HTTP_201_CREATED)
-async def create_field_activity(
+def restrict_to_visible_categories(query, current_user: User):
+    """
+    Hide activities whose category requires a higher role than the user's.
+    Done in SQL so every page is full. Works on Query and select() alike.
+    """
+    # Role hierarchy: team_member < manager < executive
+    role_hierarchy = {"team_member": 0, "manager": 1, "executive": 2}
+    user_role_level = role_hierarchy.get(current_user.role, 0)
+    restricted_roles = [role for role, level in role_hierarchy.items() if level > user_role_level]
+    if not restricted_roles:
+        return query
+    return query.outerjoin(FieldActivity.task_category).filter(or_(
+        FieldActivity.task_category_id.is_(None),
+        TaskCategory.required_role.notin_(restricted_roles)
+    ))
+
+
+async def category_workspace_ids(db: AsyncSession, category_ids: Iterable[Optional[int]]) -> Dict[int, int]:
+    """Workspace of each given task category (unknown ids are left out), in one query"""
+    category_ids = {category_id for category_id in category_ids if category_id}
+    if not category_ids:
+        return {}
+    return dict((await db.execute(
+        select(TaskCategory.id, TaskCategory.workspace_id).where(TaskCategory.id.in_(category_ids))
+    )).all())
+
+
+def validate_new_activity(
     activity_data: FieldActivityCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Create a new field activity"""
+    current_user: User,
+    workspace_ids: FrozenSet[int],
+    category_workspaces: Dict[int, int]
+) -> None:
+    """
+    Membership, assignment and category checks for a new activity.
+    workspace_ids and category_workspaces are looked up once per request
+    (see AccessCache.workspace_ids, category_workspace_ids).
+    """
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == activity_data.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
-
-    if not is_member:
+    if activity_data.workspace_id not in workspace_ids:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a member of this workspace"
@@ -96,13 +148,70 @@ async def create_field_activity(
 
     # Validate task_category belongs to same workspace if provided
     if activity_data.task_category_id:
-        category = db.query(TaskCategory).filter(TaskCategory.id == activity_data.task_category_id).first()
-        if not category or category.workspace_id != activity_data.workspace_id:
+        if category_workspaces.get(activity_data.task_category_id) != activity_data.workspace_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid task category for this workspace"
             )
 
+
+def validate_status_change(activity: FieldActivity, update_data: dict, current_user: User) -> None:
+    """Required fields and permission for an update that sets status"""
+    # If updating to COMPLETED, ensure required fields are provided
+    if 'status' in update_data and update_data['status'] == ActivityStatus.COMPLETED:
+        # Check current activity state and updated data
+        start_time = update_data.get('start_time') or activity.start_time
+        end_time = update_data.get('end_time') or activity.end_time
+        task_description = update_data.get('task_description') or activity.task_description
+
+        if not start_time or not end_time or not task_description:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_time, end_time, and task_description are required when completing a task"
+            )
+
+    # Permission check: staff can only complete their own pending tasks
+    if 'status' in update_data:
+        if activity.support_staff_id != current_user.id:
+            # Only managers/executives can update others' tasks
+            if current_user.role not in [UserRole.MANAGER, UserRole.EXECUTIVE]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You can only update your own assigned tasks"
+                )
+
+
+async def reload_activities(db: AsyncSession, activity_ids: List[int]) -> List[FieldActivity]:
+    """
+    Load activities (with what FieldActivityResponse nests) in one query, in
+    the given order, fresh from the database even if the session holds them
+    """
+    loaded = {
+        activity.id: activity
+        for activity in await db.scalars(
+            select(FieldActivity)
+            .options(*ResponseAssembler.FIELD_ACTIVITY_OPTIONS)
+            .where(FieldActivity.id.in_(activity_ids))
+            .execution_options(populate_existing=True)
+        )
+    }
+    return [loaded[activity_id] for activity_id in activity_ids]
+
+
+@router.post("/", response_model=FieldActivityResponse, status_code=status.HTTP_201_CREATED)
+async def create_field_activity(
+    activity_data: FieldActivityCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create a new field activity"""
+    validate_new_activity(
+        activity_data,
+        current_user,
+        await AccessCache.workspace_ids_async(db, current_user.id),
+        await category_workspace_ids(db, [activity_data.task_category_id])
+    )
+
     # Sanitize HTML content
     activity_dict = activity_data.model_dump()
     if activity_dict.get('task_description'):
@@ -114,36 +223,182 @@ async def create_field_activity(
         **activity_dict,
         created_by=current_user.id
     )
+    SearchService.index_activity(activity)
     db.add(activity)
-    db.commit()
-    db.refresh(activity)
+    await db.flush()
+    await db.run_sync(FieldActivityStatsService.record_created, activity)
+    await db.commit()
 
     # Populate computed fields for response
-    activity.support_staff_name = activity.support_staff.full_name or activity.support_staff.username
-    activity.created_by_name = current_user.full_name or current_user.username
+    activities = await reload_activities(db, [activity.id])
+    return (await ResponseAssembler.field_activities(db, activities, UserNameMap(current_user)))[0]
 
-    return activity
 
+@router.post("/bulk", response_model=FieldActivityBulkResponse)
+async def bulk_create_field_activities(
+    activities_data: List[FieldActivityCreate] = Body(..., min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create several field activities at once (e.g. a day's visits)
+
+    Memberships, categories and staff are looked up once for the batch and
+    the valid activities are inserted in one statement and one transaction.
+    Rejected items come back in `errors` with their index; the others are
+    still created.
+    """
+    workspace_ids = await AccessCache.workspace_ids_async(db, current_user.id)
+    category_workspaces = await category_workspace_ids(db, (a.task_category_id for a in activities_data))
+    staff_ids = set(await db.scalars(
+        select(User.id).where(User.id.in_({a.support_staff_id for a in activities_data}))
+    ))
+
+    errors = []
+    rows = []
+    for index, activity_data in enumerate(activities_data):
+        try:
+            validate_new_activity(activity_data, current_user, workspace_ids, category_workspaces)
+            if activity_data.support_staff_id not in staff_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Support staff not found"
+                )
+        except HTTPException as exc:
+            errors.append(bulk_item_error(index, exc))
+            continue
+        rows.append(activity_data.model_dump())
+
+    if not rows:
+        return FieldActivityBulkResponse(errors=errors)
 
-@router.get("/workspace/{workspace_id}", response_model=List[FieldActivityResponse])
+    # Sanitize HTML content
+    for field in ('task_description', 'remarks'):
+        for row, cleaned in zip(rows, sanitize_html_many(row[field] for row in rows)):
+            row[field] = cleaned
+    for row in rows:
+        row['created_by'] = current_user.id
+        SearchService.index_activity_values(row)
+
+    activities = (await db.scalars(
+        insert(FieldActivity).returning(FieldActivity, sort_by_parameter_order=True),
+        rows
+    )).all()
+    await db.run_sync(FieldActivityStatsService.record_batch, created=activities)
+    activity_ids = [activity.id for activity in activities]
+    await db.commit()
+
+    activities = await reload_activities(db, activity_ids)
+    await ResponseAssembler.field_activities(db, activities, UserNameMap(current_user))
+    return FieldActivityBulkResponse(activities=activities, errors=errors)
+
+
+@router.patch("/bulk/status", response_model=FieldActivityBulkResponse)
+async def bulk_update_field_activity_status(
+    updates: List[FieldActivityStatusUpdate] = Body(..., min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Change the status of several field activities at once (e.g. completing
+    the day's pending tasks)
+
+    Same rules as updating one activity. The activities are loaded in one
+    query and the valid changes saved in one transaction; rejected items
+    come back in `errors` with their index.
+    """
+    activities = {
+        activity.id: activity
+        for activity in await db.scalars(
+            select(FieldActivity).where(FieldActivity.id.in_({update.id for update in updates}))
+        )
+    }
+    workspace_ids = await AccessCache.workspace_ids_async(db, current_user.id)
+
+    errors = []
+    changes = []
+    seen = set()
+    for index, update in enumerate(updates):
+        activity = activities.get(update.id)
+        update_data = update.model_dump(exclude_unset=True, exclude={"id"})
+        try:
+            if not activity:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Field activity not found"
+                )
+            if update.id in seen:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Field activity appears more than once in this batch"
+                )
+            if activity.workspace_id not in workspace_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not a member of this workspace"
+                )
+            validate_status_change(activity, update_data, current_user)
+        except HTTPException as exc:
+            errors.append(bulk_item_error(index, exc))
+            continue
+        seen.add(update.id)
+        changes.append((activity, update_data))
+
+    if not changes:
+        return FieldActivityBulkResponse(errors=errors)
+
+    # Sanitize HTML content if present
+    descriptions = sanitize_html_many(update_data.get('task_description') for _, update_data in changes)
+    updated = []
+    for (activity, update_data), description in zip(changes, descriptions):
+        if 'task_description' in update_data:
+            update_data['task_description'] = description
+        stats_before = FieldActivityStatsService.snapshot(activity)
+        for field, value in update_data.items():
+            setattr(activity, field, value)
+        activity.updated_by = current_user.id
+        SearchService.index_activity(activity)
+        updated.append((stats_before, activity))
+
+    await db.flush()
+    await db.run_sync(FieldActivityStatsService.record_batch, updated=updated)
+    activity_ids = [activity.id for activity, _ in changes]
+    await db.commit()
+
+    activities = await reload_activities(db, activity_ids)
+    await ResponseAssembler.field_activities(db, activities, UserNameMap(current_user))
+    return FieldActivityBulkResponse(activities=activities, errors=errors)
+
+
+@router.get("/workspace/{workspace_id}", response_model=Union[List[FieldActivityResponse], Page[FieldActivityResponse]])
 async def get_workspace_field_activities(
     workspace_id: int,
+    response: Response,
     date_from: Optional[date] = Query(None, description="Filter from date"),
     date_to: Optional[date] = Query(None, description="Filter to date"),
     support_staff_id: Optional[int] = Query(None, description="Filter by staff member"),
     task_category_id: Optional[int] = Query(None, description="Filter by category"),
     customer_name: Optional[str] = Query(None, description="Search customer name"),
-    search: Optional[str] = Query(None, description="Search in task description"),
+    search: Optional[str] = Query(None, description="Search in title, description, remarks and customer"),
     status: Optional[ActivityStatus] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all field activities for a workspace with optional filters"""
+    """
+    Get field activities for a workspace with optional filters
+
+    Newest first. With limit or cursor the result is paginated: the body is
+    {items, next_cursor} (next_cursor also in the X-Next-Cursor header).
+    """
     # Check workspace access (includes special cross-workspace permissions)
-    check_workspace_access(workspace_id, current_user, db)
+    await check_workspace_access(workspace_id, current_user, db)
 
     # Build query with filters
-    query = db.query(FieldActivity).filter(FieldActivity.workspace_id == workspace_id)
+    query = select(FieldActivity).options(
+        *ResponseAssembler.FIELD_ACTIVITY_OPTIONS
+    ).filter(FieldActivity.workspace_id == workspace_id)
 
     if date_from:
         query = query.filter(FieldActivity.activity_date >= date_from)
@@ -158,51 +413,79 @@ async def get_workspace_field_activities(
         query = query.filter(FieldActivity.task_category_id == task_category_id)
 
     if customer_name:
-        query = query.filter(FieldActivity.customer_name.ilike(f"%{customer_name}%"))
+        query = query.filter(SearchService.contains(FieldActivity.customer_name, customer_name))
 
     if search:
-        query = query.filter(FieldActivity.task_description.ilike(f"%{search}%"))
+        query = query.filter(SearchService.contains(FieldActivity.search_text, search))
 
     if status:
         query = query.filter(FieldActivity.status == status)
 
-    activities = query.order_by(FieldActivity.activity_date.desc(), FieldActivity.start_time.desc()).all()
-
-    # Filter activities based on user role and category required_role
-    # Role hierarchy: team_member < manager < executive
-    role_hierarchy = {"team_member": 0, "manager": 1, "executive": 2}
-    user_role_level = role_hierarchy.get(current_user.role, 0)
+    query = restrict_to_visible_categories(query, current_user)
 
-    filtered_activities = []
-    for activity in activities:
-        # If activity has no category, show it to everyone
-        if not activity.task_category_id:
-            filtered_activities.append(activity)
-        else:
-            # Check if user's role meets the category's required role
-            category = activity.task_category
-            category_required_level = role_hierarchy.get(category.required_role, 0)
-            if user_role_level >= category_required_level:
-                filtered_activities.append(activity)
+    page_size = resolve_page_size(limit, cursor)
+    activities = (await db.scalars(query.filter(
+        *ACTIVITY_KEYSET_DESC.after(cursor)
+    ).order_by(*ACTIVITY_KEYSET_DESC.order_by()).limit(fetch_size(page_size)))).all()
+    filtered_activities, next_cursor = ACTIVITY_KEYSET_DESC.page(activities, page_size)
 
     # Populate computed fields
-    for activity in filtered_activities:
-        activity.support_staff_name = activity.support_staff.full_name or activity.support_staff.username
-        activity.created_by_name = activity.created_by_user.full_name or activity.created_by_user.username
-        if activity.updated_by:
-            activity.updated_by_name = activity.updated_by_user.full_name or activity.updated_by_user.username
+    items = await ResponseAssembler.field_activities(db, filtered_activities, UserNameMap(current_user))
+    return page_body(response, items, next_cursor, cursor, limit)
 
-    return filtered_activities
+
+@router.get("/workspace/{workspace_id}/search", response_model=List[SearchResult])
+async def search_field_activities(
+    workspace_id: int,
+    q: str = Query(..., min_length=1, description="Words or phrase to search for"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Ranked search over activity titles, customers, descriptions and remarks
+
+    Best matches first; each hit carries a snippet with the matched words
+    wrapped in <mark>.
+    """
+    await check_workspace_access(workspace_id, current_user, db)
+
+    hits = await db.run_sync(
+        SearchService.search,
+        FieldActivity,
+        q,
+        filters=[FieldActivity.workspace_id == workspace_id],
+        date_column=FieldActivity.activity_date,
+        limit=limit,
+        base=restrict_to_visible_categories(select(FieldActivity), current_user)
+    )
+    return [
+        SearchResult(
+            id=activity.id,
+            workspace_id=activity.workspace_id,
+            title=activity.title,
+            date=activity.activity_date,
+            customer_name=activity.customer_name,
+            rank=rank,
+            highlight=snippet
+        )
+        for activity, rank, snippet in hits
+    ]
 
 
 @router.get("/{activity_id}", response_model=FieldActivityDetailResponse)
 async def get_field_activity(
     activity_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific field activity with photos"""
-    activity = db.query(FieldActivity).filter(FieldActivity.id == activity_id).first()
+    activity = await db.scalar(
+        select(FieldActivity).options(
+            *ResponseAssembler.FIELD_ACTIVITY_OPTIONS,
+            selectinload(FieldActivity.photos)
+        ).filter(FieldActivity.id == activity_id)
+    )
 
     if not activity:
         raise HTTPException(
@@ -211,7 +494,7 @@ async def get_field_activity(
         )
 
     # Check workspace access (includes special cross-workspace permissions)
-    check_workspace_access(activity.workspace_id, current_user, db)
+    await check_workspace_access(activity.workspace_id, current_user, db)
 
     # Check if user has permission to view this activity based on category role
     if activity.task_category_id:
@@ -227,10 +510,7 @@ async def get_field_activity(
             )
 
     # Populate computed fields
-    activity.support_staff_name = activity.support_staff.full_name or activity.support_staff.username
-    activity.created_by_name = activity.created_by_user.full_name or activity.created_by_user.username
-    if activity.updated_by:
-        activity.updated_by_name = activity.updated_by_user.full_name or activity.updated_by_user.username
+    await ResponseAssembler.field_activities(db, [activity], UserNameMap(current_user))
 
     return activity
 
@@ -239,11 +519,11 @@ async def get_field_activity(
 async def update_field_activity(
     activity_id: int,
     activity_data: FieldActivityUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a field activity"""
-    activity = db.query(FieldActivity).filter(FieldActivity.id == activity_id).first()
+    activity = await db.scalar(select(FieldActivity).filter(FieldActivity.id == activity_id))
 
     if not activity:
         raise HTTPException(
@@ -252,10 +532,7 @@ async def update_field_activity(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == activity.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, activity.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -265,7 +542,7 @@ async def update_field_activity(
 
     # Validate task_category if being updated
     if activity_data.task_category_id:
-        category = db.query(TaskCategory).filter(TaskCategory.id == activity_data.task_category_id).first()
+        category = await db.scalar(select(TaskCategory).filter(TaskCategory.id == activity_data.task_category_id))
         if not category or category.workspace_id != activity.workspace_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -274,29 +551,7 @@ async def update_field_activity(
 
     # Validate status transitions and required fields
     update_data = activity_data.model_dump(exclude_unset=True)
-
-    # If updating to COMPLETED, ensure required fields are provided
-    if 'status' in update_data and update_data['status'] == ActivityStatus.COMPLETED:
-        # Check current activity state and updated data
-        start_time = update_data.get('start_time') or activity.start_time
-        end_time = update_data.get('end_time') or activity.end_time
-        task_description = update_data.get('task_description') or activity.task_description
-
-        if not start_time or not end_time or not task_description:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="start_time, end_time, and task_description are required when completing a task"
-            )
-
-    # Permission check: staff can only complete their own pending tasks
-    if 'status' in update_data:
-        if activity.support_staff_id != current_user.id:
-            # Only managers/executives can update others' tasks
-            if current_user.role not in [UserRole.MANAGER, UserRole.EXECUTIVE]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update your own assigned tasks"
-                )
+    validate_status_change(activity, update_data, current_user)
 
     # Update activity fields
 
@@ -306,29 +561,29 @@ async def update_field_activity(
     if 'remarks' in update_data and update_data['remarks']:
         update_data['remarks'] = sanitize_html(update_data['remarks'])
 
+    stats_before = FieldActivityStatsService.snapshot(activity)
     for field, value in update_data.items():
         setattr(activity, field, value)
 
     activity.updated_by = current_user.id
-    db.commit()
-    db.refresh(activity)
+    SearchService.index_activity(activity)
+    await db.flush()
+    await db.run_sync(FieldActivityStatsService.record_updated, stats_before, activity)
+    await db.commit()
 
     # Populate computed fields
-    activity.support_staff_name = activity.support_staff.full_name or activity.support_staff.username
-    activity.created_by_name = activity.created_by_user.full_name or activity.created_by_user.username
-    activity.updated_by_name = current_user.full_name or current_user.username
-
-    return activity
+    activities = await reload_activities(db, [activity.id])
+    return (await ResponseAssembler.field_activities(db, activities, UserNameMap(current_user)))[0]
 
 
 @router.delete("/{activity_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_field_activity(
     activity_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a field activity"""
-    activity = db.query(FieldActivity).filter(FieldActivity.id == activity_id).first()
+    activity = await db.scalar(select(FieldActivity).filter(FieldActivity.id == activity_id))
 
     if not activity:
         raise HTTPException(
@@ -337,10 +592,7 @@ async def delete_field_activity(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == activity.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, activity.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -355,24 +607,25 @@ async def delete_field_activity(
             detail="Only the creator or managers can delete this activity"
         )
 
-    db.delete(activity)
-    db.commit()
+    await db.run_sync(FieldActivityStatsService.record_deleted, activity)
+    await db.delete(activity)
+    await db.commit()
 
     return None
 
 
-@router.get("/workspace/{workspace_id}/pending", response_model=List[FieldActivityResponse])
+@router.get("/workspace/{workspace_id}/pending", response_model=Union[List[FieldActivityResponse], Page[FieldActivityResponse]])
 async def get_pending_tasks(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get pending tasks assigned to the current user"""
+    """Get pending tasks assigned to the current user (paginated, oldest first)"""
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -381,34 +634,31 @@ async def get_pending_tasks(
         )
 
     # Get pending tasks assigned to current user
-    pending_tasks = db.query(FieldActivity).filter(
+    page_size = resolve_page_size(limit, cursor)
+    pending_tasks = (await db.scalars(select(FieldActivity).options(
+        *ResponseAssembler.FIELD_ACTIVITY_OPTIONS
+    ).filter(
         FieldActivity.workspace_id == workspace_id,
         FieldActivity.support_staff_id == current_user.id,
-        FieldActivity.status == ActivityStatus.PENDING
-    ).order_by(FieldActivity.activity_date.asc()).all()
+        FieldActivity.status == ActivityStatus.PENDING,
+        *ACTIVITY_KEYSET_ASC.after(cursor)
+    ).order_by(*ACTIVITY_KEYSET_ASC.order_by()).limit(fetch_size(page_size)))).all()
+    pending_tasks, next_cursor = ACTIVITY_KEYSET_ASC.page(pending_tasks, page_size)
 
     # Populate computed fields
-    for task in pending_tasks:
-        task.support_staff_name = task.support_staff.full_name or task.support_staff.username
-        task.created_by_name = task.created_by_user.full_name or task.created_by_user.username
-        if task.updated_by:
-            task.updated_by_name = task.updated_by_user.full_name or task.updated_by_user.username
-
-    return pending_tasks
+    items = await ResponseAssembler.field_activities(db, pending_tasks, UserNameMap(current_user))
+    return page_body(response, items, next_cursor, cursor, limit)
 
 
 @router.get("/workspace/{workspace_id}/assigned-by-me", response_model=List[FieldActivityResponse])
 async def get_tasks_assigned_by_me(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.EXECUTIVE]))
 ):
     """Get pending tasks created by the current user (managers/executives only)"""
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -417,20 +667,16 @@ async def get_tasks_assigned_by_me(
         )
 
     # Get pending tasks created by current user
-    assigned_tasks = db.query(FieldActivity).filter(
+    assigned_tasks = (await db.scalars(select(FieldActivity).options(
+        *ResponseAssembler.FIELD_ACTIVITY_OPTIONS
+    ).filter(
         FieldActivity.workspace_id == workspace_id,
         FieldActivity.created_by == current_user.id,
         FieldActivity.status == ActivityStatus.PENDING
-    ).order_by(FieldActivity.activity_date.asc()).all()
+    ).order_by(FieldActivity.activity_date.asc()))).all()
 
     # Populate computed fields
-    for task in assigned_tasks:
-        task.support_staff_name = task.support_staff.full_name or task.support_staff.username
-        task.created_by_name = task.created_by_user.full_name or task.created_by_user.username
-        if task.updated_by:
-            task.updated_by_name = task.updated_by_user.full_name or task.updated_by_user.username
-
-    return assigned_tasks
+    return await ResponseAssembler.field_activities(db, assigned_tasks, UserNameMap(current_user))
 
 
 @router.get("/workspace/{workspace_id}/analytics")
@@ -438,53 +684,42 @@ async def get_field_activity_analytics(
     workspace_id: int,
     date_from: Optional[date] = Query(None, description="Analytics from date"),
     date_to: Optional[date] = Query(None, description="Analytics to date"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.EXECUTIVE]))
 ):
     """Get analytics for field activities (managers/executives only)"""
     # Check workspace access (includes special cross-workspace permissions)
-    check_workspace_access(workspace_id, current_user, db)
+    await check_workspace_access(workspace_id, current_user, db)
 
-    # Build base query
-    query = db.query(FieldActivity).filter(FieldActivity.workspace_id == workspace_id)
+    # Read from the daily rollup when it exists, otherwise scan field_activities
+    source = FieldActivityStatsService.source(await FieldActivityStatsService.is_available_async(db))
 
+    filters = [source.workspace_id == workspace_id]
     if date_from:
-        query = query.filter(FieldActivity.activity_date >= date_from)
+        filters.append(source.activity_date >= date_from)
     if date_to:
-        query = query.filter(FieldActivity.activity_date <= date_to)
+        filters.append(source.activity_date <= date_to)
 
     # Hours by staff member
-    hours_by_staff = db.query(
+    hours_by_staff = (await db.execute(select(
         User.id,
         User.full_name,
         User.username,
-        func.count(FieldActivity.id).label('activity_count')
-    ).join(FieldActivity, FieldActivity.support_staff_id == User.id)\
-     .filter(FieldActivity.workspace_id == workspace_id)
-
-    if date_from:
-        hours_by_staff = hours_by_staff.filter(FieldActivity.activity_date >= date_from)
-    if date_to:
-        hours_by_staff = hours_by_staff.filter(FieldActivity.activity_date <= date_to)
-
-    hours_by_staff = hours_by_staff.group_by(User.id, User.full_name, User.username).all()
+        source.count().label('activity_count')
+    ).join(source.model, source.support_staff_id == User.id)
+     .filter(*filters)
+     .group_by(User.id, User.full_name, User.username))).all()
 
     # Activities by category
-    activities_by_category = db.query(
+    activities_by_category = (await db.execute(select(
         TaskCategory.title,
-        func.count(FieldActivity.id).label('count')
-    ).join(FieldActivity, FieldActivity.task_category_id == TaskCategory.id)\
-     .filter(FieldActivity.workspace_id == workspace_id)
-
-    if date_from:
-        activities_by_category = activities_by_category.filter(FieldActivity.activity_date >= date_from)
-    if date_to:
-        activities_by_category = activities_by_category.filter(FieldActivity.activity_date <= date_to)
-
-    activities_by_category = activities_by_category.group_by(TaskCategory.title).all()
+        source.count().label('count')
+    ).join(source.model, source.task_category_id == TaskCategory.id)
+     .filter(*filters)
+     .group_by(TaskCategory.title))).all()
 
     # Total activities
-    total_activities = query.count()
+    total_activities = await db.scalar(select(source.count()).filter(*filters)) or 0
 
     return {
         "total_activities": total_activities,
@@ -506,16 +741,9 @@ async def get_field_activity_analytics(
     }
 
 
-@router.post("/{activity_id}/photos", response_model=FieldActivityPhotoResponse, status_code=status.HTTP_201_CREATED)
-async def upload_field_activity_photo(
-    activity_id: int,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Upload a photo for a field activity"""
-    # Get activity
-    activity = db.query(FieldActivity).filter(FieldActivity.id == activity_id).first()
+async def get_member_activity(activity_id: int, current_user: User, db: AsyncSession) -> FieldActivity:
+    """The activity, if the user is a member of its workspace"""
+    activity = await db.scalar(select(FieldActivity).filter(FieldActivity.id == activity_id))
 
     if not activity:
         raise HTTPException(
@@ -524,10 +752,7 @@ async def upload_field_activity_photo(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == activity.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, activity.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -535,49 +760,148 @@ async def upload_field_activity_photo(
             detail="Not a member of this workspace"
         )
 
-    # Validate file size
-    file_content = await file.read()
-    file_size = len(file_content)
+    return activity
 
-    max_size = 10 * 1024 * 1024  # 10MB
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {max_size} bytes"
-        )
 
-    # Validate file type
-    if file.content_type not in ALLOWED_IMAGE_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type {file.content_type} not allowed. Only images are supported."
-        )
+@router.post("/{activity_id}/photos", response_model=FieldActivityPhotoResponse, status_code=status.HTTP_201_CREATED)
+async def upload_field_activity_photo(
+    activity_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload a photo for a field activity"""
+    await get_member_activity(activity_id, current_user, db)
+
+    # Validate size and (sniffed) type; identical content is stored once
+    blob = await BlobStore.store(
+        db,
+        file,
+        ALLOWED_IMAGE_TYPES,
+        storage=settings.FILE_STORAGE,
+        max_size=MAX_PHOTO_SIZE,
+        type_hint="Only images are supported."
+    )
+    return await create_photo(db, blob, activity_id, file.filename, current_user)
+
+
+@router.post("/{activity_id}/photos/presign", response_model=PresignedUploadResponse)
+async def presign_field_activity_photo(
+    activity_id: int,
+    upload: DirectUploadRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start uploading a photo straight to storage; finish with photos/complete"""
+    await get_member_activity(activity_id, current_user, db)
+
+    token, request = BlobStore.presign(
+        db,
+        settings.FILE_STORAGE,
+        scope=f"photo:{activity_id}",
+        user_id=current_user.id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        sha256=upload.sha256,
+        allowed_types=ALLOWED_IMAGE_TYPES,
+        max_size=MAX_PHOTO_SIZE
+    )
+    await db.commit()
+    return PresignedUploadResponse(upload_token=token, **asdict(request))
+
+
+@router.post("/{activity_id}/photos/complete", response_model=FieldActivityPhotoResponse, status_code=status.HTTP_201_CREATED)
+async def complete_field_activity_photo(
+    activity_id: int,
+    upload: DirectUploadComplete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Attach a photo uploaded with photos/presign to the activity"""
+    await get_member_activity(activity_id, current_user, db)
+
+    blob, claims = await BlobStore.complete(
+        db, upload.upload_token, f"photo:{activity_id}", current_user.id, ALLOWED_IMAGE_TYPES
+    )
+    return await create_photo(db, blob, activity_id, claims["filename"], current_user)
+
+
+@router.post("/{activity_id}/photos/resumable", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_resumable_field_activity_photo(
+    activity_id: int,
+    upload: ResumableUploadRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a resumable photo upload; PATCH it in chunks, then photos/resumable/{upload_id}/complete"""
+    await get_member_activity(activity_id, current_user, db)
+
+    session = ResumableUploads.create(
+        db,
+        scope=f"photo:{activity_id}",
+        user_id=current_user.id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        sha256=upload.sha256,
+        allowed_types=ALLOWED_IMAGE_TYPES,
+        max_size=MAX_PHOTO_SIZE
+    )
+    await db.commit()
+    described = ResumableUploads.describe(session)
+    response.headers["Location"] = described.url
+    response.headers.update(ResumableUploads.headers(session, described.offset))
+    return described
 
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join("uploads", "field_photos", unique_filename)
 
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+@router.post(
+    "/{activity_id}/photos/resumable/{upload_id}/complete",
+    response_model=FieldActivityPhotoResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def complete_resumable_field_activity_photo(
+    activity_id: int,
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Attach a fully received resumable upload to the activity"""
+    await get_member_activity(activity_id, current_user, db)
+
+    blob, session = await ResumableUploads.finalize(
+        db,
+        upload_id,
+        scope=f"photo:{activity_id}",
+        user_id=current_user.id,
+        allowed_types=ALLOWED_IMAGE_TYPES,
+        storage=settings.FILE_STORAGE,
+        max_size=MAX_PHOTO_SIZE,
+        type_hint="Only images are supported."
+    )
+    return await create_photo(db, blob, activity_id, session.filename, current_user)
 
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(file_content)
 
-    # Create photo record
+async def create_photo(db: AsyncSession, blob: Blob, activity_id: int, filename: str, current_user: User) -> FieldActivityPhoto:
+    """Photo record for a stored blob (commits)"""
     photo = FieldActivityPhoto(
         field_activity_id=activity_id,
-        file_path=file_path,
-        file_name=file.filename,
-        file_size=file_size,
-        mime_type=file.content_type,
+        file_path=blob.location,
+        file_name=filename,
+        file_size=blob.size,
+        mime_type=blob.mime_type,
+        blob_id=blob.id,
         uploaded_by=current_user.id
     )
 
     db.add(photo)
-    db.commit()
-    db.refresh(photo)
+    await db.flush()
+    # Thumbnails are rendered by the outbox worker; until then the
+    # response's size URLs point at the original
+    Outbox.enqueue(db, TOPIC_PHOTO_VARIANTS, {"photo_id": photo.id})
+    await db.commit()
+    await db.refresh(photo)
 
     return photo
 
@@ -586,15 +910,15 @@ async def upload_field_activity_photo(
 async def delete_field_activity_photo(
     activity_id: int,
     photo_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a photo from a field activity"""
     # Get photo
-    photo = db.query(FieldActivityPhoto).filter(
+    photo = await db.scalar(select(FieldActivityPhoto).filter(
         FieldActivityPhoto.id == photo_id,
         FieldActivityPhoto.field_activity_id == activity_id
-    ).first()
+    ))
 
     if not photo:
         raise HTTPException(
@@ -603,13 +927,10 @@ async def delete_field_activity_photo(
         )
 
     # Get activity
-    activity = db.query(FieldActivity).filter(FieldActivity.id == activity_id).first()
+    activity = await db.scalar(select(FieldActivity).filter(FieldActivity.id == activity_id))
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == activity.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, activity.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -617,18 +938,14 @@ async def delete_field_activity_photo(
             detail="Not a member of this workspace"
         )
 
-    # Delete file from filesystem
-    if os.path.exists(photo.file_path):
-        os.remove(photo.file_path)
-
-    # Delete photo record
-    db.delete(photo)
-    db.commit()
+    # Delete photo record; the file goes with its last reference (BlobStore)
+    await db.delete(photo)
+    await db.commit()
 
     return None
 
 
-@router.post("/workspace/{workspace_id}/send-report")
+@router.post("/workspace/{workspace_id}/send-report", status_code=status.HTTP_202_ACCEPTED)
 async def send_activity_report(
     workspace_id: int,
     date_from: str = Body(...),
@@ -636,7 +953,7 @@ async def send_activity_report(
     recipient_emails: List[str] = Body(...),
     support_staff_id: Optional[int] = Body(None),
     send_individual_reports: bool = Body(False, description="Send personalized reports to each staff member"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -648,12 +965,14 @@ async def send_activity_report(
 
     If send_individual_reports=False (default):
     - All recipients receive the same full report
+
+    The emails are sent in the background; the response returns the job id.
     """
     # Check workspace access (includes special cross-workspace permissions)
-    check_workspace_access(workspace_id, current_user, db)
+    await check_workspace_access(workspace_id, current_user, db)
 
     # Build query
-    query = db.query(FieldActivity).filter(
+    query = select(FieldActivity.id).filter(
         FieldActivity.workspace_id == workspace_id
     )
 
@@ -665,60 +984,46 @@ async def send_activity_report(
     if support_staff_id:
         query = query.filter(FieldActivity.support_staff_id == support_staff_id)
 
-    # Get activities
-    activities = query.order_by(
-        FieldActivity.activity_date,
-        FieldActivity.start_time
-    ).all()
-
-    if not activities:
+    if await db.scalar(query.limit(1)) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No activities found for the specified criteria"
         )
 
+    # Rendering and sending happen in the outbox worker, not in this request
+    job = Outbox.enqueue(db, TOPIC_ACTIVITY_REPORT, {
+        "workspace_id": workspace_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "support_staff_id": support_staff_id,
+        "recipient_emails": recipient_emails,
+        "individual": send_individual_reports
+    })
+    await db.commit()
+
     if send_individual_reports:
-        # Send personalized reports to each workspace member
-        return await FieldActivityReportService.send_individual_reports(
-            workspace_id=workspace_id,
-            activities=activities,
-            date_from=date_from,
-            date_to=date_to,
-            db=db,
-            resend_api_key=settings.RESEND_API_KEY,
-            from_email=settings.RESEND_FROM_EMAIL,
-            from_name=settings.RESEND_FROM_NAME,
-            frontend_url=settings.FRONTEND_URL
-        )
+        message = "Individual reports queued for the workspace members"
     else:
-        # Send same report to all recipients (original behavior)
-        return await FieldActivityReportService.send_bulk_report(
-            activities=activities,
-            recipient_emails=recipient_emails,
-            date_from=date_from,
-            date_to=date_to,
-            resend_api_key=settings.RESEND_API_KEY,
-            from_email=settings.RESEND_FROM_EMAIL,
-            from_name=settings.RESEND_FROM_NAME,
-            frontend_url=settings.FRONTEND_URL
-        )
+        message = f"Report queued for {len(recipient_emails)} recipient(s)"
+    return {"message": message, "status": "queued", "job_id": job.id}
 
 
 @router.post("/trigger-weekly-report")
 async def trigger_weekly_report_manually(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXECUTIVE]))
 ):
     """
     Manually trigger the weekly report job (Executives only)
-    Useful for testing the automated email system
+    Useful for testing the automated email system; the job runs in the background
     """
-    from app.scheduler import send_weekly_reports
-
     try:
-        await send_weekly_reports()
+        # Runs in the outbox worker; the request returns at once
+        job = Outbox.enqueue(db, TOPIC_WEEKLY_REPORTS, {"requested_by": current_user.id})
+        await db.commit()
         return {
             'message': 'Weekly report job triggered successfully',
+            'job_id': job.id,
             'timestamp': datetime.now().isoformat()
         }
     except Exception as e:
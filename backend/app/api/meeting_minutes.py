@@ -1,15 +1,19 @@
 """
 Meeting Minutes API endpoints
-Handles CRUD operations for meeting minutes with Cloudinary file uploads
+Handles CRUD operations for meeting minutes with file uploads (Cloudinary by default)
 """
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Union
+from dataclasses import asdict
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, select
+from app.config import settings
+from app.database import get_async_db
+from app.models.blob import Blob
 from app.models.user import User, UserRole
-from app.models.workspace import WorkspaceMember
 from app.models.meeting_minute import MeetingMinute, MinuteAttachment, MinuteActionItem
 from app.schemas.meeting_minute import (
     MeetingMinuteCreate,
@@ -21,13 +25,43 @@ from app.schemas.meeting_minute import (
     ActionItemUpdate,
     ActionItemResponse
 )
+from app.schemas.search import SearchResult
+from app.schemas.upload import (
+    DirectUploadComplete,
+    DirectUploadRequest,
+    PresignedUploadResponse,
+    ResumableUploadRequest,
+    ResumableUploadResponse
+)
 from app.utils.auth import get_current_active_user, require_role
 from app.utils.sanitizer import sanitize_html
-from app.utils.cloudinary import upload_to_cloudinary, delete_from_cloudinary
-from app.config import settings
+from app.schemas.pagination import Page
+from app.utils.pagination import (
+    CURSOR_DESCRIPTION, LIMIT_DESCRIPTION, Keyset, fetch_size, page_body, resolve_page_size
+)
+from app.services.response_assembler import ResponseAssembler, UserNameMap
+from app.services.search_service import SearchService
+from app.services.access_cache import AccessCache
+from app.services.blob_store import BlobStore
+from app.services.resumable_uploads import ResumableUploads
+from app.services.storage import resource_type_for
 
 router = APIRouter()
 
+# Keyset order for the paginated minutes list
+MINUTE_KEYSET = Keyset(
+    (MeetingMinute.meeting_date, True, False),
+    (MeetingMinute.id, True, False)
+)
+
+# What MeetingMinuteDetailResponse nests
+MINUTE_DETAIL_OPTIONS = (
+    selectinload(MeetingMinute.created_by_user),
+    selectinload(MeetingMinute.updated_by_user),
+    selectinload(MeetingMinute.attachments).selectinload(MinuteAttachment.uploaded_by_user),
+    selectinload(MeetingMinute.action_items).selectinload(MinuteActionItem.assigned_user)
+)
+
 ALLOWED_FILE_TYPES = {
     "application/pdf",
     "image/jpeg", "image/png", "image/gif", "image/webp",
@@ -41,15 +75,12 @@ ALLOWED_FILE_TYPES = {
 @router.post("/", response_model=MeetingMinuteDetailResponse, status_code=status.HTTP_201_CREATED)
 async def create_meeting_minute(
     minute_data: MeetingMinuteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new meeting minute"""
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute_data.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute_data.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -71,8 +102,9 @@ async def create_meeting_minute(
         **minute_dict,
         created_by=current_user.id
     )
+    SearchService.index_minute(meeting_minute)
     db.add(meeting_minute)
-    db.flush()  # Get the ID without committing
+    await db.flush()  # Get the ID without committing
 
     # Create action items if provided
     if minute_data.action_items:
@@ -83,8 +115,12 @@ async def create_meeting_minute(
             )
             db.add(action_item)
 
-    db.commit()
-    db.refresh(meeting_minute)
+    await db.commit()
+    meeting_minute = await db.scalar(
+        select(MeetingMinute).options(*MINUTE_DETAIL_OPTIONS).filter(
+            MeetingMinute.id == meeting_minute.id
+        ).execution_options(populate_existing=True)
+    )
 
     # Populate computed fields
     meeting_minute.created_by_name = current_user.full_name or current_user.username
@@ -99,21 +135,21 @@ async def create_meeting_minute(
     return meeting_minute
 
 
-@router.get("/workspace/{workspace_id}", response_model=List[MeetingMinuteResponse])
+@router.get("/workspace/{workspace_id}", response_model=Union[List[MeetingMinuteResponse], Page[MeetingMinuteResponse]])
 async def get_workspace_meeting_minutes(
     workspace_id: int,
+    response: Response,
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all meeting minutes for a workspace with optional filters"""
+    """Get meeting minutes for a workspace with optional filters (paginated, newest first)"""
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -122,7 +158,7 @@ async def get_workspace_meeting_minutes(
         )
 
     # Build query
-    query = db.query(MeetingMinute).filter(MeetingMinute.workspace_id == workspace_id)
+    query = select(MeetingMinute).filter(MeetingMinute.workspace_id == workspace_id)
 
     # Apply filters
     if date_from:
@@ -130,33 +166,69 @@ async def get_workspace_meeting_minutes(
     if date_to:
         query = query.filter(MeetingMinute.meeting_date <= date_to)
     if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            func.lower(MeetingMinute.title).like(search_pattern.lower())
-        )
+        query = query.filter(SearchService.contains(MeetingMinute.search_text, search))
 
-    # Order by date descending
-    minutes = query.order_by(MeetingMinute.meeting_date.desc()).all()
+    # Order by date descending (one page at a time when asked)
+    page_size = resolve_page_size(limit, cursor)
+    minutes = (await db.scalars(query.filter(
+        *MINUTE_KEYSET.after(cursor)
+    ).order_by(*MINUTE_KEYSET.order_by()).limit(fetch_size(page_size)))).all()
+    minutes, next_cursor = MINUTE_KEYSET.page(minutes, page_size)
 
     # Populate computed fields
-    for minute in minutes:
-        minute.created_by_name = minute.created_by_user.full_name or minute.created_by_user.username
-        if minute.updated_by:
-            minute.updated_by_name = minute.updated_by_user.full_name or minute.updated_by_user.username
-        minute.attachment_count = len(minute.attachments)
-        minute.action_item_count = len(minute.action_items)
+    items = await ResponseAssembler.meeting_minutes(db, minutes, UserNameMap(current_user))
+    return page_body(response, items, next_cursor, cursor, limit)
+
+
+@router.get("/workspace/{workspace_id}/search", response_model=List[SearchResult])
+async def search_meeting_minutes(
+    workspace_id: int,
+    q: str = Query(..., min_length=1, description="Words or phrase to search for"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Ranked search over minute titles, agendas, discussions and decisions"""
+    # Check workspace membership
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
-    return minutes
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this workspace"
+        )
+
+    hits = await db.run_sync(
+        SearchService.search,
+        MeetingMinute,
+        q,
+        filters=[MeetingMinute.workspace_id == workspace_id],
+        date_column=MeetingMinute.meeting_date,
+        limit=limit
+    )
+    return [
+        SearchResult(
+            id=minute.id,
+            workspace_id=minute.workspace_id,
+            title=minute.title,
+            date=minute.meeting_date,
+            rank=rank,
+            highlight=snippet
+        )
+        for minute, rank, snippet in hits
+    ]
 
 
 @router.get("/{minute_id}", response_model=MeetingMinuteDetailResponse)
 async def get_meeting_minute(
     minute_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific meeting minute with full details"""
-    minute = db.query(MeetingMinute).filter(MeetingMinute.id == minute_id).first()
+    minute = await db.scalar(
+        select(MeetingMinute).options(*MINUTE_DETAIL_OPTIONS).filter(MeetingMinute.id == minute_id)
+    )
 
     if not minute:
         raise HTTPException(
@@ -165,10 +237,7 @@ async def get_meeting_minute(
         )
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -199,11 +268,11 @@ async def get_meeting_minute(
 async def update_meeting_minute(
     minute_id: int,
     minute_data: MeetingMinuteUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a meeting minute"""
-    minute = db.query(MeetingMinute).filter(MeetingMinute.id == minute_id).first()
+    minute = await db.scalar(select(MeetingMinute).filter(MeetingMinute.id == minute_id))
 
     if not minute:
         raise HTTPException(
@@ -212,10 +281,7 @@ async def update_meeting_minute(
         )
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -238,27 +304,23 @@ async def update_meeting_minute(
         setattr(minute, key, value)
 
     minute.updated_by = current_user.id
+    SearchService.index_minute(minute)
 
-    db.commit()
-    db.refresh(minute)
+    await db.commit()
+    await db.refresh(minute)
 
     # Populate computed fields
-    minute.created_by_name = minute.created_by_user.full_name or minute.created_by_user.username
-    minute.updated_by_name = current_user.full_name or current_user.username
-    minute.attachment_count = len(minute.attachments)
-    minute.action_item_count = len(minute.action_items)
-
-    return minute
+    return (await ResponseAssembler.meeting_minutes(db, [minute], UserNameMap(current_user)))[0]
 
 
 @router.delete("/{minute_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_meeting_minute(
     minute_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a meeting minute"""
-    minute = db.query(MeetingMinute).filter(MeetingMinute.id == minute_id).first()
+    minute = await db.scalar(select(MeetingMinute).filter(MeetingMinute.id == minute_id))
 
     if not minute:
         raise HTTPException(
@@ -267,10 +329,7 @@ async def delete_meeting_minute(
         )
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -285,29 +344,14 @@ async def delete_meeting_minute(
             detail="Only the creator or managers can delete meeting minutes"
         )
 
-    # Delete attachments from Cloudinary
-    for attachment in minute.attachments:
-        try:
-            await delete_from_cloudinary(
-                attachment.cloudinary_public_id,
-                attachment.resource_type
-            )
-        except Exception as e:
-            print(f"Failed to delete Cloudinary file: {e}")
-
-    db.delete(minute)
-    db.commit()
+    # Attachments cascade; their files go with their last reference (BlobStore)
+    await db.delete(minute)
+    await db.commit()
 
 
-@router.post("/{minute_id}/attachments", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
-async def upload_attachment(
-    minute_id: int,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Upload an attachment (PDF, image, doc) to Cloudinary"""
-    minute = db.query(MeetingMinute).filter(MeetingMinute.id == minute_id).first()
+async def get_member_minute(minute_id: int, current_user: User, db: AsyncSession) -> MeetingMinute:
+    """The meeting minute, if the user is a member of its workspace"""
+    minute = await db.scalar(select(MeetingMinute).filter(MeetingMinute.id == minute_id))
 
     if not minute:
         raise HTTPException(
@@ -316,10 +360,7 @@ async def upload_attachment(
         )
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -327,54 +368,223 @@ async def upload_attachment(
             detail="Not a member of this workspace"
         )
 
-    # Validate file
-    file_content = await file.read()
-    file_size = len(file_content)
+    return minute
+
+
+@router.post("/{minute_id}/attachments", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(
+    minute_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload an attachment (PDF, image, doc) to minutes storage (Cloudinary by default)"""
+    await get_member_minute(minute_id, current_user, db)
 
-    if file_size > settings.MAX_UPLOAD_SIZE:
+    # Validate size and (sniffed) type; known content is not uploaded again
+    try:
+        blob = await BlobStore.store(
+            db, file, ALLOWED_FILE_TYPES, storage=settings.MINUTES_STORAGE, folder="flowhive/minutes"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum of {settings.MAX_UPLOAD_SIZE} bytes"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload file: {str(e)}"
         )
 
-    if file.content_type not in ALLOWED_FILE_TYPES:
+    return await create_attachment(db, blob, minute_id, file.filename, current_user)
+
+
+@router.post(
+    "/{minute_id}/attachments/batch",
+    response_model=List[AttachmentResponse],
+    status_code=status.HTTP_201_CREATED
+)
+async def upload_attachments(
+    minute_id: int,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Upload several attachments at once: stored concurrently, attached in one
+    transaction (all of them, or none if any is rejected)
+    """
+    await get_member_minute(minute_id, current_user, db)
+
+    if len(files) > settings.MAX_BATCH_UPLOAD_FILES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type {file.content_type} not allowed"
+            detail=f"At most {settings.MAX_BATCH_UPLOAD_FILES} files per upload"
         )
 
-    # Determine resource type
-    resource_type = "image" if file.content_type.startswith("image/") else "raw"
+    # Every store finishes (or fails) before the transaction ends
+    results = await asyncio.gather(*(
+        BlobStore.store(db, file, ALLOWED_FILE_TYPES, storage=settings.MINUTES_STORAGE, folder="flowhive/minutes")
+        for file in files
+    ), return_exceptions=True)
+    for file, result in zip(files, results):
+        if isinstance(result, BaseException):
+            await db.rollback()  # files stored for the others are removed with it
+            if isinstance(result, HTTPException):
+                raise HTTPException(status_code=result.status_code, detail=f"{file.filename}: {result.detail}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload {file.filename}: {str(result)}"
+            )
+
+    attachments = [
+        new_attachment(blob, minute_id, file.filename, current_user)
+        for file, blob in zip(files, results)
+    ]
+    db.add_all(attachments)
+    await db.flush()
+    ids = [attachment.id for attachment in attachments]
+    await db.commit()
+    # One query reloads them all, with their blobs (refresh() would be one each)
+    await db.scalars(
+        select(MinuteAttachment).filter(MinuteAttachment.id.in_(ids)).execution_options(populate_existing=True)
+    )
+
+    for attachment in attachments:
+        attachment.uploader_name = current_user.full_name or current_user.username
+    return attachments
+
+
+@router.post("/{minute_id}/attachments/presign", response_model=PresignedUploadResponse)
+async def presign_attachment(
+    minute_id: int,
+    upload: DirectUploadRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start uploading an attachment straight to storage; finish with attachments/complete"""
+    await get_member_minute(minute_id, current_user, db)
+
+    token, request = BlobStore.presign(
+        db,
+        settings.MINUTES_STORAGE,
+        scope=f"minute:{minute_id}",
+        user_id=current_user.id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        sha256=upload.sha256,
+        allowed_types=ALLOWED_FILE_TYPES,
+        folder="flowhive/minutes"
+    )
+    await db.commit()
+    return PresignedUploadResponse(upload_token=token, **asdict(request))
+
+
+@router.post("/{minute_id}/attachments/complete", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
+async def complete_attachment(
+    minute_id: int,
+    upload: DirectUploadComplete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Attach a file uploaded with attachments/presign to the meeting minute"""
+    await get_member_minute(minute_id, current_user, db)
+
+    blob, claims = await BlobStore.complete(
+        db, upload.upload_token, f"minute:{minute_id}", current_user.id, ALLOWED_FILE_TYPES
+    )
+    return await create_attachment(db, blob, minute_id, claims["filename"], current_user)
+
+
+@router.post("/{minute_id}/attachments/resumable", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_resumable_attachment(
+    minute_id: int,
+    upload: ResumableUploadRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a resumable attachment upload; PATCH it in chunks, then attachments/resumable/{upload_id}/complete"""
+    await get_member_minute(minute_id, current_user, db)
+
+    session = ResumableUploads.create(
+        db,
+        scope=f"minute:{minute_id}",
+        user_id=current_user.id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        sha256=upload.sha256,
+        allowed_types=ALLOWED_FILE_TYPES
+    )
+    await db.commit()
+    described = ResumableUploads.describe(session)
+    response.headers["Location"] = described.url
+    response.headers.update(ResumableUploads.headers(session, described.offset))
+    return described
+
+
+@router.post(
+    "/{minute_id}/attachments/resumable/{upload_id}/complete",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def complete_resumable_attachment(
+    minute_id: int,
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Attach a fully received resumable upload to the meeting minute"""
+    await get_member_minute(minute_id, current_user, db)
 
-    # Upload to Cloudinary
     try:
-        result = await upload_to_cloudinary(
-            file_content,
-            file.filename,
-            folder="flowhive/minutes",
-            resource_type=resource_type
+        blob, session = await ResumableUploads.finalize(
+            db,
+            upload_id,
+            scope=f"minute:{minute_id}",
+            user_id=current_user.id,
+            allowed_types=ALLOWED_FILE_TYPES,
+            storage=settings.MINUTES_STORAGE,
+            folder="flowhive/minutes"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
 
-    # Create attachment record
-    attachment = MinuteAttachment(
+    return await create_attachment(db, blob, minute_id, session.filename, current_user)
+
+
+def new_attachment(blob: Blob, minute_id: int, filename: str, current_user: User) -> MinuteAttachment:
+    """Attachment record for a stored blob (not added to the session)"""
+    return MinuteAttachment(
         meeting_minute_id=minute_id,
-        cloudinary_public_id=result["public_id"],
-        cloudinary_url=result["secure_url"],
-        resource_type=resource_type,
-        file_name=file.filename,
-        file_size=file_size,
-        mime_type=file.content_type,
+        cloudinary_public_id=blob.location,
+        cloudinary_url=blob.url or "",  # none for private storage: signed per response
+        resource_type=blob.resource_type or resource_type_for(blob.mime_type),
+        blob_id=blob.id,
+        file_name=filename,
+        file_size=blob.size,
+        mime_type=blob.mime_type,
         uploaded_by=current_user.id
     )
 
+
+async def create_attachment(
+    db: AsyncSession,
+    blob: Blob,
+    minute_id: int,
+    filename: str,
+    current_user: User
+) -> MinuteAttachment:
+    """Attachment record for a stored blob (commits)"""
+    attachment = new_attachment(blob, minute_id, filename, current_user)
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    await db.commit()
+    await db.refresh(attachment)
 
     attachment.uploader_name = current_user.full_name or current_user.username
 
@@ -385,14 +595,16 @@ async def upload_attachment(
 async def delete_attachment(
     minute_id: int,
     attachment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an attachment from meeting minute and Cloudinary"""
-    attachment = db.query(MinuteAttachment).filter(
+    attachment = await db.scalar(select(MinuteAttachment).options(
+        selectinload(MinuteAttachment.meeting_minute)
+    ).filter(
         MinuteAttachment.id == attachment_id,
         MinuteAttachment.meeting_minute_id == minute_id
-    ).first()
+    ))
 
     if not attachment:
         raise HTTPException(
@@ -403,10 +615,7 @@ async def delete_attachment(
     minute = attachment.meeting_minute
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -414,28 +623,27 @@ async def delete_attachment(
             detail="Not a member of this workspace"
         )
 
-    # Delete from Cloudinary
-    try:
-        await delete_from_cloudinary(
-            attachment.cloudinary_public_id,
-            attachment.resource_type
-        )
-    except Exception as e:
-        print(f"Failed to delete from Cloudinary: {e}")
+    # Cloudinary file goes with its last reference (BlobStore), after the commit
+    await db.delete(attachment)
+    await db.commit()
 
-    db.delete(attachment)
-    db.commit()
+
+async def set_assigned_user_name(db: AsyncSession, action_item: MinuteActionItem, current_user: User) -> None:
+    """Populate assigned_user_name on an action item"""
+    if action_item.assigned_to:
+        names = await UserNameMap(current_user).load_async(db, [action_item.assigned_to])
+        action_item.assigned_user_name = names.name(action_item.assigned_to)
 
 
 @router.post("/{minute_id}/action-items", response_model=ActionItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_action_item(
     minute_id: int,
     action_item_data: ActionItemCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create an action item for a meeting minute"""
-    minute = db.query(MeetingMinute).filter(MeetingMinute.id == minute_id).first()
+    minute = await db.scalar(select(MeetingMinute).filter(MeetingMinute.id == minute_id))
 
     if not minute:
         raise HTTPException(
@@ -444,10 +652,7 @@ async def create_action_item(
         )
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -461,12 +666,10 @@ async def create_action_item(
     )
 
     db.add(action_item)
-    db.commit()
-    db.refresh(action_item)
-
-    if action_item.assigned_to:
-        action_item.assigned_user_name = action_item.assigned_user.full_name or action_item.assigned_user.username
+    await db.commit()
+    await db.refresh(action_item)
 
+    await set_assigned_user_name(db, action_item, current_user)
     return action_item
 
 
@@ -475,14 +678,16 @@ async def update_action_item(
     minute_id: int,
     action_item_id: int,
     action_item_data: ActionItemUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update an action item"""
-    action_item = db.query(MinuteActionItem).filter(
+    action_item = await db.scalar(select(MinuteActionItem).options(
+        selectinload(MinuteActionItem.meeting_minute)
+    ).filter(
         MinuteActionItem.id == action_item_id,
         MinuteActionItem.meeting_minute_id == minute_id
-    ).first()
+    ))
 
     if not action_item:
         raise HTTPException(
@@ -493,10 +698,7 @@ async def update_action_item(
     minute = action_item.meeting_minute
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -514,12 +716,10 @@ async def update_action_item(
         from datetime import datetime
         action_item.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(action_item)
-
-    if action_item.assigned_to:
-        action_item.assigned_user_name = action_item.assigned_user.full_name or action_item.assigned_user.username
+    await db.commit()
+    await db.refresh(action_item)
 
+    await set_assigned_user_name(db, action_item, current_user)
     return action_item
 
 
@@ -527,14 +727,16 @@ async def update_action_item(
 async def delete_action_item(
     minute_id: int,
     action_item_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an action item"""
-    action_item = db.query(MinuteActionItem).filter(
+    action_item = await db.scalar(select(MinuteActionItem).options(
+        selectinload(MinuteActionItem.meeting_minute)
+    ).filter(
         MinuteActionItem.id == action_item_id,
         MinuteActionItem.meeting_minute_id == minute_id
-    ).first()
+    ))
 
     if not action_item:
         raise HTTPException(
@@ -545,10 +747,7 @@ async def delete_action_item(
     minute = action_item.meeting_minute
 
     # Check workspace membership
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == minute.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, minute.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -556,5 +755,5 @@ async def delete_action_item(
             detail="Not a member of this workspace"
         )
 
-    db.delete(action_item)
-    db.commit()
+    await db.delete(action_item)
+    await db.commit()
@@ -0,0 +1,23 @@
+"""
+Outbox API Endpoints
+For hosts where the in-process worker can't run between requests
+(serverless, e.g. Vercel): a cron calls /drain to run due messages
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.config import settings
+from app.services.outbox import outbox_worker
+from app.utils.auth import require_cron_secret
+
+router = APIRouter()
+
+
+# GET: Vercel Cron requests its paths with GET
+@router.get("/drain", dependencies=[Depends(require_cron_secret)])
+async def drain_outbox():
+    """
+    Run due outbox messages for up to OUTBOX_DRAIN_MAX_SECONDS
+    """
+    processed = await outbox_worker.drain(settings.OUTBOX_DRAIN_MAX_SECONDS)
+    return {"processed": processed}
@@ -1,9 +1,10 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User
-from app.models.workspace import WorkspaceMember
 from app.models.project import Project
 from app.schemas.project import (
     ProjectCreate,
@@ -12,6 +13,8 @@ from app.schemas.project import (
     ProjectDetailResponse
 )
 from app.utils.auth import get_current_active_user
+from app.services.response_assembler import ResponseAssembler, UserNameMap
+from app.services.access_cache import AccessCache
 
 router = APIRouter()
 
@@ -19,15 +22,12 @@ router = APIRouter()
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new project"""
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == project_data.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, project_data.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -37,8 +37,8 @@ async def create_project(
 
     project = Project(**project_data.model_dump())
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
 
     return project
 
@@ -46,15 +46,12 @@ async def create_project(
 @router.get("/workspace/{workspace_id}", response_model=List[ProjectResponse])
 async def get_workspace_projects(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all projects in a workspace"""
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -62,18 +59,18 @@ async def get_workspace_projects(
             detail="Not a member of this workspace"
         )
 
-    projects = db.query(Project).filter(Project.workspace_id == workspace_id).all()
+    projects = (await db.scalars(select(Project).filter(Project.workspace_id == workspace_id))).all()
     return projects
 
 
 @router.get("/{project_id}", response_model=ProjectDetailResponse)
 async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific project with tasks"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id, options=[selectinload(Project.tasks)])
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,10 +78,7 @@ async def get_project(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == project.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, project.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -93,43 +87,8 @@ async def get_project(
         )
 
     # Format tasks with assignee and creator names
-    from app.models.task import Task
-    tasks_with_names = []
-    for task in project.tasks:
-        task_dict = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "project_id": task.project_id,
-            "parent_task_id": task.parent_task_id,
-            "creator_id": task.creator_id,
-            "assignee_id": task.assignee_id,
-            "status": task.status,
-            "priority": task.priority,
-            "due_date": task.due_date,
-            "start_date": task.start_date,
-            "completed_at": task.completed_at,
-            "position": task.position,
-            "estimated_hours": task.estimated_hours,
-            "actual_hours": task.actual_hours,
-            "created_at": task.created_at,
-            "updated_at": task.updated_at,
-            "assignee_name": None,
-            "creator_name": None
-        }
-
-        # Get assignee name
-        if task.assignee_id:
-            assignee = db.query(User).filter(User.id == task.assignee_id).first()
-            if assignee:
-                task_dict["assignee_name"] = assignee.full_name or assignee.username
-
-        # Get creator name
-        creator = db.query(User).filter(User.id == task.creator_id).first()
-        if creator:
-            task_dict["creator_name"] = creator.full_name or creator.username
-
-        tasks_with_names.append(task_dict)
+    names = await UserNameMap(current_user).load_async(db, ResponseAssembler.task_user_ids(project.tasks))
+    tasks_with_names = ResponseAssembler.tasks(project.tasks, names)
 
     return {
         "id": project.id,
@@ -147,11 +106,11 @@ async def get_project(
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -159,10 +118,7 @@ async def update_project(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == project.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, project.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -174,19 +130,19 @@ async def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -194,10 +150,7 @@ async def update_project(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == project.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, project.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -209,18 +162,18 @@ async def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -228,10 +181,7 @@ async def delete_project(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == project.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, project.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -239,6 +189,6 @@ async def delete_project(
             detail="Not a member of this workspace"
         )
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     return None
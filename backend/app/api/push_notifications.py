@@ -3,11 +3,12 @@ Push Notification API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.push_subscription import PushSubscription
 from app.services.push_notification_service import PushNotificationService
@@ -32,23 +33,23 @@ class PushSubscriptionResponse(BaseModel):
 @router.post("/subscribe", response_model=PushSubscriptionResponse)
 async def subscribe_to_push(
     subscription: PushSubscriptionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Subscribe current user to push notifications
     """
     # Check if subscription already exists
-    existing = db.query(PushSubscription).filter(
+    existing = await db.scalar(select(PushSubscription).filter(
         PushSubscription.endpoint == subscription.endpoint
-    ).first()
+    ).limit(1))
 
     if existing:
         # Reactivate if it was deactivated
         existing.active = True
         existing.user_id = current_user.id
-        db.commit()
-        db.refresh(existing)
+        await db.commit()
+        await db.refresh(existing)
         return existing
 
     # Create new subscription
@@ -61,8 +62,8 @@ async def subscribe_to_push(
     )
 
     db.add(new_subscription)
-    db.commit()
-    db.refresh(new_subscription)
+    await db.commit()
+    await db.refresh(new_subscription)
 
     return new_subscription
 
@@ -70,16 +71,16 @@ async def subscribe_to_push(
 @router.delete("/unsubscribe")
 async def unsubscribe_from_push(
     endpoint: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Unsubscribe from push notifications
     """
-    subscription = db.query(PushSubscription).filter(
+    subscription = await db.scalar(select(PushSubscription).filter(
         PushSubscription.endpoint == endpoint,
         PushSubscription.user_id == current_user.id
-    ).first()
+    ).limit(1))
 
     if not subscription:
         raise HTTPException(
@@ -88,7 +89,7 @@ async def unsubscribe_from_push(
         )
 
     subscription.active = False
-    db.commit()
+    await db.commit()
 
     return {"message": "Unsubscribed successfully"}
 
@@ -111,23 +112,20 @@ async def get_vapid_public_key():
 
 @router.get("/subscription-status")
 async def get_subscription_status(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Check if current user has active push subscription
     """
-    subscription = db.query(PushSubscription).filter(
+    count = await db.scalar(select(func.count(PushSubscription.id)).filter(
         PushSubscription.user_id == current_user.id,
         PushSubscription.active == True
-    ).first()
+    ))
 
     return {
-        "subscribed": subscription is not None,
-        "count": db.query(PushSubscription).filter(
-            PushSubscription.user_id == current_user.id,
-            PushSubscription.active == True
-        ).count()
+        "subscribed": count > 0,
+        "count": count
     }
 
 
@@ -142,7 +140,7 @@ class SendNotificationRequest(BaseModel):
 @router.post("/send")
 async def send_notification(
     notification: SendNotificationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -150,12 +148,12 @@ async def send_notification(
     """
     # Determine recipients
     if notification.user_ids:
-        users = db.query(User).filter(
+        users = (await db.scalars(select(User).filter(
             User.id.in_(notification.user_ids),
             User.is_active == True
-        ).all()
+        ))).all()
     else:
-        users = db.query(User).filter(User.is_active == True).all()
+        users = (await db.scalars(select(User).filter(User.is_active == True))).all()
 
     if not users:
         raise HTTPException(
@@ -163,36 +161,37 @@ async def send_notification(
             detail="No active users found"
         )
 
-    # Send notifications
-    success_count = 0
-    failed_count = 0
-    results = []
+    # Prepare additional data
+    data = {}
+    if notification.icon:
+        data["icon"] = notification.icon
+    if notification.url:
+        data["url"] = notification.url
+
+    # Send notifications (one concurrent dispatch for every recipient)
+    try:
+        delivered = await PushNotificationService.send_to_users(
+            db=db,
+            user_ids=[user.id for user in users],
+            title=notification.title,
+            message=notification.body,
+            data=data if data else None
+        )
+        error = None
+    except Exception as e:
+        delivered = set()
+        error = str(e)
 
+    results = []
     for user in users:
-        try:
-            # Prepare additional data
-            data = {}
-            if notification.icon:
-                data["icon"] = notification.icon
-            if notification.url:
-                data["url"] = notification.url
-
-            result = PushNotificationService.send_notification(
-                db=db,
-                user_id=user.id,
-                title=notification.title,
-                message=notification.body,
-                data=data if data else None
-            )
-            if result:
-                success_count += 1
-                results.append({"user_id": user.id, "status": "sent"})
-            else:
-                failed_count += 1
-                results.append({"user_id": user.id, "status": "failed"})
-        except Exception as e:
-            failed_count += 1
-            results.append({"user_id": user.id, "status": "error", "message": str(e)})
+        if user.id in delivered:
+            results.append({"user_id": user.id, "status": "sent"})
+        elif error:
+            results.append({"user_id": user.id, "status": "error", "message": error})
+        else:
+            results.append({"user_id": user.id, "status": "failed"})
+    success_count = len(delivered)
+    failed_count = len(users) - success_count
 
     return {
         "message": f"Notifications sent to {success_count} user(s), {failed_count} failed",
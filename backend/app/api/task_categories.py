@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User
-from app.models.workspace import WorkspaceMember
 from app.models.field_activity import TaskCategory
 from app.schemas.field_activity import (
     TaskCategoryCreate,
@@ -11,22 +12,30 @@ from app.schemas.field_activity import (
     TaskCategoryResponse
 )
 from app.utils.auth import get_current_active_user
+from app.services.access_cache import AccessCache
 
 router = APIRouter()
 
 
+async def load_category(db: AsyncSession, category_id: int) -> Optional[TaskCategory]:
+    """The category with its creator (TaskCategoryResponse nests it), freshly loaded"""
+    return await db.scalar(
+        select(TaskCategory)
+        .options(selectinload(TaskCategory.created_by_user))
+        .filter(TaskCategory.id == category_id)
+        .execution_options(populate_existing=True)
+    )
+
+
 @router.post("/", response_model=TaskCategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_task_category(
     category_data: TaskCategoryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new task category"""
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == category_data.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, category_data.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -39,25 +48,21 @@ async def create_task_category(
     category_dict['created_by'] = current_user.id
     category = TaskCategory(**category_dict)
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    await db.commit()
 
-    return category
+    return await load_category(db, category.id)
 
 
 @router.get("/workspace/{workspace_id}", response_model=List[TaskCategoryResponse])
 async def get_workspace_task_categories(
     workspace_id: int,
     include_inactive: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all task categories for a workspace"""
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -65,23 +70,25 @@ async def get_workspace_task_categories(
             detail="Not a member of this workspace"
         )
 
-    query = db.query(TaskCategory).filter(TaskCategory.workspace_id == workspace_id)
+    query = select(TaskCategory).options(
+        selectinload(TaskCategory.created_by_user)
+    ).filter(TaskCategory.workspace_id == workspace_id)
 
     if not include_inactive:
         query = query.filter(TaskCategory.is_active == True)
 
-    categories = query.order_by(TaskCategory.name).all()
+    categories = (await db.scalars(query.order_by(TaskCategory.name))).all()
     return categories
 
 
 @router.get("/{category_id}", response_model=TaskCategoryResponse)
 async def get_task_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific task category"""
-    category = db.query(TaskCategory).filter(TaskCategory.id == category_id).first()
+    category = await load_category(db, category_id)
 
     if not category:
         raise HTTPException(
@@ -90,10 +97,7 @@ async def get_task_category(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == category.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, category.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -108,11 +112,11 @@ async def get_task_category(
 async def update_task_category(
     category_id: int,
     category_data: TaskCategoryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a task category"""
-    category = db.query(TaskCategory).filter(TaskCategory.id == category_id).first()
+    category = await load_category(db, category_id)
 
     if not category:
         raise HTTPException(
@@ -121,10 +125,7 @@ async def update_task_category(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == category.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, category.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -137,20 +138,19 @@ async def update_task_category(
     for field, value in update_data.items():
         setattr(category, field, value)
 
-    db.commit()
-    db.refresh(category)
+    await db.commit()
 
-    return category
+    return await load_category(db, category.id)
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete (deactivate) a task category"""
-    category = db.query(TaskCategory).filter(TaskCategory.id == category_id).first()
+    category = await db.get(TaskCategory, category_id)
 
     if not category:
         raise HTTPException(
@@ -159,10 +159,7 @@ async def delete_task_category(
         )
 
     # Check if user is workspace member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == category.workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, category.workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -172,6 +169,6 @@ async def delete_task_category(
 
     # Soft delete - deactivate instead of removing
     category.is_active = False
-    db.commit()
+    await db.commit()
 
     return None
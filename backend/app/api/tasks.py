@@ -1,58 +1,243 @@
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Union
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Response
 import httpx
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.database import get_db
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User
+from app.models.project import Project
 from app.models.task import Task, TaskStatus
 from app.models.comment import ActivityLog
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskDetailResponse
+from app.schemas.bulk import bulk_item_error
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskStatusUpdate, TaskResponse, TaskDetailResponse, TaskBulkResponse
+)
 from app.utils.auth import get_current_active_user
-from app.config import Settings
+from app.schemas.pagination import Page
+from app.utils.pagination import (
+    CURSOR_DESCRIPTION, LIMIT_DESCRIPTION, SKIP_DESCRIPTION,
+    Keyset, fetch_size, page_body, resolve_offset, resolve_page_size
+)
+from app.services.access_cache import AccessCache
+from app.services.response_assembler import ResponseAssembler, UserNameMap
+from app.config import Settings, settings
 import json
 import random
 
 router = APIRouter()
 
+# Keyset order for the paginated task list
+TASK_KEYSET = Keyset(
+    (Task.updated_at, True, True),
+    (Task.id, True, False)
+)
 
-def log_activity(db: Session, task_id: int, user_id: int, action: str, details: dict = None):
+
+def activity_log_values(task_id: int, user_id: int, action: str, details: dict = None) -> dict:
+    """Column values of a task activity log row"""
+    return {
+        "task_id": task_id,
+        "user_id": user_id,
+        "action": action,
+        "details": json.dumps(details) if details else None
+    }
+
+
+def log_activity(db: AsyncSession, task_id: int, user_id: int, action: str, details: dict = None):
     """Helper to log task activity"""
-    activity = ActivityLog(
-        task_id=task_id,
-        user_id=user_id,
-        action=action,
-        details=json.dumps(details) if details else None
-    )
-    db.add(activity)
+    db.add(ActivityLog(**activity_log_values(task_id, user_id, action, details)))
+
+
+async def insert_activity_logs(db: AsyncSession, logs: List[dict]):
+    """Insert many activity_log_values() rows in one executemany"""
+    if logs:
+        await db.execute(insert(ActivityLog), logs)
+
+
+class TaskReferences(NamedTuple):
+    """The projects, parent tasks and assignees new tasks point at (see load_task_references)"""
+    project_workspaces: Dict[int, int]
+    parent_projects: Dict[int, int]
+    assignee_ids: Set[int]
+
+
+async def load_task_references(db: AsyncSession, tasks_data: Iterable[TaskCreate]) -> TaskReferences:
+    """Workspace of each project, project of each parent task and the existing assignees, one query each"""
+    tasks_data = list(tasks_data)
+    project_workspaces = dict((await db.execute(
+        select(Project.id, Project.workspace_id).where(Project.id.in_({t.project_id for t in tasks_data}))
+    )).all())
+    parent_ids = {t.parent_task_id for t in tasks_data if t.parent_task_id}
+    parent_projects = dict((await db.execute(
+        select(Task.id, Task.project_id).where(Task.id.in_(parent_ids))
+    )).all()) if parent_ids else {}
+    assignee_ids = {t.assignee_id for t in tasks_data if t.assignee_id}
+    known_assignees = set(await db.scalars(
+        select(User.id).where(User.id.in_(assignee_ids))
+    )) if assignee_ids else set()
+    return TaskReferences(project_workspaces, parent_projects, known_assignees)
+
+
+def validate_new_task(task_data: TaskCreate, workspace_ids: FrozenSet[int], references: TaskReferences) -> None:
+    """
+    Project, membership, parent task and assignee checks for a new task.
+    workspace_ids and references are looked up once per request
+    (see AccessCache.workspace_ids, load_task_references).
+    """
+    if task_data.project_id not in references.project_workspaces:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if references.project_workspaces[task_data.project_id] not in workspace_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this workspace")
+    if task_data.parent_task_id and references.parent_projects.get(task_data.parent_task_id) != task_data.project_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parent task not found in this project"
+        )
+    if task_data.assignee_id and task_data.assignee_id not in references.assignee_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Assignee not found")
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new task"""
+    validate_new_task(
+        task_data,
+        await AccessCache.workspace_ids_async(db, current_user.id),
+        await load_task_references(db, [task_data])
+    )
+
     task = Task(
         **task_data.model_dump(),
         creator_id=current_user.id,
     )
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
 
     # Log activity
     log_activity(db, task.id, current_user.id, "created", {
         "title": task.title,
         "status": task.status.value
     })
-    db.commit()
+    await db.commit()
 
     return task
 
+
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def bulk_create_tasks(
+    tasks_data: List[TaskCreate] = Body(..., min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create several tasks at once
+
+    Projects, parent tasks, assignees and the user's workspaces are looked
+    up once for the batch; the valid tasks and their activity logs are
+    inserted in one statement each, in one transaction. Rejected items come
+    back in `errors` with their index; the others are still created.
+    """
+    references = await load_task_references(db, tasks_data)
+    workspace_ids = await AccessCache.workspace_ids_async(db, current_user.id)
+
+    errors = []
+    rows = []
+    for index, task_data in enumerate(tasks_data):
+        try:
+            validate_new_task(task_data, workspace_ids, references)
+        except HTTPException as exc:
+            errors.append(bulk_item_error(index, exc))
+            continue
+        rows.append({**task_data.model_dump(), "creator_id": current_user.id})
+
+    if not rows:
+        return TaskBulkResponse(errors=errors)
+
+    tasks = (await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows)).all()
+    await insert_activity_logs(db, [
+        activity_log_values(task.id, current_user.id, "created", {
+            "title": task.title,
+            "status": task.status.value
+        })
+        for task in tasks
+    ])
+    await db.commit()
+
+    names = await UserNameMap(current_user).load_async(db, ResponseAssembler.task_user_ids(tasks))
+    return TaskBulkResponse(tasks=ResponseAssembler.tasks(tasks, names), errors=errors)
+
+
+@router.patch("/bulk/status", response_model=TaskBulkResponse)
+async def bulk_update_task_status(
+    updates: List[TaskStatusUpdate] = Body(..., min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Change the status of several tasks at once (e.g. a board column move)
+
+    The tasks are loaded in one query and the changes, with their activity
+    logs, saved in one transaction. Rejected items come back in `errors`
+    with their index.
+    """
+    found = {
+        task.id: (task, workspace_id)
+        for task, workspace_id in (await db.execute(
+            select(Task, Project.workspace_id)
+            .join(Project, Task.project_id == Project.id)
+            .where(Task.id.in_({update.id for update in updates}))
+        )).all()
+    }
+    workspace_ids = await AccessCache.workspace_ids_async(db, current_user.id)
+
+    errors = []
+    tasks = []
+    logs = []
+    seen = set()
+    for index, update in enumerate(updates):
+        task, workspace_id = found.get(update.id, (None, None))
+        try:
+            if not task:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+            if update.id in seen:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Task appears more than once in this batch"
+                )
+            if workspace_id not in workspace_ids:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this workspace")
+        except HTTPException as exc:
+            errors.append(bulk_item_error(index, exc))
+            continue
+
+        seen.add(update.id)
+        tasks.append(task)
+        if task.status == update.status:
+            continue
+        logs.append(activity_log_values(task.id, current_user.id, "updated", {
+            "status": {"old": str(task.status), "new": str(update.status)}
+        }))
+        # Mark as completed if status changed to completed
+        if update.status == TaskStatus.COMPLETED:
+            task.completed_at = datetime.utcnow()
+        task.status = update.status
+
+    await db.flush()
+    await insert_activity_logs(db, logs)
+    await db.commit()
+
+    names = await UserNameMap(current_user).load_async(db, ResponseAssembler.task_user_ids(tasks))
+    return TaskBulkResponse(tasks=ResponseAssembler.tasks(tasks, names), errors=errors)
+
+
 @router.get("/github-repos", response_model=List[Dict])
 async def get_github_repos(
     current_user: User = Depends(get_current_active_user)
@@ -132,7 +317,7 @@ async def create_tasks_from_github_commits(
     repo_name: str = Query(..., description="Repository name"),
     commit_shas: Optional[List[str]] = Query(None, description="Specific commit SHAs to import"),
     since: Optional[str] = Query(None, description="Only commits after this date (ISO 8601)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -141,8 +326,7 @@ async def create_tasks_from_github_commits(
     Can either import specific commits by SHA or all commits since a date.
     """
     # Verify project exists and user has access
-    from app.models.project import Project
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -168,7 +352,8 @@ async def create_tasks_from_github_commits(
             commits = [c for c in commits if c["sha"] in commit_shas]
 
         # Create tasks from commits
-        created_tasks = []
+        task_rows = []
+        log_details = []
         for commit in commits:
             commit_message = commit["commit"]["message"]
             commit_sha = commit["sha"][:7]  # Short SHA
@@ -209,39 +394,43 @@ async def create_tasks_from_github_commits(
             description = f"{commit_message}\n\n{random.choice(templates)}"
 
             # Create task
-            task = Task(
-                title=commit_message.split('\n')[0][:255],  # First line as title, limit to 255 chars
-                description=description,
-                project_id=project_id,
-                creator_id=current_user.id,
-                assignee_id=current_user.id,
-                status=TaskStatus.COMPLETED,  # Mark as completed since work is done
-                completed_at=commit_datetime,
-                due_date=commit_datetime,  # Due date is the commit date
-                start_date=start_datetime  # Start date is 2 days before commit
-            )
-
-            db.add(task)
-            db.flush()  # Get the task ID
-
-            # Log activity
-            log_activity(db, task.id, current_user.id, "created_from_github", {
-                "title": task.title,
+            title = commit_message.split('\n')[0][:255]  # First line as title, limit to 255 chars
+            task_rows.append({
+                "title": title,
+                "description": description,
+                "project_id": project_id,
+                "creator_id": current_user.id,
+                "assignee_id": current_user.id,
+                "status": TaskStatus.COMPLETED,  # Mark as completed since work is done
+                "completed_at": commit_datetime,
+                "due_date": commit_datetime,  # Due date is the commit date
+                "start_date": start_datetime  # Start date is 2 days before commit
+            })
+            log_details.append({
+                "title": title,
                 "commit_sha": commit_sha,
                 "commit_url": commit_url
             })
 
-            created_tasks.append(task)
-
-        db.commit()
-
-        # Refresh and prepare response
+        # All tasks in one INSERT .. RETURNING, then their activity logs
+        created_tasks = []
+        if task_rows:
+            created_tasks = (await db.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                task_rows
+            )).all()
+            await insert_activity_logs(db, [
+                activity_log_values(task.id, current_user.id, "created_from_github", details)
+                for task, details in zip(created_tasks, log_details)
+            ])
+
+        await db.commit()
+
+        # Prepare response (creator is always the current user)
         response_tasks = []
         for task in created_tasks:
-            db.refresh(task)
             task_response = TaskResponse.model_validate(task)
-            if task.creator:
-                task_response.creator_name = task.creator.full_name or task.creator.username
+            task_response.creator_name = current_user.full_name or current_user.username
             response_tasks.append(task_response)
 
         return response_tasks
@@ -252,25 +441,32 @@ async def create_tasks_from_github_commits(
             detail=f"Failed to fetch commits from GitHub: {str(e)}"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create tasks: {str(e)}"
         )
 
 
-@router.get("/", response_model=List[TaskResponse])
+@router.get("/", response_model=Union[List[TaskResponse], Page[TaskResponse]])
 async def get_tasks(
+    response: Response,
     project_id: Optional[int] = None,
     assignee_id: Optional[int] = None,
     status: Optional[TaskStatus] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description=SKIP_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get tasks with optional filters"""
-    query = db.query(Task)
+    """
+    Get tasks with optional filters, most recently updated first
+
+    With limit or cursor the result is paginated: the body is
+    {items, next_cursor} (next_cursor also in the X-Next-Cursor header).
+    """
+    query = select(Task)
 
     if project_id:
         query = query.filter(Task.project_id == project_id)
@@ -281,56 +477,50 @@ async def get_tasks(
     if status:
         query = query.filter(Task.status == status)
 
-    tasks = query.order_by(Task.updated_at.desc()).offset(skip).limit(limit).all()
-
-    response_tasks = []
-    for task in tasks:
-        task_response = TaskResponse.model_validate(task)
-        if task.assignee:
-            task_response.assignee_name = task.assignee.full_name or task.assignee.username
-        if task.creator:
-            task_response.creator_name = task.creator.full_name or task.creator.username
-
-        response_tasks.append(task_response)
+    page_size = resolve_page_size(limit, cursor)
+    tasks = (await db.scalars(
+        query.filter(*TASK_KEYSET.after(cursor)).order_by(*TASK_KEYSET.order_by())
+        .offset(resolve_offset(skip, cursor)).limit(fetch_size(page_size))
+    )).all()
+    tasks, next_cursor = TASK_KEYSET.page(tasks, page_size)
 
-    return response_tasks
+    names = await UserNameMap(current_user).load_async(db, ResponseAssembler.task_user_ids(tasks))
+    return page_body(response, ResponseAssembler.tasks(tasks, names), next_cursor, cursor, limit, skip)
 
 
 @router.get("/my-tasks", response_model=List[TaskResponse])
 async def get_my_tasks(
     status: Optional[TaskStatus] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get tasks assigned to current user"""
-    query = db.query(Task).filter(Task.assignee_id == current_user.id)
+    query = select(Task).filter(Task.assignee_id == current_user.id)
 
     if status:
         query = query.filter(Task.status == status)
 
-    tasks = query.all()
+    tasks = (await db.scalars(query)).all()
 
     # Enrich tasks with names
-    response_tasks = []
-    for task in tasks:
-        task_response = TaskResponse.model_validate(task)
-        if task.assignee:
-            task_response.assignee_name = task.assignee.full_name or task.assignee.username
-        if task.creator:
-            task_response.creator_name = task.creator.full_name or task.creator.username
-        response_tasks.append(task_response)
-
-    return response_tasks
+    names = await UserNameMap(current_user).load_async(db, ResponseAssembler.task_user_ids(tasks))
+    return ResponseAssembler.tasks(tasks, names)
 
 
 @router.get("/{task_id}", response_model=TaskDetailResponse)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific task with details"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.scalar(
+        select(Task).options(
+            selectinload(Task.assignee),
+            selectinload(Task.creator),
+            selectinload(Task.subtasks)
+        ).filter(Task.id == task_id)
+    )
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -339,10 +529,9 @@ async def get_task(
 
     # Get workspace_id through project -> workspace
     from app.models.project import Project
-    workspace_id = None
-    project = db.query(Project).filter(Project.id == task.project_id).first()
-    if project:
-        workspace_id = project.workspace_id
+    workspace_id = await db.scalar(
+        select(Project.workspace_id).filter(Project.id == task.project_id)
+    )
 
     # Add names for response
     response_data = TaskDetailResponse.model_validate(task)
@@ -359,11 +548,11 @@ async def get_task(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -384,13 +573,13 @@ async def update_task(
     if task_data.status == TaskStatus.COMPLETED and task.status != TaskStatus.COMPLETED:
         task.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
 
     # Log activity
     if changes:
         log_activity(db, task.id, current_user.id, "updated", changes)
-        db.commit()
+        await db.commit()
 
     return task
 
@@ -398,11 +587,11 @@ async def update_task(
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -414,8 +603,8 @@ async def delete_task(
     #     "title": task.title
     # })
     # db.commit()
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
 
     return None
 
@@ -423,15 +612,15 @@ async def delete_task(
 @router.get("/{task_id}/subtasks", response_model=List[TaskResponse])
 async def get_subtasks(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all subtasks of a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
 
-    subtasks = db.query(Task).filter(Task.parent_task_id == task_id).all()
+    subtasks = (await db.scalars(select(Task).filter(Task.parent_task_id == task_id))).all()
     return subtasks
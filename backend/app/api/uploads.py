@@ -0,0 +1,110 @@
+"""
+Upload receivers
+- Presigned PUT URLs of the local storage driver point here (see
+  app.services.storage). The signed token in the URL is the authorization:
+  it names the file path, size and SHA-256 the body must have.
+- The chunk requests of resumable uploads (see
+  app.services.resumable_uploads); they are started and completed on the
+  resource the file is for.
+"""
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+import aiofiles
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db, run_sync
+from app.models.user import User
+from app.services.resumable_uploads import PATCH_CONTENT_TYPE, ResumableUploads
+from app.services.storage import verify_token
+from app.utils.auth import get_current_active_user
+from app.utils.uploads import too_large
+
+router = APIRouter()
+
+
+@router.put("/local/{token}", status_code=status.HTTP_204_NO_CONTENT)
+async def receive_local_upload(token: str, request: Request):
+    """Store the request body at the token's key if it is the declared file"""
+    claims = verify_token(token, "local_put")
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired upload URL"
+        )
+
+    key, size = claims["key"], claims["size"]
+    partial = f"{key}.{uuid.uuid4().hex[:8]}.part"
+    os.makedirs(os.path.dirname(partial) or ".", exist_ok=True)
+    digest = hashlib.sha256()
+    received = 0
+    try:
+        async with aiofiles.open(partial, "wb") as f:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > size:
+                    raise too_large(size)
+                digest.update(chunk)
+                await f.write(chunk)
+        if received != size or digest.hexdigest() != claims["sha256"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body does not match the declared size and sha256"
+            )
+        os.replace(partial, key)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.head("/resumable/{upload_id}")
+async def get_resumable_upload_offset(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """How much of the upload has been received (Upload-Offset), to resume from"""
+    session = await run_sync(db, ResumableUploads.get, upload_id, current_user.id)
+    return Response(headers=ResumableUploads.headers(session, ResumableUploads.offset(session)))
+
+
+@router.patch("/resumable/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    upload_checksum: Optional[str] = Header(None, alias="Upload-Checksum"),
+    content_type: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Append the body to the upload, at Upload-Offset"""
+    if content_type != PATCH_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be {PATCH_CONTENT_TYPE}"
+        )
+    session = await run_sync(db, ResumableUploads.get, upload_id, current_user.id)
+    offset = await ResumableUploads.append(db, session, upload_offset, request.stream(), upload_checksum)
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers=ResumableUploads.headers(session, offset)
+    )
+
+
+@router.delete("/resumable/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_resumable_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Abandon the upload"""
+    session = await run_sync(db, ResumableUploads.get, upload_id, current_user.id)
+    await run_sync(db, ResumableUploads.discard, session)
+    await db.commit()
@@ -1,33 +1,46 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserResponse, UserUpdate
 from app.utils.auth import get_current_active_user, require_role
+from app.schemas.pagination import Page
+from app.utils.pagination import (
+    CURSOR_DESCRIPTION, LIMIT_DESCRIPTION, SKIP_DESCRIPTION,
+    Keyset, fetch_size, page_body, resolve_offset, resolve_page_size
+)
+from app.services.search_service import SearchService
+from app.services.access_cache import AccessCache
 
 router = APIRouter()
 
+# Keyset order for the paginated user list
+USER_KEYSET = Keyset(
+    (User.updated_at, True, True),
+    (User.id, True, False)
+)
+
 
 @router.get("/search", response_model=List[UserResponse])
 async def search_users(
     q: str,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Search users by email, username, or full name"""
-    search_term = f"%{q}%"
-    users = db.query(User).filter(
-        (User.email.ilike(search_term)) | (User.username.ilike(search_term)) | (User.full_name.ilike(search_term))
-    ).limit(limit).all()
-    return users
+    """Search users by email, username, or full name (best matches first)"""
+    return await db.run_sync(SearchService.search_users, q, limit)
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=Union[List[UserResponse], Page[UserResponse]])
 async def get_users(
-    skip: int = 0,
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: Optional[int] = Query(None, description=LIMIT_DESCRIPTION),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description=SKIP_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all users (managers and executives only)"""
@@ -37,18 +50,22 @@ async def get_users(
             detail="Not enough permissions"
         )
 
-    users = db.query(User).offset(skip).all()
-    return users
+    page_size = resolve_page_size(limit, cursor)
+    users = (await db.scalars(select(User).filter(
+        *USER_KEYSET.after(cursor)
+    ).order_by(*USER_KEYSET.order_by()).offset(resolve_offset(skip, cursor)).limit(fetch_size(page_size)))).all()
+    users, next_cursor = USER_KEYSET.page(users, page_size)
+    return page_body(response, users, next_cursor, cursor, limit, skip)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific user"""
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,7 +78,7 @@ async def get_user(
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a user (own profile or executives only)"""
@@ -71,7 +88,7 @@ async def update_user(
             detail="Not enough permissions"
         )
 
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,25 +108,27 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await AccessCache.invalidate_user(user_id)
+    await db.refresh(user)
     return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXECUTIVE]))
 ):
     """Delete a user (executives only)"""
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await AccessCache.invalidate_user(user_id)
     return None
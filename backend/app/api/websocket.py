@@ -1,61 +1,244 @@
-from typing import Dict, Set
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Set
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from starlette.websockets import WebSocketState
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import get_db
-import json
+from app.services.websocket_backplane import Backplane, InMemoryBackplane, create_backplane
+from app.services.websocket_protocol import FrameCache, encode, decode, entity_key, negotiate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# What to do when a client's send queue is full
+OVERFLOW_DISCONNECT = "disconnect"    # close it; the client reconnects and refetches
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # discard its oldest queued frame
+
+# 1013 "Try Again Later": tells clients to reconnect after a backoff
+CLOSE_TOO_SLOW = 1013
+
+
+class ClientConnection:
+    """
+    One connected socket with a bounded outbound queue drained by its own
+    writer task, so a slow client only ever delays itself
+    """
+
+    def __init__(self, websocket: WebSocket, workspace_id: int, max_queue: int, protocol: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.workspace_id = workspace_id
+        # Negotiated subprotocol (see app.services.websocket_protocol)
+        self.protocol = protocol
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped_frames = 0
+        self.writer: Optional[asyncio.Task] = None
+
+    def enqueue(self, frame, policy: str) -> bool:
+        """
+        Queue a frame without waiting
+
+        Returns:
+            False if the queue is full and the policy is to disconnect
+        """
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            if policy != OVERFLOW_DROP_OLDEST:
+                return False
+            self.queue.get_nowait()
+            self.queue.put_nowait(frame)
+            self.dropped_frames += 1
+            return True
+
+    async def drain(self, send_timeout: float):
+        """Writer loop: send queued frames in order until a send fails"""
+        while True:
+            frame = await self.queue.get()
+            if isinstance(frame, bytes):
+                send = self.websocket.send_bytes(frame)
+            else:
+                send = self.websocket.send_text(frame)
+            await asyncio.wait_for(send, send_timeout)
+
+    async def close(self, code: int, reason: str, timeout: float):
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), timeout)
+        except Exception:
+            pass
+
 
 class ConnectionManager:
-    """Manage WebSocket connections"""
+    """
+    Manage WebSocket connections
 
-    def __init__(self):
-        # workspace_id -> set of websockets
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    Broadcasts go through a backplane so they reach the sockets of every
+    API process, not just this one (see app.services.websocket_backplane).
+    Each socket gets a bounded send queue and writer task (ClientConnection):
+    a broadcast serializes the message once and enqueues it everywhere
+    without awaiting any send. Clients that fall behind by more than
+    WEBSOCKET_SEND_QUEUE_SIZE frames, or stall a send for longer than
+    WEBSOCKET_SEND_TIMEOUT_SECONDS, are handled per WEBSOCKET_OVERFLOW_POLICY.
 
-    async def connect(self, websocket: WebSocket, workspace_id: int):
-        """Connect a websocket to a workspace room"""
-        await websocket.accept()
+    With a coalescing window (WEBSOCKET_COALESCE_MS) broadcasts are held
+    per workspace for that long, repeated events about the same entity
+    collapse to the latest, and clients that negotiated a subprotocol get
+    the lot as one batch frame.
+    """
 
-        if workspace_id not in self.active_connections:
-            self.active_connections[workspace_id] = set()
+    def __init__(
+        self,
+        backplane: Optional[Backplane] = None,
+        max_queue: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        overflow_policy: Optional[str] = None,
+        coalesce_ms: Optional[int] = None
+    ):
+        # workspace_id -> websocket -> connection (on this process)
+        self.active_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        self.max_queue = max_queue or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WEBSOCKET_SEND_TIMEOUT_SECONDS
+        self.overflow_policy = overflow_policy or settings.WEBSOCKET_OVERFLOW_POLICY
+        self.coalesce_window = (settings.WEBSOCKET_COALESCE_MS if coalesce_ms is None else coalesce_ms) / 1000
+        # workspace_id -> collapse key -> message, flushed by a timer task
+        self._pending: Dict[int, Dict[Any, dict]] = {}
+        self._flushers: Dict[int, asyncio.Task] = {}
+        self.evicted = 0
+        self._closing: Set[asyncio.Task] = set()
+        self.backplane = backplane or InMemoryBackplane()
+        self.backplane.bind(self.deliver_to_workspace)
+
+    async def start(self):
+        """Start receiving broadcasts from other processes"""
+        await self.backplane.start()
+
+    async def stop(self):
+        for workspace_id in list(self._pending):
+            self._flush(workspace_id)
+        await self.backplane.stop()
+
+    async def connect(self, websocket: WebSocket, workspace_id: int) -> ClientConnection:
+        """Connect a websocket to a workspace room"""
+        protocol = negotiate(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=protocol)
 
-        self.active_connections[workspace_id].add(websocket)
+        connection = ClientConnection(websocket, workspace_id, self.max_queue, protocol)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.active_connections.setdefault(workspace_id, {})[websocket] = connection
+        self.connections[websocket] = connection
+        return connection
 
     def disconnect(self, websocket: WebSocket, workspace_id: int):
         """Disconnect a websocket from a workspace room"""
-        if workspace_id in self.active_connections:
-            self.active_connections[workspace_id].discard(websocket)
+        connection = self.connections.pop(websocket, None)
+        if connection is not None and connection.writer is not None:
+            connection.writer.cancel()
 
-            # Clean up empty rooms
-            if not self.active_connections[workspace_id]:
-                del self.active_connections[workspace_id]
+        room = self.active_connections.get(workspace_id)
+        if room is None:
+            return
+        room.pop(websocket, None)
+
+        # Clean up empty rooms
+        if not room:
+            del self.active_connections[workspace_id]
+
+    async def broadcast_to_workspace(self, workspace_id: int, message: dict, exclude: Optional[str] = None):
+        """
+        Broadcast a message to all connections in a workspace, on every process
+
+        `exclude` is the id of a connection that should not get it (the sender).
+        """
+        await self.backplane.publish(workspace_id, message, exclude)
+
+    async def deliver_to_workspace(self, workspace_id: int, message: dict, exclude: Optional[str] = None):
+        """Queue a message for this process's connections in a workspace"""
+        if workspace_id not in self.active_connections:
+            return
 
-    async def broadcast_to_workspace(self, workspace_id: int, message: dict):
-        """Broadcast a message to all connections in a workspace"""
-        if workspace_id in self.active_connections:
-            disconnected = set()
+        # Client chatter (sent with an exclude) goes out at once, after
+        # anything already pending so the order is kept
+        if not self.coalesce_window or exclude is not None:
+            self._flush(workspace_id)
+            self._send(workspace_id, [message], exclude)
+            return
 
-            for connection in self.active_connections[workspace_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.add(connection)
+        pending = self._pending.setdefault(workspace_id, {})
+        key = entity_key(message) or object()
+        pending.pop(key, None)  # a newer event about the entity moves to the end
+        pending[key] = message
+        if workspace_id not in self._flushers:
+            self._flushers[workspace_id] = asyncio.create_task(self._flush_later(workspace_id))
 
-            # Remove disconnected clients
-            for connection in disconnected:
-                self.active_connections[workspace_id].discard(connection)
+    async def _flush_later(self, workspace_id: int):
+        await asyncio.sleep(self.coalesce_window)
+        self._flushers.pop(workspace_id, None)
+        self._flush(workspace_id)
+
+    def _flush(self, workspace_id: int):
+        """Send a workspace's pending events now"""
+        flusher = self._flushers.pop(workspace_id, None)
+        if flusher is not None and flusher is not asyncio.current_task():
+            flusher.cancel()
+        pending = self._pending.pop(workspace_id, None)
+        if pending:
+            self._send(workspace_id, list(pending.values()))
+
+    def _send(self, workspace_id: int, messages: List[dict], exclude: Optional[str] = None):
+        """Enqueue messages on every local connection of a workspace, encoding once per protocol"""
+        room = self.active_connections.get(workspace_id)
+        if not room:
+            return
+
+        frames = FrameCache(workspace_id, messages)
+        for connection in list(room.values()):
+            if connection.id == exclude:
+                continue
+            for frame in frames.frames(connection.protocol):
+                if not connection.enqueue(frame, self.overflow_policy):
+                    self._evict(connection, "Client too slow")
+                    break
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send a message to a specific websocket"""
+        """Send a message to a specific websocket (queued behind its pending broadcasts)"""
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
+        if not connection.enqueue(encode(message, connection.protocol), self.overflow_policy):
+            self._evict(connection, "Client too slow")
+
+    async def _write(self, connection: ClientConnection):
         try:
-            await websocket.send_json(message)
+            await connection.drain(self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._evict(connection, "Send timed out")
         except Exception:
-            pass
+            # Socket already gone; the endpoint's receive loop cleans up
+            self.disconnect(connection.websocket, connection.workspace_id)
 
+    def _evict(self, connection: ClientConnection, reason: str):
+        """Drop a slow consumer and close its socket in the background"""
+        self.disconnect(connection.websocket, connection.workspace_id)
+        self.evicted += 1
+        logger.info("Dropping WebSocket client in workspace %s: %s", connection.workspace_id, reason)
+        task = asyncio.create_task(connection.close(CLOSE_TOO_SLOW, reason, self.send_timeout))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
 
-manager = ConnectionManager()
+
+manager = ConnectionManager(create_backplane(
+    settings.WEBSOCKET_BACKPLANE_URL, settings.WEBSOCKET_BACKPLANE_CHANNEL
+))
 
 
 @router.websocket("/workspace/{workspace_id}")
@@ -69,16 +252,24 @@ async def websocket_endpoint(websocket: WebSocket, workspace_id: int):
     - Assignment changes
     - Status changes
     - New notifications
+
+    Clients may offer the "flowhive.msgpack" or "flowhive.json"
+    subprotocol to receive batched (and, for msgpack, binary) frames; see
+    app.services.websocket_protocol. Without one, every event arrives as its
+    own JSON frame.
     """
-    await manager.connect(websocket, workspace_id)
+    connection = await manager.connect(websocket, workspace_id)
 
     try:
-        while True:
-            # Receive messages from client
-            data = await websocket.receive_text()
+        # Stops once the manager closes the socket (e.g. a too-slow client)
+        while websocket.application_state == WebSocketState.CONNECTED:
+            # Receive messages from client (JSON text, or MessagePack binary)
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
 
             try:
-                message = json.loads(data)
+                message = decode(frame)
 
                 # Echo confirmation back to sender
                 await manager.send_personal_message({
@@ -92,15 +283,17 @@ async def websocket_endpoint(websocket: WebSocket, workspace_id: int):
                     "type": "broadcast",
                     "workspace_id": workspace_id,
                     "data": message
-                })
+                }, exclude=connection.id)
 
-            except json.JSONDecodeError:
+            except ValueError:
                 await manager.send_personal_message({
                     "type": "error",
                     "message": "Invalid JSON format"
                 }, websocket)
 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, workspace_id)
 
 
@@ -110,6 +303,10 @@ async def notify_workspace(workspace_id: int, event_type: str, data: dict):
 
     Usage example in other routes:
     await notify_workspace(workspace_id, "task_created", {"task_id": task.id, "title": task.title})
+
+    Include the entity's "id" in `data` when later events about the same
+    entity supersede earlier ones (e.g. "task_updated"); they then collapse
+    within the coalescing window.
     """
     await manager.broadcast_to_workspace(workspace_id, {
         "type": event_type,
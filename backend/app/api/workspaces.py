@@ -1,7 +1,9 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
 from app.models.user import User, UserRole
 from app.models.workspace import Workspace, WorkspaceMember
 from app.schemas.workspace import (
@@ -12,6 +14,7 @@ from app.schemas.workspace import (
     WorkspaceMemberResponse
 )
 from app.utils.auth import get_current_active_user
+from app.services.access_cache import AccessCache
 
 router = APIRouter()
 
@@ -19,7 +22,7 @@ router = APIRouter()
 @router.post("/", response_model=WorkspaceResponse, status_code=status.HTTP_201_CREATED)
 async def create_workspace(
     workspace_data: WorkspaceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new workspace"""
@@ -33,13 +36,14 @@ async def create_workspace(
     )
 
     db.add(workspace)
-    db.commit()
-    db.refresh(workspace)
+    await db.commit()
+    await db.refresh(workspace)
 
     # Add creator as a member
     member = WorkspaceMember(workspace_id=workspace.id, user_id=current_user.id)
     db.add(member)
-    db.commit()
+    await db.commit()
+    await AccessCache.invalidate_memberships([current_user.id])
 
     return workspace
 
@@ -48,13 +52,13 @@ async def create_workspace(
 async def get_workspaces(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all workspaces the user is a member of"""
-    workspaces = db.query(Workspace).join(WorkspaceMember).filter(
+    workspaces = (await db.scalars(select(Workspace).join(WorkspaceMember).filter(
         WorkspaceMember.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))).all()
 
     return workspaces
 
@@ -62,11 +66,14 @@ async def get_workspaces(
 @router.get("/{workspace_id}", response_model=WorkspaceDetailResponse)
 async def get_workspace(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific workspace with members"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(
+        Workspace, workspace_id,
+        options=[selectinload(Workspace.members).selectinload(WorkspaceMember.user)]
+    )
     if not workspace:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,10 +81,7 @@ async def get_workspace(
         )
 
     # Check if user is a member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -133,11 +137,11 @@ async def get_workspace(
 async def update_workspace(
     workspace_id: int,
     workspace_data: WorkspaceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a workspace"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -154,19 +158,19 @@ async def update_workspace(
     for field, value in update_data.items():
         setattr(workspace, field, value)
 
-    db.commit()
-    db.refresh(workspace)
+    await db.commit()
+    await db.refresh(workspace)
     return workspace
 
 
 @router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_workspace(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a workspace"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -179,8 +183,13 @@ async def delete_workspace(
             detail="Only workspace owner can delete"
         )
 
-    db.delete(workspace)
-    db.commit()
+    member_ids = (await db.scalars(select(WorkspaceMember.user_id).filter(
+        WorkspaceMember.workspace_id == workspace_id
+    ))).all()
+
+    await db.delete(workspace)
+    await db.commit()
+    await AccessCache.invalidate_memberships(member_ids)
     return None
 
 
@@ -188,11 +197,11 @@ async def delete_workspace(
 async def add_workspace_member(
     workspace_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Add a member to workspace"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -207,7 +216,7 @@ async def add_workspace_member(
         )
 
     # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -215,10 +224,10 @@ async def add_workspace_member(
         )
 
     # Check if already a member
-    existing = db.query(WorkspaceMember).filter(
+    existing = await db.scalar(select(WorkspaceMember).filter(
         WorkspaceMember.workspace_id == workspace_id,
         WorkspaceMember.user_id == user_id
-    ).first()
+    ).limit(1))
 
     if existing:
         raise HTTPException(
@@ -228,7 +237,8 @@ async def add_workspace_member(
 
     member = WorkspaceMember(workspace_id=workspace_id, user_id=user_id)
     db.add(member)
-    db.commit()
+    await db.commit()
+    await AccessCache.invalidate_memberships([user_id])
 
     return {"message": "Member added successfully"}
 
@@ -237,11 +247,11 @@ async def add_workspace_member(
 async def remove_workspace_member(
     workspace_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Remove a member from workspace"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -254,10 +264,10 @@ async def remove_workspace_member(
             detail="Only workspace owner can remove members"
         )
 
-    member = db.query(WorkspaceMember).filter(
+    member = await db.scalar(select(WorkspaceMember).filter(
         WorkspaceMember.workspace_id == workspace_id,
         WorkspaceMember.user_id == user_id
-    ).first()
+    ).limit(1))
 
     if not member:
         raise HTTPException(
@@ -265,20 +275,21 @@ async def remove_workspace_member(
             detail="Member not found"
         )
 
-    db.delete(member)
-    db.commit()
+    await db.delete(member)
+    await db.commit()
+    await AccessCache.invalidate_memberships([user_id])
     return None
 
 
 @router.get("/{workspace_id}/members", response_model=List[WorkspaceMemberResponse])
 async def get_workspace_members(
     workspace_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all members of a workspace"""
     # Check if workspace exists
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+    workspace = await db.get(Workspace, workspace_id)
     if not workspace:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -286,10 +297,7 @@ async def get_workspace_members(
         )
 
     # Check if user is a member
-    is_member = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id,
-        WorkspaceMember.user_id == current_user.id
-    ).first()
+    is_member = await AccessCache.is_member_async(db, workspace_id, current_user.id)
 
     if not is_member:
         raise HTTPException(
@@ -297,14 +305,16 @@ async def get_workspace_members(
             detail="Not a member of this workspace"
         )
 
-    # Get all members with their user data
+    # Get all members with their user data (one query for the users)
     members = []
-    workspace_members = db.query(WorkspaceMember).filter(
+    workspace_members = (await db.scalars(select(WorkspaceMember).options(
+        selectinload(WorkspaceMember.user)
+    ).filter(
         WorkspaceMember.workspace_id == workspace_id
-    ).all()
+    ))).all()
 
     for member in workspace_members:
-        user = db.query(User).filter(User.id == member.user_id).first()
+        user = member.user
         if user:
             members.append({
                 "id": member.id,
@@ -32,6 +32,7 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str = ""
     RESEND_FROM_EMAIL: str = ""
     RESEND_FROM_NAME: str = "Crystaline Field Reports"
+    RESEND_API_URL: str = "https://api.resend.com"
 
     # Weekly Report Settings
     WEEKLY_REPORT_ENABLED: bool = True
@@ -39,6 +40,17 @@ class Settings(BaseSettings):
     WEEKLY_REPORT_HOUR: int = 17  # 5 PM
     WEEKLY_REPORT_RECIPIENTS: str = ""  # Comma-separated emails
     WEEKLY_REPORT_TIMEZONE: str = "Africa/Nairobi"
+    REPORT_EMAIL_CONCURRENCY: int = 4  # Resend requests in flight
+    REPORT_EMAIL_BATCH_SIZE: int = 100  # emails per batch request (Resend allows 100)
+
+    # Scheduler leader election: one process runs the cron jobs. "table" leases
+    # a row in scheduler_locks (any database, any pooler); "advisory" uses a
+    # PostgreSQL advisory lock and needs a direct connection, not a
+    # transaction-mode pooler (pgbouncer); "auto" picks advisory on PostgreSQL
+    # unless DATABASE_URL looks like such a pooler
+    SCHEDULER_LEADER_BACKEND: str = "table"
+    SCHEDULER_LEADER_HEARTBEAT_SECONDS: int = 15
+    SCHEDULER_LEADER_TTL_SECONDS: int = 60  # table lease; renewed every heartbeat
 
     # Github API (for commits integration)
     GITHUB_API_URL: str = ""
@@ -56,20 +68,101 @@ class Settings(BaseSettings):
             return []
         return [email.strip() for email in self.WEEKLY_REPORT_RECIPIENTS.split(",")]
 
+    # List pagination (keyset cursors)
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+
+    # Bulk create/update endpoints: items accepted in one request
+    BULK_MAX_ITEMS: int = 200
+
+    # Per-process cache of authenticated users and workspace memberships
+    # (0 seconds disables it). Changes made through the API are invalidated
+    # on every worker over the WebSocket backplane; the TTL bounds how long
+    # changes made directly in the database take to show.
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # WebSocket fan-out across processes: empty for a single process,
+    # redis://host:6379/0 to share broadcasts between workers
+    WEBSOCKET_BACKPLANE_URL: str = ""
+    WEBSOCKET_BACKPLANE_CHANNEL: str = "flowhive:ws"
+
+    # Per-connection outbound buffering
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 256  # frames waiting per client
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 10.0
+    WEBSOCKET_OVERFLOW_POLICY: str = "disconnect"  # or "drop_oldest"
+    # Hold broadcasts this long to merge them into batches (0 = send at once)
+    WEBSOCKET_COALESCE_MS: int = 0
+
+    # Transactional outbox: side effects run by a background worker. Each API
+    # process runs one; with it off, run python -m app.outbox_worker, or (on
+    # serverless hosts such as Vercel) have a cron call /api/outbox/drain
+    OUTBOX_WORKER_ENABLED: bool = True  # run a worker in each API process
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 2.0
+    OUTBOX_BATCH_SIZE: int = 20  # messages claimed (and run concurrently) at once
+    OUTBOX_LEASE_SECONDS: int = 900  # a claimed message is retried after this
+    OUTBOX_MAX_ATTEMPTS: int = 8  # then dead-lettered
+    OUTBOX_BACKOFF_BASE_SECONDS: float = 5.0
+    OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+    OUTBOX_RETENTION_DAYS: int = 7  # processed messages are purged after this
+    # /api/outbox/drain: runs batches for at most this long per call, and
+    # answers only "Authorization: Bearer <CRON_SECRET>" (Vercel Cron sends
+    # it); empty disables the endpoint
+    OUTBOX_DRAIN_MAX_SECONDS: float = 8.0
+    CRON_SECRET: str = ""
+
     # File Upload
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
+    MAX_BATCH_UPLOAD_FILES: int = 10  # files in one multi-file upload
+    # Serving /uploads: "app" (this process streams the files), or hand them
+    # to the front proxy: "x-accel-redirect" (nginx; an internal location at
+    # UPLOAD_ACCEL_PREFIX aliasing UPLOAD_DIR) or "x-sendfile" (Apache, lighttpd)
+    UPLOAD_SERVE_MODE: str = "app"
+    UPLOAD_ACCEL_PREFIX: str = "/protected-uploads"
+    # Processes rendering field photo thumbnails (0 = a thread in the worker)
+    PHOTO_VARIANT_WORKERS: int = 2
+
+    # Storage for uploaded files: "local" (UPLOAD_DIR), "s3" or "cloudinary"
+    FILE_STORAGE: str = "local"  # task attachments and field photos
+    MINUTES_STORAGE: str = "cloudinary"  # meeting minute attachments
+    STORAGE_PRESIGN_EXPIRES_SECONDS: int = 900  # presigned upload/download URLs
+
+    # Resumable uploads: partial files, outside UPLOAD_DIR (which is served);
+    # shared by every API instance
+    UPLOAD_STAGING_DIR: str = "./upload_staging"
+    RESUMABLE_UPLOAD_EXPIRE_HOURS: int = 24  # since the last received chunk
+
+    # S3-compatible object storage (AWS S3, or MinIO via S3_ENDPOINT_URL)
+    S3_BUCKET: str = ""
+    S3_REGION: str = ""
+    S3_ENDPOINT_URL: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_KEY_PREFIX: str = ""  # e.g. "flowhive/"
+    S3_PUBLIC_URL: str = ""  # base URL if the bucket is public (or behind a CDN); else GETs are presigned
 
     # Cloudinary (for minutes attachments)
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
+    # Threads for (blocking) Cloudinary SDK calls: uploads in flight at once
+    CLOUDINARY_WORKERS: int = 8
+    # Upload API base URL; e.g. a local stub (python -m benchmarks.cloudinary_stub)
+    CLOUDINARY_API_URL: str = ""  # default https://api.cloudinary.com
 
     # Push Notifications (VAPID keys)
     VAPID_PUBLIC_KEY: str = ""
     VAPID_PRIVATE_KEY: str = ""
     VAPID_CLAIM_EMAIL: str = "admin@flowhive.app"
 
+    # Push dispatch
+    PUSH_MAX_CONCURRENCY_PER_HOST: int = 50  # requests in flight per push service
+    PUSH_ENCRYPTION_WORKERS: int = 4
+    PUSH_REQUEST_TIMEOUT_SECONDS: float = 10.0
+    PUSH_TTL_SECONDS: int = 0  # 0 = deliver only if the device is reachable now
+    PUSH_AUDIENCE_BATCH_SIZE: int = 500  # subscriptions streamed per dispatch
+
     @property
     def allowed_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
@@ -1,6 +1,11 @@
+import asyncio
+from typing import Any, Callable, TypeVar, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
 
 # Configure engine for Supabase connection pooling
@@ -15,6 +20,59 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+T = TypeVar("T")
+
+_RUN_SYNC_LOCK_KEY = "run_sync_lock"
+
+
+def get_async_database_url(database_url: str):
+    """
+    Translate the sync DATABASE_URL into its async driver equivalent.
+
+    postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://.
+    asyncpg does not understand libpq's `sslmode` query parameter, so it is
+    returned separately as connect_args.
+    """
+    url = make_url(database_url)
+    connect_args = {}
+
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"])
+            if sslmode != "disable":
+                connect_args["ssl"] = sslmode
+        # Supabase's transaction pooler (pgbouncer) can't hold prepared statements
+        connect_args["statement_cache_size"] = 0
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    return url, connect_args
+
+
+_async_url, _async_connect_args = get_async_database_url(settings.DATABASE_URL)
+
+# Async engine for request handlers, so queries don't block the event loop.
+# The sync engine above stays in place for Alembic, the scheduler and scripts.
+if _async_url.get_backend_name() == "sqlite":
+    async_engine = create_async_engine(_async_url, connect_args=_async_connect_args)
+else:
+    async_engine = create_async_engine(
+        _async_url,
+        connect_args=_async_connect_args,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10,
+        pool_recycle=3600,
+    )
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # Keep loaded attributes usable after commit
+)
+
 
 def get_db():
     """Dependency for getting database sessions"""
@@ -23,3 +81,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting async database sessions"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_sync(db: Union[Session, AsyncSession], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call fn(session, *args, **kwargs) with the sync Session behind db
+
+    For sync service code (BlobStore, ResumableUploads, ...) called from
+    async endpoints as well as from scripts and workers with a Session. A
+    Session is passed straight in; an AsyncSession goes through
+    AsyncSession.run_sync, one call at a time: it allows no concurrent
+    operations, and a batch upload gathers several BlobStore.store() calls
+    on one session.
+    """
+    if not isinstance(db, AsyncSession):
+        return fn(db, *args, **kwargs)
+    lock = db.info.setdefault(_RUN_SYNC_LOCK_KEY, asyncio.Lock())
+    async with lock:
+        return await db.run_sync(fn, *args, **kwargs)
@@ -1,15 +1,25 @@
-from fastapi import FastAPI, File, UploadFile
+from fastapi import Depends, FastAPI, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.api import (
     auth, users, workspaces, projects, tasks, comments,
-    attachments, analytics, websocket, field_operations, task_categories, meeting_minutes, customers, push_notifications
+    attachments, analytics, websocket, field_operations, task_categories, meeting_minutes, customers, push_notifications,
+    uploads, outbox
 )
 from app.api import field_activity_comments
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.models.user import UserRole
+from app.services.access_cache import AccessCache
+from app.utils.auth import require_role
+from app.utils.uploads import CHUNK_SIZE, UploadSizeLimitMiddleware
+from app.utils.upload_serving import UploadFiles
+import hashlib
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -20,12 +30,53 @@ async def lifespan(app: FastAPI):
     from app.scheduler import start_scheduler
     start_scheduler()
 
+    # Startup: Subscribe to WebSocket broadcasts (and access cache
+    # invalidations) from other workers
+    from app.api.websocket import manager
+    AccessCache.bind(manager.backplane)
+    await manager.start()
+
+    # Startup: Configure the Cloudinary SDK (once: its settings are global)
+    from app.utils.cloudinary import init_cloudinary, shutdown_executor
+    init_cloudinary()
+
+    # Startup: Drain the outbox (push, report emails, Cloudinary clean-up)
+    from app.services.outbox import outbox_worker
+    if settings.OUTBOX_WORKER_ENABLED:
+        await outbox_worker.start()
+    else:
+        logger.warning(
+            "OUTBOX_WORKER_ENABLED is false: push notifications, report emails and file clean-up "
+            "wait for python -m app.outbox_worker or a call to /api/outbox/drain"
+        )
+
     yield
 
+    # Shutdown: Stop the outbox worker (unfinished messages are retried later)
+    await outbox_worker.stop()
+
+    # Shutdown: Stop the photo variant render processes
+    from app.services.photo_variants import PhotoVariantService
+    PhotoVariantService.shutdown()
+
+    # Shutdown: Stop the Cloudinary call threads
+    shutdown_executor()
+
+    # Shutdown: Leave the WebSocket backplane
+    await manager.stop()
+
+    # Shutdown: Close the push dispatcher's HTTP connections
+    from app.services.push_notification_service import PushNotificationService
+    await PushNotificationService.aclose()
+
     # Shutdown: Stop scheduler
     from app.scheduler import shutdown_scheduler
     shutdown_scheduler()
 
+    # Shutdown: Close pooled async database connections
+    from app.database import async_engine
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -34,6 +85,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Reject oversized multipart uploads before they are spooled (inside CORS,
+# so browsers can read the 413)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -41,13 +96,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Create upload directory if it doesn't exist (skip in serverless)
 if not os.environ.get('VERCEL'):
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    # Mount static files for uploads (skip in serverless)
-    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+    # Serve uploads, with cache validators (skip in serverless)
+    app.mount(
+        "/uploads",
+        UploadFiles(
+            directory=settings.UPLOAD_DIR,
+            mode=settings.UPLOAD_SERVE_MODE,
+            accel_prefix=settings.UPLOAD_ACCEL_PREFIX
+        ),
+        name="uploads"
+    )
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -57,6 +121,7 @@ app.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
 app.include_router(comments.router, prefix="/api/comments", tags=["Comments"])
 app.include_router(attachments.router, prefix="/api/attachments", tags=["Attachments"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(websocket.router, prefix="/api/ws", tags=["WebSocket"])
 app.include_router(field_operations.router, prefix="/api/field-activities", tags=["Field Operations"])
@@ -65,6 +130,7 @@ app.include_router(task_categories.router, prefix="/api/task-categories", tags=[
 app.include_router(meeting_minutes.router, prefix="/api/meeting-minutes", tags=["Meeting Minutes"])
 app.include_router(customers.router, prefix="/api/customers", tags=["Customers"])
 app.include_router(push_notifications.router, prefix="/api/push", tags=["Push Notifications"])
+app.include_router(outbox.router, prefix="/api/outbox", tags=["Outbox"])
 
 
 @app.get("/")
@@ -81,6 +147,50 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# The diagnostics below expose process, job and queue internals: executives only
+require_executive = Depends(require_role([UserRole.EXECUTIVE]))
+
+
+@app.get("/health/cache", dependencies=[require_executive])
+async def cache_stats():
+    """Hit/miss counters of the per-process user and membership caches"""
+    return AccessCache.stats()
+
+
+@app.get("/health/outbox", dependencies=[require_executive])
+def outbox_stats():
+    """Outbox backlog: messages per status and the oldest due message's delay"""
+    from app.database import SessionLocal
+    from app.services.outbox import Outbox
+
+    db = SessionLocal()
+    try:
+        return Outbox.stats(db)
+    finally:
+        db.close()
+
+
+@app.get("/health/scheduler", dependencies=[require_executive])
+def scheduler_status():
+    """Scheduler leadership of this process and the latest job runs"""
+    from app.database import SessionLocal
+    from app.scheduler import get_leader
+    from app.services.job_ledger import JobLedger
+
+    leader = get_leader()
+    db = SessionLocal()
+    try:
+        return {
+            "process": leader.holder,
+            "backend": leader.backend,
+            "is_leader": leader.is_leader,
+            "leader": leader.current_holder(),
+            "recent_runs": JobLedger.recent(db, limit=10)
+        }
+    finally:
+        db.close()
+
+
 @app.post("/api/test-upload", tags=["Testing"])
 async def test_file_upload(
     file: UploadFile = File(..., description="File to upload for testing")
@@ -91,15 +201,20 @@ async def test_file_upload(
     This endpoint accepts a single file upload and returns information about the uploaded file.
     Useful for testing file upload functionality without authentication.
     """
-    contents = await file.read()
-    file_size = len(contents)
+    # Read in chunks for the size and hash; nothing is stored
+    digest = hashlib.sha256()
+    file_size = 0
+    while chunk := await file.read(CHUNK_SIZE):
+        digest.update(chunk)
+        file_size += len(chunk)
 
     return {
         "message": "File uploaded successfully",
         "filename": file.filename,
         "content_type": file.content_type,
         "file_size_bytes": file_size,
-        "file_size_kb": round(file_size / 1024, 2)
+        "file_size_kb": round(file_size / 1024, 2),
+        "sha256": digest.hexdigest()
     }
 
 
@@ -109,5 +224,8 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # Compress WebSocket frames for clients that offer it (the default,
+        # kept explicit since batched frames rely on it)
+        ws_per_message_deflate=True
     )
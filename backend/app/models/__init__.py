@@ -3,10 +3,14 @@ from app.models.workspace import Workspace, WorkspaceMember, WorkspaceType
 from app.models.project import Project
 from app.models.task import Task, TaskStatus, TaskPriority
 from app.models.comment import Comment, Attachment, ActivityLog
-from app.models.field_activity import FieldActivity, FieldActivityPhoto, FieldActivityComment, TaskCategory, LocationType
+from app.models.field_activity import FieldActivity, FieldActivityPhoto, FieldActivityComment, FieldActivityDailyStat, TaskCategory, LocationType
 from app.models.meeting_minute import MeetingMinute, MinuteAttachment, MinuteActionItem
 from app.models.customers import Licence
 from app.models.push_subscription import PushSubscription
+from app.models.outbox import OutboxMessage
+from app.models.scheduler import SchedulerLock, JobRun
+from app.models.blob import Blob
+from app.models.upload_session import UploadSession
 
 __all__ = [
     "User",
@@ -24,11 +28,17 @@ __all__ = [
     "FieldActivity",
     "FieldActivityPhoto",
     "FieldActivityComment",
+    "FieldActivityDailyStat",
     "TaskCategory",
     "LocationType",
     "MeetingMinute",
     "MinuteAttachment",
     "MinuteActionItem",
     "Licence",
-    "PushSubscription"
+    "PushSubscription",
+    "OutboxMessage",
+    "SchedulerLock",
+    "JobRun",
+    "Blob",
+    "UploadSession"
 ]
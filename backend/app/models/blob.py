@@ -0,0 +1,41 @@
+"""
+Blob model
+Content-addressed stored files, shared by every attachment with the same
+content and reference counted
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.database import Base
+
+BLOB_STORAGE_LOCAL = "local"            # location is a file path under UPLOAD_DIR
+BLOB_STORAGE_S3 = "s3"                  # location is the object key in S3_BUCKET
+BLOB_STORAGE_CLOUDINARY = "cloudinary"  # location is the Cloudinary public_id
+
+
+class Blob(Base):
+    """
+    One stored file
+
+    Attachment, FieldActivityPhoto and MinuteAttachment rows point here via
+    blob_id; ref_count is how many do. A blob is removed (row and file) once
+    its count drops to zero. Blobs migrated from before content addressing
+    whose content could not be read have no sha256 and are never shared.
+    """
+    __tablename__ = "blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=True)
+    storage = Column(String(16), nullable=False, default=BLOB_STORAGE_LOCAL)
+    location = Column(String, nullable=False)
+    url = Column(String, nullable=True)  # permanent public URL, if the storage has one
+    resource_type = Column(String, nullable=True)  # Cloudinary resource type
+    size = Column(Integer, nullable=False)
+    mime_type = Column(String, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("storage", "sha256", name="uq_blobs_storage_sha256"),
+    )
@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.blob import BLOB_STORAGE_LOCAL
 
 
 class Comment(Base):
@@ -15,6 +16,10 @@ class Comment(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_comments_task_created", "task_id", "created_at", "id"),
+    )
+
     # Relationships
     task = relationship("Task", back_populates="comments")
     user = relationship("User", back_populates="comments")
@@ -30,6 +35,7 @@ class Attachment(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)  # in bytes
     mime_type = Column(String, nullable=False)
+    blob_id = Column(Integer, ForeignKey("blobs.id"), nullable=True, index=True)  # shared stored file
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -37,6 +43,12 @@ class Attachment(Base):
     # Relationships
     task = relationship("Task", back_populates="attachments")
     uploader = relationship("User")
+    blob = relationship("Blob", lazy="joined")
+
+    @property
+    def storage(self) -> str:
+        """Storage holding the file (rows from before blobs are local)"""
+        return self.blob.storage if self.blob is not None else BLOB_STORAGE_LOCAL
 
 
 class ActivityLog(Base):
@@ -1,7 +1,10 @@
 from datetime import datetime, time, timedelta
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Date, Time, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Date, Time, Boolean, Enum, JSON
+from sqlalchemy import Float, Numeric, UniqueConstraint, Index, and_, case, cast, extract, func, literal_column, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.blob import BLOB_STORAGE_LOCAL
 import enum
 
 
@@ -55,6 +58,7 @@ class FieldActivity(Base):
     task_category_id = Column(Integer, ForeignKey("task_categories.id"), nullable=True, index=True)
     task_description = Column(Text, nullable=True)  # Nullable for pending tasks
     remarks = Column(Text, nullable=True)
+    search_text = Column(Text, nullable=True)  # Title, customer and HTML-stripped text, see SearchService
     customer_rep = Column(String, nullable=True)
     status = Column(Enum(ActivityStatus), nullable=False, default=ActivityStatus.COMPLETED, index=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -71,22 +75,113 @@ class FieldActivity(Base):
     photos = relationship("FieldActivityPhoto", back_populates="field_activity", cascade="all, delete-orphan")
     comments = relationship("FieldActivityComment", back_populates="activity", cascade="all, delete-orphan")
 
-    @property
-    def duration_hours(self) -> float:
-        """Calculate duration in hours between start_time and end_time"""
-        if self.start_time and self.end_time:
+    __table_args__ = (
+        # Workspace list (keyset order), date-range filters and analytics.
+        # NULLS LAST ordering is Postgres-only syntax.
+        Index(
+            "ix_field_activities_workspace_date",
+            workspace_id, activity_date.desc(), start_time.desc().nulls_last(), id.desc()
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_field_activities_workspace_staff_date", workspace_id, support_staff_id, activity_date),
+        Index(
+            "ix_field_activities_workspace_customer", workspace_id, customer_id,
+            postgresql_where=text("customer_id IS NOT NULL"),
+            sqlite_where=text("customer_id IS NOT NULL")
+        ),
+        Index(
+            "ix_field_activities_pending", workspace_id, support_staff_id, activity_date, start_time, id,
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'")
+        ),
+        # Full-text (ranked search) and trigram (substring filters) indexes, Postgres-only
+        Index(
+            "ix_field_activities_search_fts",
+            func.to_tsvector(literal_column("'english'::regconfig"), func.coalesce(search_text, literal_column("''"))),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_field_activities_search_trgm", search_text,
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_field_activities_customer_name_trgm", customer_name,
+            postgresql_using="gin", postgresql_ops={"customer_name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    @staticmethod
+    def calculate_duration_hours(start_time: time, end_time: time) -> float:
+        """Calculate duration in hours between a start and end time"""
+        if start_time and end_time:
             # Convert time objects to datetime for calculation
-            start_dt = datetime.combine(datetime.today(), self.start_time)
-            end_dt = datetime.combine(datetime.today(), self.end_time)
+            start_dt = datetime.combine(datetime.today(), start_time)
+            end_dt = datetime.combine(datetime.today(), end_time)
 
             # Handle overnight shifts (end time is next day)
             if end_dt < start_dt:
-                end_dt = datetime.combine(datetime.today(), self.end_time) + timedelta(days=1)
+                end_dt = datetime.combine(datetime.today(), end_time) + timedelta(days=1)
 
             duration = end_dt - start_dt
             return round(duration.total_seconds() / 3600, 2)  # Convert to hours with 2 decimal places
         return 0.0
 
+    @hybrid_property
+    def duration_hours(self) -> float:
+        """Calculate duration in hours between start_time and end_time"""
+        return FieldActivity.calculate_duration_hours(self.start_time, self.end_time)
+
+    @duration_hours.expression
+    def duration_hours(cls):
+        """SQL equivalent of duration_hours, usable inside SUM()/GROUP BY queries"""
+        def seconds_of_day(column):
+            return (
+                extract('hour', column) * 3600
+                + extract('minute', column) * 60
+                + extract('second', column)
+            )
+
+        elapsed = seconds_of_day(cls.end_time) - seconds_of_day(cls.start_time)
+
+        # Handle overnight shifts (end time is next day)
+        elapsed = case((elapsed < 0, elapsed + 86400), else_=elapsed)
+
+        # Round per row like the Python property, so sums match exactly
+        hours = cast(func.round(cast(elapsed / 3600.0, Numeric), 2), Float)
+        return case(
+            (and_(cls.start_time.isnot(None), cls.end_time.isnot(None)), hours),
+            else_=0.0
+        )
+
+
+class FieldActivityDailyStat(Base):
+    """
+    Daily rollup of field activities, maintained incrementally on every
+    create/update/delete so analytics don't rescan field_activities.
+
+    One row per (workspace, date, staff, category, customer, location type)
+    bucket. Nullable key columns can't take part in a unique constraint, so
+    bucket_key holds a digest of the full key and is what upserts conflict on.
+    """
+    __tablename__ = "field_activity_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("bucket_key", name="uq_field_activity_daily_stats_bucket_key"),
+        Index("ix_field_activity_daily_stats_workspace_date", "workspace_id", "activity_date"),
+        Index("ix_field_activity_daily_stats_workspace_customer", "workspace_id", "customer_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_key = Column(String(64), nullable=False)
+    workspace_id = Column(Integer, ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
+    activity_date = Column(Date, nullable=False)
+    support_staff_id = Column(Integer, nullable=False)
+    task_category_id = Column(Integer, nullable=True)  # NULL = uncategorized
+    customer_id = Column(String, nullable=True)
+    customer_name = Column(String, nullable=False)
+    location_type = Column(Enum(LocationType), nullable=False)
+    activity_count = Column(Integer, nullable=False, default=0)
+    total_hours = Column(Numeric(12, 2), nullable=False, default=0)  # Exact sums, no float drift
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class FieldActivityPhoto(Base):
     __tablename__ = "field_activity_photos"
@@ -97,12 +192,22 @@ class FieldActivityPhoto(Base):
     file_name = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=False)
+    blob_id = Column(Integer, ForeignKey("blobs.id"), nullable=True, index=True)  # shared stored file
+    # {name: {path, width, height, size, mime_type}} from PhotoVariantService;
+    # None until rendered, {} if the image can't be read
+    variants = Column(JSON, nullable=True)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     field_activity = relationship("FieldActivity", back_populates="photos")
     uploaded_by_user = relationship("User", backref="uploaded_field_photos")
+    blob = relationship("Blob", lazy="joined")
+
+    @property
+    def storage(self) -> str:
+        """Storage holding the file (rows from before blobs are local)"""
+        return self.blob.storage if self.blob is not None else BLOB_STORAGE_LOCAL
 
 
 class FieldActivityComment(Base):
@@ -2,10 +2,11 @@
 Meeting Minutes Models
 Models for meeting minutes and attachments in field operations
 """
-from sqlalchemy import Column, Integer, String, Text, Date, Time, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Date, Time, DateTime, ForeignKey, JSON, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.models.blob import BLOB_STORAGE_CLOUDINARY
 
 
 class MeetingMinute(Base):
@@ -27,6 +28,7 @@ class MeetingMinute(Base):
     agenda = Column(Text, nullable=True)  # HTML/Rich text
     discussions = Column(Text, nullable=True)  # HTML/Rich text - main content
     decisions = Column(Text, nullable=True)  # HTML/Rich text
+    search_text = Column(Text, nullable=True)  # Title and HTML-stripped content, see SearchService
     
     # Metadata
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -34,6 +36,20 @@ class MeetingMinute(Base):
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_meeting_minutes_workspace_date", workspace_id, meeting_date.desc(), id.desc()),
+        # Full-text (ranked search) and trigram (substring filters) indexes, Postgres-only
+        Index(
+            "ix_meeting_minutes_search_fts",
+            func.to_tsvector(literal_column("'english'::regconfig"), func.coalesce(search_text, literal_column("''"))),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_meeting_minutes_search_trgm", search_text,
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     workspace = relationship("Workspace", backref="meeting_minutes")
     created_by_user = relationship("User", foreign_keys=[created_by], backref="created_minutes")
@@ -49,10 +65,11 @@ class MinuteAttachment(Base):
     id = Column(Integer, primary_key=True, index=True)
     meeting_minute_id = Column(Integer, ForeignKey("meeting_minutes.id", ondelete="CASCADE"), nullable=False)
     
-    # Cloudinary storage
+    # Cloudinary storage (with MINUTES_STORAGE=s3/local: the blob's key and permanent URL, if any)
     cloudinary_public_id = Column(String, nullable=False)  # Cloudinary public ID
     cloudinary_url = Column(String, nullable=False)  # Secure URL from Cloudinary
     resource_type = Column(String, nullable=False)  # image, raw (for PDFs/docs), etc.
+    blob_id = Column(Integer, ForeignKey("blobs.id"), nullable=True, index=True)  # shared stored file
     
     # File metadata
     file_name = Column(String, nullable=False)
@@ -66,6 +83,12 @@ class MinuteAttachment(Base):
     # Relationships
     meeting_minute = relationship("MeetingMinute", back_populates="attachments")
     uploaded_by_user = relationship("User", backref="uploaded_minute_attachments")
+    blob = relationship("Blob", lazy="joined")
+
+    @property
+    def storage(self) -> str:
+        """Storage holding the file (rows from before blobs are in Cloudinary)"""
+        return self.blob.storage if self.blob is not None else BLOB_STORAGE_CLOUDINARY
 
 
 class MinuteActionItem(Base):
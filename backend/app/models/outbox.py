@@ -0,0 +1,36 @@
+"""
+Outbox model
+Side effects recorded in the same transaction as the change that causes them
+and carried out later by the outbox worker
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from datetime import datetime
+
+from app.database import Base
+
+OUTBOX_PENDING = "pending"        # waiting for available_at
+OUTBOX_PROCESSING = "processing"  # claimed by a worker until locked_until
+OUTBOX_DONE = "done"
+OUTBOX_DEAD = "dead"              # gave up after max_attempts; see last_error
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default=OUTBOX_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The worker's poll: due messages in order
+        Index("ix_outbox_messages_status_available", "status", "available_at"),
+    )
@@ -3,7 +3,7 @@ Push Notification Subscription model
 Stores user web push subscriptions for PWA notifications
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -22,5 +22,9 @@ class PushSubscription(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_push_subscriptions_user_active", "user_id", "active"),
+    )
+
     # Relationship
     user = relationship("User", backref="push_subscriptions")
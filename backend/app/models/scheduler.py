@@ -0,0 +1,55 @@
+"""
+Scheduler models
+Leader lease (the default leader election backend), and the ledger of
+scheduled job runs
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, UniqueConstraint
+from datetime import datetime
+
+from app.database import Base
+
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JOB_TRIGGER_SCHEDULE = "schedule"  # cron; at most one run per job and period
+JOB_TRIGGER_MANUAL = "manual"      # requested by a user; never deduplicated
+
+
+class SchedulerLock(Base):
+    """A named lease held by one process until expires_at"""
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(128), nullable=False)
+    acquired_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class JobRun(Base):
+    """
+    One run of a scheduled job
+
+    period identifies what a scheduled run covers (e.g. the reported week);
+    the unique constraint makes a second run for the same period fail to
+    start, whichever process tries it. Manual runs leave it empty.
+    """
+    __tablename__ = "job_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(64), nullable=False)
+    period = Column(String(32), nullable=True)
+    trigger = Column(String(16), nullable=False, default=JOB_TRIGGER_SCHEDULE)
+    status = Column(String(16), nullable=False, default=JOB_RUNNING)
+    holder = Column(String(128), nullable=False)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    stats = Column(JSON, nullable=True)  # counts, plus per-workspace counts and timings
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "period", name="uq_job_runs_job_period"),
+        Index("ix_job_runs_job_started", "job_id", "started_at"),
+    )
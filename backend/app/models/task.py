@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -41,6 +41,16 @@ class Task(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_tasks_assignee_status", assignee_id, status),
+        Index("ix_tasks_parent_task_id", parent_task_id),
+        # Keyset order of the task lists; NULLS LAST ordering is Postgres-only syntax
+        Index("ix_tasks_project_updated", project_id, updated_at.desc().nulls_last(), id.desc()).ddl_if(
+            dialect="postgresql"
+        ),
+        Index("ix_tasks_updated", updated_at.desc().nulls_last(), id.desc()).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     project = relationship("Project", back_populates="tasks")
     creator = relationship("User", back_populates="created_tasks", foreign_keys=[creator_id])
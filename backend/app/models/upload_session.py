@@ -0,0 +1,32 @@
+"""
+Upload session model
+Resumable uploads in progress: the bytes received so far are staged on
+disk (UPLOAD_STAGING_DIR/<id>), the row says what they will become
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+
+from app.database import Base
+
+
+class UploadSession(Base):
+    """
+    One resumable upload
+
+    The staged file's size is the upload offset. locked_until is held by the
+    PATCH request appending to it, so a retry can't write alongside a
+    request the server has not yet noticed was dropped.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, part of the upload URL
+    scope = Column(String(64), nullable=False)  # what it will be attached to, e.g. "photo:12"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(255), nullable=False)  # declared; sniffed again when finalized
+    size = Column(Integer, nullable=False)  # Upload-Length
+    sha256 = Column(String(64), nullable=True)  # declared, checked when finalized
+    locked_until = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)  # pushed back by every PATCH
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -27,6 +27,19 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Trigram index behind user search (SearchService.search_users), Postgres-only
+        Index(
+            "ix_users_search_trgm",
+            func.lower(
+                func.coalesce(full_name, literal_column("''"))
+                + literal_column("' '") + username
+                + literal_column("' '") + email
+            ).label("search"),
+            postgresql_using="gin", postgresql_ops={"search": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     owned_workspaces = relationship("Workspace", back_populates="owner", foreign_keys="Workspace.owner_id")
     workspace_members = relationship("WorkspaceMember", back_populates="user")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -38,6 +38,11 @@ class WorkspaceMember(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     joined_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_workspace_members_workspace_user", "workspace_id", "user_id"),
+        Index("ix_workspace_members_user_id", "user_id"),
+    )
+
     # Relationships
     workspace = relationship("Workspace", back_populates="members")
     user = relationship("User", back_populates="workspace_members")
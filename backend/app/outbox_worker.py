@@ -0,0 +1,36 @@
+"""
+Standalone outbox worker
+Run with: python -m app.outbox_worker
+
+Drains the outbox in its own process. Any number can run next to the API
+processes, which also run a worker each unless OUTBOX_WORKER_ENABLED=false
+(set that when these standalone workers do all the draining).
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.services.outbox import OutboxWorker
+from app.services.photo_variants import PhotoVariantService
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    worker = OutboxWorker()
+    await worker.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+    await worker.stop()
+    PhotoVariantService.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
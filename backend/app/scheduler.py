@@ -1,32 +1,94 @@
 """
 Task Scheduler for automated jobs
 Handles scheduled tasks like weekly email reports
+
+Every API process starts the scheduler, but only the elected leader (see
+app.services.leader_election) runs the cron jobs; the others take over if it
+goes away. Each run is recorded in the job_runs ledger, which also refuses a
+second scheduled run for the same period.
 """
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict
+import asyncio
+import functools
 import logging
 
 from app.database import SessionLocal
-from app.models.field_activity import FieldActivity
-from app.models.workspace import Workspace
-from app.models.user import User
-from app.services.field_activity_service import FieldActivityReportService
+from app.models.scheduler import JOB_TRIGGER_SCHEDULE
+from app.services.job_ledger import JobLedger
+from app.services.leader_election import LeaderElection
 from app.services.push_notification_service import PushNotificationService
+from app.services.report_pipeline import WeeklyReportPipeline
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
-
-async def send_weekly_reports():
+# Created on first use so importing this module doesn't touch the database
+_leader: LeaderElection = None
+
+
+def get_leader() -> LeaderElection:
+    global _leader
+    if _leader is None:
+        _leader = LeaderElection("scheduler")
+    return _leader
+
+
+async def leader_heartbeat():
+    """Acquire or renew scheduler leadership"""
+    await asyncio.to_thread(get_leader().heartbeat)
+
+
+def leader_only(job):
+    """Run a cron job only in the leading process"""
+    @functools.wraps(job)
+    async def run():
+        # Check now rather than trusting the last heartbeat: a leader that
+        # just died has usually released its lock already
+        if not await asyncio.to_thread(get_leader().heartbeat):
+            logger.info(f"Skipping {job.__name__}: this process is not the scheduler leader")
+            return
+        await job()
+    return run
+
+
+def _report_stats(date_from: str, date_to: str, pipeline: WeeklyReportPipeline, results: Dict[int, Any]) -> Dict[str, Any]:
+    by_workspace = {}
+    for workspace_id, result in results.items():
+        if isinstance(result, Exception):
+            by_workspace[str(workspace_id)] = {"error": str(result)}
+        else:
+            by_workspace[str(workspace_id)] = {
+                key: result[key] for key in ("activities", "sent_count", "failed_count", "seconds")
+            }
+    sent = [r for r in results.values() if not isinstance(r, Exception)]
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "workspaces": len(results),
+        "sent_count": sum(r["sent_count"] for r in sent),
+        "failed_count": sum(r["failed_count"] for r in sent),
+        "failed_workspaces": len(results) - len(sent),
+        "rendered": pipeline.rendered,
+        "resend_requests": pipeline.mailer.requests,
+        "by_workspace": by_workspace
+    }
+
+
+async def send_weekly_reports(trigger: str = JOB_TRIGGER_SCHEDULE):
     """
     Send weekly activity reports for all workspaces
     Runs every Sunday at 5 PM (or configured day/time)
+
+    Args:
+        trigger: JOB_TRIGGER_SCHEDULE runs at most once per reported week;
+            JOB_TRIGGER_MANUAL (the trigger endpoint) always runs
     """
     logger.info("Starting weekly report job...")
 
@@ -38,6 +100,7 @@ async def send_weekly_reports():
     # even if weekly_report_recipients_list is empty
 
     db: Session = SessionLocal()
+    run = None
 
     try:
         # Calculate last week's date range (Monday to Sunday)
@@ -51,88 +114,41 @@ async def send_weekly_reports():
         date_from = last_monday.strftime("%Y-%m-%d")
         date_to = last_sunday.strftime("%Y-%m-%d")
 
+        # The ledger's sync sessions run in a thread, off the event loop
+        run = await asyncio.to_thread(
+            JobLedger.start, "weekly_reports", date_from, get_leader().holder, trigger
+        )
+        if run is None:
+            return
+
         logger.info(f"Generating reports for period: {date_from} to {date_to}")
 
-        # Get all active workspaces
-        workspaces = db.query(Workspace).all()
-
-        for workspace in workspaces:
-            try:
-                logger.info(f"Processing workspace: {workspace.name} (ID: {workspace.id})")
-
-                # Get activities for this workspace
-                activities = db.query(FieldActivity).filter(
-                    FieldActivity.workspace_id == workspace.id,
-                    FieldActivity.activity_date >= date_from,
-                    FieldActivity.activity_date <= date_to
-                ).order_by(
-                    FieldActivity.activity_date,
-                    FieldActivity.start_time
-                ).all()
-
-                if not activities:
-                    logger.info(f"No activities found for workspace {workspace.name}")
-                    continue
-
-                # Send individual reports to each workspace member
-                try:
-                    result = await FieldActivityReportService.send_individual_reports(
-                        workspace_id=workspace.id,
-                        activities=activities,
-                        date_from=date_from,
-                        date_to=date_to,
-                        db=db,
-                        resend_api_key=settings.RESEND_API_KEY,
-                        from_email=settings.RESEND_FROM_EMAIL,
-                        from_name=settings.RESEND_FROM_NAME,
-                        frontend_url=settings.FRONTEND_URL
-                    )
-
-                    logger.info(
-                        f"Workspace {workspace.name}: {result['sent_count']} sent, "
-                        f"{result['failed_count']} failed"
-                    )
-
-                    if result.get('errors'):
-                        for error in result['errors']:
-                            logger.error(f"  - {error}")
-
-                except Exception as e:
-                    logger.error(f"Failed to send individual reports for workspace {workspace.name}: {str(e)}")
-
-                # Also send to configured recipients if specified (full report)
-                if settings.weekly_report_recipients_list:
-                    try:
-                        await FieldActivityReportService.send_bulk_report(
-                            activities=activities,
-                            recipient_emails=settings.weekly_report_recipients_list,
-                            date_from=date_from,
-                            date_to=date_to,
-                            resend_api_key=settings.RESEND_API_KEY,
-                            from_email=settings.RESEND_FROM_EMAIL,
-                            from_name=settings.RESEND_FROM_NAME,
-                            frontend_url=settings.FRONTEND_URL
-                        )
-                        logger.info(f"Full report sent to configured recipients: {settings.weekly_report_recipients_list}")
-                    except Exception as e:
-                        logger.error(f"Failed to send to configured recipients: {str(e)}")
-
-            except Exception as e:
-                logger.error(f"Error processing workspace {workspace.id}: {str(e)}")
-                continue
+        # All workspaces in parallel; configured recipients also get each full report
+        pipeline = WeeklyReportPipeline()
+        results = await pipeline.run(
+            db,
+            date_from=date_from,
+            date_to=date_to,
+            extra_recipients=settings.weekly_report_recipients_list
+        )
+        await asyncio.to_thread(JobLedger.finish, run, _report_stats(date_from, date_to, pipeline, results))
 
         logger.info("Weekly report job completed")
 
     except Exception as e:
         logger.error(f"Error in weekly report job: {str(e)}")
+        if run is not None:
+            # Whatever the job left unfinished must not hold locks meanwhile
+            await asyncio.to_thread(db.rollback)
+            await asyncio.to_thread(JobLedger.fail, run, e)
     finally:
-        db.close()
+        await asyncio.to_thread(db.close)
 
 
-async def send_weekly_push_notifications():
+async def send_weekly_push_notifications(trigger: str = JOB_TRIGGER_SCHEDULE):
     """
     Send push notifications to all users about their weekly email report
-    Runs every Monday at 8:00 AM
+    Runs every Monday at 8:00 AM, at most once per ISO week
     """
     logger.info("Starting weekly push notification job...")
 
@@ -141,38 +157,38 @@ async def send_weekly_push_notifications():
         return
 
     db: Session = SessionLocal()
+    run = None
 
     try:
-        # Get all users
-        users = db.query(User).all()
-
-        sent_count = 0
-        failed_count = 0
-
-        for user in users:
-            try:
-                success = PushNotificationService.send_weekly_report_notification(
-                    db=db,
-                    user_id=user.id
-                )
-                if success:
-                    sent_count += 1
-                    logger.info(f"Push notification sent to {user.email}")
-                else:
-                    failed_count += 1
-
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"Failed to send push notification to user {user.id}: {str(e)}")
+        year, week, _ = datetime.now().isocalendar()
+        run = await asyncio.to_thread(
+            JobLedger.start, "weekly_push_notifications", f"{year}-W{week:02d}", get_leader().holder, trigger
+        )
+        if run is None:
+            return
+
+        # Every active subscription of every active user, streamed in batches
+        report = await PushNotificationService.send_weekly_report_notification(db)
+        await asyncio.to_thread(JobLedger.finish, run, {
+            "users_notified": len(report.delivered_users),
+            "sent": report.sent,
+            "failed": report.failed,
+            "expired": len(report.gone)
+        })
 
         logger.info(
-            f"Weekly push notification job completed: {sent_count} sent, {failed_count} failed"
+            f"Weekly push notification job completed: {len(report.delivered_users)} user(s) notified, "
+            f"{report.sent} sent, {report.failed} failed, {len(report.gone)} expired"
         )
 
     except Exception as e:
         logger.error(f"Error in weekly push notification job: {str(e)}")
+        if run is not None:
+            # Whatever the job left unfinished must not hold locks meanwhile
+            await asyncio.to_thread(db.rollback)
+            await asyncio.to_thread(JobLedger.fail, run, e)
     finally:
-        db.close()
+        await asyncio.to_thread(db.close)
 
 
 def start_scheduler():
@@ -193,11 +209,13 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        send_weekly_reports,
+        leader_only(send_weekly_reports),
         trigger=trigger,
         id='weekly_reports',
         name='Send Weekly Activity Reports',
-        replace_existing=True
+        replace_existing=True,
+        misfire_grace_time=3600,
+        coalesce=True
     )
 
     # Add Monday 8 AM push notification job
@@ -209,11 +227,26 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        send_weekly_push_notifications,
+        leader_only(send_weekly_push_notifications),
         trigger=push_trigger,
         id='weekly_push_notifications',
         name='Send Weekly Push Notifications',
-        replace_existing=True
+        replace_existing=True,
+        misfire_grace_time=3600,
+        coalesce=True
+    )
+
+    # Leader election: first attempt right away, then keep the lease alive
+    scheduler.add_job(
+        leader_heartbeat,
+        trigger='interval',
+        seconds=settings.SCHEDULER_LEADER_HEARTBEAT_SECONDS,
+        next_run_time=datetime.now(),
+        id='scheduler_leader_heartbeat',
+        name='Scheduler Leader Heartbeat',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
     )
 
     scheduler.start()
@@ -234,3 +267,6 @@ def shutdown_scheduler():
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Scheduler shutdown")
+    if _leader is not None:
+        # Let another process lead without waiting for the lease to expire
+        _leader.release()
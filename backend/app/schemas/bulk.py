@@ -0,0 +1,20 @@
+"""
+Bulk Schemas
+Shared parts of the bulk create/update endpoints: items are checked one by
+one, the valid ones are written together and every rejected item comes back
+as an error with its position in the request.
+"""
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+class BulkItemError(BaseModel):
+    """A rejected item: its index in the request array and why"""
+    index: int
+    status_code: int
+    detail: str
+
+
+def bulk_item_error(index: int, exc: HTTPException) -> BulkItemError:
+    """The error entry of an item rejected with exc"""
+    return BulkItemError(index=index, status_code=exc.status_code, detail=exc.detail)
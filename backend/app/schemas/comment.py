@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
+from app.models.blob import BLOB_STORAGE_LOCAL
+from app.services.storage import object_url
 
 
 class CommentBase(BaseModel):
@@ -41,6 +43,13 @@ class AttachmentResponse(BaseModel):
     uploaded_by: int
     uploader_name: Optional[str] = None
     created_at: datetime
+    storage: str = Field(default=BLOB_STORAGE_LOCAL, exclude=True)
+    url: Optional[str] = None  # download URL (may be presigned and expire)
+
+    @model_validator(mode='after')
+    def download_url(self):
+        self.url = object_url(self.storage, self.file_path, self.original_filename)
+        return self
 
     class Config:
         from_attributes = True
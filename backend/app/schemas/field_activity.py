@@ -1,8 +1,11 @@
-from pydantic import BaseModel, field_validator, model_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, ValidationInfo, field_validator, model_validator
+from typing import Any, Dict, Optional, List
 from datetime import datetime, date, time
 from app.schemas.user import UserResponse
 from app.models.field_activity import ActivityStatus, LocationType
+from app.models.blob import BLOB_STORAGE_LOCAL
+from app.schemas.bulk import BulkItemError
+from app.services.storage import object_url
 
 
 # Minimal user info for creator/updater fields
@@ -66,11 +69,44 @@ class FieldActivityPhotoCreate(BaseModel):
     pass
 
 
+class PhotoVariant(BaseModel):
+    url: Optional[str] = None
+    width: int
+    height: int
+    size: int
+    mime_type: str
+
+
 class FieldActivityPhotoResponse(FieldActivityPhotoBase):
     id: int
     field_activity_id: int
     uploaded_by: int
     uploaded_at: datetime
+    storage: str = Field(default=BLOB_STORAGE_LOCAL, exclude=True)
+    # Rendered sizes: thumbnail, medium and their _webp versions
+    variants: Dict[str, PhotoVariant] = {}
+    # Per-size URLs; a size not rendered (yet) falls back to the original
+    url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    medium_url: Optional[str] = None
+
+    @field_validator('variants', mode='before')
+    @classmethod
+    def variant_urls(cls, value: Optional[Dict[str, Dict[str, Any]]], info: ValidationInfo):
+        storage = info.data.get("storage")
+        return {
+            name: {**variant, "url": object_url(storage, variant.get("key"))}
+            for name, variant in (value or {}).items()
+        }
+
+    @model_validator(mode='after')
+    def size_urls(self):
+        self.url = object_url(self.storage, self.file_path, self.file_name)
+        thumbnail = self.variants.get("thumbnail")
+        medium = self.variants.get("medium")
+        self.thumbnail_url = thumbnail.url if thumbnail else self.url
+        self.medium_url = medium.url if medium else self.url
+        return self
 
     class Config:
         from_attributes = True
@@ -153,6 +189,15 @@ class FieldActivityUpdate(BaseModel):
     status: Optional[ActivityStatus] = None
 
 
+class FieldActivityStatusUpdate(BaseModel):
+    """One item of a bulk status update; completing needs times and a description"""
+    id: int
+    status: ActivityStatus
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    task_description: Optional[str] = None
+
+
 class FieldActivityResponse(FieldActivityBase):
     id: int
     workspace_id: int
@@ -178,3 +223,10 @@ class FieldActivityDetailResponse(FieldActivityResponse):
 
     class Config:
         from_attributes = True
+
+
+
+class FieldActivityBulkResponse(BaseModel):
+    """Activities written by a bulk request and the items it rejected"""
+    activities: List[FieldActivityResponse] = []
+    errors: List[BulkItemError] = []
@@ -2,9 +2,11 @@
 Meeting Minutes Schemas
 Pydantic schemas for meeting minutes API
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 from datetime import date, time, datetime
+from app.models.blob import BLOB_STORAGE_CLOUDINARY
+from app.services.storage import object_url
 
 
 # Attendee schemas
@@ -62,6 +64,15 @@ class AttachmentResponse(BaseModel):
     uploaded_by: int
     uploaded_at: datetime
     uploader_name: Optional[str] = None
+    storage: str = Field(default=BLOB_STORAGE_CLOUDINARY, exclude=True)
+    url: Optional[str] = None  # download URL (may be presigned and expire)
+
+    @model_validator(mode='after')
+    def download_url(self):
+        self.url = self.cloudinary_url or object_url(
+            self.storage, self.cloudinary_public_id, self.file_name, self.resource_type
+        )
+        return self
 
     class Config:
         from_attributes = True
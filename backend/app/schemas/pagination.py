@@ -0,0 +1,16 @@
+"""
+Pagination Schemas
+Body of a list endpoint when the client asks for pages (passes limit or
+cursor): one page of items and the cursor for the next one.
+"""
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list; next_cursor is None on the last page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
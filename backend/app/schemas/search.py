@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+
+class SearchResult(BaseModel):
+    """One ranked search hit; `highlight` is a text snippet with matches wrapped in <mark>"""
+    id: int
+    workspace_id: int
+    title: str
+    date: date
+    customer_name: Optional[str] = None
+    rank: float
+    highlight: str
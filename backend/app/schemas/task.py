@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 from app.models.task import TaskStatus, TaskPriority
+from app.schemas.bulk import BulkItemError
 
 
 class TaskBase(BaseModel):
@@ -34,6 +35,11 @@ class TaskUpdate(BaseModel):
     position: Optional[int] = None
 
 
+class TaskStatusUpdate(BaseModel):
+    id: int
+    status: TaskStatus
+
+
 class TaskResponse(TaskBase):
     id: int
     project_id: int
@@ -72,3 +78,10 @@ class TaskDetailResponse(TaskResponse):
 
     class Config:
         from_attributes = True
+
+
+
+class TaskBulkResponse(BaseModel):
+    """Tasks written by a bulk request and the items it rejected"""
+    tasks: List[TaskResponse] = []
+    errors: List[BulkItemError] = []
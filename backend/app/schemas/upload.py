@@ -0,0 +1,59 @@
+"""
+Direct Upload Schemas
+Presigned uploads: the client declares a file, sends it straight to
+storage, then completes the upload to attach it. Resumable uploads: the
+client declares a file, sends it in PATCH chunks it can resume after a
+dropped connection, then completes the upload to attach it.
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from datetime import datetime
+
+
+class DirectUploadRequest(BaseModel):
+    """A file the client is about to upload"""
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., description="SHA-256 of the file, 64 lowercase hex digits")
+
+
+class PresignedUploadResponse(BaseModel):
+    """
+    Send the file with this request, then POST upload_token to the matching
+    /complete endpoint. For method POST, send fields plus the file (as
+    "file") as multipart/form-data; for PUT, the file is the body.
+    A relative url is on this API.
+    """
+    upload_token: str
+    method: str
+    url: str
+    headers: Dict[str, str] = {}
+    fields: Dict[str, str] = {}
+    expires_at: datetime
+
+
+class DirectUploadComplete(BaseModel):
+    upload_token: str
+
+
+class ResumableUploadRequest(BaseModel):
+    """A file the client is about to upload in chunks"""
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(..., gt=0)
+    sha256: Optional[str] = Field(None, description="SHA-256 of the file, checked on completion if given")
+
+
+class ResumableUploadResponse(BaseModel):
+    """
+    PATCH chunks to url (Content-Type: application/offset+octet-stream,
+    Upload-Offset: the offset the chunk starts at); after a dropped
+    connection, HEAD url for the offset to resume from. Once offset equals
+    size, POST to the matching /complete endpoint.
+    """
+    upload_id: str
+    url: str
+    offset: int
+    size: int
+    expires_at: datetime
@@ -0,0 +1,138 @@
+"""
+Access Cache
+Per-process cache of the authenticated user row and of each user's workspace
+memberships, so the auth dependency and membership checks don't cost a
+database round-trip on every request.
+
+Entries are dropped when the user or their memberships change through the
+API (see invalidate_user / invalidate_memberships), in every worker process:
+the invalidation is sent as a signal over the WebSocket backplane bound at
+startup (see bind), so a removed member or deactivated user loses access on
+all workers at once. That takes a shared backplane (WEBSOCKET_BACKPLANE_URL)
+when running several workers. Changes made directly in the database become
+visible once the entry expires, after settings.AUTH_CACHE_TTL_SECONDS.
+"""
+
+from typing import FrozenSet, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.models.user import User
+from app.models.workspace import WorkspaceMember
+from app.services.websocket_backplane import Backplane
+from app.utils.cache import TTLCache
+
+SIGNAL_INVALIDATE = "access_cache.invalidate"
+
+# Credentials never sit in the cache; reading them off a cached user raises
+# DetachedInstanceError instead of returning stale values
+_UNCACHED_USER_COLUMNS = {"hashed_password", "reset_token", "reset_token_expires"}
+_USER_COLUMNS = [column.key for column in User.__table__.columns if column.key not in _UNCACHED_USER_COLUMNS]
+
+user_cache = TTLCache("users", settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+membership_cache = TTLCache("memberships", settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# Carries invalidations to the other workers; None drops entries locally only
+_backplane: Optional[Backplane] = None
+
+
+def _drop(data: dict) -> None:
+    """Apply an invalidation signal to this process's caches"""
+    for user_id in data.get("users", ()):
+        user_cache.invalidate(user_id)
+        membership_cache.invalidate(user_id)
+    for user_id in data.get("memberships", ()):
+        membership_cache.invalidate(user_id)
+
+
+async def _invalidate(users: List[int] = (), memberships: List[int] = ()) -> None:
+    data = {"users": list(users), "memberships": list(memberships)}
+    if _backplane is None:
+        _drop(data)
+        return
+    await _backplane.signal(SIGNAL_INVALIDATE, data)
+
+
+class AccessCache:
+    """Cached user and workspace membership lookups"""
+
+    @staticmethod
+    async def get_user(db: AsyncSession, user_id: int):
+        """
+        The user with this id, or None
+
+        On a hit the user is rebuilt from cached column values as a detached
+        instance, so each request gets its own object. Column attributes read
+        as usual; relationships are not loaded and must be queried explicitly.
+        """
+        values = user_cache.get(user_id)
+        if values is None:
+            user = await db.get(User, user_id)
+            if user is None:
+                return None
+            user_cache.set(user_id, {key: getattr(user, key) for key in _USER_COLUMNS})
+            return user
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    @staticmethod
+    def workspace_ids(db: Session, user_id: int) -> FrozenSet[int]:
+        """Ids of the workspaces the user is a member of"""
+        workspace_ids = membership_cache.get(user_id)
+        if workspace_ids is None:
+            workspace_ids = frozenset(db.scalars(
+                select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
+            ))
+            membership_cache.set(user_id, workspace_ids)
+        return workspace_ids
+
+    @staticmethod
+    async def workspace_ids_async(db: AsyncSession, user_id: int) -> FrozenSet[int]:
+        """workspace_ids() for async sessions"""
+        workspace_ids = membership_cache.get(user_id)
+        if workspace_ids is None:
+            workspace_ids = frozenset(await db.scalars(
+                select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
+            ))
+            membership_cache.set(user_id, workspace_ids)
+        return workspace_ids
+
+    @staticmethod
+    def is_member(db: Session, workspace_id: int, user_id: int) -> bool:
+        return workspace_id in AccessCache.workspace_ids(db, user_id)
+
+    @staticmethod
+    async def is_member_async(db: AsyncSession, workspace_id: int, user_id: int) -> bool:
+        return workspace_id in await AccessCache.workspace_ids_async(db, user_id)
+
+    @staticmethod
+    def bind(backplane: Backplane) -> None:
+        """Send invalidations to, and receive them from, every process on this backplane"""
+        global _backplane
+        _backplane = backplane
+        backplane.on_signal(SIGNAL_INVALIDATE, _drop)
+
+    @staticmethod
+    async def invalidate_user(user_id: int) -> None:
+        """Drop a user's cached row and memberships in every process (call after committing a change)"""
+        await _invalidate(users=[user_id])
+
+    @staticmethod
+    async def invalidate_memberships(user_ids: Iterable[int]) -> None:
+        """Drop cached memberships of these users in every process (call after committing a change)"""
+        await _invalidate(memberships=list(user_ids))
+
+    @staticmethod
+    def clear() -> None:
+        user_cache.clear()
+        membership_cache.clear()
+
+    @staticmethod
+    def stats() -> dict:
+        """Hit/miss counters of both caches"""
+        return {cache.name: cache.stats() for cache in (user_cache, membership_cache)}
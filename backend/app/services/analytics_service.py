@@ -0,0 +1,326 @@
+"""
+Analytics Aggregation Service
+Set-based aggregation for dashboards: every metric comes from a small, fixed
+number of GROUP BY / FILTER queries and is assembled in memory, so the number
+of round-trips does not grow with workspaces, projects or users.
+"""
+
+from typing import Dict, List, Optional, Iterable
+from datetime import datetime, timedelta, date
+from sqlalchemy import func, select, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.models.workspace import Workspace, WorkspaceMember
+from app.models.project import Project
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.field_activity import TaskCategory, LocationType
+from app.schemas.analytics import (
+    TaskAnalytics,
+    ProjectAnalytics,
+    UserProductivity,
+    WorkspaceAnalytics,
+    ExecutiveDashboard,
+    FieldActivityAnalytics
+)
+from app.services.field_activity_stats_service import FieldActivityStatsService
+
+
+def calculate_completion_rate(completed: int, total: int) -> float:
+    """Calculate completion rate as percentage"""
+    return round((completed / total * 100) if total > 0 else 0, 2)
+
+
+class AnalyticsAggregationService:
+    """Builds analytics payloads from grouped aggregate queries"""
+
+    @staticmethod
+    def _workspace_filter(query, column, workspace_ids: Optional[Iterable[int]]):
+        """Restrict a query to the given workspaces (None means all)"""
+        if workspace_ids is None:
+            return query
+        return query.filter(column.in_(list(workspace_ids)))
+
+    @staticmethod
+    async def field_activity_analytics_by_workspace(
+        db: AsyncSession,
+        workspace_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, FieldActivityAnalytics]:
+        """
+        Compute field activity analytics for many workspaces at once
+
+        Args:
+            db: Async database session
+            workspace_ids: Workspaces to include (None for every workspace)
+
+        Returns:
+            Dict of workspace_id -> FieldActivityAnalytics. Workspaces without
+            any field activity are absent from the result.
+        """
+        scope = AnalyticsAggregationService._workspace_filter
+        now = datetime.utcnow()
+        week_start = (now - timedelta(days=now.weekday())).date()
+        month_start = now.replace(day=1).date()
+
+        # Read from the daily rollup when it exists, otherwise scan field_activities
+        source = FieldActivityStatsService.source(await FieldActivityStatsService.is_available_async(db))
+        on_site = source.location_type == LocationType.ON_SITE
+
+        # Counters and billable/non-billable hours per workspace in a single FILTER pass
+        counters = (await db.execute(scope(select(
+            source.workspace_id,
+            source.count().label('total'),
+            source.count(source.activity_date >= week_start).label('this_week'),
+            source.count(source.activity_date >= month_start).label('this_month'),
+            source.count(source.task_category_id.is_(None)).label('uncategorized'),
+            source.count(on_site).label('billable_visits'),
+            source.count(~on_site).label('office_activities'),
+            func.count(func.distinct(source.customer_id)).label('unique_customers'),
+            source.hours(on_site).label('billable_hours'),
+            source.hours(~on_site).label('non_billable_hours'),
+        ), source.workspace_id, workspace_ids).group_by(source.workspace_id))).all()
+
+        if not counters:
+            return {}
+
+        # Staff activity counts per workspace
+        staff_count = source.count()
+        staff_rows = (await db.execute(scope(select(
+            source.workspace_id,
+            User.id,
+            User.full_name,
+            User.username,
+            staff_count.label('activity_count')
+        ).join(
+            source.model, source.support_staff_id == User.id
+        ), source.workspace_id, workspace_ids).group_by(
+            source.workspace_id, User.id, User.full_name, User.username
+        ).order_by(
+            source.workspace_id, staff_count.desc(), User.id
+        ))).all()
+        top_staff: Dict[int, List[dict]] = {}
+        for ws_id, user_id, full_name, username, count in staff_rows:
+            staff = top_staff.setdefault(ws_id, [])
+            if len(staff) < 5:
+                staff.append({
+                    "user_id": user_id,
+                    "name": full_name or username,
+                    "activity_count": count
+                })
+
+        # Category distribution per workspace
+        category_rows = (await db.execute(scope(select(
+            source.workspace_id,
+            TaskCategory.title,
+            source.count().label('count')
+        ).join(
+            source.model, source.task_category_id == TaskCategory.id
+        ), source.workspace_id, workspace_ids).group_by(
+            source.workspace_id, TaskCategory.title
+        ))).all()
+        categories: Dict[int, Dict[str, int]] = {}
+        for ws_id, title, count in category_rows:
+            categories.setdefault(ws_id, {})[title] = count
+
+        # Top customers by visit count per workspace
+        visit_count = source.count()
+        customer_rows = (await db.execute(scope(select(
+            source.workspace_id,
+            source.customer_name,
+            visit_count.label('visit_count')
+        ).filter(
+            source.customer_name.isnot(None)
+        ), source.workspace_id, workspace_ids).group_by(
+            source.workspace_id, source.customer_name
+        ).order_by(
+            source.workspace_id, visit_count.desc()
+        ))).all()
+        top_customers: Dict[int, List[dict]] = {}
+        for ws_id, name, count in customer_rows:
+            customers = top_customers.setdefault(ws_id, [])
+            if len(customers) < 6:
+                customers.append({
+                    "customer_name": name,
+                    "visit_count": count
+                })
+
+        results = {}
+        for row in counters:
+            billable_hours = float(row.billable_hours or 0.0)
+            non_billable_hours = float(row.non_billable_hours or 0.0)
+            total_hours = billable_hours + non_billable_hours
+            billing_rate = (billable_hours / total_hours * 100) if total_hours > 0 else 0.0
+
+            category_distribution = dict(categories.get(row.workspace_id, {}))
+            if row.uncategorized > 0:
+                category_distribution["Uncategorized"] = row.uncategorized
+
+            results[row.workspace_id] = FieldActivityAnalytics(
+                total_activities=row.total,
+                total_hours=round(total_hours, 2),
+                activities_this_week=row.this_week,
+                activities_this_month=row.this_month,
+                top_staff=top_staff.get(row.workspace_id, []),
+                category_distribution=category_distribution,
+                top_customers=top_customers.get(row.workspace_id, []),
+                unique_customers=row.unique_customers or 0,
+                billable_hours=round(billable_hours, 2),
+                non_billable_hours=round(non_billable_hours, 2),
+                billable_visits=row.billable_visits,
+                office_activities=row.office_activities,
+                billing_rate=round(billing_rate, 1)
+            )
+
+        return results
+
+    @staticmethod
+    async def build_executive_dashboard(db: AsyncSession) -> ExecutiveDashboard:
+        """
+        Build the executive dashboard with a fixed number of queries
+
+        Args:
+            db: Async database session
+
+        Returns:
+            ExecutiveDashboard assembled from grouped aggregates
+        """
+        now = datetime.utcnow()
+        completed = Task.status == TaskStatus.COMPLETED
+
+        # Overview, priority and status distribution from one grouped pass
+        status_priority_rows = (await db.execute(select(
+            Task.status,
+            Task.priority,
+            func.count(Task.id).label('total'),
+            func.count(Task.id).filter(Task.due_date < now).label('past_due')
+        ).group_by(Task.status, Task.priority))).all()
+
+        status_dist = {status_enum.value: 0 for status_enum in TaskStatus}
+        priority_dist = {priority.value: 0 for priority in TaskPriority}
+        overdue_tasks = 0
+        for task_status, priority, total, past_due in status_priority_rows:
+            status_dist[task_status.value] += total
+            priority_dist[priority.value] += total
+            if task_status != TaskStatus.COMPLETED:
+                overdue_tasks += past_due
+
+        total_tasks = sum(status_dist.values())
+        completed_tasks = status_dist[TaskStatus.COMPLETED.value]
+        overview = TaskAnalytics(
+            total_tasks=total_tasks,
+            completed_tasks=completed_tasks,
+            in_progress_tasks=status_dist[TaskStatus.IN_PROGRESS.value],
+            overdue_tasks=overdue_tasks,
+            completion_rate=calculate_completion_rate(completed_tasks, total_tasks),
+            average_completion_time=None
+        )
+
+        # Task counts per project
+        project_rows = (await db.execute(select(
+            Project.id,
+            Project.name,
+            Project.workspace_id,
+            func.count(Task.id).label('total'),
+            func.count(Task.id).filter(completed).label('completed')
+        ).outerjoin(
+            Task, Task.project_id == Project.id
+        ).group_by(
+            Project.id, Project.name, Project.workspace_id
+        ).order_by(Project.id))).all()
+
+        projects_by_workspace: Dict[int, List[ProjectAnalytics]] = {}
+        for project_id, name, ws_id, total, done in project_rows:
+            projects_by_workspace.setdefault(ws_id, []).append(ProjectAnalytics(
+                project_id=project_id,
+                project_name=name,
+                total_tasks=total,
+                completed_tasks=done,
+                completion_rate=calculate_completion_rate(done, total)
+            ))
+
+        # Member counts per workspace
+        member_counts = dict((await db.execute(select(
+            WorkspaceMember.workspace_id,
+            func.count(WorkspaceMember.id)
+        ).group_by(WorkspaceMember.workspace_id))).all())
+
+        field_analytics = await AnalyticsAggregationService.field_activity_analytics_by_workspace(db)
+
+        workspaces = (await db.execute(
+            select(Workspace.id, Workspace.name).order_by(Workspace.id)
+        )).all()
+        workspace_analytics = []
+        for ws_id, ws_name in workspaces:
+            projects = projects_by_workspace.get(ws_id, [])
+            ws_total = sum(p.total_tasks for p in projects)
+            ws_completed = sum(p.completed_tasks for p in projects)
+
+            workspace_analytics.append(WorkspaceAnalytics(
+                workspace_id=ws_id,
+                workspace_name=ws_name,
+                total_projects=len(projects),
+                total_tasks=ws_total,
+                completed_tasks=ws_completed,
+                active_members=member_counts.get(ws_id, 0),
+                completion_rate=calculate_completion_rate(ws_completed, ws_total),
+                projects=projects,
+                field_activities=field_analytics.get(ws_id)
+            ))
+
+        # Top performers (top 5) among users with assigned tasks
+        user_rows = (await db.execute(select(
+            User.id,
+            User.full_name,
+            User.username,
+            func.count(Task.id).label('assigned'),
+            func.count(Task.id).filter(completed).label('completed')
+        ).join(
+            Task, Task.assignee_id == User.id
+        ).group_by(
+            User.id, User.full_name, User.username
+        ).order_by(User.id))).all()
+
+        user_productivity = [
+            UserProductivity(
+                user_id=user_id,
+                user_name=full_name or username,
+                tasks_assigned=assigned,
+                tasks_completed=done,
+                completion_rate=calculate_completion_rate(done, assigned),
+                average_hours_per_task=None
+            )
+            for user_id, full_name, username, assigned, done in user_rows
+        ]
+        user_productivity.sort(key=lambda x: x.completion_rate, reverse=True)
+
+        # Task completion trend (last 7 days)
+        trend_start = (now - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
+        completed_day = func.date(Task.completed_at, type_=Date)
+        trend_rows = (await db.execute(select(
+            completed_day,
+            func.count(Task.id)
+        ).filter(
+            Task.completed_at >= trend_start,
+            Task.completed_at < trend_start + timedelta(days=7)
+        ).group_by(completed_day))).all()
+        completed_per_day = {
+            (day if isinstance(day, date) else date.fromisoformat(str(day))): count
+            for day, count in trend_rows
+        }
+
+        completion_trend = []
+        for i in range(7):
+            day = (trend_start + timedelta(days=i)).date()
+            completion_trend.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "completed": completed_per_day.get(day, 0)
+            })
+
+        return ExecutiveDashboard(
+            overview=overview,
+            workspaces=workspace_analytics,
+            top_performers=user_productivity[:5],
+            task_completion_trend=completion_trend,
+            priority_distribution=priority_dist,
+            status_distribution=status_dist
+        )
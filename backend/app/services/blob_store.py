@@ -0,0 +1,454 @@
+"""
+Blob Store
+Content-addressed storage for uploaded files.
+
+An upload is validated and hashed (SHA-256) before anything is written. If
+a blob with that hash already exists in the target storage, the new
+attachment simply references it: nothing is written or uploaded again.
+Otherwise the file is stored once, under a key derived from its hash, by
+the storage driver (local disk, S3 or Cloudinary; see app.services.storage).
+
+Clients can also upload straight to storage: presign() hands out a
+presigned request and an upload token, the client sends the file to
+storage, and complete() checks what arrived (size, sniffed type, hash) and
+records the blob. Objects presigned but never completed are removed by a
+storage.orphan outbox message once their token has expired.
+
+Attachment, FieldActivityPhoto and MinuteAttachment rows reference blobs
+through blob_id. Deleting such a row, directly or by cascade, decrements the
+blob's ref_count in the same flush; when it reaches zero a blob.release
+outbox message removes the row and then the stored object, after the
+delete has committed. An object stored for a transaction that rolls back is
+removed again.
+
+store(), store_file() and complete() take a Session or an AsyncSession
+(their queries then run through database.run_sync).
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Collection, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import run_sync
+from app.models.blob import BLOB_STORAGE_CLOUDINARY, BLOB_STORAGE_LOCAL, Blob
+from app.models.comment import Attachment
+from app.models.field_activity import FieldActivityPhoto
+from app.models.meeting_minute import MinuteAttachment
+from app.services.outbox import Outbox
+from app.services.outbox_handlers import TOPIC_BLOB_RELEASE, TOPIC_STORAGE_DELETE, TOPIC_STORAGE_ORPHAN
+from app.services.photo_variants import variant_paths
+from app.services.storage import (
+    PresignedUpload,
+    get_storage,
+    resource_type_for,
+    sign_token,
+    verify_token
+)
+from app.utils.uploads import SNIFF_BYTES, inspect_file, sniff_mime_type, stream_upload, too_large
+
+logger = logging.getLogger(__name__)
+
+# Models whose rows hold a blob reference
+BLOB_REFERENCES = (Attachment, FieldActivityPhoto, MinuteAttachment)
+
+NEW_OBJECTS_KEY = "blob_store_new_objects"
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# A direct upload can be completed this long after its URL expires
+COMPLETE_GRACE_SECONDS = 3600
+
+
+class BlobStore:
+    """Storing, sharing and releasing blobs"""
+
+    @staticmethod
+    def acquire(db: Session, storage: str, sha256: str) -> Optional[Blob]:
+        """Add a reference to the stored blob with this content, if there is one"""
+        blob = db.query(Blob).filter(Blob.storage == storage, Blob.sha256 == sha256).first()
+        if blob is None:
+            return None
+        # Fails (0 rows) only if the blob was collected since the SELECT
+        taken = db.query(Blob).filter(Blob.id == blob.id).update(
+            {Blob.ref_count: Blob.ref_count + 1}, synchronize_session=False
+        )
+        if not taken:
+            return None
+        db.expire(blob, ["ref_count"])
+        return blob
+
+    @staticmethod
+    async def store(
+        db: Union[Session, AsyncSession],
+        file: UploadFile,
+        allowed_types: Collection[str],
+        storage: str,
+        folder: Optional[str] = None,
+        max_size: Optional[int] = None,
+        type_hint: str = ""
+    ) -> Blob:
+        """
+        Validate an upload and return the blob holding its content in
+        storage, with a reference added for the caller's new row (flushed,
+        not committed)
+
+        Raises:
+            HTTPException: 413 / 400 from stream_upload
+            Exception: Whatever the storage raised
+        """
+        upload = await stream_upload(file, allowed_types, max_size=max_size, type_hint=type_hint)
+        blob = await run_sync(db, BlobStore.acquire, storage, upload.sha256)
+        if blob is not None:
+            return blob
+
+        driver = get_storage(storage)
+        key = driver.new_key(upload.sha256, file.filename, upload.mime_type, folder)
+        # (s3transfer closes the file once it has been sent)
+        stored = await driver.call(driver.put, file.file, key, upload.mime_type)
+        blob = Blob(
+            sha256=upload.sha256,
+            storage=storage,
+            location=stored.key,
+            url=stored.url,
+            resource_type=stored.resource_type,
+            size=upload.size,
+            mime_type=upload.mime_type,
+            ref_count=1
+        )
+        return await run_sync(db, BlobStore._record, blob, stored_here=True)
+
+    @staticmethod
+    async def store_file(
+        db: Union[Session, AsyncSession],
+        path: str,
+        filename: str,
+        declared_type: str,
+        allowed_types: Collection[str],
+        storage: str,
+        folder: Optional[str] = None,
+        max_size: Optional[int] = None,
+        type_hint: str = "",
+        sha256: Optional[str] = None
+    ) -> Blob:
+        """
+        store() for a file already on disk, e.g. a finished resumable upload
+        (left in place; the caller removes it)
+
+        Args:
+            sha256: The hash the client declared, if any
+
+        Raises:
+            HTTPException: 413 / 400 from inspect_file, 400 if the file does
+                not match sha256
+            Exception: Whatever the storage raised
+        """
+        upload = await inspect_file(path, allowed_types, declared_type, max_size=max_size, type_hint=type_hint)
+        if sha256 is not None and upload.sha256 != sha256:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file does not match its sha256"
+            )
+        blob = await run_sync(db, BlobStore.acquire, storage, upload.sha256)
+        if blob is not None:
+            return blob
+
+        driver = get_storage(storage)
+        key = driver.new_key(upload.sha256, filename, upload.mime_type, folder)
+        stored = await driver.call(driver.put_file, path, key, upload.mime_type)
+        blob = Blob(
+            sha256=upload.sha256,
+            storage=storage,
+            location=stored.key,
+            url=stored.url,
+            resource_type=stored.resource_type,
+            size=upload.size,
+            mime_type=upload.mime_type,
+            ref_count=1
+        )
+        return await run_sync(db, BlobStore._record, blob, stored_here=True)
+
+    @staticmethod
+    def check_declared(
+        size: int,
+        content_type: str,
+        sha256: Optional[str],
+        allowed_types: Collection[str],
+        max_size: Optional[int] = None
+    ):
+        """
+        Check what a client says it will upload (the bytes are checked again
+        once they have arrived)
+
+        Raises:
+            HTTPException: 413 past max_size, 400 for a type not allowed or
+                a malformed hash
+        """
+        max_size = max_size or settings.MAX_UPLOAD_SIZE
+        if size > max_size:
+            raise too_large(max_size)
+        if content_type not in allowed_types:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File type {content_type} not allowed"
+            )
+        if sha256 is not None and not SHA256_PATTERN.match(sha256):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="sha256 must be the file's SHA-256 as 64 lowercase hex digits"
+            )
+
+    @staticmethod
+    def presign(
+        db: Session,
+        storage: str,
+        scope: str,
+        user_id: int,
+        filename: str,
+        content_type: str,
+        size: int,
+        sha256: str,
+        allowed_types: Collection[str],
+        folder: Optional[str] = None,
+        max_size: Optional[int] = None
+    ) -> Tuple[str, PresignedUpload]:
+        """
+        Let a client upload a file straight to storage
+
+        Checks the declared size and type (complete() checks the stored
+        bytes again) and schedules removal of the object in case the upload
+        is never completed; the caller commits.
+
+        Args:
+            scope: What the upload will be attached to, e.g. "photo:12";
+                complete() must be called with the same scope
+
+        Returns:
+            (upload_token for complete(), the request to send the file with)
+
+        Raises:
+            HTTPException: 413 past max_size, 400 for a type not allowed or
+                a malformed hash
+        """
+        BlobStore.check_declared(size, content_type, sha256, allowed_types, max_size)
+
+        driver = get_storage(storage)
+        key = driver.new_key(sha256, filename, content_type, folder)
+        upload = driver.presign_put(key, content_type, size, sha256)
+        resource_type = resource_type_for(content_type) if storage == BLOB_STORAGE_CLOUDINARY else None
+
+        expires_in = settings.STORAGE_PRESIGN_EXPIRES_SECONDS + COMPLETE_GRACE_SECONDS
+        token = sign_token({
+            "typ": "direct_upload",
+            "scope": scope,
+            "uid": user_id,
+            "storage": storage,
+            "key": key,
+            "resource_type": resource_type,
+            "filename": filename,
+            "content_type": content_type,
+            "size": size,
+            "sha256": sha256
+        }, expires_in)
+        Outbox.enqueue(db, TOPIC_STORAGE_ORPHAN, {
+            "storage": storage,
+            "key": key,
+            "resource_type": resource_type
+        }, delay_seconds=expires_in + 60)
+        return token, upload
+
+    @staticmethod
+    async def complete(
+        db: Union[Session, AsyncSession],
+        upload_token: str,
+        scope: str,
+        user_id: int,
+        allowed_types: Collection[str]
+    ) -> Tuple[Blob, Dict[str, Any]]:
+        """
+        Record a direct upload once the client has sent it
+
+        Returns:
+            (the blob, with a reference added for the caller's new row;
+            the token's claims: filename, content_type, ...)
+
+        Raises:
+            HTTPException: 403 for an invalid or expired token or another
+                scope, 409 if it was completed already, 400 if the object
+                is missing or is not the declared file (it is then removed)
+        """
+        claims = verify_token(upload_token, "direct_upload")
+        if claims is None or claims["scope"] != scope or claims["uid"] != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or expired upload token"
+            )
+
+        storage, key, resource_type = claims["storage"], claims["key"], claims["resource_type"]
+        if not await run_sync(db, BlobStore.is_orphan, storage, key):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload already completed"
+            )
+
+        driver = get_storage(storage)
+
+        def remove_object(session: Session):
+            Outbox.enqueue(session, TOPIC_STORAGE_DELETE, {
+                "storage": storage,
+                "keys": [key],
+                "resource_type": resource_type
+            })
+            session.commit()
+
+        async def reject(detail: str):
+            await run_sync(db, remove_object)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+        stat = await driver.call(driver.stat, key, resource_type)
+        if stat is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File has not been uploaded"
+            )
+        if stat.size != claims["size"]:
+            await reject(f"Uploaded {stat.size} bytes, {claims['size']} declared")
+
+        head = await driver.call(driver.read_head, key, SNIFF_BYTES, resource_type)
+        mime_type = sniff_mime_type(head, claims["content_type"])
+        if mime_type not in allowed_types:
+            await reject(f"File type {mime_type} not allowed")
+
+        sha256 = None
+        if driver.verifies_content:
+            sha256 = await driver.call(driver.sha256, key, resource_type)
+            if sha256 != claims["sha256"]:
+                await reject("Uploaded file does not match its sha256")
+            blob = await run_sync(db, BlobStore.acquire, storage, sha256)
+            if blob is not None:
+                # Already stored: keep that copy, drop this one
+                Outbox.enqueue(db, TOPIC_STORAGE_DELETE, {"storage": storage, "keys": [key]})
+                return blob, claims
+
+        blob = Blob(
+            sha256=sha256,  # None: unverified content is never shared
+            storage=storage,
+            location=key,
+            url=driver.url(key, resource_type=resource_type) if storage == BLOB_STORAGE_CLOUDINARY else None,
+            resource_type=resource_type,
+            size=stat.size,
+            mime_type=mime_type,
+            ref_count=1
+        )
+        return await run_sync(db, BlobStore._record, blob, stored_here=False), claims
+
+    @staticmethod
+    def _record(db: Session, blob: Blob, stored_here: bool) -> Blob:
+        """
+        Insert a new blob, or reference the one a concurrent upload of the
+        same content inserted first (this blob's object is then removed)
+        """
+        try:
+            with db.begin_nested():
+                db.add(blob)
+        except IntegrityError:
+            Outbox.enqueue(db, TOPIC_STORAGE_DELETE, {
+                "storage": blob.storage,
+                "keys": [blob.location],
+                "resource_type": blob.resource_type
+            })
+            existing = BlobStore.acquire(db, blob.storage, blob.sha256)
+            if existing is None:
+                raise
+            return existing
+        if stored_here:
+            db.info.setdefault(NEW_OBJECTS_KEY, []).append((blob.storage, blob.location, blob.resource_type))
+        return blob
+
+    @staticmethod
+    def release(session: Session, blob_id: int):
+        """
+        Drop one reference (during a flush); at zero, schedule the blob's
+        removal for after the commit
+        """
+        # Core statements on the flush's connection: ORM queries would autoflush
+        connection = session.connection()
+        connection.execute(
+            update(Blob.__table__).where(Blob.__table__.c.id == blob_id).values(
+                ref_count=Blob.__table__.c.ref_count - 1
+            )
+        )
+        remaining = connection.execute(
+            select(Blob.__table__.c.ref_count).where(Blob.__table__.c.id == blob_id)
+        ).scalar()
+        if remaining is not None and remaining <= 0:
+            Outbox.enqueue(session, TOPIC_BLOB_RELEASE, {"blob_id": blob_id})
+
+    @staticmethod
+    def collect(db: Session, blob_id: int):
+        """
+        Remove a blob nothing references any more: its row now, its stored
+        object through the outbox once that commits
+        """
+        blob = db.get(Blob, blob_id)
+        if blob is None or blob.ref_count > 0:
+            return  # Already gone, or referenced again since
+        deleted = db.query(Blob).filter(Blob.id == blob_id, Blob.ref_count <= 0).delete(synchronize_session=False)
+        if not deleted:
+            return
+
+        keys = [blob.location]
+        if blob.storage != BLOB_STORAGE_CLOUDINARY:
+            keys += variant_paths(blob.location)  # photo variants, if any
+        Outbox.enqueue(db, TOPIC_STORAGE_DELETE, {
+            "storage": blob.storage,
+            "keys": keys,
+            "resource_type": blob.resource_type
+        })
+        logger.info(f"Released blob {blob_id} ({blob.storage}: {blob.location})")
+
+    @staticmethod
+    def is_orphan(db: Session, storage: str, key: str) -> bool:
+        """No blob records this object"""
+        return db.query(Blob.id).filter(Blob.storage == storage, Blob.location == key).first() is None
+
+
+def _delete_objects(objects: List[Tuple[str, str, Optional[str]]]):
+    for storage, key, resource_type in objects:
+        try:
+            get_storage(storage).delete(key, resource_type)
+        except Exception as e:
+            logger.warning(f"Could not remove {storage} object {key} after a rollback: {e}")
+
+
+@event.listens_for(Session, "before_flush")
+def _release_deleted_references(session: Session, flush_context, instances):
+    for obj in session.deleted:
+        if isinstance(obj, BLOB_REFERENCES) and obj.blob_id is not None:
+            BlobStore.release(session, obj.blob_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_committed_objects(session: Session):
+    # Also fired when a savepoint is released: the transaction goes on
+    if not session.in_nested_transaction():
+        session.info.pop(NEW_OBJECTS_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _remove_uncommitted_objects(session: Session, transaction):
+    if transaction.parent is None:
+        objects = session.info.pop(NEW_OBJECTS_KEY, [])
+        local = [o for o in objects if o[0] == BLOB_STORAGE_LOCAL]
+        remote = [o for o in objects if o[0] != BLOB_STORAGE_LOCAL]
+        _delete_objects(local)
+        if remote:
+            # HTTP calls: off the caller's thread
+            threading.Thread(target=_delete_objects, args=(remote,), daemon=True).start()
@@ -3,6 +3,7 @@ Field Activity Service
 Business logic for field activity operations, including report generation and distribution
 """
 
+import asyncio
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
@@ -10,7 +11,7 @@ from fastapi import HTTPException, status
 from app.models.field_activity import FieldActivity
 from app.models.workspace import WorkspaceMember
 from app.models.user import User, UserRole
-from app.utils.email import send_activity_report_email
+from app.services.report_pipeline import ReportEmail, ReportRenderer, ResendMailer
 
 
 class FieldActivityReportService:
@@ -67,6 +68,99 @@ class FieldActivityReportService:
             'unique_staff': unique_staff
         }
 
+    @staticmethod
+    def load_report_activities(
+        db: Session,
+        workspace_id: int,
+        date_from: str = None,
+        date_to: str = None,
+        support_staff_id: int = None
+    ) -> List[FieldActivity]:
+        """Activities of a workspace report, in report order"""
+        query = db.query(FieldActivity).filter(
+            FieldActivity.workspace_id == workspace_id
+        )
+
+        if date_from:
+            query = query.filter(FieldActivity.activity_date >= date_from)
+        if date_to:
+            query = query.filter(FieldActivity.activity_date <= date_to)
+        if support_staff_id:
+            query = query.filter(FieldActivity.support_staff_id == support_staff_id)
+
+        return query.order_by(
+            FieldActivity.activity_date,
+            FieldActivity.start_time
+        ).all()
+
+    @staticmethod
+    def build_full_report_email(
+        workspace_id: int,
+        activities: List[FieldActivity],
+        recipient_emails: List[str],
+        renderer: ReportRenderer
+    ) -> ReportEmail:
+        """One email carrying the full report to all recipients"""
+        activities_by_staff = FieldActivityReportService._group_activities_by_staff(activities)
+        summary = FieldActivityReportService._calculate_summary(activities, activities_by_staff)
+
+        return ReportEmail(
+            to=list(recipient_emails),
+            subject=f"Weekly Activity Report - {renderer.date_from} to {renderer.date_to}",
+            html=renderer.render(("full", workspace_id), list(activities_by_staff.values()), summary),
+            recipient=", ".join(recipient_emails)
+        )
+
+    @staticmethod
+    def build_individual_emails(
+        workspace_id: int,
+        activities: List[FieldActivity],
+        members: List[User],
+        renderer: ReportRenderer
+    ) -> List[ReportEmail]:
+        """
+        Personalized report emails for workspace members
+        - Team members get only their activities (skipped if they have none)
+        - Managers/Executives get the full report, rendered once for all of them
+        """
+        date_from, date_to = renderer.date_from, renderer.date_to
+
+        # Group activities by staff for easy lookup
+        activities_by_staff_id = FieldActivityReportService._group_activities_by_staff(activities)
+        all_activities_list = list(activities_by_staff_id.values())
+
+        # Calculate full summary for managers/executives
+        full_summary = FieldActivityReportService._calculate_summary(activities, activities_by_staff_id)
+
+        emails = []
+        for user in members:
+            if not user.email:
+                continue  # Skip users without email
+
+            if user.role in [UserRole.MANAGER, UserRole.EXECUTIVE]:
+                # Full report for managers/executives
+                subject = f"Weekly Activity Report - All Staff ({date_from} to {date_to})"
+                html = renderer.render(("full", workspace_id), all_activities_list, full_summary)
+            else:
+                # Only their activities for team members
+                user_activities = activities_by_staff_id.get(user.id)
+
+                if not user_activities:
+                    # No activities for this user, skip
+                    continue
+
+                subject = f"Your Weekly Activity Report ({date_from} to {date_to})"
+                html = renderer.render(("staff", workspace_id, user.id), [user_activities], {
+                    'total_activities': len(user_activities['activities']),
+                    'total_hours': user_activities['total_hours'],
+                    'unique_customers': len(set(a['customer_name'] for a in user_activities['activities'])),
+                    'unique_staff': 1
+                })
+
+            emails.append(ReportEmail(to=[user.email], subject=subject, html=html, recipient=user.email))
+
+        return emails
+
     @staticmethod
     async def send_bulk_report(
         activities: List[FieldActivity],
@@ -97,39 +191,24 @@ class FieldActivityReportService:
         Raises:
             HTTPException: If email sending fails
         """
-        # Group activities by staff
-        activities_by_staff = FieldActivityReportService._group_activities_by_staff(activities)
-        activities_list = list(activities_by_staff.values())
-
-        # Calculate summary
-        summary = FieldActivityReportService._calculate_summary(activities, activities_by_staff)
-
-        # Generate subject
-        subject = f"Weekly Activity Report - {date_from} to {date_to}"
-
-        # Send email
-        result = send_activity_report_email(
-            to_emails=recipient_emails,
-            subject=subject,
-            activities_by_staff=activities_list,
-            date_from=date_from,
-            date_to=date_to,
-            summary=summary,
-            resend_api_key=resend_api_key,
-            from_email=from_email,
-            from_name=from_name,
-            frontend_url=frontend_url
+        renderer = ReportRenderer(date_from, date_to, frontend_url)
+        email = await asyncio.to_thread(
+            FieldActivityReportService.build_full_report_email,
+            activities[0].workspace_id if activities else 0, activities, recipient_emails, renderer
         )
 
-        if not result['success']:
+        mailer = ResendMailer(api_key=resend_api_key, from_email=from_email, from_name=from_name)
+        result = await mailer.send([email])
+
+        if not result['sent_count']:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=result.get('error', 'Failed to send email')
+                detail=result['errors'][0] if result['errors'] else 'Failed to send email'
             )
 
         return {
-            'message': result['message'],
-            'email_id': result.get('email_id')
+            'message': f"Report sent successfully to {len(recipient_emails)} recipient(s)",
+            'email_id': result['email_ids'][0] if result['email_ids'] else None
         }
 
     @staticmethod
@@ -166,88 +245,33 @@ class FieldActivityReportService:
         Raises:
             HTTPException: If no members found in workspace
         """
-        # Get all workspace members with their user info
-        members = db.query(WorkspaceMember, User).join(
-            User, WorkspaceMember.user_id == User.id
-        ).filter(
-            WorkspaceMember.workspace_id == workspace_id
-        ).all()
-
-        if not members:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No members found in workspace"
-            )
-
-        # Group activities by staff for easy lookup
-        activities_by_staff_id = FieldActivityReportService._group_activities_by_staff(activities)
-        all_activities_list = list(activities_by_staff_id.values())
-
-        # Calculate full summary for managers/executives
-        full_summary = FieldActivityReportService._calculate_summary(activities, activities_by_staff_id)
-
-        sent_count = 0
-        failed_count = 0
-        errors = []
-
-        # Send reports to each member
-        for member, user in members:
-            if not user.email:
-                continue  # Skip users without email
-
-            try:
-                # Check user role
-                is_manager_or_exec = user.role in [UserRole.MANAGER, UserRole.EXECUTIVE]
-
-                if is_manager_or_exec:
-                    # Send full report to managers/executives
-                    subject = f"Weekly Activity Report - All Staff ({date_from} to {date_to})"
-                    activities_to_send = all_activities_list
-                    summary_to_send = full_summary
-                else:
-                    # Send only their activities to team members
-                    user_activities = activities_by_staff_id.get(user.id)
-
-                    if not user_activities:
-                        # No activities for this user, skip
-                        continue
-
-                    subject = f"Your Weekly Activity Report ({date_from} to {date_to})"
-                    activities_to_send = [user_activities]
-                    summary_to_send = {
-                        'total_activities': len(user_activities['activities']),
-                        'total_hours': user_activities['total_hours'],
-                        'unique_customers': len(set(a['customer_name'] for a in user_activities['activities'])),
-                        'unique_staff': 1
-                    }
-
-                # Send email
-                result = send_activity_report_email(
-                    to_emails=[user.email],
-                    subject=subject,
-                    activities_by_staff=activities_to_send,
-                    date_from=date_from,
-                    date_to=date_to,
-                    summary=summary_to_send,
-                    resend_api_key=resend_api_key,
-                    from_email=from_email,
-                    from_name=from_name,
-                    frontend_url=frontend_url
+        def prepare() -> List[ReportEmail]:
+            # Get all workspace members with their user info
+            members = db.query(User).join(
+                WorkspaceMember, WorkspaceMember.user_id == User.id
+            ).filter(
+                WorkspaceMember.workspace_id == workspace_id
+            ).all()
+
+            if not members:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="No members found in workspace"
                 )
 
-                if result['success']:
-                    sent_count += 1
-                else:
-                    failed_count += 1
-                    errors.append(f"{user.email}: {result.get('error', 'Unknown error')}")
+            renderer = ReportRenderer(date_from, date_to, frontend_url)
+            return FieldActivityReportService.build_individual_emails(workspace_id, activities, members, renderer)
+
+        # The query and the rendering are blocking; keep them off the event loop
+        emails = await asyncio.to_thread(prepare)
 
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"{user.email}: {str(e)}")
+        # Concurrent batch sends instead of one blocking call per member
+        mailer = ResendMailer(api_key=resend_api_key, from_email=from_email, from_name=from_name)
+        result = await mailer.send(emails)
 
         return {
-            'message': f'Individual reports sent to {sent_count} member(s)',
-            'sent_count': sent_count,
-            'failed_count': failed_count,
-            'errors': errors if errors else None
+            'message': f"Individual reports sent to {result['sent_count']} member(s)",
+            'sent_count': result['sent_count'],
+            'failed_count': result['failed_count'],
+            'errors': result['errors'] if result['errors'] else None
         }
@@ -0,0 +1,314 @@
+"""
+Field Activity Stats Service
+Maintains the field_activity_daily_stats rollup and exposes a common set of
+aggregate accessors so analytics can read from either the rollup or the raw
+field_activities table with the same query code.
+"""
+
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, inspect, select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.field_activity import FieldActivity, FieldActivityDailyStat, LocationType
+
+# Cached once the rollup table has been seen; a missing table is re-checked
+# on every call so a fresh migration is picked up without a restart.
+_rollup_present = False
+
+
+class ActivityAggregateSource:
+    """
+    Column and aggregate accessors shared by field_activities and its rollup.
+
+    Analytics queries are written against this object instead of a model so
+    the same GROUP BY / FILTER query runs on either table: count() is
+    COUNT(id) on the raw table and SUM(activity_count) on the rollup, hours()
+    is SUM(duration_hours) vs SUM(total_hours).
+    """
+
+    def __init__(self, use_rollup: bool):
+        model = FieldActivityDailyStat if use_rollup else FieldActivity
+        self.use_rollup = use_rollup
+        self.model = model
+        self.workspace_id = model.workspace_id
+        self.activity_date = model.activity_date
+        self.support_staff_id = model.support_staff_id
+        self.task_category_id = model.task_category_id
+        self.customer_id = model.customer_id
+        self.customer_name = model.customer_name
+        self.location_type = model.location_type
+
+    def count(self, condition=None):
+        """Number of activities, optionally restricted by a FILTER condition"""
+        if not self.use_rollup:
+            expr = func.count(FieldActivity.id)
+            return expr.filter(condition) if condition is not None else expr
+        expr = func.sum(FieldActivityDailyStat.activity_count)
+        if condition is not None:
+            expr = expr.filter(condition)
+        return func.coalesce(expr, 0)
+
+    def hours(self, condition=None):
+        """Summed activity hours, optionally restricted by a FILTER condition"""
+        if self.use_rollup:
+            expr = func.sum(FieldActivityDailyStat.total_hours)
+        else:
+            expr = func.sum(FieldActivity.duration_hours)
+        return expr.filter(condition) if condition is not None else expr
+
+
+class FieldActivityStatsService:
+    """Incremental maintenance and rebuild of field_activity_daily_stats"""
+
+    @staticmethod
+    def bucket_key(
+        workspace_id: int,
+        activity_date: date,
+        support_staff_id: int,
+        task_category_id: Optional[int],
+        customer_id: Optional[str],
+        customer_name: str,
+        location_type
+    ) -> str:
+        """Stable digest of a rollup bucket (NULLs included) used as the upsert key"""
+        parts = [
+            workspace_id,
+            activity_date.isoformat(),
+            support_staff_id,
+            task_category_id,
+            customer_id,
+            customer_name,
+            LocationType(location_type).value
+        ]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def snapshot(activity: FieldActivity) -> dict:
+        """
+        Capture the rollup bucket and hours an activity currently contributes
+
+        Take this before mutating an activity so the old contribution can be
+        subtracted afterwards.
+        """
+        return {
+            "workspace_id": activity.workspace_id,
+            "activity_date": activity.activity_date,
+            "support_staff_id": activity.support_staff_id,
+            "task_category_id": activity.task_category_id,
+            "customer_id": activity.customer_id,
+            "customer_name": activity.customer_name,
+            "location_type": LocationType(activity.location_type),
+            "hours": Decimal(str(activity.duration_hours))
+        }
+
+    @staticmethod
+    def _upsert(db: Session):
+        """Dialect-specific INSERT that supports ON CONFLICT DO UPDATE"""
+        if db.get_bind().dialect.name == "sqlite":
+            return sqlite.insert(FieldActivityDailyStat)
+        return postgresql.insert(FieldActivityDailyStat)
+
+    @staticmethod
+    def _apply(db: Session, bucket: dict, count_delta: int, hours_delta: Decimal) -> None:
+        """Atomically add deltas to a bucket, creating it if needed and dropping it when empty"""
+        key_values = {k: v for k, v in bucket.items() if k != "hours"}
+        bucket_key = FieldActivityStatsService.bucket_key(**key_values)
+
+        stmt = FieldActivityStatsService._upsert(db).values(
+            bucket_key=bucket_key,
+            activity_count=count_delta,
+            total_hours=hours_delta,
+            updated_at=datetime.utcnow(),
+            **key_values
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FieldActivityDailyStat.bucket_key],
+            set_={
+                "activity_count": FieldActivityDailyStat.activity_count + stmt.excluded.activity_count,
+                "total_hours": FieldActivityDailyStat.total_hours + stmt.excluded.total_hours,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        db.execute(stmt)
+
+        if count_delta < 0:
+            db.execute(delete(FieldActivityDailyStat).where(
+                FieldActivityDailyStat.bucket_key == bucket_key,
+                FieldActivityDailyStat.activity_count <= 0
+            ))
+
+    @staticmethod
+    def record_created(db: Session, activity: FieldActivity) -> None:
+        """Add a newly flushed activity to the rollup (same transaction as the insert)"""
+        if not FieldActivityStatsService.is_available(db):
+            return
+        bucket = FieldActivityStatsService.snapshot(activity)
+        FieldActivityStatsService._apply(db, bucket, 1, bucket["hours"])
+
+    @staticmethod
+    def record_updated(db: Session, before: dict, activity: FieldActivity) -> None:
+        """Move an updated activity's contribution from its old bucket to its new one"""
+        if not FieldActivityStatsService.is_available(db):
+            return
+        after = FieldActivityStatsService.snapshot(activity)
+        if after == before:
+            return
+
+        same_bucket = all(before[k] == after[k] for k in before if k != "hours")
+        if same_bucket:
+            FieldActivityStatsService._apply(db, after, 0, after["hours"] - before["hours"])
+            return
+
+        FieldActivityStatsService._apply(db, before, -1, -before["hours"])
+        FieldActivityStatsService._apply(db, after, 1, after["hours"])
+
+    @staticmethod
+    def record_batch(
+        db: Session,
+        created: Iterable[FieldActivity] = (),
+        updated: Iterable[Tuple[dict, FieldActivity]] = ()
+    ) -> None:
+        """
+        record_created/record_updated for a batch of activities (bulk endpoints)
+
+        Deltas are summed per bucket first, so a day of visits to one
+        customer is a single upsert instead of one per activity. Buckets are
+        written in key order, keeping concurrent batches from deadlocking.
+
+        Args:
+            db: Database session (same transaction as the inserts/updates)
+            created: Newly flushed activities
+            updated: (snapshot taken before the change, activity) pairs
+        """
+        if not FieldActivityStatsService.is_available(db):
+            return
+
+        deltas = {}
+
+        def add(bucket: dict, count_delta: int, hours_delta: Decimal):
+            key_values = {k: v for k, v in bucket.items() if k != "hours"}
+            entry = deltas.setdefault(
+                FieldActivityStatsService.bucket_key(**key_values), [bucket, 0, Decimal("0")]
+            )
+            entry[1] += count_delta
+            entry[2] += hours_delta
+
+        for activity in created:
+            bucket = FieldActivityStatsService.snapshot(activity)
+            add(bucket, 1, bucket["hours"])
+        for before, activity in updated:
+            after = FieldActivityStatsService.snapshot(activity)
+            if after != before:
+                add(before, -1, -before["hours"])
+                add(after, 1, after["hours"])
+
+        for _, (bucket, count_delta, hours_delta) in sorted(deltas.items()):
+            if count_delta or hours_delta:
+                FieldActivityStatsService._apply(db, bucket, count_delta, hours_delta)
+
+    @staticmethod
+    def record_deleted(db: Session, activity: FieldActivity) -> None:
+        """Remove an activity's contribution from the rollup"""
+        if not FieldActivityStatsService.is_available(db):
+            return
+        bucket = FieldActivityStatsService.snapshot(activity)
+        FieldActivityStatsService._apply(db, bucket, -1, -bucket["hours"])
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """Whether the rollup table exists (sync sessions)"""
+        global _rollup_present
+        if not _rollup_present:
+            _rollup_present = inspect(db.connection()).has_table(FieldActivityDailyStat.__tablename__)
+        return _rollup_present
+
+    @staticmethod
+    async def is_available_async(db: AsyncSession) -> bool:
+        """Whether the rollup table exists (async sessions)"""
+        global _rollup_present
+        if not _rollup_present:
+            _rollup_present = await db.run_sync(
+                lambda session: inspect(session.connection()).has_table(FieldActivityDailyStat.__tablename__)
+            )
+        return _rollup_present
+
+    @staticmethod
+    def source(use_rollup: bool) -> ActivityAggregateSource:
+        """Aggregate accessors for the rollup (True) or the raw table (False)"""
+        return ActivityAggregateSource(use_rollup)
+
+    @staticmethod
+    def rebuild(db: Session, workspace_id: Optional[int] = None, batch_size: int = 1000) -> int:
+        """
+        Recompute the rollup from field_activities
+
+        Aggregation happens in the database; only the grouped buckets are
+        streamed back and inserted in batches. The caller commits.
+
+        Args:
+            db: Database session
+            workspace_id: Only rebuild this workspace (None for all)
+            batch_size: Rows fetched/inserted per round-trip
+
+        Returns:
+            Number of buckets written
+        """
+        clear = delete(FieldActivityDailyStat)
+        if workspace_id is not None:
+            clear = clear.where(FieldActivityDailyStat.workspace_id == workspace_id)
+        db.execute(clear)
+
+        group_columns = (
+            FieldActivity.workspace_id,
+            FieldActivity.activity_date,
+            FieldActivity.support_staff_id,
+            FieldActivity.task_category_id,
+            FieldActivity.customer_id,
+            FieldActivity.customer_name,
+            FieldActivity.location_type
+        )
+        query = select(
+            *group_columns,
+            func.count(FieldActivity.id).label("activity_count"),
+            func.sum(FieldActivity.duration_hours).label("total_hours")
+        ).group_by(*group_columns)
+        if workspace_id is not None:
+            query = query.filter(FieldActivity.workspace_id == workspace_id)
+
+        now = datetime.utcnow()
+        written = 0
+        batch = []
+        for row in db.execute(query.execution_options(yield_per=batch_size)):
+            key_values = {
+                "workspace_id": row.workspace_id,
+                "activity_date": row.activity_date,
+                "support_staff_id": row.support_staff_id,
+                "task_category_id": row.task_category_id,
+                "customer_id": row.customer_id,
+                "customer_name": row.customer_name,
+                "location_type": LocationType(row.location_type)
+            }
+            batch.append({
+                "bucket_key": FieldActivityStatsService.bucket_key(**key_values),
+                "activity_count": row.activity_count,
+                "total_hours": Decimal(str(round(float(row.total_hours or 0.0), 2))),
+                "updated_at": now,
+                **key_values
+            })
+            if len(batch) >= batch_size:
+                db.execute(insert(FieldActivityDailyStat), batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            db.execute(insert(FieldActivityDailyStat), batch)
+            written += len(batch)
+
+        return written
@@ -0,0 +1,138 @@
+"""
+Job Run Ledger
+Records every run of a scheduled job: who ran it, when, for which period,
+how long it took and what it did.
+
+Starting a scheduled run inserts its (job_id, period) row first. The unique
+constraint makes the insert fail if any process already started that period,
+so a job runs at most once per period even if two processes both believe
+they lead, or a restarted leader fires a missed trigger again.
+
+The ledger writes through short-lived sessions of its own: a run is
+recorded (and closed) whatever state the job's session is in, and the
+job's session is never committed or rolled back by the ledger.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.scheduler import (
+    JOB_FAILED, JOB_RUNNING, JOB_SUCCEEDED, JOB_TRIGGER_SCHEDULE, JobRun
+)
+
+logger = logging.getLogger(__name__)
+
+
+class JobLedger:
+    """Start, finish and list job runs"""
+
+    # Where the ledger's own sessions come from
+    session_factory: Callable[[], Session] = SessionLocal
+
+    @staticmethod
+    def start(
+        job_id: str,
+        period: Optional[str],
+        holder: str,
+        trigger: str = JOB_TRIGGER_SCHEDULE
+    ) -> Optional[JobRun]:
+        """
+        Record that a run is starting (committed at once)
+
+        Args:
+            job_id: Scheduler job id
+            period: What the run covers, e.g. "2026-10-05" for that week;
+                ignored for manual runs, which may repeat
+            holder: Process identity, for diagnosis
+            trigger: JOB_TRIGGER_SCHEDULE or JOB_TRIGGER_MANUAL
+
+        Returns:
+            The new run (detached), or None if this period has already been
+            started by a scheduled run
+        """
+        scheduled = trigger == JOB_TRIGGER_SCHEDULE
+        run = JobRun(
+            job_id=job_id,
+            period=period if scheduled else None,
+            trigger=trigger,
+            status=JOB_RUNNING,
+            holder=holder,
+            started_at=datetime.utcnow()
+        )
+        db = JobLedger.session_factory()
+        try:
+            db.add(run)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Only a scheduled run can collide, on its (job_id, period)
+                if not scheduled:
+                    raise
+                db.rollback()
+                existing = db.query(JobRun).filter(JobRun.job_id == job_id, JobRun.period == period).first()
+                logger.info(
+                    f"Job {job_id} for {period} already started by "
+                    f"{existing.holder if existing else 'another process'} "
+                    f"({existing.status if existing else 'unknown'}); skipping"
+                )
+                return None
+            db.refresh(run)
+            return run
+        finally:
+            db.close()
+
+    @staticmethod
+    def finish(run: JobRun, stats: Optional[Dict[str, Any]] = None):
+        """Mark the run succeeded with its stats"""
+        JobLedger._close(run, JOB_SUCCEEDED, stats, None)
+
+    @staticmethod
+    def fail(run: JobRun, error: Exception, stats: Optional[Dict[str, Any]] = None):
+        """
+        Mark the run failed; its period stays taken, since part of it may
+        already have been delivered (re-run it manually if needed)
+        """
+        JobLedger._close(run, JOB_FAILED, stats, f"{type(error).__name__}: {error}"[:2000])
+
+    @staticmethod
+    def _close(run: JobRun, status: str, stats: Optional[Dict[str, Any]], error: Optional[str]):
+        db = JobLedger.session_factory()
+        try:
+            run = db.get(JobRun, run.id)
+            run.status = status
+            run.finished_at = datetime.utcnow()
+            run.duration_ms = int((run.finished_at - run.started_at).total_seconds() * 1000)
+            run.stats = stats
+            run.error = error
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def recent(db: Session, job_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Latest runs, newest first"""
+        query = db.query(JobRun)
+        if job_id:
+            query = query.filter(JobRun.job_id == job_id)
+        runs = query.order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit).all()
+        return [
+            {
+                "id": run.id,
+                "job_id": run.job_id,
+                "period": run.period,
+                "trigger": run.trigger,
+                "status": run.status,
+                "holder": run.holder,
+                "started_at": run.started_at,
+                "finished_at": run.finished_at,
+                "duration_ms": run.duration_ms,
+                "stats": run.stats,
+                "error": run.error
+            }
+            for run in runs
+        ]
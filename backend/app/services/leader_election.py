@@ -0,0 +1,232 @@
+"""
+Leader Election
+Picks one process out of many (uvicorn workers, replicas) to run the
+scheduler's jobs.
+
+- "table" (the default): a row in scheduler_locks leased for
+  SCHEDULER_LEADER_TTL_SECONDS and renewed on every heartbeat. Works on any
+  database and through any pooler; a crashed leader is replaced once its
+  lease expires
+- "advisory": a session-level PostgreSQL advisory lock
+  (pg_try_advisory_lock) held on a dedicated connection; leadership ends
+  when that connection does. Only for direct connections: behind a
+  transaction-mode pooler (pgbouncer, Supabase's pooler on port 6543) the
+  lock stays on whichever server connection took it, outliving the leader
+- "auto": advisory on PostgreSQL unless DATABASE_URL looks like a
+  transaction-mode pooler, table otherwise
+
+Every process calls heartbeat() every SCHEDULER_LEADER_HEARTBEAT_SECONDS;
+followers take over as soon as the lock is free.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import case, or_, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, engine as default_engine
+from app.models.scheduler import SchedulerLock
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ADVISORY = "advisory"
+BACKEND_TABLE = "table"
+
+# Supabase's transaction-mode pooler listens on 6543 (session mode: 5432)
+TRANSACTION_POOLER_PORTS = {6543}
+
+
+def process_identity() -> str:
+    """host:pid:nonce, unique per process even across containers"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def behind_transaction_pooler(engine: Engine) -> bool:
+    """Whether the engine's URL looks like a transaction-mode pooler (pgbouncer)"""
+    url = engine.url
+    return (
+        url.port in TRANSACTION_POOLER_PORTS
+        or "pooler" in (url.host or "")
+        or url.query.get("pgbouncer") == "true"
+    )
+
+
+def advisory_key(name: str) -> int:
+    """Stable signed 64-bit key for pg_try_advisory_lock"""
+    return int.from_bytes(hashlib.sha256(f"flowhive:{name}".encode()).digest()[:8], "big", signed=True)
+
+
+class LeaderElection:
+    """
+    One named leadership, contended by every process that creates it
+
+    Usage:
+        election = LeaderElection("scheduler")
+        election.heartbeat()   # periodically; returns whether we lead
+        if election.is_leader: ...
+        election.release()     # on shutdown
+    """
+
+    def __init__(
+        self,
+        name: str,
+        engine: Engine = default_engine,
+        session_factory: Callable[[], Session] = SessionLocal,
+        backend: Optional[str] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds or settings.SCHEDULER_LEADER_TTL_SECONDS
+        self.holder = process_identity()
+        self.backend = self._choose_backend(backend or settings.SCHEDULER_LEADER_BACKEND)
+        self.is_leader = False
+        self._conn: Optional[Connection] = None
+        self._dbapi_connection = None
+
+    def _choose_backend(self, backend: str) -> str:
+        if backend == "auto":
+            if self.engine.dialect.name == "postgresql" and not behind_transaction_pooler(self.engine):
+                return BACKEND_ADVISORY
+            return BACKEND_TABLE
+        if backend not in (BACKEND_ADVISORY, BACKEND_TABLE):
+            raise ValueError(f"Unknown SCHEDULER_LEADER_BACKEND: {backend}")
+        return backend
+
+    def heartbeat(self) -> bool:
+        """Acquire or keep leadership (blocking; run it in a thread from async code)"""
+        try:
+            leader = self._advisory() if self.backend == BACKEND_ADVISORY else self._lease()
+        except Exception as e:
+            logger.warning(f"Leader election '{self.name}' heartbeat failed: {e}")
+            self._drop_connection()
+            leader = False
+
+        if leader != self.is_leader:
+            logger.info(
+                f"{self.holder} {'became' if leader else 'is no longer'} "
+                f"leader for '{self.name}' ({self.backend})"
+            )
+        self.is_leader = leader
+        return leader
+
+    def release(self):
+        """Give up leadership so another process can take over immediately"""
+        if not self.is_leader:
+            self._drop_connection()
+            return
+        try:
+            if self.backend == BACKEND_ADVISORY and self._conn is not None:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": advisory_key(self.name)})
+                self._conn.commit()
+            elif self.backend == BACKEND_TABLE:
+                db = self.session_factory()
+                try:
+                    db.query(SchedulerLock).filter(
+                        SchedulerLock.name == self.name,
+                        SchedulerLock.holder == self.holder
+                    ).delete(synchronize_session=False)
+                    db.commit()
+                finally:
+                    db.close()
+        except Exception as e:
+            logger.warning(f"Could not release leadership of '{self.name}': {e}")
+        finally:
+            self._drop_connection()
+            self.is_leader = False
+
+    def current_holder(self) -> Optional[str]:
+        """Who holds the lease (table backend only; advisory locks are anonymous)"""
+        if self.backend != BACKEND_TABLE:
+            return self.holder if self.is_leader else None
+        db = self.session_factory()
+        try:
+            lock = db.get(SchedulerLock, self.name)
+            return lock.holder if lock and lock.expires_at > datetime.utcnow() else None
+        finally:
+            db.close()
+
+    def _advisory(self) -> bool:
+        if self._conn is not None:
+            # The lock lives as long as this connection's database session;
+            # prove it still does. An invalidated Connection would reconnect
+            # silently, to a new session that doesn't hold the lock
+            if self._conn.invalidated:
+                raise ConnectionError("the connection holding the lock was lost")
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            if self._conn.connection.dbapi_connection is not self._dbapi_connection:
+                raise ConnectionError("the connection holding the lock was replaced")
+            return True
+
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": advisory_key(self.name)}
+            ).scalar()
+            conn.commit()  # Don't sit idle in a transaction; the lock is session-level
+        except Exception:
+            conn.close()
+            raise
+        if acquired:
+            self._conn = conn
+            self._dbapi_connection = conn.connection.dbapi_connection
+            return True
+        conn.close()
+        return False
+
+    def _lease(self) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        db = self.session_factory()
+        try:
+            # Renew our own lease, or take over an expired one
+            won = db.query(SchedulerLock).filter(
+                SchedulerLock.name == self.name,
+                or_(SchedulerLock.holder == self.holder, SchedulerLock.expires_at < now)
+            ).update({
+                SchedulerLock.acquired_at: case(
+                    (SchedulerLock.holder == self.holder, SchedulerLock.acquired_at), else_=now
+                ),
+                SchedulerLock.holder: self.holder,
+                SchedulerLock.expires_at: expires_at
+            }, synchronize_session=False)
+            if won:
+                db.commit()
+                return True
+
+            if db.get(SchedulerLock, self.name) is not None:
+                db.rollback()
+                return False
+
+            db.add(SchedulerLock(name=self.name, holder=self.holder, acquired_at=now, expires_at=expires_at))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # Another process created it first
+                return False
+            return True
+        finally:
+            db.close()
+
+    def _drop_connection(self):
+        if self._conn is not None:
+            try:
+                # Close the DBAPI connection rather than pooling it: a pooled
+                # session would keep the advisory lock with nobody using it
+                self._conn.invalidate()
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+            self._dbapi_connection = None
@@ -0,0 +1,369 @@
+"""
+Transactional Outbox
+Slow side effects (web push, report emails, Cloudinary clean-up) are not run
+inside request handlers. The handler records an OutboxMessage in the same
+transaction as its own change, so the side effect happens if and only if the
+change commits, and OutboxWorker carries it out afterwards:
+
+- due messages are claimed with a compare-and-set UPDATE (plus
+  FOR UPDATE SKIP LOCKED on PostgreSQL), so any number of workers, in the
+  API processes or standalone (python -m app.outbox_worker), can share the
+  table without running a message twice
+- a claim is a lease: a message whose worker died becomes due again once
+  locked_until passes
+- failures are retried with exponential backoff and jitter; after
+  max_attempts the message is dead-lettered (status "dead", last_error kept)
+- committing a session that enqueued messages wakes the in-process worker,
+  so the usual delay is one event-loop turn, not a poll interval
+- the worker's own queries (claim, outcome, purge) use sync sessions and run
+  in threads (asyncio.to_thread), never on the event loop; handlers do the
+  same for theirs
+
+Every API process runs a worker (OUTBOX_WORKER_ENABLED, on by default).
+Where background tasks don't survive the response (serverless hosts such as
+Vercel), a cron calls /api/outbox/drain, which runs OutboxWorker.drain();
+standalone workers (python -m app.outbox_worker) can run next to either.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, event, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.outbox import (
+    OUTBOX_DEAD, OUTBOX_DONE, OUTBOX_PENDING, OUTBOX_PROCESSING, OutboxMessage
+)
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Session, Dict[str, Any]], Awaitable[None]]
+
+_handlers: Dict[str, Handler] = {}
+
+
+class UnknownTopicError(LookupError):
+    """No handler is registered for a message's topic (dead-lettered at once)"""
+
+
+class Outbox:
+    """Recording side effects and registering their handlers"""
+
+    @staticmethod
+    def handler(topic: str):
+        """
+        Register the coroutine that carries out messages of a topic
+
+        Usage:
+            @Outbox.handler("push.users")
+            async def push_to_users(db: Session, payload: dict): ...
+
+        The handler gets its own (sync) session; queries on it are blocking,
+        so run them with asyncio.to_thread. Raising makes the message retry.
+        """
+        def register(func: Handler) -> Handler:
+            _handlers[topic] = func
+            return func
+        return register
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        topic: str,
+        payload: Dict[str, Any],
+        delay_seconds: float = 0,
+        max_attempts: Optional[int] = None
+    ) -> OutboxMessage:
+        """
+        Add a message to the caller's transaction (not committed here)
+
+        Args:
+            db: Session holding the change that causes the side effect
+            topic: Registered handler topic
+            payload: JSON-serializable arguments for the handler
+            delay_seconds: Do not run before this many seconds from now
+            max_attempts: Attempts before dead-lettering (OUTBOX_MAX_ATTEMPTS)
+        """
+        message = OutboxMessage(
+            topic=topic,
+            payload=payload,
+            status=OUTBOX_PENDING,
+            attempts=0,
+            max_attempts=max_attempts or settings.OUTBOX_MAX_ATTEMPTS,
+            available_at=datetime.utcnow() + timedelta(seconds=delay_seconds)
+        )
+        db.add(message)
+        db.info["outbox_enqueued"] = True
+        return message
+
+    @staticmethod
+    def stats(db: Session) -> Dict[str, Any]:
+        """Message counts per status, and how late the oldest due message is"""
+        counts = dict(
+            db.query(OutboxMessage.status, func.count(OutboxMessage.id))
+            .group_by(OutboxMessage.status)
+            .all()
+        )
+        oldest_due = db.query(func.min(OutboxMessage.available_at)).filter(
+            OutboxMessage.status == OUTBOX_PENDING,
+            OutboxMessage.available_at <= datetime.utcnow()
+        ).scalar()
+        return {
+            "pending": counts.get(OUTBOX_PENDING, 0),
+            "processing": counts.get(OUTBOX_PROCESSING, 0),
+            "done": counts.get(OUTBOX_DONE, 0),
+            "dead": counts.get(OUTBOX_DEAD, 0),
+            "oldest_due_seconds": (datetime.utcnow() - oldest_due).total_seconds() if oldest_due else 0.0
+        }
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts`: exponential, capped, with jitter"""
+    delay = min(
+        settings.OUTBOX_BACKOFF_MAX_SECONDS,
+        settings.OUTBOX_BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1)
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _due(now: datetime):
+    """Pending and due, or claimed by a worker whose lease ran out"""
+    return or_(
+        and_(OutboxMessage.status == OUTBOX_PENDING, OutboxMessage.available_at <= now),
+        and_(OutboxMessage.status == OUTBOX_PROCESSING, OutboxMessage.locked_until < now)
+    )
+
+
+class OutboxWorker:
+    """
+    Drains the outbox: claims due messages, runs their handlers concurrently,
+    and records the outcome
+
+    Usage:
+        await outbox_worker.start()   # background task on the running loop
+        ...
+        await outbox_worker.stop()
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL_SECONDS
+        self.lease_seconds = lease_seconds or settings.OUTBOX_LEASE_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._purged_at: Optional[datetime] = None
+
+    @staticmethod
+    def _load_handlers():
+        # Handlers import the services they drive; register them on first use
+        import app.services.outbox_handlers  # noqa: F401
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._load_handlers()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run_forever())
+        logger.info("Outbox worker started")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        logger.info("Outbox worker stopped")
+
+    def wake(self):
+        """Poll now instead of at the next interval (safe from any thread)"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                wakeup.set()
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(wakeup.set)
+
+    async def run_forever(self):
+        self._load_handlers()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while True:
+            try:
+                processed = await self.run_once()
+                await asyncio.to_thread(self._purge_if_due)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+                processed = 0
+
+            if processed >= self.batch_size:
+                continue  # More may be waiting
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """Claim and run one batch of due messages; returns how many ran"""
+        self._load_handlers()
+        claimed = await asyncio.to_thread(self._claim)
+        if claimed:
+            await asyncio.gather(*(self._process(message_id) for message_id in claimed))
+        return len(claimed)
+
+    async def drain(self, max_seconds: float) -> int:
+        """
+        Run batches until none is full or max_seconds have passed (a batch
+        already started is finished), then purge if due; returns how many
+        messages ran. For callers without a long-lived worker, e.g. a cron
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        total = 0
+        while True:
+            processed = await self.run_once()
+            total += processed
+            if processed < self.batch_size or loop.time() >= deadline:
+                break
+        await asyncio.to_thread(self._purge_if_due)
+        return total
+
+    def _claim(self) -> List[int]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            candidates = db.query(OutboxMessage.id).filter(_due(now)).order_by(
+                OutboxMessage.available_at, OutboxMessage.id
+            ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            claimed = []
+            for (message_id,) in candidates:
+                # Compare-and-set: only one worker wins a message
+                won = db.query(OutboxMessage).filter(
+                    OutboxMessage.id == message_id, _due(now)
+                ).update({
+                    OutboxMessage.status: OUTBOX_PROCESSING,
+                    OutboxMessage.locked_until: now + timedelta(seconds=self.lease_seconds),
+                    OutboxMessage.attempts: OutboxMessage.attempts + 1
+                }, synchronize_session=False)
+                if won:
+                    claimed.append(message_id)
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    async def _process(self, message_id: int):
+        db = self.session_factory()
+        try:
+            message = await asyncio.to_thread(db.get, OutboxMessage, message_id)
+            topic, payload = message.topic, message.payload
+            handler = _handlers.get(topic)
+            try:
+                if handler is None:
+                    raise UnknownTopicError(f"No outbox handler for topic {topic!r}")
+                await handler(db, payload)
+            except asyncio.CancelledError:
+                # Worker shutting down: hand the message back instead of
+                # leaving it claimed until the lease runs out
+                await asyncio.to_thread(self._release, db, message_id)
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self._record_failure, db, message_id, e)
+                return
+
+            await asyncio.to_thread(self._complete, db, message_id)
+        finally:
+            await asyncio.to_thread(db.close)
+
+    @staticmethod
+    def _complete(db: Session, message_id: int):
+        # Commits together with anything the handler left uncommitted
+        message = db.get(OutboxMessage, message_id)
+        message.status = OUTBOX_DONE
+        message.locked_until = None
+        message.last_error = None
+        message.processed_at = datetime.utcnow()
+        db.commit()
+
+    @staticmethod
+    def _release(db: Session, message_id: int):
+        db.rollback()
+        message = db.get(OutboxMessage, message_id)
+        message.status = OUTBOX_PENDING
+        message.locked_until = None
+        message.attempts = max(0, message.attempts - 1)
+        db.commit()
+
+    @staticmethod
+    def _record_failure(db: Session, message_id: int, error: Exception):
+        db.rollback()
+        message = db.get(OutboxMessage, message_id)
+        message.last_error = f"{type(error).__name__}: {error}"[:2000]
+        message.locked_until = None
+        if message.attempts >= message.max_attempts or isinstance(error, UnknownTopicError):
+            message.status = OUTBOX_DEAD
+            logger.error(
+                f"Outbox message {message_id} ({message.topic}) dead-lettered after "
+                f"{message.attempts} attempt(s): {message.last_error}"
+            )
+        else:
+            delay = backoff_seconds(message.attempts)
+            message.status = OUTBOX_PENDING
+            message.available_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(
+                f"Outbox message {message_id} ({message.topic}) failed attempt {message.attempts}, "
+                f"retrying in {delay:.0f}s: {message.last_error}"
+            )
+        db.commit()
+
+    def _purge_if_due(self):
+        """Delete finished messages older than OUTBOX_RETENTION_DAYS, hourly"""
+        now = datetime.utcnow()
+        if self._purged_at and now - self._purged_at < timedelta(hours=1):
+            return
+        self._purged_at = now
+        db = self.session_factory()
+        try:
+            deleted = db.query(OutboxMessage).filter(
+                OutboxMessage.status == OUTBOX_DONE,
+                OutboxMessage.processed_at < now - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Purged {deleted} processed outbox message(s)")
+        finally:
+            db.close()
+
+
+outbox_worker = OutboxWorker()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker_after_commit(session: Session):
+    if session.info.pop("outbox_enqueued", False):
+        outbox_worker.wake()
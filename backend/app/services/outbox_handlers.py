@@ -0,0 +1,155 @@
+"""
+Outbox Handlers
+What the outbox worker does for each topic. Request handlers enqueue these
+with Outbox.enqueue(db, TOPIC_..., payload) before committing.
+
+The session a handler gets is sync: its queries (and any file system work)
+go through asyncio.to_thread so the worker's event loop keeps running.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.field_activity_service import FieldActivityReportService
+from app.services.outbox import Outbox
+from app.services.push_notification_service import PushNotificationService
+from app.utils.cloudinary import delete_from_cloudinary
+
+logger = logging.getLogger(__name__)
+
+TOPIC_PUSH_USERS = "push.users"
+TOPIC_ACTIVITY_REPORT = "report.activity"
+TOPIC_WEEKLY_REPORTS = "report.weekly"
+TOPIC_CLOUDINARY_DESTROY = "cloudinary.destroy"
+TOPIC_BLOB_RELEASE = "blob.release"
+TOPIC_FILE_DELETE = "file.delete"
+TOPIC_PHOTO_VARIANTS = "photo.variants"
+TOPIC_STORAGE_DELETE = "storage.delete"
+TOPIC_STORAGE_ORPHAN = "storage.orphan"
+TOPIC_UPLOAD_EXPIRE = "upload.expire"
+
+
+@Outbox.handler(TOPIC_PUSH_USERS)
+async def push_to_users(db: Session, payload: Dict[str, Any]):
+    """payload: user_ids, title, message, data"""
+    notified = await PushNotificationService.send_to_users(
+        db=db,
+        user_ids=payload["user_ids"],
+        title=payload["title"],
+        message=payload["message"],
+        data=payload.get("data")
+    )
+    logger.info(f"Push notification '{payload['title']}' delivered to {len(notified)} of {len(payload['user_ids'])} user(s)")
+
+
+@Outbox.handler(TOPIC_ACTIVITY_REPORT)
+async def send_activity_report(db: Session, payload: Dict[str, Any]):
+    """payload: workspace_id, date_from, date_to, support_staff_id, recipient_emails, individual"""
+    activities = await asyncio.to_thread(
+        FieldActivityReportService.load_report_activities,
+        db,
+        payload["workspace_id"],
+        payload.get("date_from"),
+        payload.get("date_to"),
+        payload.get("support_staff_id")
+    )
+    if not activities:
+        logger.info(f"Activity report for workspace {payload['workspace_id']} skipped: no activities")
+        return
+
+    options = dict(
+        date_from=payload.get("date_from"),
+        date_to=payload.get("date_to"),
+        resend_api_key=settings.RESEND_API_KEY,
+        from_email=settings.RESEND_FROM_EMAIL,
+        from_name=settings.RESEND_FROM_NAME,
+        frontend_url=settings.FRONTEND_URL
+    )
+
+    if payload.get("individual"):
+        result = await FieldActivityReportService.send_individual_reports(
+            workspace_id=payload["workspace_id"],
+            activities=activities,
+            db=db,
+            **options
+        )
+        # Retry only when nothing went out; a retry resends to everyone
+        if result["failed_count"] and not result["sent_count"]:
+            raise RuntimeError(f"No report delivered: {result['errors'][0]}")
+        logger.info(f"Individual reports for workspace {payload['workspace_id']}: {result['message']}")
+    else:
+        # Raises HTTPException when the email is not accepted
+        await FieldActivityReportService.send_bulk_report(
+            activities=activities,
+            recipient_emails=payload["recipient_emails"],
+            **options
+        )
+
+
+@Outbox.handler(TOPIC_WEEKLY_REPORTS)
+async def run_weekly_reports(db: Session, payload: Dict[str, Any]):
+    from app.models.scheduler import JOB_TRIGGER_MANUAL
+    from app.scheduler import send_weekly_reports
+    await send_weekly_reports(trigger=JOB_TRIGGER_MANUAL)
+
+
+@Outbox.handler(TOPIC_CLOUDINARY_DESTROY)
+async def destroy_cloudinary_file(db: Session, payload: Dict[str, Any]):
+    """payload: public_id, resource_type (messages queued before storage.delete)"""
+    result = await delete_from_cloudinary(payload["public_id"], payload.get("resource_type") or "auto")
+    if result.get("result") not in ("ok", "not found"):
+        raise RuntimeError(f"Cloudinary destroy returned {result}")
+
+
+@Outbox.handler(TOPIC_BLOB_RELEASE)
+async def release_blob(db: Session, payload: Dict[str, Any]):
+    """payload: blob_id"""
+    from app.services.blob_store import BlobStore
+    await asyncio.to_thread(BlobStore.collect, db, payload["blob_id"])
+
+
+@Outbox.handler(TOPIC_FILE_DELETE)
+async def delete_file(db: Session, payload: Dict[str, Any]):
+    """payload: path (a local upload; queued by the blob migration)"""
+    try:
+        await asyncio.to_thread(os.remove, payload["path"])
+    except FileNotFoundError:
+        pass
+
+
+@Outbox.handler(TOPIC_STORAGE_DELETE)
+async def delete_stored_objects(db: Session, payload: Dict[str, Any]):
+    """payload: storage, keys, resource_type"""
+    from app.services.storage import get_storage
+    driver = get_storage(payload["storage"])
+    for key in payload["keys"]:
+        await driver.call(driver.delete, key, payload.get("resource_type"))
+
+
+@Outbox.handler(TOPIC_STORAGE_ORPHAN)
+async def delete_if_orphan(db: Session, payload: Dict[str, Any]):
+    """payload: storage, key, resource_type (a direct upload, if never completed)"""
+    from app.services.blob_store import BlobStore
+    from app.services.storage import get_storage
+    if await asyncio.to_thread(BlobStore.is_orphan, db, payload["storage"], payload["key"]):
+        driver = get_storage(payload["storage"])
+        await driver.call(driver.delete, payload["key"], payload.get("resource_type"))
+
+
+@Outbox.handler(TOPIC_PHOTO_VARIANTS)
+async def render_photo_variants(db: Session, payload: Dict[str, Any]):
+    """payload: photo_id"""
+    from app.services.photo_variants import PhotoVariantService
+    await PhotoVariantService.generate(db, payload["photo_id"])
+
+
+@Outbox.handler(TOPIC_UPLOAD_EXPIRE)
+async def expire_resumable_upload(db: Session, payload: Dict[str, Any]):
+    """payload: upload_id (queued when a resumable upload is created)"""
+    from app.services.resumable_uploads import ResumableUploads
+    await asyncio.to_thread(ResumableUploads.expire, db, payload["upload_id"])
@@ -0,0 +1,213 @@
+"""
+Photo Variants
+Thumbnail and medium-size renditions of field activity photos, as JPEG and
+WebP, so list and detail screens don't download full-size phone photos.
+
+Variants are rendered by the outbox worker (photo.variants, enqueued with
+the upload) in a process pool, off the event loop and past the GIL. Each
+rendition is rotated upright from the EXIF orientation and saved without
+EXIF (camera, GPS) data. The files sit next to the photo's blob, in the
+same storage (<blob key>.<variant>.<ext>), and go with it; their metadata
+is stored on the photo (FieldActivityPhoto.variants). Photos in remote
+storage are downloaded to a temporary directory to be rendered.
+
+HEIC photos need the optional pillow-heif package; photos Pillow can't
+read keep no variants and are served as uploaded.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.blob import BLOB_STORAGE_LOCAL
+from app.models.field_activity import FieldActivityPhoto
+from app.services.storage import StorageDriver, get_storage
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:  # HEIC support is optional
+    pass
+
+logger = logging.getLogger(__name__)
+
+# name -> (longest edge in pixels, format)
+PHOTO_VARIANTS = {
+    "medium": (1280, "JPEG"),
+    "medium_webp": (1280, "WEBP"),
+    "thumbnail": (320, "JPEG"),
+    "thumbnail_webp": (320, "WEBP"),
+}
+FORMATS = {
+    "JPEG": (".jpg", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+    "WEBP": (".webp", "image/webp", {"quality": 80, "method": 4}),
+}
+
+
+def variant_path(location: str, name: str) -> str:
+    """Key of a photo's variant, next to its blob's key"""
+    extension = FORMATS[PHOTO_VARIANTS[name][1]][0]
+    return f"{location}.{name}{extension}"
+
+
+def variant_paths(location: str) -> List[str]:
+    """Every variant key a blob may have"""
+    return [variant_path(location, name) for name in PHOTO_VARIANTS]
+
+
+def render_variants(source: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Render every variant of the image file at source, next to it (runs in
+    a pool process)
+
+    Returns:
+        {name: {key (the file path), width, height, size, mime_type}}
+
+    Raises:
+        UnidentifiedImageError: source is not an image Pillow can read
+    """
+    largest = max(edge for edge, _ in PHOTO_VARIANTS.values())
+    with Image.open(source) as original:
+        # JPEG: decode at the smallest scale still at least this large
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+
+    # Nothing but the colour profile is written back
+    icc_profile = image.info.get("icc_profile")
+    image.info = {"icc_profile": icc_profile} if icc_profile else {}
+
+    variants = {}
+    # Largest first, each one scaled down from the previous
+    for name, (edge, image_format) in sorted(PHOTO_VARIANTS.items(), key=lambda item: -item[1][0]):
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        extension, mime_type, options = FORMATS[image_format]
+        rendition = image
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            rendition = _flatten(image)
+        elif image_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+            rendition = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        path = variant_path(source, name)
+        # Photos sharing a blob may be rendered at the same time
+        partial = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        rendition.save(partial, image_format, icc_profile=icc_profile, **options)
+        os.replace(partial, path)
+        variants[name] = {
+            "key": path,
+            "width": rendition.width,
+            "height": rendition.height,
+            "size": os.path.getsize(path),
+            "mime_type": mime_type
+        }
+    return variants
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB, with transparent areas on white rather than black"""
+    if not image.has_transparency_data:
+        return image.convert("RGB")
+    rgba = image.convert("RGBA")
+    flat = Image.new("RGB", rgba.size, (255, 255, 255))
+    flat.paste(rgba, mask=rgba.getchannel("A"))
+    return flat
+
+
+_pool: Optional[Executor] = None
+
+
+class PhotoVariantService:
+    """Rendering and attaching photo variants"""
+
+    @staticmethod
+    def get_pool() -> Optional[Executor]:
+        """The render pool, started on first use (None: render in a thread)"""
+        global _pool
+        if _pool is None and settings.PHOTO_VARIANT_WORKERS > 0:
+            # spawn: forking a process that runs threads (uvicorn, the
+            # scheduler) can copy locks held by them
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PHOTO_VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+    @staticmethod
+    def shutdown():
+        global _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+    @staticmethod
+    async def render(source: str) -> Dict[str, Dict[str, Any]]:
+        pool = PhotoVariantService.get_pool()
+        if pool is None:
+            return await asyncio.to_thread(render_variants, source)
+        return await asyncio.get_running_loop().run_in_executor(pool, render_variants, source)
+
+    @staticmethod
+    async def generate(db: Session, photo_id: int):
+        """
+        Give a photo its variants (the caller commits)
+
+        Photos sharing a blob share its variant files: if one of them
+        already has variants they are copied, not rendered again.
+        """
+        photo = await asyncio.to_thread(db.get, FieldActivityPhoto, photo_id)
+        if photo is None or photo.variants is not None:
+            return  # Deleted since, or already done
+        driver = get_storage(photo.storage)
+
+        if photo.blob_id is not None:
+            sibling = await asyncio.to_thread(
+                db.query(FieldActivityPhoto).filter(
+                    FieldActivityPhoto.blob_id == photo.blob_id,
+                    FieldActivityPhoto.variants.isnot(None),
+                    FieldActivityPhoto.id != photo.id
+                ).first
+            )
+            if sibling is not None and await driver.call(
+                lambda: all(driver.stat(v["key"]) for v in sibling.variants.values())
+            ):
+                photo.variants = sibling.variants
+                return
+
+        try:
+            if photo.storage == BLOB_STORAGE_LOCAL:
+                photo.variants = await PhotoVariantService.render(photo.file_path)
+            else:
+                photo.variants = await PhotoVariantService._render_remote(driver, photo.file_path)
+        except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+            logger.warning(f"No variants for photo {photo_id} ({photo.mime_type}): {e}")
+            photo.variants = {}
+            return
+        logger.info(f"Rendered {len(photo.variants)} variants for photo {photo_id}")
+
+    @staticmethod
+    async def _render_remote(driver: StorageDriver, key: str) -> Dict[str, Dict[str, Any]]:
+        """Download, render locally, upload the variants next to key"""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "original")
+
+            def download():
+                with open(source, "wb") as f:
+                    driver.download(key, f)
+
+            def upload(variants: Dict[str, Dict[str, Any]]):
+                for name, variant in variants.items():
+                    with open(variant["key"], "rb") as f:
+                        variant["key"] = driver.put(f, variant_path(key, name), variant["mime_type"]).key
+
+            await driver.call(download)
+            variants = await PhotoVariantService.render(source)
+            await driver.call(upload, variants)
+            return variants
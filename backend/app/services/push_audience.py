@@ -0,0 +1,120 @@
+"""
+Push Audience Resolver
+Resolves who a push notification goes to into batches of subscriptions.
+
+An audience ("all users", "workspace X", "role Y" or an explicit list of
+users) becomes one query joining push_subscriptions to users, streamed with
+yield_per and ordered by user, so a job costs one round trip per batch of
+subscriptions instead of one query per user. A user's devices are never
+split across two batches.
+"""
+
+from dataclasses import dataclass
+from typing import FrozenSet, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.push_subscription import PushSubscription
+from app.models.user import User, UserRole
+from app.models.workspace import WorkspaceMember
+from app.services.push_dispatcher import PushTarget
+
+AUDIENCE_ALL = "all"
+AUDIENCE_WORKSPACE = "workspace"
+AUDIENCE_ROLE = "role"
+AUDIENCE_USERS = "users"
+
+
+@dataclass(frozen=True)
+class Audience:
+    """Who a notification is for; build with the classmethods"""
+    kind: str
+    workspace_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    user_ids: FrozenSet[int] = frozenset()
+
+    @classmethod
+    def all_users(cls) -> "Audience":
+        return cls(AUDIENCE_ALL)
+
+    @classmethod
+    def workspace(cls, workspace_id: int) -> "Audience":
+        return cls(AUDIENCE_WORKSPACE, workspace_id=workspace_id)
+
+    @classmethod
+    def with_role(cls, role: UserRole) -> "Audience":
+        return cls(AUDIENCE_ROLE, role=UserRole(role))
+
+    @classmethod
+    def users(cls, user_ids) -> "Audience":
+        return cls(AUDIENCE_USERS, user_ids=frozenset(user_ids))
+
+
+class AudienceResolver:
+    """Streams the active subscriptions of an audience"""
+
+    @staticmethod
+    def query(audience: Audience):
+        """
+        SELECT of the audience's active subscriptions of active users,
+        ordered by user
+        """
+        stmt = select(
+            PushSubscription.id,
+            PushSubscription.user_id,
+            PushSubscription.endpoint,
+            PushSubscription.p256dh_key,
+            PushSubscription.auth_key
+        ).join(
+            User, User.id == PushSubscription.user_id
+        ).where(
+            PushSubscription.active == True,
+            User.is_active == True
+        )
+
+        if audience.kind == AUDIENCE_WORKSPACE:
+            # Semi-join: a duplicated membership row must not duplicate pushes
+            stmt = stmt.where(PushSubscription.user_id.in_(
+                select(WorkspaceMember.user_id).where(WorkspaceMember.workspace_id == audience.workspace_id)
+            ))
+        elif audience.kind == AUDIENCE_ROLE:
+            stmt = stmt.where(User.role == audience.role)
+        elif audience.kind == AUDIENCE_USERS:
+            stmt = stmt.where(PushSubscription.user_id.in_(audience.user_ids))
+        elif audience.kind != AUDIENCE_ALL:
+            raise ValueError(f"Unknown push audience: {audience.kind}")
+
+        return stmt.order_by(PushSubscription.user_id, PushSubscription.id)
+
+    @staticmethod
+    def batches(db: Session, audience: Audience, batch_size: int = None) -> Iterator[List[PushTarget]]:
+        """
+        Yield the audience's subscriptions in batches of about batch_size
+        (PUSH_AUDIENCE_BATCH_SIZE), each holding all devices of its users
+
+        The rows are streamed (a server-side cursor on PostgreSQL), so the
+        session must not be committed until the iteration is done.
+        """
+        batch_size = batch_size or settings.PUSH_AUDIENCE_BATCH_SIZE
+        if audience.kind == AUDIENCE_USERS and not audience.user_ids:
+            return
+
+        result = db.execute(AudienceResolver.query(audience).execution_options(yield_per=batch_size))
+        batch: List[PushTarget] = []
+        for rows in result.partitions():
+            for row in rows:
+                # Cut only between users
+                if len(batch) >= batch_size and row.user_id != batch[-1].user_id:
+                    yield batch
+                    batch = []
+                batch.append(PushTarget(
+                    subscription_id=row.id,
+                    user_id=row.user_id,
+                    endpoint=row.endpoint,
+                    p256dh=row.p256dh_key,
+                    auth=row.auth_key
+                ))
+        if batch:
+            yield batch
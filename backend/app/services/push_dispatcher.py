@@ -0,0 +1,219 @@
+"""
+Web Push Dispatcher
+Sends encrypted Web Push messages concurrently without blocking the event loop.
+
+- pooled keep-alive httpx clients per push service host
+  (fcm.googleapis.com, updates.push.services.mozilla.com, ...), carrying at
+  most PUSH_MAX_CONCURRENCY_PER_HOST requests at a time between them.
+  httpcore rescans every pooled connection whenever a request starts or
+  ends, so a host's connections are spread over pools of POOL_SIZE
+- payload encryption (an ECDH + AES-GCM round per subscription) runs in a
+  thread pool of PUSH_ENCRYPTION_WORKERS
+- VAPID Authorization headers are signed once per audience and reused until
+  shortly before they expire
+- subscriptions the push service reports gone (404/410) are returned in the
+  report so the caller can deactivate them in one statement
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
+from pywebpush import WebPusher
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_ENCODING = "aes128gcm"
+
+# Connections per httpx client; a host gets ceil(max_per_host / POOL_SIZE) clients
+POOL_SIZE = 10
+
+# VAPID tokens may live up to 24h; sign for 12h (as pywebpush does) and
+# re-sign 10 minutes before expiry so no request carries a stale token
+VAPID_TOKEN_LIFETIME_SECONDS = 12 * 60 * 60
+VAPID_RENEW_MARGIN_SECONDS = 10 * 60
+
+
+@dataclass
+class PushTarget:
+    """One subscription to deliver to"""
+    subscription_id: int
+    user_id: int
+    endpoint: str
+    p256dh: str
+    auth: str
+
+
+@dataclass
+class DispatchReport:
+    """Outcome of one dispatch"""
+    sent: int = 0
+    failed: int = 0
+    gone: List[int] = field(default_factory=list)  # subscription ids answered 404/410
+    delivered_users: Set[int] = field(default_factory=set)
+    elapsed: float = 0.0
+
+    @property
+    def pushes_per_second(self) -> float:
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: "DispatchReport"):
+        """Add another batch's outcome to this one"""
+        self.sent += other.sent
+        self.failed += other.failed
+        self.gone.extend(other.gone)
+        self.delivered_users |= other.delivered_users
+        self.elapsed += other.elapsed
+
+
+class VapidHeaderCache:
+    """Signed VAPID Authorization headers per audience (push service origin)"""
+
+    def __init__(self, vapid, subject: str, clock: Callable[[], float] = time.time):
+        self.vapid = vapid
+        self.subject = subject
+        self._clock = clock
+        self._headers: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self.signed = 0
+
+    def headers(self, audience: str) -> Dict[str, str]:
+        now = self._clock()
+        cached = self._headers.get(audience)
+        if cached and cached[0] - VAPID_RENEW_MARGIN_SECONDS > now:
+            return cached[1]
+
+        expires_at = int(now) + VAPID_TOKEN_LIFETIME_SECONDS
+        headers = self.vapid.sign({"sub": self.subject, "aud": audience, "exp": expires_at})
+        self._headers[audience] = (expires_at, headers)
+        self.signed += 1
+        return headers
+
+
+def encrypt_payload(target: PushTarget, data: bytes) -> bytes:
+    """aes128gcm-encrypt a payload for one subscription (CPU-bound; runs in the pool)"""
+    pusher = WebPusher({
+        "endpoint": target.endpoint,
+        "keys": {"p256dh": target.p256dh, "auth": target.auth}
+    })
+    return pusher.encode(data, CONTENT_ENCODING)["body"]
+
+
+class PushDispatcher:
+    """
+    Concurrent Web Push sender.
+
+    Usage:
+        dispatcher = PushDispatcher(vapid_loader=PushNotificationService._get_vapid)
+        report = await dispatcher.dispatch(targets, {"title": "Hi", "message": "..."})
+    """
+
+    def __init__(
+        self,
+        vapid_loader: Callable[[], object],
+        subject: Optional[str] = None,
+        max_per_host: Optional[int] = None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        ttl: Optional[int] = None
+    ):
+        self._vapid_loader = vapid_loader
+        self.subject = subject or f"mailto:{settings.VAPID_CLAIM_EMAIL}"
+        self.max_per_host = max_per_host or settings.PUSH_MAX_CONCURRENCY_PER_HOST
+        self.workers = workers or settings.PUSH_ENCRYPTION_WORKERS
+        self.timeout = timeout or settings.PUSH_REQUEST_TIMEOUT_SECONDS
+        self.ttl = settings.PUSH_TTL_SECONDS if ttl is None else ttl
+        self._vapid_headers: Optional[VapidHeaderCache] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # HTTP clients and semaphores belong to the event loop that made them
+        self._loop = None
+        self._clients: Dict[str, List[httpx.AsyncClient]] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _prepare(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._clients = {}
+            self._host_limits = {}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="webpush")
+        if self._vapid_headers is None:
+            self._vapid_headers = VapidHeaderCache(self._vapid_loader(), self.subject)
+
+    def _host(self, host: str, key: int) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        if host not in self._clients:
+            pools = -(-self.max_per_host // POOL_SIZE)
+            size = -(-self.max_per_host // pools)
+            self._clients[host] = [
+                httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=size, max_keepalive_connections=size)
+                )
+                for _ in range(pools)
+            ]
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        clients = self._clients[host]
+        return clients[key % len(clients)], self._host_limits[host]
+
+    async def dispatch(self, targets: Sequence[PushTarget], payload: Union[dict, bytes]) -> DispatchReport:
+        """Send one payload to every target concurrently"""
+        report = DispatchReport()
+        if not targets:
+            return report
+
+        self._prepare()
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        started = time.perf_counter()
+        await asyncio.gather(*(self._send(target, data, report) for target in targets))
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    async def _send(self, target: PushTarget, data: bytes, report: DispatchReport):
+        loop = asyncio.get_running_loop()
+        url = urlparse(target.endpoint)
+        try:
+            body = await loop.run_in_executor(self._executor, encrypt_payload, target, data)
+            headers = {
+                "TTL": str(self.ttl),
+                "Content-Encoding": CONTENT_ENCODING,
+                **self._vapid_headers.headers(f"{url.scheme}://{url.netloc}")
+            }
+            client, limit = self._host(url.netloc, target.subscription_id)
+            async with limit:
+                response = await client.post(target.endpoint, content=body, headers=headers)
+        except Exception as e:
+            report.failed += 1
+            logger.error("Failed to send push notification to subscription %s: %r", target.subscription_id, e)
+            return
+
+        if response.status_code in (404, 410):
+            report.gone.append(target.subscription_id)
+        elif response.is_success:
+            report.sent += 1
+            report.delivered_users.add(target.user_id)
+        else:
+            report.failed += 1
+            logger.error(
+                "Push service rejected subscription %s: %s %s",
+                target.subscription_id, response.status_code, response.text[:200]
+            )
+
+    async def aclose(self):
+        clients, self._clients, self._host_limits = self._clients, {}, {}
+        loop, self._loop = self._loop, None
+        # Connections made on another (finished) event loop cannot be closed from this one
+        if loop is asyncio.get_running_loop():
+            for pools in clients.values():
+                for client in pools:
+                    await client.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
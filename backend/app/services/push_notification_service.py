@@ -1,28 +1,46 @@
 """
 Push Notification Service
-Handles sending web push notifications to users
+Handles sending web push notifications to users (through PushDispatcher)
 """
 
-from pywebpush import webpush, WebPushException
 from py_vapid import Vapid
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TypeVar, Union
+import asyncio
 import logging
 import tempfile
 import os
 
+from app.database import run_sync
 from app.models.push_subscription import PushSubscription
 from app.models.user import User
+from app.services.push_audience import Audience, AudienceResolver
+from app.services.push_dispatcher import DispatchReport, PushDispatcher
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+async def _off_loop(db: Union[Session, AsyncSession], fn: Callable[..., T], *args: Any) -> T:
+    """fn(session, *args) off the event loop: in a thread, or through an AsyncSession"""
+    if isinstance(db, AsyncSession):
+        return await run_sync(db, fn, *args)
+    return await asyncio.to_thread(fn, db, *args)
+
+
+def _next_batch(db: Session, pending: Iterator[List]) -> Optional[List]:
+    return next(pending, None)
+
 
 class PushNotificationService:
     """Service for sending push notifications"""
 
     _vapid_instance = None
+    _dispatcher = None
 
     @staticmethod
     def _normalize_private_key_pem(raw_key: str) -> str:
@@ -76,8 +94,111 @@ class PushNotificationService:
 
         return cls._vapid_instance
 
+    @classmethod
+    def dispatcher(cls) -> PushDispatcher:
+        """Shared dispatcher (pooled HTTP client, encryption workers, VAPID header cache)"""
+        if cls._dispatcher is None:
+            cls._dispatcher = PushDispatcher(vapid_loader=cls._get_vapid)
+        return cls._dispatcher
+
+    @classmethod
+    async def aclose(cls):
+        """Release the dispatcher's connections and workers (app shutdown)"""
+        if cls._dispatcher is not None:
+            await cls._dispatcher.aclose()
+            cls._dispatcher = None
+
+    @staticmethod
+    def build_payload(title: str, message: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Notification payload as the service worker expects it"""
+        payload = {
+            "title": title,
+            "message": message,
+            "icon": "/icon-192x192.svg",
+            "badge": "/icon-192x192.svg",
+        }
+
+        if data:
+            payload.update(data)
+
+        return payload
+
     @staticmethod
-    def send_notification(
+    def _deactivate(db: Session, subscription_ids: List[int]):
+        """Mark subscriptions the push service reported gone (404/410) inactive"""
+        if not subscription_ids:
+            return
+        db.execute(
+            update(PushSubscription)
+            .where(PushSubscription.id.in_(subscription_ids))
+            .values(active=False)
+        )
+        db.commit()
+        logger.info(f"Deactivated {len(subscription_ids)} expired push subscription(s)")
+
+    @staticmethod
+    async def send_to_audience(
+        db: Union[Session, AsyncSession],
+        audience: Audience,
+        title: str,
+        message: str,
+        data: Dict[str, Any] = None,
+        batch_size: int = None
+    ) -> DispatchReport:
+        """
+        Push one notification to every active subscription of an audience
+
+        Subscriptions are streamed from one query in batches (all devices of
+        a user in the same batch) and each batch is dispatched concurrently;
+        gone subscriptions are deactivated in a single UPDATE at the end.
+        The queries run off the event loop: in a thread for a Session, through
+        run_sync for an AsyncSession.
+        """
+        payload = PushNotificationService.build_payload(title, message, data)
+        dispatcher = PushNotificationService.dispatcher()
+
+        report = DispatchReport()
+        batches = 0
+        session = db.sync_session if isinstance(db, AsyncSession) else db
+        pending = AudienceResolver.batches(session, audience, batch_size)
+        while True:
+            targets = await _off_loop(db, _next_batch, pending)
+            if targets is None:
+                break
+            report.merge(await dispatcher.dispatch(targets, payload))
+            batches += 1
+
+        await _off_loop(db, PushNotificationService._deactivate, report.gone)
+
+        if batches:
+            logger.info(
+                f"Push dispatch to {audience.kind} audience: {report.sent} sent, {report.failed} failed, "
+                f"{len(report.gone)} gone, {len(report.delivered_users)} user(s) in {batches} batch(es), "
+                f"{report.elapsed:.2f}s ({report.pushes_per_second:.0f} pushes/s)"
+            )
+        return report
+
+    @staticmethod
+    async def send_to_users(
+        db: Union[Session, AsyncSession],
+        user_ids: Iterable[int],
+        title: str,
+        message: str,
+        data: Dict[str, Any] = None
+    ) -> Set[int]:
+        """
+        Send push notification to several users at once
+
+        Returns:
+            Ids of the users at least one of whose devices accepted it
+        """
+        report = await PushNotificationService.send_to_audience(
+            db, Audience.users(user_ids), title, message, data
+        )
+        return report.delivered_users
+
+    @staticmethod
+    async def send_notification(
         db: Session,
         user_id: int,
         title: str,
@@ -97,65 +218,13 @@ class PushNotificationService:
         Returns:
             True if sent successfully, False otherwise
         """
-        # Get all active subscriptions for this user
-        subscriptions = db.query(PushSubscription).filter(
-            PushSubscription.user_id == user_id,
-            PushSubscription.active == True
-        ).all()
-
-        if not subscriptions:
-            logger.warning(f"No active push subscriptions for user {user_id}")
-            return False
-
-        # Prepare notification payload
-        payload = {
-            "title": title,
-            "message": message,
-            "icon": "/icon-192x192.svg",
-            "badge": "/icon-192x192.svg",
-        }
-
-        if data:
-            payload.update(data)
-
-        success_count = 0
-
-        for subscription in subscriptions:
-            try:
-                # Get VAPID instance
-                vapid = PushNotificationService._get_vapid()
-
-                # Send push notification
-                webpush(
-                    subscription_info={
-                        "endpoint": subscription.endpoint,
-                        "keys": {
-                            "p256dh": subscription.p256dh_key,
-                            "auth": subscription.auth_key
-                        }
-                    },
-                    data=json.dumps(payload),
-                    vapid_private_key=vapid,
-                    vapid_claims={
-                        "sub": f"mailto:{settings.VAPID_CLAIM_EMAIL}"
-                    }
-                )
-                success_count += 1
-                logger.info(f"Push notification sent to user {user_id}")
-
-            except WebPushException as e:
-                logger.error(f"Failed to send push notification: {e}")
-
-                # If subscription is invalid/expired, deactivate it
-                if e.response and e.response.status_code in [404, 410]:
-                    subscription.active = False
-                    db.commit()
-                    logger.info(f"Deactivated invalid subscription for user {user_id}")
-
-        return success_count > 0
+        delivered = await PushNotificationService.send_to_users(db, [user_id], title, message, data)
+        if not delivered:
+            logger.warning(f"Push notification not delivered to user {user_id}")
+        return user_id in delivered
 
     @staticmethod
-    def send_to_workspace(
+    async def send_to_workspace(
         db: Session,
         workspace_id: int,
         title: str,
@@ -168,25 +237,17 @@ class PushNotificationService:
         Returns:
             Number of users notified
         """
-        from app.models.workspace import WorkspaceMember
-
-        members = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id
-        ).all()
-
-        success_count = 0
-        for member in members:
-            if PushNotificationService.send_notification(db, member.user_id, title, message, data):
-                success_count += 1
-
-        return success_count
+        report = await PushNotificationService.send_to_audience(
+            db, Audience.workspace(workspace_id), title, message, data
+        )
+        return len(report.delivered_users)
 
     @staticmethod
-    def send_weekly_report_notification(db: Session, user_id: int) -> bool:
-        """Send notification about weekly email report"""
-        return PushNotificationService.send_notification(
+    async def send_weekly_report_notification(db: Session, audience: Audience = None) -> DispatchReport:
+        """Send notification about weekly email report (to all users by default)"""
+        return await PushNotificationService.send_to_audience(
             db=db,
-            user_id=user_id,
+            audience=audience or Audience.all_users(),
             title="📊 Weekly Report Ready",
             message="Your personalized weekly activity report has been sent to your email.",
             data={
@@ -0,0 +1,255 @@
+"""
+Weekly Report Pipeline
+Builds and sends field activity report emails for many workspaces at once.
+
+- each distinct report body is rendered once per run: every manager and
+  executive of a workspace (and the configured recipients) share the same
+  full-report HTML; only team members get a body of their own
+- emails go out through Resend's batch endpoint (up to
+  REPORT_EMAIL_BATCH_SIZE per request), at most REPORT_EMAIL_CONCURRENCY
+  requests in flight, each in a worker thread so the event loop never
+  blocks on the SDK; rate-limited requests are retried with backoff
+- the scheduler's weekly run loads activities and members for all
+  workspaces in two queries and sends the workspaces in parallel
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import resend
+from resend.exceptions import RateLimitError
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.models.field_activity import FieldActivity
+from app.models.user import User
+from app.models.workspace import Workspace, WorkspaceMember
+from app.utils.email import generate_report_html
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_SECONDS = 1.0
+
+
+@dataclass
+class ReportEmail:
+    """One email to send; recipient is the label used in error messages"""
+    to: List[str]
+    subject: str
+    html: str
+    recipient: str
+
+
+class ReportRenderer:
+    """generate_report_html, memoized per distinct report body for one period"""
+
+    def __init__(self, date_from: str, date_to: str, frontend_url: Optional[str] = None):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.frontend_url = frontend_url or settings.FRONTEND_URL
+        self._html: Dict[Hashable, str] = {}
+        self.rendered = 0
+
+    def render(self, key: Hashable, activities_by_staff: List[Dict[str, Any]], summary: Dict[str, Any]) -> str:
+        """
+        HTML for a report body; key identifies the body (e.g. ("full", workspace_id)
+        or ("staff", workspace_id, user_id)) and must change whenever the content would
+        """
+        if key not in self._html:
+            self._html[key] = generate_report_html(
+                activities_by_staff, self.date_from, self.date_to, summary, self.frontend_url
+            )
+            self.rendered += 1
+        return self._html[key]
+
+
+class ResendMailer:
+    """
+    Sends ReportEmails through Resend's batch API with bounded concurrency
+
+    Usage:
+        mailer = ResendMailer()
+        result = await mailer.send(emails)  # {"sent_count", "failed_count", "errors", "email_ids"}
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        from_email: Optional[str] = None,
+        from_name: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.api_key = api_key if api_key is not None else settings.RESEND_API_KEY
+        self.sender = f"{from_name or settings.RESEND_FROM_NAME} <{from_email or settings.RESEND_FROM_EMAIL}>"
+        self.batch_size = max(1, min(batch_size or settings.REPORT_EMAIL_BATCH_SIZE, 100))
+        self._limit = asyncio.Semaphore(concurrency or settings.REPORT_EMAIL_CONCURRENCY)
+        self.requests = 0
+
+    def _post(self, params: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Module-level SDK configuration; every mailer uses the same values
+        resend.api_key = self.api_key
+        resend.api_url = settings.RESEND_API_URL
+        return resend.Batch.send(params, {"batch_validation": "permissive"})
+
+    async def send(self, emails: Sequence[ReportEmail]) -> Dict[str, Any]:
+        result = {"sent_count": 0, "failed_count": 0, "errors": [], "email_ids": []}
+        chunks = [emails[i:i + self.batch_size] for i in range(0, len(emails), self.batch_size)]
+        await asyncio.gather(*(self._send_chunk(chunk, result) for chunk in chunks))
+        return result
+
+    async def _send_chunk(self, chunk: Sequence[ReportEmail], result: Dict[str, Any]):
+        params = [
+            {"from": self.sender, "to": email.to, "subject": email.subject, "html": email.html}
+            for email in chunk
+        ]
+        async with self._limit:
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                try:
+                    self.requests += 1
+                    response = await asyncio.to_thread(self._post, params)
+                    break
+                except RateLimitError as e:
+                    if attempt == RATE_LIMIT_RETRIES:
+                        self._fail(chunk, str(e), result)
+                        return
+                    await asyncio.sleep(RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt)
+                except Exception as e:
+                    self._fail(chunk, str(e), result)
+                    return
+
+        # Permissive validation: ids for the accepted emails, in order, plus
+        # an error per rejected index
+        rejected = {error["index"]: error["message"] for error in response.get("errors") or []}
+        for index, email in enumerate(chunk):
+            if index in rejected:
+                result["failed_count"] += 1
+                result["errors"].append(f"{email.recipient}: {rejected[index]}")
+            else:
+                result["sent_count"] += 1
+        result["email_ids"].extend(item.get("id") for item in response.get("data") or [])
+
+    @staticmethod
+    def _fail(chunk: Sequence[ReportEmail], error: str, result: Dict[str, Any]):
+        result["failed_count"] += len(chunk)
+        result["errors"].extend(f"{email.recipient}: {error}" for email in chunk)
+
+
+class WeeklyReportPipeline:
+    """Weekly reports for every workspace with activity in the period"""
+
+    def __init__(self, mailer: Optional[ResendMailer] = None, frontend_url: Optional[str] = None):
+        self.mailer = mailer or ResendMailer()
+        self.frontend_url = frontend_url
+        self.rendered = 0
+
+    async def run(
+        self,
+        db: Session,
+        date_from: str,
+        date_to: str,
+        extra_recipients: Optional[List[str]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Send individual reports to the members of every workspace, plus the
+        full report to extra_recipients, for each workspace with activity
+
+        Loading and rendering are blocking and run in a thread; only the
+        sends happen on the event loop.
+
+        Returns:
+            Send result per workspace id
+        """
+        workspaces, emails_by_workspace, renderer = await asyncio.to_thread(
+            self._prepare, db, date_from, date_to, extra_recipients
+        )
+        jobs = {
+            workspace_id: self._send_workspace(emails, activity_count)
+            for workspace_id, (emails, activity_count) in emails_by_workspace.items()
+        }
+
+        self.rendered = renderer.rendered
+        results = dict(zip(jobs, await asyncio.gather(*jobs.values(), return_exceptions=True)))
+
+        for workspace_id, result in results.items():
+            name = workspaces[workspace_id].name
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send reports for workspace {name}: {result}")
+                continue
+            logger.info(f"Workspace {name}: {result['sent_count']} sent, {result['failed_count']} failed")
+            for error in result["errors"]:
+                logger.error(f"  - {error}")
+
+        logger.info(
+            f"Weekly reports: {len(results)} workspace(s), {renderer.rendered} report(s) rendered, "
+            f"{self.mailer.requests} Resend request(s)"
+        )
+        return results
+
+    def _prepare(
+        self,
+        db: Session,
+        date_from: str,
+        date_to: str,
+        extra_recipients: Optional[List[str]]
+    ) -> Tuple[Dict[int, Workspace], Dict[int, Tuple[List[ReportEmail], int]], ReportRenderer]:
+        """Load the period's activities and members and render every workspace's emails"""
+        # Local import: field_activity_service builds on this module
+        from app.services.field_activity_service import FieldActivityReportService
+
+        workspaces = {workspace.id: workspace for workspace in db.query(Workspace).all()}
+
+        activities_by_workspace: Dict[int, List[FieldActivity]] = defaultdict(list)
+        activities = db.query(FieldActivity).options(
+            selectinload(FieldActivity.support_staff)
+        ).filter(
+            FieldActivity.activity_date >= date_from,
+            FieldActivity.activity_date <= date_to
+        ).order_by(
+            FieldActivity.activity_date,
+            FieldActivity.start_time
+        ).all()
+        for activity in activities:
+            activities_by_workspace[activity.workspace_id].append(activity)
+
+        members_by_workspace: Dict[int, List[User]] = defaultdict(list)
+        if activities_by_workspace:
+            rows = db.query(WorkspaceMember.workspace_id, User).join(
+                User, WorkspaceMember.user_id == User.id
+            ).filter(
+                WorkspaceMember.workspace_id.in_(list(activities_by_workspace))
+            ).all()
+            for workspace_id, user in rows:
+                members_by_workspace[workspace_id].append(user)
+
+        renderer = ReportRenderer(date_from, date_to, self.frontend_url)
+        emails_by_workspace = {}
+        for workspace_id, workspace in workspaces.items():
+            workspace_activities = activities_by_workspace.get(workspace_id)
+            if not workspace_activities:
+                logger.info(f"No activities found for workspace {workspace.name}")
+                continue
+
+            emails = FieldActivityReportService.build_individual_emails(
+                workspace_id, workspace_activities, members_by_workspace[workspace_id], renderer
+            )
+            if extra_recipients:
+                emails.append(FieldActivityReportService.build_full_report_email(
+                    workspace_id, workspace_activities, extra_recipients, renderer
+                ))
+            emails_by_workspace[workspace_id] = (emails, len(workspace_activities))
+
+        return workspaces, emails_by_workspace, renderer
+
+    async def _send_workspace(self, emails: List[ReportEmail], activity_count: int) -> Dict[str, Any]:
+        """mailer.send, plus the workspace's activity count and send time for the job ledger"""
+        started = time.perf_counter()
+        result = await self.mailer.send(emails)
+        result["activities"] = activity_count
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        return result
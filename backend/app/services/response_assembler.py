@@ -0,0 +1,179 @@
+"""
+Response Assembler
+Builds list responses in a fixed number of queries: related rows are loaded
+eagerly and every *_name field is filled from a single per-request user
+lookup, instead of lazy-loading users row by row.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.user import User
+from app.models.task import Task
+from app.models.field_activity import FieldActivity, FieldActivityComment, TaskCategory
+from app.models.meeting_minute import MeetingMinute, MinuteAttachment, MinuteActionItem
+from app.schemas.task import TaskResponse
+from app.schemas.field_activity import FieldActivityCommentResponse
+
+
+def display_name(user: Optional[User]) -> Optional[str]:
+    """Name shown for a user in responses (full name, falling back to username)"""
+    if user is None:
+        return None
+    return user.full_name or user.username
+
+
+class UserNameMap:
+    """
+    Per-request map of user id -> display name and avatar
+
+    Seed it with users already in memory (usually current_user), then load()
+    the ids a response needs; only ids not seen yet are fetched, in one query.
+    """
+
+    def __init__(self, *users: User):
+        self._users: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        for user in users:
+            self.add(user)
+
+    def add(self, user: User) -> None:
+        """Record a user that is already loaded"""
+        self._users[user.id] = (display_name(user), user.avatar_url)
+
+    def _missing_query(self, user_ids: Iterable[Optional[int]]):
+        """SELECT for the ids not in the map yet, or None when nothing is missing"""
+        missing = {user_id for user_id in user_ids if user_id is not None} - self._users.keys()
+        if not missing:
+            return None
+        return select(User.id, User.full_name, User.username, User.avatar_url).where(User.id.in_(missing))
+
+    def _add_rows(self, rows) -> None:
+        for user_id, full_name, username, avatar_url in rows:
+            self._users[user_id] = (full_name or username, avatar_url)
+
+    def load(self, db: Session, user_ids: Iterable[Optional[int]]) -> "UserNameMap":
+        """Fetch any missing users (sync sessions)"""
+        query = self._missing_query(user_ids)
+        if query is not None:
+            self._add_rows(db.execute(query).all())
+        return self
+
+    async def load_async(self, db: AsyncSession, user_ids: Iterable[Optional[int]]) -> "UserNameMap":
+        """Fetch any missing users (async sessions)"""
+        query = self._missing_query(user_ids)
+        if query is not None:
+            self._add_rows((await db.execute(query)).all())
+        return self
+
+    def name(self, user_id: Optional[int]) -> Optional[str]:
+        if user_id is None:
+            return None
+        return self._users.get(user_id, (None, None))[0]
+
+    def avatar(self, user_id: Optional[int]) -> Optional[str]:
+        if user_id is None:
+            return None
+        return self._users.get(user_id, (None, None))[1]
+
+
+class ResponseAssembler:
+    """Eager-load options and *_name population shared by list endpoints"""
+
+    # FieldActivityResponse nests task_category and its created_by_user
+    FIELD_ACTIVITY_OPTIONS = (
+        selectinload(FieldActivity.task_category).selectinload(TaskCategory.created_by_user),
+    )
+
+    @staticmethod
+    def task_user_ids(tasks: Iterable[Task]) -> set:
+        """User ids referenced by a list of tasks"""
+        ids = set()
+        for task in tasks:
+            ids.add(task.creator_id)
+            ids.add(task.assignee_id)
+        return ids
+
+    @staticmethod
+    def tasks(tasks: Iterable[Task], names: UserNameMap) -> List[TaskResponse]:
+        """Build TaskResponse objects with assignee/creator names"""
+        response_tasks = []
+        for task in tasks:
+            task_response = TaskResponse.model_validate(task)
+            task_response.assignee_name = names.name(task.assignee_id)
+            task_response.creator_name = names.name(task.creator_id)
+            response_tasks.append(task_response)
+        return response_tasks
+
+    @staticmethod
+    async def field_activities(
+        db: AsyncSession,
+        activities: List[FieldActivity],
+        names: UserNameMap
+    ) -> List[FieldActivity]:
+        """Populate support_staff/created_by/updated_by names on field activities"""
+        user_ids = set()
+        for activity in activities:
+            user_ids.update((activity.support_staff_id, activity.created_by, activity.updated_by))
+        await names.load_async(db, user_ids)
+
+        for activity in activities:
+            activity.support_staff_name = names.name(activity.support_staff_id)
+            activity.created_by_name = names.name(activity.created_by)
+            if activity.updated_by:
+                activity.updated_by_name = names.name(activity.updated_by)
+        return activities
+
+    @staticmethod
+    async def meeting_minutes(
+        db: AsyncSession,
+        minutes: List[MeetingMinute],
+        names: UserNameMap
+    ) -> List[MeetingMinute]:
+        """Populate author names and attachment/action item counts on meeting minutes"""
+        if not minutes:
+            return minutes
+
+        minute_ids = [minute.id for minute in minutes]
+        attachment_counts = dict((await db.execute(select(
+            MinuteAttachment.meeting_minute_id, func.count(MinuteAttachment.id)
+        ).where(
+            MinuteAttachment.meeting_minute_id.in_(minute_ids)
+        ).group_by(MinuteAttachment.meeting_minute_id))).all())
+        action_item_counts = dict((await db.execute(select(
+            MinuteActionItem.meeting_minute_id, func.count(MinuteActionItem.id)
+        ).where(
+            MinuteActionItem.meeting_minute_id.in_(minute_ids)
+        ).group_by(MinuteActionItem.meeting_minute_id))).all())
+
+        user_ids = set()
+        for minute in minutes:
+            user_ids.update((minute.created_by, minute.updated_by))
+        await names.load_async(db, user_ids)
+
+        for minute in minutes:
+            minute.created_by_name = names.name(minute.created_by)
+            if minute.updated_by:
+                minute.updated_by_name = names.name(minute.updated_by)
+            minute.attachment_count = attachment_counts.get(minute.id, 0)
+            minute.action_item_count = action_item_counts.get(minute.id, 0)
+        return minutes
+
+    @staticmethod
+    async def activity_comments(
+        db: AsyncSession,
+        comments: List[FieldActivityComment],
+        names: UserNameMap
+    ) -> List[FieldActivityCommentResponse]:
+        """Build FieldActivityCommentResponse objects with author name and avatar"""
+        await names.load_async(db, {comment.user_id for comment in comments})
+
+        response_comments = []
+        for comment in comments:
+            comment_response = FieldActivityCommentResponse.model_validate(comment)
+            comment_response.user_name = names.name(comment.user_id)
+            comment_response.user_avatar = names.avatar(comment.user_id)
+            response_comments.append(comment_response)
+        return response_comments
@@ -0,0 +1,397 @@
+"""
+Resumable Uploads
+Chunked uploads that survive dropped connections, after the tus protocol
+(https://tus.io), so a field photo sent over a flaky mobile link resumes
+where it stopped instead of starting over.
+
+  POST   <resource>/resumable                 declare the file: name, type, size[, sha256]
+  HEAD   /api/uploads/resumable/{id}          Upload-Offset: bytes received so far
+  PATCH  /api/uploads/resumable/{id}          append the body at Upload-Offset
+  DELETE /api/uploads/resumable/{id}          abandon the upload
+  POST   <resource>/resumable/{id}/complete   attach the finished file
+
+Received bytes are staged in UPLOAD_STAGING_DIR (one file per upload, its
+size is the offset). A PATCH cut off mid-body keeps what arrived, unless it
+carries an Upload-Checksum for the chunk, in which case an incomplete or
+corrupt chunk is dropped. Completing the upload checks the whole file (size
+limit, sniffed type, declared sha256) and stores it through the BlobStore
+like any other upload.
+
+Uploads not completed within RESUMABLE_UPLOAD_EXPIRE_HOURS of their last
+chunk are removed by an upload.expire outbox message.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import AsyncIterator, Collection, Dict, Optional, Tuple, Union
+
+import aiofiles
+from fastapi import HTTPException, status
+from sqlalchemy import event, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from starlette.requests import ClientDisconnect
+
+from app.config import settings
+from app.database import run_sync
+from app.models.blob import Blob
+from app.models.upload_session import UploadSession
+from app.schemas.upload import ResumableUploadResponse
+from app.services.blob_store import BlobStore
+from app.services.outbox import Outbox
+from app.services.outbox_handlers import TOPIC_UPLOAD_EXPIRE
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = "1.0.0"
+PATCH_CONTENT_TYPE = "application/offset+octet-stream"
+HTTP_CHECKSUM_MISMATCH = 460  # tus checksum extension
+
+# How long a PATCH may hold an upload; chunks are expected to take far less
+PATCH_LEASE_SECONDS = 600
+
+STAGED_FILES_KEY = "resumable_upload_staged_files"
+
+
+def staging_path(upload_id: str) -> str:
+    return os.path.join(settings.UPLOAD_STAGING_DIR, upload_id)
+
+
+def _received(upload_id: str) -> int:
+    try:
+        return os.path.getsize(staging_path(upload_id))
+    except FileNotFoundError:
+        return 0
+
+
+def _parse_checksum(header: str) -> bytes:
+    """Upload-Checksum: "sha256 <base64 digest>" (sha256 is the one algorithm supported)"""
+    algorithm, _, encoded = header.strip().partition(" ")
+    if algorithm.lower() != "sha256":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload-Checksum algorithm must be sha256"
+        )
+    try:
+        return base64.b64decode(encoded.strip(), validate=True)
+    except binascii.Error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload-Checksum digest must be base64"
+        )
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ResumableUploads:
+    """Resumable upload sessions and their staged files"""
+
+    @staticmethod
+    def create(
+        db: Session,
+        scope: str,
+        user_id: int,
+        filename: str,
+        content_type: str,
+        size: int,
+        sha256: Optional[str],
+        allowed_types: Collection[str],
+        max_size: Optional[int] = None
+    ) -> UploadSession:
+        """
+        Start an upload (the caller commits)
+
+        Args:
+            scope: What the upload will be attached to, e.g. "photo:12";
+                finalize() must be called with the same scope
+
+        Raises:
+            HTTPException: 413 past max_size, 400 for a type not allowed or
+                a malformed hash
+        """
+        BlobStore.check_declared(size, content_type, sha256, allowed_types, max_size)
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            scope=scope,
+            user_id=user_id,
+            filename=filename,
+            content_type=content_type,
+            size=size,
+            sha256=sha256,
+            expires_at=ResumableUploads._expiry()
+        )
+        db.add(session)
+        Outbox.enqueue(
+            db, TOPIC_UPLOAD_EXPIRE, {"upload_id": session.id},
+            delay_seconds=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS * 3600 + 60
+        )
+        return session
+
+    @staticmethod
+    def get(db: Session, upload_id: str, user_id: int) -> UploadSession:
+        """The user's unexpired upload (404 otherwise)"""
+        session = db.get(UploadSession, upload_id)
+        if session is None or session.user_id != user_id or session.expires_at <= datetime.utcnow():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found"
+            )
+        return session
+
+    @staticmethod
+    def offset(session: UploadSession) -> int:
+        return _received(session.id)
+
+    @staticmethod
+    def headers(session: UploadSession, offset: int) -> Dict[str, str]:
+        """tus response headers describing the upload"""
+        return {
+            "Tus-Resumable": TUS_VERSION,
+            "Upload-Offset": str(offset),
+            "Upload-Length": str(session.size),
+            "Upload-Expires": format_datetime(session.expires_at.replace(tzinfo=timezone.utc), usegmt=True),
+            "Cache-Control": "no-store"
+        }
+
+    @staticmethod
+    def describe(session: UploadSession) -> ResumableUploadResponse:
+        return ResumableUploadResponse(
+            upload_id=session.id,
+            url=f"/api/uploads/resumable/{session.id}",
+            offset=ResumableUploads.offset(session),
+            size=session.size,
+            expires_at=session.expires_at
+        )
+
+    @staticmethod
+    async def append(
+        db: Union[Session, AsyncSession],
+        session: UploadSession,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        checksum: Optional[str] = None
+    ) -> int:
+        """
+        Append a PATCH body to the staged file (commits)
+
+        Args:
+            offset: The client's Upload-Offset; must be the bytes received
+            chunks: The request body
+            checksum: The client's Upload-Checksum for this body, if any
+
+        Returns:
+            The new offset. If the client disconnected, it includes what
+            arrived before (nothing, if a checksum was given).
+
+        Raises:
+            HTTPException: 423 while another PATCH holds the upload, 409 for
+                the wrong offset, 413 past the declared size, 460 if the
+                body does not match checksum, 400 for a malformed checksum
+        """
+        expected = _parse_checksum(checksum) if checksum else None
+        # Read before _lock commits: loading them again would hold a
+        # connection while the body arrives
+        upload_id, size = session.id, session.size
+        await run_sync(db, ResumableUploads._lock, upload_id)
+        try:
+            start = _received(upload_id)
+            if offset != start:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Upload-Offset is {offset}, {start} bytes have been received"
+                )
+
+            path = staging_path(upload_id)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            digest = hashlib.sha256()
+            received = 0
+            disconnected = False
+            async with aiofiles.open(path, "ab") as f:
+                try:
+                    async for chunk in chunks:
+                        if start + received + len(chunk) > size:
+                            received = -1
+                            break
+                        digest.update(chunk)
+                        await f.write(chunk)
+                        received += len(chunk)
+                except ClientDisconnect:
+                    disconnected = True
+
+            if received < 0:
+                await asyncio.to_thread(os.truncate, path, start)
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload is {size} bytes; the chunk goes past the end"
+                )
+            if expected is not None and (disconnected or digest.digest() != expected):
+                await asyncio.to_thread(os.truncate, path, start)
+                if disconnected:
+                    return start
+                raise HTTPException(status_code=HTTP_CHECKSUM_MISMATCH, detail="Checksum mismatch")
+            return start + received
+        finally:
+            await run_sync(db, ResumableUploads._unlock, session)
+
+    @staticmethod
+    async def finalize(
+        db: Union[Session, AsyncSession],
+        upload_id: str,
+        scope: str,
+        user_id: int,
+        allowed_types: Collection[str],
+        storage: str,
+        folder: Optional[str] = None,
+        max_size: Optional[int] = None,
+        type_hint: str = ""
+    ) -> Tuple[Blob, UploadSession]:
+        """
+        Store a fully received upload (the caller adds its row and commits;
+        the staged file is removed once that commits)
+
+        Returns:
+            (the blob, with a reference added for the caller's new row;
+            the finished upload: filename, content_type, ...)
+
+        Raises:
+            HTTPException: 404 for an unknown upload or another scope, 423
+                while a PATCH holds it, 409 before all bytes are received,
+                400 / 413 if the file is rejected (the upload is discarded)
+        """
+        session = await run_sync(db, ResumableUploads.get, upload_id, user_id)
+        if session.scope != scope:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found"
+            )
+        if session.locked_until is not None and session.locked_until > datetime.utcnow():
+            raise HTTPException(
+                status_code=status.HTTP_423_LOCKED,
+                detail="Upload is still receiving a chunk"
+            )
+        received = _received(upload_id)
+        if received != session.size:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: {received} of {session.size} bytes received"
+            )
+
+        try:
+            blob = await BlobStore.store_file(
+                db,
+                staging_path(upload_id),
+                session.filename,
+                session.content_type,
+                allowed_types,
+                storage,
+                folder=folder,
+                max_size=max_size,
+                type_hint=type_hint,
+                sha256=session.sha256
+            )
+        except HTTPException as e:
+            if e.status_code in (status.HTTP_400_BAD_REQUEST, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE):
+                # Sending the same bytes again won't help
+                await run_sync(db, ResumableUploads._discard_rejected, upload_id)
+            raise
+        await run_sync(db, ResumableUploads.discard, session)
+        return blob, session
+
+    @staticmethod
+    def _discard_rejected(db: Session, upload_id: str):
+        """Roll back a rejected finalize() and discard the upload (commits)"""
+        db.rollback()
+        rejected = db.get(UploadSession, upload_id)
+        if rejected is not None:
+            ResumableUploads.discard(db, rejected)
+            db.commit()
+
+    @staticmethod
+    def discard(db: Session, session: UploadSession):
+        """Delete the upload; its staged file goes once that commits"""
+        db.delete(session)
+        db.info.setdefault(STAGED_FILES_KEY, []).append(staging_path(session.id))
+
+    @staticmethod
+    def expire(db: Session, upload_id: str):
+        """Remove the upload if it has expired, otherwise check again when it will have"""
+        session = db.get(UploadSession, upload_id)
+        if session is None:
+            _remove(staging_path(upload_id))  # Finished or discarded; make sure
+            return
+
+        now = datetime.utcnow()
+        due = max(session.expires_at, session.locked_until or now)
+        if due > now:
+            Outbox.enqueue(
+                db, TOPIC_UPLOAD_EXPIRE, {"upload_id": upload_id},
+                delay_seconds=(due - now).total_seconds() + 60
+            )
+            return
+
+        ResumableUploads.discard(db, session)
+        logger.info(f"Expired resumable upload {upload_id} ({_received(upload_id)} of {session.size} bytes)")
+
+    @staticmethod
+    def _lock(db: Session, upload_id: str):
+        """Take the upload for one PATCH, or answer 423 (commits)"""
+        now = datetime.utcnow()
+        taken = db.query(UploadSession).filter(
+            UploadSession.id == upload_id,
+            or_(UploadSession.locked_until.is_(None), UploadSession.locked_until <= now)
+        ).update(
+            {UploadSession.locked_until: now + timedelta(seconds=PATCH_LEASE_SECONDS)},
+            synchronize_session=False
+        )
+        # Release the connection: the body may take minutes to arrive
+        db.commit()
+        if not taken:
+            raise HTTPException(
+                status_code=status.HTTP_423_LOCKED,
+                detail="Upload is receiving another chunk; retry once it is done"
+            )
+
+    @staticmethod
+    def _unlock(db: Session, session: UploadSession):
+        """Release the upload after a PATCH and push back its expiry (commits)"""
+        expires_at = ResumableUploads._expiry()
+        db.query(UploadSession).filter(UploadSession.id == session.id).update(
+            {UploadSession.locked_until: None, UploadSession.expires_at: expires_at},
+            synchronize_session=False
+        )
+        db.commit()
+        # The response headers describe the upload as it is now
+        set_committed_value(session, "locked_until", None)
+        set_committed_value(session, "expires_at", expires_at)
+
+    @staticmethod
+    def _expiry() -> datetime:
+        return datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS)
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_staged_files(session: Session):
+    if session.in_nested_transaction():
+        return  # a savepoint released, not the commit
+    for path in session.info.pop(STAGED_FILES_KEY, []):
+        _remove(path)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _keep_staged_files(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(STAGED_FILES_KEY, None)
@@ -0,0 +1,249 @@
+"""
+Search Service
+Ranked, index-backed search over field activities, meeting minutes and users.
+
+Activities and minutes keep a plain-text `search_text` column (title plus
+HTML-stripped body fields) that Postgres indexes twice: a GIN tsvector
+expression index for ranked full-text search and a pg_trgm index for the
+substring filters of the list endpoints. On other databases (SQLite in
+tests) the same calls fall back to LIKE matching with a term-count rank.
+"""
+
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import case, func, literal, literal_column, and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.field_activity import FieldActivity
+from app.models.meeting_minute import MeetingMinute
+from app.models.user import User
+from app.utils.sanitizer import strip_html_tags
+
+# Text search configuration; must match the expression indexes in the migration
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8, MaxFragments=2, FragmentDelimiter=\" … \""
+
+# Lowercased "full name username email" used for user search (trigram-indexed on Postgres)
+USER_SEARCH_EXPR = func.lower(
+    func.coalesce(User.full_name, literal_column("''"))
+    + literal_column("' '") + User.username
+    + literal_column("' '") + User.email
+)
+
+# Plain-text and HTML source fields of each model's search_text
+SEARCH_FIELDS = {
+    FieldActivity: (("title", "customer_name"), ("task_description", "remarks")),
+    MeetingMinute: (("title",), ("agenda", "discussions", "decisions")),
+}
+
+_SNIPPET_CHARS = 160
+
+
+def build_search_text(*parts: Optional[str], html: Sequence[Optional[str]] = ()) -> str:
+    """Join plain-text parts and HTML fields (tags stripped) into one searchable string"""
+    chunks = [part.strip() for part in parts if part and part.strip()]
+    for fragment in html:
+        text = strip_html_tags(fragment).strip()
+        if text:
+            chunks.append(text)
+    return "\n".join(chunks)
+
+
+def search_terms(query: str) -> List[str]:
+    """Lowercased words of a search query (quotes and operators dropped)"""
+    return [term for term in re.findall(r"\w+", query.lower()) if term]
+
+
+def tsquery_text(terms: Sequence[str]) -> str:
+    """
+    to_tsquery() input matching every term, the last one as a prefix so
+    results show up while the user is still typing a word
+    """
+    return " & ".join([*terms[:-1], f"{terms[-1]}:*"])
+
+
+def highlight(text: Optional[str], terms: Sequence[str]) -> str:
+    """
+    Python counterpart of ts_headline: a snippet around the first match with
+    every term wrapped in <mark>
+    """
+    if not text:
+        return ""
+    if not terms:
+        return text[:_SNIPPET_CHARS]
+
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, first.start() - _SNIPPET_CHARS // 3) if first else 0
+    snippet = text[start:start + _SNIPPET_CHARS]
+    snippet = pattern.sub(lambda match: f"<mark>{match.group(0)}</mark>", snippet)
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if start + _SNIPPET_CHARS < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+
+class SearchService:
+    """Maintains search_text columns and builds dialect-aware search clauses"""
+
+    @staticmethod
+    def index_activity(activity: FieldActivity) -> None:
+        """Refresh an activity's search_text (call after changing its text fields)"""
+        activity.search_text = SearchService._document(FieldActivity, activity)
+
+    @staticmethod
+    def index_activity_values(values: dict) -> None:
+        """index_activity() for an activity still held as column values (bulk inserts)"""
+        values["search_text"] = SearchService._document(FieldActivity, values, get=dict.get)
+
+    @staticmethod
+    def index_minute(minute: MeetingMinute) -> None:
+        """Refresh a meeting minute's search_text (call after changing its text fields)"""
+        minute.search_text = SearchService._document(MeetingMinute, minute)
+
+    @staticmethod
+    def _document(model, row, get=getattr) -> str:
+        text_fields, html_fields = SEARCH_FIELDS[model]
+        return build_search_text(
+            *(get(row, field) for field in text_fields),
+            html=[get(row, field) for field in html_fields]
+        )
+
+    @staticmethod
+    def is_postgres(db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def contains(column, term: str):
+        """
+        Case-insensitive substring filter
+
+        ILIKE on Postgres, where a pg_trgm GIN index on the column serves it;
+        lower() LIKE lower() elsewhere. LIKE wildcards in `term` are escaped.
+        """
+        return column.icontains(term, autoescape=True)
+
+    @staticmethod
+    def ranked(db: Session, column, query: str):
+        """
+        Match, rank and highlight expressions for a ranked search on `column`
+
+        `query` must contain at least one word (see search_terms()).
+
+        Returns:
+            (match clause, rank expression, highlight expression). On
+            Postgres the highlight is ts_headline output; on the fallback it
+            is the raw column, to be passed through highlight() in Python.
+        """
+        terms = search_terms(query)
+        if SearchService.is_postgres(db):
+            vector = func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, literal_column("''")))
+            tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text(terms))
+            match = vector.op("@@")(tsquery)
+            rank = func.ts_rank_cd(vector, tsquery)
+            headline = func.ts_headline(SEARCH_CONFIG, column, tsquery, literal(HEADLINE_OPTIONS))
+            return match, rank, headline
+
+        match = and_(*(SearchService.contains(column, term) for term in terms))
+        rank = sum(
+            (case((SearchService.contains(column, term), 1), else_=0) for term in terms),
+            literal(0)
+        )
+        return match, rank, column
+
+    @staticmethod
+    def search(
+        db: Session,
+        model,
+        query: str,
+        filters: Sequence = (),
+        date_column=None,
+        limit: int = 20,
+        base=None
+    ) -> list:
+        """
+        Ranked search over a model with a search_text column
+
+        Args:
+            db: Database session
+            model: FieldActivity or MeetingMinute
+            query: Search text as typed by the user
+            filters: Extra WHERE clauses (workspace, visibility, ...)
+            date_column: Tie-breaker ordering (newest first)
+            limit: Maximum number of results
+            base: Optional select() to start from (e.g. one with joins)
+
+        Returns:
+            Rows of (model instance, rank, highlight); empty when the query
+            has no searchable words
+        """
+        if not search_terms(query):
+            return []
+
+        match, rank, headline = SearchService.ranked(db, model.search_text, query)
+        stmt = base if base is not None else select(model)
+        order = [rank.desc()]
+        if date_column is not None:
+            order.append(date_column.desc())
+        order.append(model.id.desc())
+
+        stmt = stmt.add_columns(
+            rank.label("rank"), headline.label("highlight")
+        ).where(match, *filters).order_by(*order).limit(limit)
+        rows = db.execute(stmt).all()
+
+        if SearchService.is_postgres(db):
+            return [(row[0], float(row.rank), row.highlight or "") for row in rows]
+        terms = search_terms(query)
+        return [(row[0], float(row.rank), highlight(row.highlight, terms)) for row in rows]
+
+    @staticmethod
+    def search_users(db: Session, query: str, limit: int = 10) -> List[User]:
+        """
+        Users whose name, username or email contains `query`
+
+        Prefix matches come first, then shorter (closer) matches. On Postgres
+        the substring filter is served by the trigram index on USER_SEARCH_EXPR.
+        """
+        needle = query.strip().lower()
+        prefix = or_(
+            func.lower(User.username).startswith(needle, autoescape=True),
+            func.lower(User.email).startswith(needle, autoescape=True),
+            func.lower(User.full_name).startswith(needle, autoescape=True)
+        )
+        stmt = select(User).where(
+            USER_SEARCH_EXPR.contains(needle, autoescape=True)
+        ).order_by(
+            case((prefix, 0), else_=1), func.length(USER_SEARCH_EXPR), User.id
+        ).limit(limit)
+        return list(db.scalars(stmt))
+
+    @staticmethod
+    def rebuild(db: Session, batch_size: int = 500) -> int:
+        """
+        Recompute search_text for every activity and meeting minute
+
+        Only the source columns are read, in id-ordered batches, and written
+        back with a bulk UPDATE per batch. The caller commits.
+
+        Returns:
+            Number of rows updated
+        """
+        updated = 0
+        for model, (text_fields, html_fields) in SEARCH_FIELDS.items():
+            columns = [getattr(model, field) for field in text_fields + html_fields]
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(model.id, *columns).where(model.id > last_id).order_by(model.id).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                db.execute(update(model), [
+                    {"id": row.id, "search_text": SearchService._document(model, row)}
+                    for row in rows
+                ])
+                updated += len(rows)
+                last_id = rows[-1].id
+        return updated
@@ -0,0 +1,490 @@
+"""
+Storage
+Where uploaded files live: local disk, an S3-compatible bucket (AWS S3,
+MinIO for local development) or Cloudinary, behind one driver interface.
+
+Each driver stores objects under keys, reports what it holds, and hands out
+presigned requests: a client PUTs (or, for Cloudinary, POSTs) a file
+straight to storage and fetches it back from a storage URL, so file bytes
+don't pass through an API worker. Blobs (BlobStore) record which driver and
+key hold their content.
+
+Driver methods block (disk, HTTP): from async code, run them with
+driver.call(), in the driver's worker threads.
+
+- local: keys are file paths under UPLOAD_DIR, served by the /uploads
+  mount. Its "presigned" PUT is a signed, expiring API URL
+  (PUT /api/uploads/local/{token}), so local uploads do pass through the
+  API; use it for development and single-host installs.
+- s3: keys are object keys in S3_BUCKET (behind S3_KEY_PREFIX). Presigned
+  PUTs carry the declared size and SHA-256 checksum, which S3 and MinIO
+  enforce; GETs are presigned unless S3_PUBLIC_URL serves the bucket.
+- cloudinary: keys are public_ids. Direct uploads are signed upload form
+  posts; Cloudinary can't check a declared hash.
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Callable, Dict, Optional, TypeVar
+
+import httpx
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.models.blob import BLOB_STORAGE_CLOUDINARY, BLOB_STORAGE_LOCAL, BLOB_STORAGE_S3
+from app.utils.uploads import CHUNK_SIZE, upload_url
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StorageError(RuntimeError):
+    """A driver is misconfigured or the storage service refused a request"""
+
+
+@dataclass
+class StoredObject:
+    """What a driver stored"""
+    key: str
+    url: Optional[str] = None  # permanent public URL, if the storage has one
+    resource_type: Optional[str] = None  # Cloudinary resource type
+
+
+@dataclass
+class ObjectStat:
+    size: int
+    sha256: Optional[str] = None  # hex, when the storage verified it on upload
+
+
+@dataclass
+class PresignedUpload:
+    """An HTTP request the client sends to put a file into storage"""
+    method: str
+    url: str
+    expires_at: datetime
+    headers: Dict[str, str] = field(default_factory=dict)
+    fields: Dict[str, str] = field(default_factory=dict)  # form fields (POST), file goes in "file"
+
+
+def sign_token(claims: Dict[str, Any], expires_in: int) -> str:
+    """A signed, expiring token for claims (typ names what it grants)"""
+    return jwt.encode(
+        {**claims, "exp": datetime.utcnow() + timedelta(seconds=expires_in)},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+
+def verify_token(token: str, typ: str) -> Optional[Dict[str, Any]]:
+    """The claims of a valid, unexpired token of this typ, else None"""
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return claims if claims.get("typ") == typ else None
+
+
+def resource_type_for(mime_type: str) -> str:
+    return "image" if mime_type.startswith("image/") else "raw"
+
+
+def object_name(sha256: str, filename: Optional[str]) -> str:
+    """
+    <2 hex>/<sha256>-<nonce><ext>
+
+    The nonce gives each blob row an object of its own, so collecting a
+    released blob can never remove an object a newer blob with the same
+    content has just stored.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    return f"{sha256[:2]}/{sha256}-{uuid.uuid4().hex[:8]}{extension}"
+
+
+class StorageDriver:
+    """Interface every storage implements"""
+
+    name: str = ""
+    verifies_content: bool = True  # sha256() works: direct uploads can be deduplicated
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """Threads call() uses (None: asyncio's default pool)"""
+        return None
+
+    async def call(self, function: Callable[..., T], *args) -> T:
+        """Run a blocking function (a driver method, or one calling them) in the driver's threads"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(function, *args))
+
+    def new_key(self, sha256: str, filename: Optional[str], content_type: str, folder: Optional[str] = None) -> str:
+        """A fresh key for content with this hash"""
+        raise NotImplementedError
+
+    def put(self, source: BinaryIO, key: str, content_type: str) -> StoredObject:
+        """Store source (read from its current position) under key"""
+        raise NotImplementedError
+
+    def put_file(self, path: str, key: str, content_type: str) -> StoredObject:
+        """Store the file at path under key (the file is left in place)"""
+        with open(path, "rb") as source:
+            return self.put(source, key, content_type)
+
+    def stat(self, key: str, resource_type: Optional[str] = None) -> Optional[ObjectStat]:
+        """Size (and verified hash) of the object, None if there is none"""
+        raise NotImplementedError
+
+    def read_head(self, key: str, length: int, resource_type: Optional[str] = None) -> bytes:
+        """The object's first bytes"""
+        raise NotImplementedError
+
+    def download(self, key: str, destination: BinaryIO, resource_type: Optional[str] = None):
+        """Copy the object into destination"""
+        raise NotImplementedError
+
+    def delete(self, key: str, resource_type: Optional[str] = None):
+        """Remove the object; no error if it is already gone"""
+        raise NotImplementedError
+
+    def url(self, key: str, filename: Optional[str] = None, resource_type: Optional[str] = None) -> Optional[str]:
+        """Where a client downloads the object (may be presigned and expire)"""
+        raise NotImplementedError
+
+    def presign_put(self, key: str, content_type: str, size: int, sha256: str) -> PresignedUpload:
+        """A request that stores exactly this file under key"""
+        raise NotImplementedError
+
+    def sha256(self, key: str, resource_type: Optional[str] = None) -> Optional[str]:
+        """
+        Hex SHA-256 of the object: the storage's verified checksum if it
+        has one, else computed by reading the object
+        """
+        stat = self.stat(key, resource_type)
+        if stat is None:
+            return None
+        if stat.sha256:
+            return stat.sha256
+        digest = _HashingWriter()
+        self.download(key, digest, resource_type)
+        return digest.hexdigest()
+
+
+class _HashingWriter:
+    """A write-only file that only hashes what is written to it"""
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self._digest.update(data)
+        return len(data)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class LocalStorage(StorageDriver):
+    """Files under UPLOAD_DIR; keys are the file paths"""
+
+    name = BLOB_STORAGE_LOCAL
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.UPLOAD_DIR
+
+    def new_key(self, sha256: str, filename: Optional[str], content_type: str, folder: Optional[str] = None) -> str:
+        return os.path.join(self.root, "blobs", *object_name(sha256, filename).split("/"))
+
+    def put(self, source: BinaryIO, key: str, content_type: str) -> StoredObject:
+        partial = f"{key}.{uuid.uuid4().hex[:8]}.part"
+        os.makedirs(os.path.dirname(partial) or ".", exist_ok=True)
+        try:
+            with open(partial, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+            os.replace(partial, key)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return StoredObject(key=key)
+
+    def put_file(self, path: str, key: str, content_type: str) -> StoredObject:
+        # A hard link where possible: no copy, and the file at path can still
+        # be removed (or kept, if the caller's transaction rolls back)
+        os.makedirs(os.path.dirname(key) or ".", exist_ok=True)
+        try:
+            os.link(path, key)
+        except OSError:  # another file system, or no hard links
+            return super().put_file(path, key, content_type)
+        return StoredObject(key=key)
+
+    def stat(self, key: str, resource_type: Optional[str] = None) -> Optional[ObjectStat]:
+        try:
+            return ObjectStat(size=os.path.getsize(key))
+        except FileNotFoundError:
+            return None
+
+    def read_head(self, key: str, length: int, resource_type: Optional[str] = None) -> bytes:
+        with open(key, "rb") as f:
+            return f.read(length)
+
+    def download(self, key: str, destination: BinaryIO, resource_type: Optional[str] = None):
+        with open(key, "rb") as f:
+            shutil.copyfileobj(f, destination, CHUNK_SIZE)
+
+    def delete(self, key: str, resource_type: Optional[str] = None):
+        try:
+            os.remove(key)
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str, filename: Optional[str] = None, resource_type: Optional[str] = None) -> Optional[str]:
+        return upload_url(key)
+
+    def presign_put(self, key: str, content_type: str, size: int, sha256: str) -> PresignedUpload:
+        expires_in = settings.STORAGE_PRESIGN_EXPIRES_SECONDS
+        token = sign_token(
+            {"typ": "local_put", "key": key, "size": size, "sha256": sha256},
+            expires_in
+        )
+        return PresignedUpload(
+            method="PUT",
+            url=f"/api/uploads/local/{token}",
+            expires_at=datetime.utcnow() + timedelta(seconds=expires_in),
+            headers={"Content-Type": content_type}
+        )
+
+
+class S3Storage(StorageDriver):
+    """An S3-compatible bucket (AWS S3, MinIO)"""
+
+    name = BLOB_STORAGE_S3
+
+    def __init__(self, client=None):
+        if not settings.S3_BUCKET:
+            raise StorageError("S3_BUCKET is not set")
+        if client is None:
+            try:
+                import boto3
+                from botocore.config import Config
+            except ImportError:
+                raise StorageError("The boto3 package is required for S3 storage")
+            client = boto3.client(
+                "s3",
+                endpoint_url=settings.S3_ENDPOINT_URL or None,
+                region_name=settings.S3_REGION or None,
+                aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+                aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+                config=Config(
+                    signature_version="s3v4",
+                    # MinIO and most stand-ins only route bucket paths
+                    s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"}
+                )
+            )
+        self.client = client
+        self.bucket = settings.S3_BUCKET
+
+    def new_key(self, sha256: str, filename: Optional[str], content_type: str, folder: Optional[str] = None) -> str:
+        return f"{settings.S3_KEY_PREFIX}blobs/{object_name(sha256, filename)}"
+
+    def put(self, source: BinaryIO, key: str, content_type: str) -> StoredObject:
+        self.client.upload_fileobj(
+            source, self.bucket, key,
+            ExtraArgs={"ContentType": content_type, "ChecksumAlgorithm": "SHA256"}
+        )
+        return StoredObject(key=key, url=self._public_url(key))
+
+    def stat(self, key: str, resource_type: Optional[str] = None) -> Optional[ObjectStat]:
+        from botocore.exceptions import ClientError
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        checksum = head.get("ChecksumSHA256")
+        # Multipart uploads report a checksum of part checksums ("...-<parts>")
+        sha256 = base64.b64decode(checksum).hex() if checksum and "-" not in checksum else None
+        return ObjectStat(size=head["ContentLength"], sha256=sha256)
+
+    def read_head(self, key: str, length: int, resource_type: Optional[str] = None) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes=0-{length - 1}")
+        return response["Body"].read()
+
+    def download(self, key: str, destination: BinaryIO, resource_type: Optional[str] = None):
+        self.client.download_fileobj(self.bucket, key, destination)
+
+    def delete(self, key: str, resource_type: Optional[str] = None):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url(self, key: str, filename: Optional[str] = None, resource_type: Optional[str] = None) -> Optional[str]:
+        public = self._public_url(key)
+        if public:
+            return public
+        params = {"Bucket": self.bucket, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'inline; filename="{_quote(filename)}"'
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=settings.STORAGE_PRESIGN_EXPIRES_SECONDS
+        )
+
+    def presign_put(self, key: str, content_type: str, size: int, sha256: str) -> PresignedUpload:
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        expires_in = settings.STORAGE_PRESIGN_EXPIRES_SECONDS
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentType": content_type,
+                "ContentLength": size,
+                "ChecksumSHA256": checksum
+            },
+            ExpiresIn=expires_in
+        )
+        return PresignedUpload(
+            method="PUT",
+            url=url,
+            expires_at=datetime.utcnow() + timedelta(seconds=expires_in),
+            headers={"Content-Type": content_type, "x-amz-checksum-sha256": checksum}
+        )
+
+    def _public_url(self, key: str) -> Optional[str]:
+        if settings.S3_PUBLIC_URL:
+            return f"{settings.S3_PUBLIC_URL.rstrip('/')}/{key}"
+        return None
+
+
+class CloudinaryStorage(StorageDriver):
+    """Cloudinary; keys are public_ids"""
+
+    name = BLOB_STORAGE_CLOUDINARY
+    verifies_content = False  # reading every upload back would cost a download each
+
+    def __init__(self):
+        from app.utils.cloudinary import init_cloudinary
+        if not init_cloudinary():
+            raise StorageError("Cloudinary credentials are not set")
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        # Bounded: each call holds a thread for a whole transfer
+        from app.utils.cloudinary import get_executor
+        return get_executor()
+
+    def new_key(self, sha256: str, filename: Optional[str], content_type: str, folder: Optional[str] = None) -> str:
+        name = object_name(sha256, filename).split("/")[1]
+        if resource_type_for(content_type) == "image":
+            name = os.path.splitext(name)[0]  # image public_ids carry no extension
+        return f"{folder}/{name}" if folder else name
+
+    def put(self, source: BinaryIO, key: str, content_type: str) -> StoredObject:
+        import cloudinary.uploader
+        resource_type = resource_type_for(content_type)
+        result = cloudinary.uploader.upload(
+            source,
+            public_id=key,
+            resource_type=resource_type,
+            overwrite=False
+        )
+        return StoredObject(key=result["public_id"], url=result["secure_url"], resource_type=resource_type)
+
+    def stat(self, key: str, resource_type: Optional[str] = None) -> Optional[ObjectStat]:
+        import cloudinary.api
+        try:
+            resource = cloudinary.api.resource(key, resource_type=resource_type or "image")
+        except cloudinary.api.NotFound:
+            return None
+        return ObjectStat(size=resource["bytes"])
+
+    def read_head(self, key: str, length: int, resource_type: Optional[str] = None) -> bytes:
+        url = self.url(key, resource_type=resource_type)
+        response = httpx.get(url, headers={"Range": f"bytes=0-{length - 1}"}, follow_redirects=True)
+        response.raise_for_status()
+        return response.content[:length]
+
+    def download(self, key: str, destination: BinaryIO, resource_type: Optional[str] = None):
+        with httpx.stream("GET", self.url(key, resource_type=resource_type), follow_redirects=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes(CHUNK_SIZE):
+                destination.write(chunk)
+
+    def delete(self, key: str, resource_type: Optional[str] = None):
+        import cloudinary.uploader
+        result = cloudinary.uploader.destroy(key, resource_type=resource_type or "image", invalidate=True)
+        if result.get("result") not in ("ok", "not found"):
+            raise StorageError(f"Cloudinary destroy returned {result}")
+
+    def url(self, key: str, filename: Optional[str] = None, resource_type: Optional[str] = None) -> Optional[str]:
+        import cloudinary.utils
+        return cloudinary.utils.cloudinary_url(key, resource_type=resource_type or "image", secure=True)[0]
+
+    def presign_put(self, key: str, content_type: str, size: int, sha256: str) -> PresignedUpload:
+        import cloudinary.utils
+        resource_type = resource_type_for(content_type)
+        fields = {
+            "public_id": key,
+            "timestamp": str(int(time.time())),
+            "overwrite": "false"
+        }
+        fields["signature"] = cloudinary.utils.api_sign_request(fields, settings.CLOUDINARY_API_SECRET)
+        fields["api_key"] = settings.CLOUDINARY_API_KEY
+        return PresignedUpload(
+            method="POST",
+            url=cloudinary.utils.cloudinary_api_url("upload", resource_type=resource_type),
+            # Cloudinary accepts a signature for an hour
+            expires_at=datetime.utcnow() + timedelta(hours=1),
+            fields=fields
+        )
+
+
+def _quote(filename: str) -> str:
+    return filename.replace("\\", "_").replace('"', "_")
+
+
+DRIVERS = {
+    BLOB_STORAGE_LOCAL: LocalStorage,
+    BLOB_STORAGE_S3: S3Storage,
+    BLOB_STORAGE_CLOUDINARY: CloudinaryStorage,
+}
+
+_drivers: Dict[str, StorageDriver] = {}
+_drivers_lock = threading.Lock()
+
+
+def get_storage(name: str) -> StorageDriver:
+    """The driver for a storage name (one instance per process)"""
+    driver = _drivers.get(name)
+    if driver is None:
+        if name not in DRIVERS:
+            raise StorageError(f"Unknown storage '{name}'")
+        with _drivers_lock:
+            driver = _drivers.get(name)
+            if driver is None:
+                driver = _drivers[name] = DRIVERS[name]()
+    return driver
+
+
+def object_url(
+    storage: Optional[str],
+    key: Optional[str],
+    filename: Optional[str] = None,
+    resource_type: Optional[str] = None
+) -> Optional[str]:
+    """Download URL of a stored object, None if it can't be given"""
+    if not key:
+        return None
+    try:
+        return get_storage(storage or BLOB_STORAGE_LOCAL).url(key, filename, resource_type)
+    except StorageError as e:
+        logger.warning(f"No URL for {storage} object {key}: {e}")
+        return None
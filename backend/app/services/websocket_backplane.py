@@ -0,0 +1,227 @@
+"""
+WebSocket Backplane
+Fans workspace broadcasts out to every API process, so a client connected to
+one uvicorn worker receives events raised on another.
+
+ConnectionManager publishes each broadcast to its backplane; the backplane
+hands it to the manager of every process, which delivers it to its own
+sockets. Signals ride the same channel: a named payload whose handler runs
+in every process, e.g. the access cache dropping a user's entries.
+
+- InMemoryBackplane: a single process (the default). Backplanes sharing an
+  InMemoryBroker behave like separate processes on one Redis, which makes
+  multi-worker fan-out testable without a server.
+- RedisBackplane: Redis pub/sub (or any server speaking the protocol, e.g.
+  Valkey). Needs the `redis` package; tests can pass a fakeredis client.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Called with (workspace_id, message, excluded connection id) for every
+# event to deliver locally
+DeliveryHandler = Callable[[int, dict, Optional[str]], Awaitable[None]]
+# Called with the data of a signal, in every process
+SignalHandler = Callable[[dict], None]
+
+DEFAULT_CHANNEL = "flowhive:ws"
+_RECONNECT_DELAY_SECONDS = 1.0
+
+
+class Backplane:
+    """
+    Base class of the backplanes.
+
+    bind() registers the local delivery handler, start()/stop() manage any
+    background listener and publish() sends an event to every process,
+    this one included. `exclude` names a connection (e.g. the sender) that
+    should not receive the event, wherever it is connected.
+
+    on_signal() registers the handler of a named signal and signal() runs
+    it in every process, this one included.
+    """
+
+    def __init__(self):
+        self._handler: Optional[DeliveryHandler] = None
+        self._signal_handlers: Dict[str, SignalHandler] = {}
+
+    def bind(self, handler: DeliveryHandler) -> None:
+        self._handler = handler
+
+    def on_signal(self, name: str, handler: SignalHandler) -> None:
+        self._signal_handlers[name] = handler
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, workspace_id: int, message: dict, exclude: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    async def signal(self, name: str, data: dict) -> None:
+        raise NotImplementedError
+
+    def _receive_signal(self, name: str, data: dict) -> None:
+        handler = self._signal_handlers.get(name)
+        if handler is None:
+            return
+        try:
+            handler(data)
+        except Exception:
+            logger.exception("Backplane signal %s failed", name)
+
+    async def _deliver(self, workspace_id: int, message: dict, exclude: Optional[str] = None) -> None:
+        if self._handler is None:
+            return
+        try:
+            await self._handler(workspace_id, message, exclude)
+        except Exception:
+            logger.exception("WebSocket delivery failed for workspace %s", workspace_id)
+
+
+class InMemoryBroker:
+    """In-process stand-in for a pub/sub server"""
+
+    def __init__(self):
+        self.subscribers: Set["InMemoryBackplane"] = set()
+
+    async def publish(self, workspace_id: int, message: dict, exclude: Optional[str] = None) -> None:
+        for backplane in list(self.subscribers):
+            await backplane._deliver(workspace_id, message, exclude)
+
+    async def signal(self, name: str, data: dict) -> None:
+        for backplane in list(self.subscribers):
+            backplane._receive_signal(name, data)
+
+
+class InMemoryBackplane(Backplane):
+    """Delivers within this process, or to every backplane on a shared broker"""
+
+    def __init__(self, broker: Optional[InMemoryBroker] = None):
+        super().__init__()
+        self.broker = broker or InMemoryBroker()
+
+    def bind(self, handler: DeliveryHandler) -> None:
+        super().bind(handler)
+        self.broker.subscribers.add(self)
+
+    def on_signal(self, name: str, handler: SignalHandler) -> None:
+        super().on_signal(name, handler)
+        self.broker.subscribers.add(self)
+
+    async def stop(self) -> None:
+        self.broker.subscribers.discard(self)
+
+    async def publish(self, workspace_id: int, message: dict, exclude: Optional[str] = None) -> None:
+        await self.broker.publish(workspace_id, message, exclude)
+
+    async def signal(self, name: str, data: dict) -> None:
+        await self.broker.signal(name, data)
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub backplane.
+
+    Events (and signals) are delivered to local sockets immediately and
+    published to the channel tagged with this process's origin id; the
+    listener skips its own events and delivers everyone else's.
+    """
+
+    def __init__(self, url: Optional[str] = None, channel: str = DEFAULT_CHANNEL, client=None):
+        super().__init__()
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                raise RuntimeError("The redis package is required for a Redis WebSocket backplane")
+            client = redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            await self._subscribed.wait()
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+            self._subscribed.clear()
+        await self.client.aclose()
+
+    async def publish(self, workspace_id: int, message: dict, exclude: Optional[str] = None) -> None:
+        await self._deliver(workspace_id, message, exclude)
+        envelope = json.dumps({
+            "origin": self.origin, "workspace_id": workspace_id, "message": message, "exclude": exclude
+        })
+        try:
+            await self.client.publish(self.channel, envelope)
+        except Exception as e:
+            logger.warning("Failed to publish WebSocket event for workspace %s: %s", workspace_id, e)
+
+    async def signal(self, name: str, data: dict) -> None:
+        self._receive_signal(name, data)
+        envelope = json.dumps({"origin": self.origin, "signal": name, "data": data})
+        try:
+            await self.client.publish(self.channel, envelope)
+        except Exception as e:
+            logger.warning("Failed to publish backplane signal %s: %s", name, e)
+
+    async def _listen(self) -> None:
+        """Subscribe and deliver remote events, resubscribing after connection errors"""
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._subscribed.set()
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    envelope = json.loads(item["data"])
+                    if envelope.get("origin") == self.origin:
+                        continue
+                    if "signal" in envelope:
+                        self._receive_signal(envelope["signal"], envelope["data"])
+                        continue
+                    await self._deliver(envelope["workspace_id"], envelope["message"], envelope.get("exclude"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("WebSocket backplane subscription lost, reconnecting: %s", e)
+                # Let start() return even if Redis is down at boot; local
+                # delivery keeps working meanwhile
+                self._subscribed.set()
+                await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def create_backplane(url: str = "", channel: str = DEFAULT_CHANNEL) -> Backplane:
+    """
+    Backplane for a WEBSOCKET_BACKPLANE_URL setting: empty or memory:// for
+    in-process delivery, redis:// / rediss:// / unix:// for Redis
+    """
+    if not url or url.startswith("memory://"):
+        return InMemoryBackplane()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackplane(url, channel)
+    raise ValueError(f"Unsupported WebSocket backplane URL: {url}")
@@ -0,0 +1,104 @@
+"""
+WebSocket Wire Protocol
+Frame encodings negotiated through the WebSocket subprotocol header.
+
+- no subprotocol (legacy clients): one JSON text frame per event, exactly
+  as before
+- "flowhive.json": JSON text frames; several events raised within the
+  coalescing window arrive as one {"type": "batch", "events": [...]} frame
+- "flowhive.msgpack": the same messages as MessagePack binary frames
+  (offered only when the msgpack package is installed)
+
+Compression (permessage-deflate) is negotiated by the server itself and
+applies to every protocol.
+"""
+
+import json
+from typing import Dict, Hashable, List, Optional, Sequence, Union
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional; clients fall back to JSON
+    msgpack = None
+
+PROTOCOL_LEGACY = None
+PROTOCOL_JSON = "flowhive.json"
+PROTOCOL_MSGPACK = "flowhive.msgpack"
+
+Frame = Union[str, bytes]
+
+
+def supported_protocols() -> List[str]:
+    """Subprotocols this server can speak, in order of preference"""
+    if msgpack is not None:
+        return [PROTOCOL_MSGPACK, PROTOCOL_JSON]
+    return [PROTOCOL_JSON]
+
+
+def negotiate(requested: Sequence[str]) -> Optional[str]:
+    """Pick the server's preferred protocol among those the client offered"""
+    for protocol in supported_protocols():
+        if protocol in requested:
+            return protocol
+    return PROTOCOL_LEGACY
+
+
+def encode(message: dict, protocol: Optional[str]) -> Frame:
+    if protocol == PROTOCOL_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    # Same format as WebSocket.send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode(frame: dict) -> dict:
+    """
+    Message from an ASGI "websocket.receive" event (text or binary frame)
+
+    Raises:
+        ValueError: the frame is not valid JSON / MessagePack
+    """
+    if frame.get("text") is not None:
+        return json.loads(frame["text"])
+    if frame.get("bytes") is not None and msgpack is not None:
+        try:
+            return msgpack.unpackb(frame["bytes"], raw=False)
+        except Exception as e:
+            raise ValueError(str(e))
+    raise ValueError("Unsupported frame")
+
+
+def entity_key(message: dict) -> Optional[Hashable]:
+    """
+    Collapse key of an event: (type, data["id"]). Within a coalescing window a
+    later event with the same key replaces the earlier one; events without an
+    "id" in their data are never collapsed.
+    """
+    data = message.get("data")
+    if isinstance(data, dict) and data.get("id") is not None:
+        return message.get("type"), data["id"]
+    return None
+
+
+class FrameCache:
+    """
+    Frames for one delivery, encoded at most once per protocol however many
+    sockets receive them
+    """
+
+    def __init__(self, workspace_id: int, messages: List[dict]):
+        self.workspace_id = workspace_id
+        self.messages = messages
+        self._frames: Dict[Optional[str], List[Frame]] = {}
+
+    def frames(self, protocol: Optional[str]) -> List[Frame]:
+        if protocol not in self._frames:
+            if protocol == PROTOCOL_LEGACY or len(self.messages) == 1:
+                frames = [encode(message, protocol) for message in self.messages]
+            else:
+                frames = [encode({
+                    "type": "batch",
+                    "workspace_id": self.workspace_id,
+                    "events": self.messages
+                }, protocol)]
+            self._frames[protocol] = frames
+        return self._frames[protocol]
@@ -1,13 +1,15 @@
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
+from app.services.access_cache import AccessCache
 from app.schemas.user import TokenData
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -58,7 +60,7 @@ def decode_access_token(token: str) -> Optional[TokenData]:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get the current authenticated user"""
     credentials_exception = HTTPException(
@@ -71,7 +73,7 @@ async def get_current_user(
     if token_data is None or token_data.user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user = await AccessCache.get_user(db, token_data.user_id)
     if user is None:
         raise credentials_exception
 
@@ -101,3 +103,15 @@ def require_role(required_roles: list):
             )
         return current_user
     return role_checker
+
+
+async def require_cron_secret(authorization: Optional[str] = Header(None)):
+    """Require "Authorization: Bearer <CRON_SECRET>" (404 while CRON_SECRET is unset)"""
+    if not settings.CRON_SECRET:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.CRON_SECRET}"
+    if authorization is None or not hmac.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid cron secret"
+        )
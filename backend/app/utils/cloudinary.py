@@ -1,45 +1,108 @@
 """
 Cloudinary utility for file uploads
 Handles PDF, image, and document uploads to Cloudinary cloud storage
+
+The SDK is synchronous: every call blocks on HTTP for as long as the
+transfer takes. Calls from async code run in a pool of CLOUDINARY_WORKERS
+threads (get_executor), which keeps them off the event loop and stops a
+burst of uploads from taking all of asyncio's default threads. The SDK is
+configured once, at startup (init_cloudinary).
 """
-from typing import Optional
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Optional, Union
 import cloudinary
+import cloudinary.api_client.call_api
 import cloudinary.uploader
+import cloudinary.utils
 from app.config import settings
 
-# Initialize Cloudinary configuration
-def init_cloudinary():
-    """Initialize Cloudinary with credentials from settings"""
-    if settings.CLOUDINARY_CLOUD_NAME and settings.CLOUDINARY_API_KEY:
+_configured = False
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def init_cloudinary() -> bool:
+    """
+    Configure Cloudinary with credentials from settings (the first call
+    does; called at startup)
+
+    Returns:
+        bool: Whether credentials are set
+    """
+    global _configured
+    if not _configured and settings.CLOUDINARY_CLOUD_NAME and settings.CLOUDINARY_API_KEY:
+        options = {}
+        if settings.CLOUDINARY_API_URL:
+            options["upload_prefix"] = settings.CLOUDINARY_API_URL.rstrip("/")
         cloudinary.config(
             cloud_name=settings.CLOUDINARY_CLOUD_NAME,
             api_key=settings.CLOUDINARY_API_KEY,
             api_secret=settings.CLOUDINARY_API_SECRET,
-            secure=True
+            secure=True,
+            **options
+        )
+        # The SDK's connection pools keep one connection per host; with
+        # CLOUDINARY_WORKERS threads every other one would be dropped after
+        # its call, and the next call would connect (TLS) again
+        http = cloudinary.utils.get_http_connector(
+            cloudinary.config(), {**cloudinary.CERT_KWARGS, "maxsize": settings.CLOUDINARY_WORKERS}
         )
+        cloudinary.uploader._http = http
+        cloudinary.api_client.call_api._http = http
+        _configured = True
+    return _configured
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The threads Cloudinary calls run in, started on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CLOUDINARY_WORKERS,
+                    thread_name_prefix="cloudinary"
+                )
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the threads (calls in progress finish)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+async def run_in_executor(function: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking SDK call in the Cloudinary threads"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(function, *args, **kwargs))
+
 
 async def upload_to_cloudinary(
-    file_content: bytes,
+    file_content: Union[bytes, BinaryIO],
     filename: str,
     folder: str = "flowhive/minutes",
     resource_type: str = "auto"
 ) -> dict:
     """
     Upload a file to Cloudinary
-    
+
     Args:
-        file_content: The file content as bytes
+        file_content: The file content as bytes, or an open binary file
         filename: Original filename
         folder: Cloudinary folder path
         resource_type: Type of resource ("auto", "image", "raw", "video")
-    
+
     Returns:
         dict: Cloudinary response with URL, public_id, etc.
     """
-    init_cloudinary()
-    
-    # Upload to Cloudinary
-    result = cloudinary.uploader.upload(
+    return await run_in_executor(
+        cloudinary.uploader.upload,
         file_content,
         folder=folder,
         resource_type=resource_type,  # "auto" handles images, PDFs, docs
@@ -47,43 +110,38 @@ async def upload_to_cloudinary(
         unique_filename=True,
         overwrite=False
     )
-    
-    return result
+
 
 async def delete_from_cloudinary(public_id: str, resource_type: str = "auto") -> dict:
     """
     Delete a file from Cloudinary
-    
+
     Args:
         public_id: The Cloudinary public_id of the file
         resource_type: Type of resource to delete
-    
+
     Returns:
         dict: Cloudinary deletion response
     """
-    init_cloudinary()
-    
-    result = cloudinary.uploader.destroy(
+    return await run_in_executor(
+        cloudinary.uploader.destroy,
         public_id,
         resource_type=resource_type,
         invalidate=True
     )
-    
-    return result
+
 
 def get_cloudinary_url(public_id: str, resource_type: str = "auto") -> str:
     """
     Generate a Cloudinary URL for a file
-    
+
     Args:
         public_id: The Cloudinary public_id
         resource_type: Type of resource
-    
+
     Returns:
         str: Full Cloudinary URL
     """
-    init_cloudinary()
-    
     if resource_type == "raw":
         return cloudinary.utils.cloudinary_url(
             public_id,
@@ -91,7 +149,7 @@ def get_cloudinary_url(public_id: str, resource_type: str = "auto") -> str:
             secure=True,
             flags="attachment"
         )[0]
-    
+
     return cloudinary.utils.cloudinary_url(
         public_id,
         secure=True
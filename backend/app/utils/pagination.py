@@ -0,0 +1,225 @@
+"""
+Keyset (Cursor) Pagination Utilities
+Page through ordered lists by "rows after the last one seen" instead of
+OFFSET, so every page costs the same no matter how deep the client goes.
+
+Paging is opt-in: a request with neither limit nor cursor gets the whole
+list as a plain JSON array, as before pagination existed. With either one
+the body is a Page ({"items": [...], "next_cursor": ...}); next_cursor is
+also sent in the X-Next-Cursor header, and is null / absent on the last page.
+
+Lists that had OFFSET paging keep their `skip` parameter, deprecated: with
+it the body stays a plain list (limit, if given, caps it as it used to).
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, false, or_
+
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Query parameter descriptions shared by every paginated list
+CURSOR_DESCRIPTION = "next_cursor from the previous page"
+LIMIT_DESCRIPTION = "Page size (capped by PAGE_SIZE_MAX); asks for a page: {items, next_cursor}"
+SKIP_DESCRIPTION = "Deprecated, use cursor: rows to skip; the body stays a plain list"
+
+_PARSERS = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    time: time.fromisoformat,
+}
+
+# Integer keys are BIGINT at most; anything wider fails in the driver
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def paging_requested(cursor: Optional[str], limit: Optional[int]) -> bool:
+    """Whether the client asked for pages (otherwise it gets the whole list)"""
+    return cursor is not None or limit is not None
+
+
+def resolve_page_size(limit: Optional[int], cursor: Optional[str] = None) -> Optional[int]:
+    """
+    Requested page size, defaulted and capped by settings
+
+    None (the whole list) when the client did not ask for pages.
+    """
+    if not paging_requested(cursor, limit):
+        return None
+    if not limit or limit < 1:
+        return settings.PAGE_SIZE_DEFAULT
+    return min(limit, settings.PAGE_SIZE_MAX)
+
+
+def resolve_offset(skip: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """
+    OFFSET of the deprecated skip parameter (None without it)
+
+    skip and cursor both say where the page starts, so they can't be combined.
+    """
+    if skip is not None and cursor is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either skip or cursor"
+        )
+    return skip or None
+
+
+def fetch_size(page_size: Optional[int]) -> Optional[int]:
+    """Rows to fetch for a page: one extra tells whether another page follows"""
+    return None if page_size is None else page_size + 1
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the cursor for the next page (absent on the last page)"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def page_body(
+    response: Response,
+    items: List[Any],
+    next_cursor: Optional[str],
+    cursor: Optional[str],
+    limit: Optional[int],
+    skip: Optional[int] = None
+):
+    """
+    Body of a list response: the plain list, or a Page when the client asked
+    for pages (declare response_model=Union[List[X], Page[X]]). A request
+    with the deprecated skip gets the plain list.
+    """
+    set_next_cursor(response, next_cursor)
+    if skip is not None or not paging_requested(cursor, limit):
+        return items
+    return {"items": items, "next_cursor": next_cursor}
+
+
+class Keyset:
+    """
+    A sort order usable for keyset pagination.
+
+    Each key is (column, descending, nullable). The last key must be unique
+    (normally the primary key) so the order is total. Nullable keys sort
+    NULLS LAST on every dialect.
+
+    Usage:
+        keyset = Keyset((Task.updated_at, True, True), (Task.id, True, False))
+        size = resolve_page_size(limit, cursor)
+        rows = query.filter(*keyset.after(cursor)).order_by(*keyset.order_by()).limit(fetch_size(size))
+        rows, next_cursor = keyset.page(rows, size)
+        return page_body(response, rows, next_cursor, cursor, limit)
+
+    Lists that had skip also apply .offset(resolve_offset(skip, cursor))
+    and pass skip on to page_body.
+    """
+
+    def __init__(self, *keys: Tuple[Any, bool, bool]):
+        self.keys = keys
+
+    def order_by(self) -> List[Any]:
+        clauses = []
+        for column, descending, nullable in self.keys:
+            clause = column.desc() if descending else column.asc()
+            clauses.append(clause.nulls_last() if nullable else clause)
+        return clauses
+
+    def _beyond(self, column, descending: bool, nullable: bool, value):
+        """Rows strictly past `value` on one key"""
+        if value is None:
+            return false()  # NULLs sort last, nothing comes after them
+        past = column < value if descending else column > value
+        return or_(past, column.is_(None)) if nullable else past
+
+    def _predicate(self, values: Sequence[Any], index: int = 0):
+        column, descending, nullable = self.keys[index]
+        value = values[index]
+        beyond = self._beyond(column, descending, nullable, value)
+        if index == len(self.keys) - 1:
+            return beyond
+        same = column.is_(None) if value is None else column == value
+        return or_(beyond, and_(same, self._predicate(values, index + 1)))
+
+    def after(self, cursor: Optional[str]) -> List[Any]:
+        """Filter clauses selecting rows after the cursor (empty for the first page)"""
+        if not cursor:
+            return []
+        return [self._predicate(self.decode(cursor))]
+
+    def encode(self, row) -> str:
+        values = []
+        for column, _, _ in self.keys:
+            value = getattr(row, column.key)
+            values.append(value.isoformat() if isinstance(value, (date, time)) else value)
+        payload = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        """
+        Key values of a cursor, each checked against its column's type
+
+        A cursor is client input: anything encode() could not have produced
+        is a 400 here rather than a database error later.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if not isinstance(raw, list) or len(raw) != len(self.keys):
+                raise ValueError("cursor does not match this list")
+            return [self._coerce(column, nullable, value) for (column, _, nullable), value in zip(self.keys, raw)]
+        except (ValueError, TypeError, binascii.Error, UnicodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    def _coerce(column, nullable: bool, value):
+        """A cursor value as the column's Python type (ValueError if it can't be one)"""
+        if value is None:
+            if not nullable:
+                raise ValueError(f"{column.key} cannot be null")
+            return None
+
+        python_type = column.type.python_type
+        parser = _PARSERS.get(python_type)
+        if parser is not None:
+            if not isinstance(value, str):
+                raise ValueError(f"{column.key} must be an ISO string")
+            parsed = parser(value)
+            if python_type is datetime and (parsed.tzinfo is not None) != bool(column.type.timezone):
+                raise ValueError(f"{column.key} has the wrong time zone awareness")
+            return parsed
+
+        if python_type is int:
+            if not isinstance(value, int) or isinstance(value, bool) or not _INT_MIN <= value <= _INT_MAX:
+                raise ValueError(f"{column.key} must be an integer")
+        elif python_type is float:
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(f"{column.key} must be a number")
+        elif python_type is str:
+            if not isinstance(value, str) or "\x00" in value:
+                raise ValueError(f"{column.key} must be a string")
+        elif not isinstance(value, python_type):
+            raise ValueError(f"{column.key} has the wrong type")
+        return value
+
+    def page(self, rows: Sequence[Any], page_size: Optional[int]) -> Tuple[List[Any], Optional[str]]:
+        """
+        Trim rows fetched with limit(fetch_size(page_size)) to one page
+
+        Returns:
+            (rows of this page, cursor for the next page or None); all rows
+            and None when page_size is None (not paginated)
+        """
+        rows = list(rows)
+        if page_size is None or len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self.encode(rows[-1])
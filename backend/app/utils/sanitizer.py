@@ -2,8 +2,10 @@
 HTML Sanitization Utilities
 Sanitize user-provided HTML content to prevent XSS attacks
 """
+import threading
 import bleach
-from typing import Optional
+from bleach.sanitizer import Cleaner
+from typing import Iterable, List, Optional
 
 
 # Allowed HTML tags for rich text content
@@ -47,6 +49,43 @@ def sanitize_html(html_content: Optional[str]) -> Optional[str]:
     return cleaned_html
 
 
+_local = threading.local()
+
+
+def _cleaner() -> Cleaner:
+    """This thread's Cleaner (they are not thread-safe), built on first use"""
+    cleaner = getattr(_local, "cleaner", None)
+    if cleaner is None:
+        cleaner = _local.cleaner = Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+    return cleaner
+
+
+def sanitize_html_many(contents: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """
+    sanitize_html() for a batch of values (bulk endpoints).
+
+    One Cleaner serves the whole batch, and a value repeated in the batch
+    (the same remarks on every visit of a day) is cleaned once.
+
+    Args:
+        contents: Raw HTML strings, None or empty allowed
+
+    Returns:
+        Sanitized strings, in the same order
+    """
+    cleaner = _cleaner()
+    cleaned = {}
+    results = []
+    for html_content in contents:
+        if not html_content:
+            results.append(html_content)
+            continue
+        if html_content not in cleaned:
+            cleaned[html_content] = cleaner.clean(html_content)
+        results.append(cleaned[html_content])
+    return results
+
+
 def strip_html_tags(html_content: Optional[str]) -> str:
     """
     Strip all HTML tags and return plain text.
@@ -0,0 +1,93 @@
+"""
+Upload serving
+UploadFiles serves /uploads: Starlette's StaticFiles (Range, If-Range,
+If-None-Match and If-Modified-Since handled there) plus
+- a strong ETag from the SHA-256 in content-addressed blob paths
+  (blobs/<2 hex>/<sha256>-<nonce><ext>, see app.services.storage)
+- immutable Cache-Control for blobs and their photo variants: the bytes at
+  such a path never change, so browsers and CDNs need not ask again
+- no-cache for anything else (files from before content addressing):
+  cached, but revalidated with the ETag
+- UPLOAD_SERVE_MODE "x-accel-redirect" (nginx) or "x-sendfile" (Apache,
+  lighttpd): conditional requests are still answered here, but the bytes
+  (and Range requests) are left to the front proxy
+"""
+
+import mimetypes
+import os
+import re
+from typing import Dict
+from urllib.parse import quote
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+SERVE_APP = "app"
+SERVE_X_ACCEL_REDIRECT = "x-accel-redirect"
+SERVE_X_SENDFILE = "x-sendfile"
+
+# <sha256>-<nonce><ext> for a blob; a variant adds .<name><ext> to that
+BLOB_PATH = re.compile(r"^blobs/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})-[0-9a-f]{8}(?P<suffix>[^/]*)$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class UploadFileResponse(FileResponse):
+    # Fewer thread hops per file than Starlette's 64 KB
+    chunk_size = 256 * 1024
+
+
+def cache_headers(relative_path: str) -> Dict[str, str]:
+    """Cache-Control, and the ETag if the path carries the content's hash"""
+    match = BLOB_PATH.match(relative_path)
+    if match is None:
+        return {"cache-control": REVALIDATE}
+    headers = {"cache-control": IMMUTABLE}
+    if match["suffix"].count(".") <= 1:  # the blob itself, not a variant
+        headers["etag"] = f'"{match["sha256"]}"'
+    return headers
+
+
+class UploadFiles(StaticFiles):
+    """StaticFiles for UPLOAD_DIR with cache validators and proxy offload"""
+
+    def __init__(self, directory: str, mode: str = SERVE_APP, accel_prefix: str = ""):
+        if mode not in (SERVE_APP, SERVE_X_ACCEL_REDIRECT, SERVE_X_SENDFILE):
+            raise ValueError(f"Unknown upload serve mode: {mode}")
+        super().__init__(directory=directory)
+        self.root = os.path.realpath(directory)
+        self.mode = mode
+        self.accel_prefix = accel_prefix.rstrip("/")
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        relative = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        headers = cache_headers(relative)
+
+        if self.mode == SERVE_APP:
+            response = UploadFileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        else:
+            response = Response(
+                status_code=status_code,
+                headers=headers,
+                media_type=mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            )
+            # ETag / Last-Modified for is_not_modified (the empty body's
+            # Content-Length: 0 is replaced by the proxy)
+            FileResponse.set_stat_headers(response, stat_result)
+            if self.mode == SERVE_X_ACCEL_REDIRECT:
+                response.headers["x-accel-redirect"] = f"{self.accel_prefix}/{quote(relative)}"
+            else:
+                response.headers["x-sendfile"] = str(full_path)
+
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,301 @@
+"""
+Streaming upload helpers
+Copy uploaded files to their destination in fixed-size chunks instead of
+reading them into memory.
+
+- stream_upload copies an UploadFile chunk by chunk, hashing (SHA-256) and
+  counting as it goes, and stops at the first chunk past the size limit
+- the content type is sniffed from the first bytes, so a declared type can't
+  smuggle in a file of another kind
+- UploadSizeLimitMiddleware rejects multipart requests whose body is larger
+  than MAX_UPLOAD_SIZE (MAX_BATCH_UPLOAD_FILES times that for .../batch
+  uploads of several files) before (or while) it is received, so an
+  oversized upload never reaches the spool on disk
+"""
+
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Collection, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 512
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries, part headers and small form fields
+BATCH_UPLOAD_SUFFIX = "/batch"  # multipart endpoints taking several files
+
+OLE_TYPES = {"application/msword", "application/vnd.ms-excel"}
+OOXML_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+TEXT_TYPES = {"text/plain", "text/csv"}
+HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"}
+
+
+@dataclass
+class UploadInfo:
+    """What stream_upload found out about an upload"""
+    size: int
+    sha256: str
+    mime_type: str
+    path: Optional[str] = None  # where it was written, if anywhere
+
+
+def sniff_mime_type(head: bytes, declared: Optional[str] = None) -> str:
+    """
+    Content type from a file's first bytes
+
+    Container formats that can't be told apart from their first bytes (OLE2
+    for .doc/.xls, ZIP for .docx/.xlsx) keep the declared type when it is
+    one of theirs; text keeps a declared text type.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in HEIF_BRANDS:
+        return "image/heic"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return declared if declared in OLE_TYPES else "application/x-ole-storage"
+    if head.startswith(b"PK\x03\x04"):
+        return declared if declared in OOXML_TYPES else "application/zip"
+    if _looks_like_text(head):
+        return declared if declared in TEXT_TYPES else "text/plain"
+    return "application/octet-stream"
+
+
+def _looks_like_text(head: bytes) -> bool:
+    if not head or b"\x00" in head:
+        return False
+    try:
+        # Not final: the sample may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size exceeds maximum allowed size of {max_size} bytes"
+    )
+
+
+def unique_upload_path(directory: str, filename: Optional[str]) -> str:
+    """directory/<uuid><original extension>"""
+    extension = os.path.splitext(filename or "")[1]
+    return os.path.join(directory, f"{uuid.uuid4()}{extension}")
+
+
+def upload_url(path: Optional[str]) -> Optional[str]:
+    """URL of a file under UPLOAD_DIR, as served by the /uploads mount"""
+    if not path:
+        return None
+    relative = os.path.relpath(path, settings.UPLOAD_DIR)
+    if relative.startswith(os.pardir):
+        return None
+    return "/uploads/" + relative.replace(os.sep, "/")
+
+
+async def stream_upload(
+    file: UploadFile,
+    allowed_types: Collection[str],
+    destination: Optional[str] = None,
+    max_size: Optional[int] = None,
+    type_hint: str = ""
+) -> UploadInfo:
+    """
+    Validate an upload chunk by chunk, copying it to destination if given
+
+    Args:
+        file: The uploaded file
+        allowed_types: Content types accepted after sniffing
+        destination: File path to write to (written as destination.part and
+            renamed when complete); None only validates and hashes, and
+            rewinds the file for the caller to send elsewhere
+        max_size: Size limit in bytes (MAX_UPLOAD_SIZE)
+        type_hint: Appended to the 400 detail, e.g. "Only images are supported."
+
+    Raises:
+        HTTPException: 413 past max_size, 400 for a type not in allowed_types;
+            nothing is left at destination
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    # Starlette spools uploads to a temporary file; one worker thread copies
+    # it rather than a thread hop per chunk
+    info = await asyncio.to_thread(
+        _copy, file.file, file.content_type, allowed_types, destination, max_size, type_hint
+    )
+    if destination is None:
+        await file.seek(0)
+    return info
+
+
+async def inspect_file(
+    path: str,
+    allowed_types: Collection[str],
+    declared: Optional[str] = None,
+    max_size: Optional[int] = None,
+    type_hint: str = ""
+) -> UploadInfo:
+    """
+    stream_upload's checks (size limit, sniffed type, SHA-256) for a file
+    already on disk, e.g. a finished resumable upload
+
+    Raises:
+        HTTPException: 413 past max_size, 400 for a type not in allowed_types
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+
+    def inspect() -> UploadInfo:
+        with open(path, "rb") as source:
+            return _copy(source, declared, allowed_types, None, max_size, type_hint)
+
+    info = await asyncio.to_thread(inspect)
+    info.path = path
+    return info
+
+
+def _copy(
+    source: BinaryIO,
+    declared: Optional[str],
+    allowed_types: Collection[str],
+    destination: Optional[str],
+    max_size: int,
+    type_hint: str
+) -> UploadInfo:
+    source.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+
+    head = source.read(SNIFF_BYTES)
+    mime_type = sniff_mime_type(head, declared)
+    if mime_type not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type {mime_type} not allowed. {type_hint}".strip()
+        )
+
+    partial = f"{destination}.part" if destination else None
+    if partial:
+        os.makedirs(os.path.dirname(partial) or ".", exist_ok=True)
+    target = open(partial, "wb") if partial else None
+    try:
+        chunk = head
+        while chunk:
+            size += len(chunk)
+            if size > max_size:
+                raise too_large(max_size)
+            digest.update(chunk)
+            if target:
+                target.write(chunk)
+            chunk = source.read(CHUNK_SIZE)
+        if target:
+            target.close()
+            os.replace(partial, destination)
+    except BaseException:
+        if target:
+            target.close()
+            os.remove(partial)
+        raise
+
+    return UploadInfo(size=size, sha256=digest.hexdigest(), mime_type=mime_type, path=destination)
+
+
+async def write_upload(file: UploadFile, destination: str):
+    """
+    Copy an already validated upload to destination in chunks (via
+    destination.part) and rewind it
+    """
+    await asyncio.to_thread(_write, file.file, destination)
+    await file.seek(0)
+
+
+def _write(source: BinaryIO, destination: str):
+    source.seek(0)
+    partial = f"{destination}.part"
+    os.makedirs(os.path.dirname(partial) or ".", exist_ok=True)
+    try:
+        with open(partial, "wb") as target:
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Answer 413 to multipart requests larger than max_size (plus form
+    overhead; MAX_BATCH_UPLOAD_FILES times that for batch uploads): at once
+    when Content-Length says so, otherwise as soon as the received body
+    passes the limit. Each file is checked against max_size as it is copied.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: Optional[int] = None):
+        self.app = app
+        self.max_size = max_size or settings.MAX_UPLOAD_SIZE
+        self.limit = self.max_size + MULTIPART_OVERHEAD
+        self.batch_max_size = self.max_size * settings.MAX_BATCH_UPLOAD_FILES
+        self.batch_limit = self.batch_max_size + MULTIPART_OVERHEAD * settings.MAX_BATCH_UPLOAD_FILES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"].rstrip("/").endswith(BATCH_UPLOAD_SUFFIX):
+            max_size, limit = self.batch_max_size, self.batch_limit
+        else:
+            max_size, limit = self.max_size, self.limit
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, max_size)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Re-raised by FastAPI's body parsing as this response
+                    raise too_large(max_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _is_multipart(scope: Scope) -> bool:
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        return content_type.lower().startswith(b"multipart/form-data")
+
+    async def _reject(self, send: Send, max_size: int):
+        body = json.dumps({"detail": too_large(max_size).detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,171 @@
+"""
+Entering a day's work: one request per item vs the bulk endpoints
+Run with: python -m benchmarks.bulk_entry [--items 20] [--rtt-ms 80] [--database-url postgresql://...]
+
+Starts the API on 127.0.0.1 against a throwaway SQLite database (or
+--database-url, whose tables are created if missing) and, as one field
+staff member, enters --items of each:
+
+  activities  POST /api/field-activities/ per visit   vs  POST /bulk
+  tasks       POST /api/tasks/ per task               vs  POST /bulk
+  statuses    PATCH /api/tasks/{id} per task          vs  PATCH /bulk/status
+
+For each: the time taken, HTTP requests and SQL statements executed.
+--rtt-ms is added before every request, the round-trip of a phone on a
+mobile network; it is what a day entered one item at a time pays --items
+times.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.cloudinary_stub import start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--items", type=int, default=20)
+parser.add_argument("--rtt-ms", type=float, default=80, help="Client to API round-trip added per request")
+parser.add_argument("--database-url", default=None, help="Database to use (default: a throwaway SQLite file)")
+args = parser.parse_args()
+
+directory = tempfile.mkdtemp()
+# Before anything imports app.config
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(directory, 'bulk.db')}"
+os.environ["WEEKLY_REPORT_ENABLED"] = "false"
+os.environ["OUTBOX_WORKER_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.field_activity import TaskCategory  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.workspace import Workspace, WorkspaceMember  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+statements = 0
+
+
+def count_statement(*_):
+    global statements
+    statements += 1
+
+
+for bind in (engine, async_engine.sync_engine):
+    event.listen(bind, "before_cursor_execute", count_statement)
+
+
+def seed(db):
+    suffix = os.urandom(4).hex()
+    user = User(email=f"bulk-{suffix}@example.com", username=f"bulk-{suffix}", full_name="Field Staff",
+                hashed_password="x", role=UserRole.TEAM_MEMBER)
+    db.add(user)
+    db.flush()
+    workspace = Workspace(name="Field", owner_id=user.id)
+    db.add(workspace)
+    db.flush()
+    db.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id))
+    category = TaskCategory(name="install", title="Installation", workspace_id=workspace.id)
+    project = Project(name="Rollout", workspace_id=workspace.id)
+    db.add_all([category, project])
+    db.commit()
+    return user.id, workspace.id, category.id, project.id
+
+
+def visits(count, user_id, workspace_id, category_id):
+    return [{
+        "workspace_id": workspace_id,
+        "support_staff_id": user_id,
+        "activity_date": date.today().isoformat(),
+        "start_time": f"{8 + i % 10:02d}:00",
+        "end_time": f"{8 + i % 10:02d}:45",
+        "title": f"Site visit {i}",
+        "customer_name": f"Customer {i % 4}",
+        "customer_id": f"C{i % 4}",
+        "location": "On site",
+        "task_category_id": category_id,
+        "task_description": f"<p>Replaced the <strong>router</strong> at site {i}</p><script>alert(1)</script>",
+        "remarks": "<p>Customer signed off</p>"
+    } for i in range(count)]
+
+
+async def main():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user_id, workspace_id, category_id, project_id = seed(db)
+    token = create_access_token({"sub": str(user_id)})
+
+    server, port = start_server(app)
+    rtt = args.rtt_ms / 1000
+    print(f"{args.items} items, {args.rtt_ms:g} ms round-trip per request, {engine.dialect.name}")
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=120
+    ) as client:
+        requests = 0
+
+        async def send(method, path, payload):
+            nonlocal requests
+            requests += 1
+            await asyncio.sleep(rtt)
+            response = await client.request(method, path, json=payload)
+            response.raise_for_status()
+            return response.json()
+
+        async def measure(name, work):
+            nonlocal requests
+            global statements
+            requests = statements = 0
+            started = time.perf_counter()
+            result = await work()
+            elapsed = time.perf_counter() - started
+            print(f"  {name:9}  {elapsed:6.2f}s  {requests:3} requests  {statements:4} SQL statements")
+            return result
+
+        await send("GET", "/api/auth/me", None)  # warm up (user cache, connections)
+
+        print("\nfield activities")
+        items = visits(args.items, user_id, workspace_id, category_id)
+
+        async def single_activities():
+            for item in items:
+                await send("POST", "/api/field-activities/", item)
+
+        await measure("one each", single_activities)
+        result = await measure("bulk", lambda: send("POST", "/api/field-activities/bulk", items))
+        assert not result["errors"], result["errors"]
+
+        print("\ntasks")
+        tasks = [{"title": f"Task {i}", "project_id": project_id, "assignee_id": user_id} for i in range(args.items)]
+
+        async def single_tasks():
+            return [await send("POST", "/api/tasks/", task) for task in tasks]
+
+        created = await measure("one each", single_tasks)
+        result = await measure("bulk", lambda: send("POST", "/api/tasks/bulk", tasks))
+        assert not result["errors"], result["errors"]
+
+        print("\ntask statuses")
+
+        async def single_statuses():
+            for task in created:
+                await send("PATCH", f"/api/tasks/{task['id']}", {"status": "completed"})
+
+        await measure("one each", single_statuses)
+        updates = [{"id": task["id"], "status": "completed"} for task in result["tasks"]]
+        result = await measure("bulk", lambda: send("PATCH", "/api/tasks/bulk/status", updates))
+        assert not result["errors"], result["errors"]
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,215 @@
+"""
+A local stand-in for the Cloudinary API, to work with MINUTES_STORAGE (or
+FILE_STORAGE) "cloudinary" offline
+Run with: python -m benchmarks.cloudinary_stub [--port 8790] [--latency 0.1] [--bandwidth-mbps 20]
+
+then start the API with
+  CLOUDINARY_API_URL=http://127.0.0.1:8790
+  CLOUDINARY_CLOUD_NAME=<any> CLOUDINARY_API_KEY=<any> CLOUDINARY_API_SECRET=<any>
+(--api-key / --api-secret must match; signatures are checked).
+
+Answers what the SDK calls, from memory:
+  POST /v1_1/<cloud>/<resource_type>/upload     signed upload (file, public_id
+                                                or folder + use_filename, overwrite)
+  POST /v1_1/<cloud>/<resource_type>/destroy    signed destroy
+  GET  /v1_1/<cloud>/resources/<resource_type>/upload/<public_id>   Admin API
+and serves the secure_url it returns for each upload. Every API call waits
+--latency seconds, uploads another size / --bandwidth-mbps: a remote
+service, not a local one.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import os
+import secrets
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import cloudinary.utils
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Fields the SDK posts but leaves out of the signature
+UNSIGNED_FIELDS = {"file", "signature", "api_key", "resource_type", "cloud_name"}
+
+MAGIC = [
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG", "png"),
+    (b"GIF8", "gif"),
+    (b"%PDF", "pdf"),
+]
+
+
+@dataclass
+class StoredResource:
+    public_id: str
+    resource_type: str
+    format: Optional[str]
+    data: bytes
+    version: int
+    created_at: str
+
+
+def error(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse({"error": {"message": message}}, status_code=status_code)
+
+
+class FakeCloudinary:
+    """Upload, destroy and resource lookups like the Cloudinary API, after a delay"""
+
+    def __init__(self, api_key: str, api_secret: str, latency: float = 0.1, bandwidth_mbps: float = 0):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency = latency
+        self.bandwidth = bandwidth_mbps * 1024 * 1024 / 8  # bytes/s
+        self.resources: Dict[Tuple[str, str], StoredResource] = {}
+        self.uploads = 0
+        self.destroys = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = Starlette(routes=[
+            Route("/v1_1/{cloud}/{resource_type}/upload", self.upload, methods=["POST"]),
+            Route("/v1_1/{cloud}/{resource_type}/destroy", self.destroy, methods=["POST"]),
+            Route("/v1_1/{cloud}/resources/{resource_type}/upload/{public_id:path}", self.resource, methods=["GET"]),
+            Route("/{cloud}/{resource_type}/upload/{path:path}", self.deliver, methods=["GET"]),
+        ])
+
+    async def _delay(self, size: int = 0):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency + (size / self.bandwidth if self.bandwidth else 0))
+        finally:
+            self.in_flight -= 1
+
+    def _signed(self, form) -> bool:
+        params = {k: v for k, v in form.items() if k not in UNSIGNED_FIELDS}
+        expected = cloudinary.utils.api_sign_request(params, self.api_secret)
+        return form.get("api_key") == self.api_key and secrets.compare_digest(form.get("signature", ""), expected)
+
+    def _basic_auth(self, request: Request) -> bool:
+        expected = base64.b64encode(f"{self.api_key}:{self.api_secret}".encode()).decode()
+        return request.headers.get("authorization", "") == f"Basic {expected}"
+
+    def _describe(self, request: Request, resource: StoredResource, **extra) -> dict:
+        cloud = request.path_params["cloud"]
+        path = resource.public_id + (f".{resource.format}" if resource.resource_type == "image" else "")
+        url = f"{request.base_url}{cloud}/{resource.resource_type}/upload/v{resource.version}/{path}"
+        return {
+            "public_id": resource.public_id,
+            "version": resource.version,
+            "resource_type": resource.resource_type,
+            "type": "upload",
+            "format": resource.format,
+            "bytes": len(resource.data),
+            "etag": hashlib.md5(resource.data).hexdigest(),
+            "created_at": resource.created_at,
+            "url": url,
+            "secure_url": url,
+            **extra
+        }
+
+    async def upload(self, request: Request):
+        async with request.form(max_part_size=100 * 1024 * 1024) as form:
+            if not self._signed(form):
+                return error("Invalid Signature", 401)
+            file = form.get("file")
+            if file is None or isinstance(file, str):
+                return error("Missing required parameter - file", 400)
+            data = await file.read()
+            await self._delay(len(data))
+
+            extension = next((ext for magic, ext in MAGIC if data.startswith(magic)), None)
+            resource_type = request.path_params["resource_type"]
+            if resource_type == "auto":
+                resource_type = "image" if extension else "raw"
+            name, file_extension = os.path.splitext(file.filename or "file")
+
+            public_id = form.get("public_id")
+            if not public_id:
+                public_id = name if form.get("use_filename") in ("1", "true") else secrets.token_hex(10)
+                if form.get("use_filename") in ("1", "true") and form.get("unique_filename") not in ("0", "false"):
+                    public_id += "_" + secrets.token_hex(3)
+                if resource_type == "raw":
+                    public_id += file_extension
+                if form.get("folder"):
+                    public_id = f"{form['folder']}/{public_id}"
+            keep_existing = form.get("overwrite") in ("0", "false")
+
+        key = (resource_type, public_id)
+        if key in self.resources and keep_existing:
+            return JSONResponse(self._describe(request, self.resources[key], existing=True))
+        self.uploads += 1
+        resource = self.resources[key] = StoredResource(
+            public_id=public_id,
+            resource_type=resource_type,
+            format=extension if resource_type == "image" else None,
+            data=data,
+            version=int(time.time()),
+            created_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        )
+        return JSONResponse(self._describe(request, resource, existing=False))
+
+    async def destroy(self, request: Request):
+        form = await request.form()
+        if not self._signed(form):
+            return error("Invalid Signature", 401)
+        await self._delay()
+        self.destroys += 1
+        removed = self.resources.pop((request.path_params["resource_type"], form.get("public_id")), None)
+        return JSONResponse({"result": "ok" if removed else "not found"})
+
+    async def resource(self, request: Request):
+        if not self._basic_auth(request):
+            return error("Invalid credentials", 401)
+        await self._delay()
+        resource = self.resources.get((request.path_params["resource_type"], request.path_params["public_id"]))
+        if resource is None:
+            return error("Resource not found", 404)
+        return JSONResponse(self._describe(request, resource))
+
+    async def deliver(self, request: Request):
+        resource_type = request.path_params["resource_type"]
+        path = request.path_params["path"]
+        parts = path.split("/", 1)
+        if len(parts) == 2 and parts[0].startswith("v") and parts[0][1:].isdigit():
+            path = parts[1]
+        resource = self.resources.get((resource_type, path))
+        if resource is None and resource_type == "image":
+            resource = self.resources.get((resource_type, os.path.splitext(path)[0]))
+        if resource is None:
+            return Response(status_code=404)
+        return Response(resource.data, media_type="application/octet-stream")
+
+
+def start_server(app, port: int = 0):
+    if not port:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--api-key", default="stub")
+    parser.add_argument("--api-secret", default="stub-secret")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds added to every API call")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20, help="Upload bandwidth (0: unlimited)")
+    args = parser.parse_args()
+    stub = FakeCloudinary(args.api_key, args.api_secret, args.latency, args.bandwidth_mbps)
+    uvicorn.run(stub.app, host="127.0.0.1", port=args.port, log_level="info")
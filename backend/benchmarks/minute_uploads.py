@@ -0,0 +1,212 @@
+"""
+Meeting minute attachments on Cloudinary: one by one vs a batch upload,
+and the event loop while the SDK works
+Run with: python -m benchmarks.minute_uploads [--files 6] [--size-kb 800] [--latency 0.15] [--bandwidth-mbps 20]
+
+Starts the API on 127.0.0.1 against a throwaway SQLite database, with
+MINUTES_STORAGE=cloudinary pointed at the local Cloudinary stand-in
+(benchmarks.cloudinary_stub: every call takes --latency seconds plus the
+transfer at --bandwidth-mbps). Then:
+
+  sequential  --files POST /attachments, one after the other (how the
+              minutes page sent several files)
+  batch       one POST /attachments/batch with all of them: stored
+              concurrently, attached in one transaction
+  rejected    a batch with one file of a type not allowed: 400, nothing
+              attached, the files already sent to Cloudinary destroyed
+
+and, in this process, --files concurrent upload_to_cloudinary calls:
+
+  inline      the SDK called on the event loop, as upload_to_cloudinary did
+  pool        upload_to_cloudinary now (CLOUDINARY_WORKERS threads)
+
+For each: the time taken, the most Cloudinary calls in flight at once and
+the worst event loop delay (health checks to the API every 10 ms; a ticker
+in this process for the helpers).
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.cloudinary_stub import FakeCloudinary, start_server
+
+directory = tempfile.mkdtemp()
+stub = FakeCloudinary("benchmark", "benchmark-secret")
+stub_server, stub_port = start_server(stub.app)
+# Before anything imports app.config: never the real database or Cloudinary
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'minutes.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(directory, "uploads")
+os.environ["MINUTES_STORAGE"] = "cloudinary"
+os.environ["CLOUDINARY_API_URL"] = f"http://127.0.0.1:{stub_port}"
+os.environ["CLOUDINARY_CLOUD_NAME"] = "benchmark"
+os.environ["CLOUDINARY_API_KEY"] = stub.api_key
+os.environ["CLOUDINARY_API_SECRET"] = stub.api_secret
+os.environ["WEEKLY_REPORT_ENABLED"] = "false"
+os.environ["OUTBOX_WORKER_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import cloudinary.uploader  # noqa: E402
+import httpx  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.meeting_minute import MeetingMinute, MinuteAttachment  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.workspace import Workspace, WorkspaceMember  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+from app.utils.cloudinary import init_cloudinary, upload_to_cloudinary  # noqa: E402
+
+
+def seed(db):
+    user = User(email="minutes@example.com", username="minutes", full_name="Minute Taker",
+                hashed_password="x", role=UserRole.TEAM_MEMBER)
+    db.add(user)
+    db.flush()
+    workspace = Workspace(name="Minutes", owner_id=user.id)
+    db.add(workspace)
+    db.flush()
+    db.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id))
+    minute = MeetingMinute(workspace_id=workspace.id, title="Weekly sync",
+                           meeting_date=date.today(), created_by=user.id)
+    db.add(minute)
+    db.commit()
+    return user, minute
+
+
+def make_files(count: int, size: int):
+    return [(f"minutes-{i}.pdf", b"%PDF-1.7\n" + os.urandom(size - 9), "application/pdf") for i in range(count)]
+
+
+async def worst_health_delay(client, stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        worst = max(worst, time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+    return worst
+
+
+async def worst_tick_delay(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def measure(work, probe):
+    """(work's result, seconds, worst probe delay, most stub calls in flight)"""
+    stub.max_in_flight = 0
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(probe(stop))
+    started = time.perf_counter()
+    try:
+        result = await work()
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+    return result, elapsed, await watcher, stub.max_in_flight
+
+
+def attachment_count(minute_id: int) -> int:
+    with SessionLocal() as db:
+        return db.query(MinuteAttachment).filter(MinuteAttachment.meeting_minute_id == minute_id).count()
+
+
+async def upload_inline(data: bytes, filename: str) -> dict:
+    """upload_to_cloudinary before: the blocking SDK call on the event loop"""
+    return cloudinary.uploader.upload(
+        data, folder="flowhive/minutes", resource_type="auto",
+        use_filename=True, unique_filename=True, overwrite=False
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--size-kb", type=int, default=800)
+    parser.add_argument("--latency", type=float, default=0.15, help="Seconds the stand-in takes per Cloudinary call")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20, help="Upload bandwidth to the stand-in (0: unlimited)")
+    args = parser.parse_args()
+    stub.latency = args.latency
+    stub.bandwidth = args.bandwidth_mbps * 1024 * 1024 / 8
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user, minute = seed(db)
+        token = create_access_token({"sub": str(user.id)})
+        base = f"/api/meeting-minutes/{minute.id}/attachments"
+        minute_id = minute.id
+    init_cloudinary()  # the API's lifespan does this; it is not run here
+
+    api_server, api_port = start_server(app)
+    files = make_files(args.files, args.size_kb * 1024)
+    print(f"{args.files} x {args.size_kb} KB PDFs, Cloudinary calls take {args.latency:g}s "
+          f"+ upload at {args.bandwidth_mbps:g} Mbps")
+
+    def report(name, elapsed, delay, in_flight, note=""):
+        print(f"  {name:10}  {elapsed:6.2f}s  {in_flight} Cloudinary calls at once  "
+              f"worst event loop delay {delay * 1000:7.1f} ms{note}")
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{api_port}",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=300
+    ) as client:
+        probe = lambda stop: worst_health_delay(client, stop)  # noqa: E731
+
+        print("\nAPI")
+
+        async def sequential():
+            for name, data, content_type in files:
+                (await client.post(base, files={"file": (name, data, content_type)})).raise_for_status()
+
+        before = attachment_count(minute_id)
+        _, elapsed, delay, in_flight = await measure(sequential, probe)
+        report("sequential", elapsed, delay, in_flight, f", {attachment_count(minute_id) - before} attached")
+
+        batch_files = make_files(args.files, args.size_kb * 1024)  # new content: none of it is stored yet
+
+        async def batch():
+            return await client.post(f"{base}/batch", files=[("files", f) for f in batch_files])
+
+        before = attachment_count(minute_id)
+        response, elapsed, delay, in_flight = await measure(batch, probe)
+        response.raise_for_status()
+        report("batch", elapsed, delay, in_flight, f", {attachment_count(minute_id) - before} attached")
+
+        rejected_files = make_files(args.files - 1, args.size_kb * 1024) + [("notes.txt", b"plain text", "text/plain")]
+
+        async def rejected():
+            return await client.post(f"{base}/batch", files=[("files", f) for f in rejected_files])
+
+        before, destroys = attachment_count(minute_id), stub.destroys
+        response, elapsed, delay, in_flight = await measure(rejected, probe)
+        for _ in range(100):  # destroyed by a thread after the rollback
+            if stub.destroys - destroys >= args.files - 1:
+                break
+            await asyncio.sleep(0.05)
+        report("rejected", elapsed, delay, in_flight,
+               f", HTTP {response.status_code}, {attachment_count(minute_id) - before} attached, "
+               f"{stub.destroys - destroys} of {args.files - 1} stored files destroyed")
+
+    print("\nupload_to_cloudinary")
+    for name, upload in (("inline", upload_inline), ("pool", upload_to_cloudinary)):
+        async def helpers():
+            return await asyncio.gather(*(upload(data, filename) for filename, data, _ in files))
+
+        _, elapsed, delay, in_flight = await measure(helpers, worst_tick_delay)
+        report(name, elapsed, delay, in_flight)
+
+    api_server.should_exit = True
+    stub_server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Web Push dispatch benchmark against a local fake push service
+Run with: python -m benchmarks.push_dispatch [--subscriptions 2000] [--latency 0.05] [--baseline 100]
+
+Starts a fake push service on 127.0.0.1 (in a background thread) that
+answers 201 after --latency seconds, or 410 for a --gone share of the
+subscriptions, and tracks how many requests each host had in flight.
+Generates that many subscriptions with real P-256 keys, alternating
+between the hosts "127.0.0.1" and "localhost" so the per-host limit shows,
+and pushes one payload to all of them through PushDispatcher. A sample of
+the received bodies is decrypted to check the encryption.
+
+The fake service runs in the same process, so on a small machine both sides
+compete for the CPU and the figures are a lower bound.
+
+--baseline N also times N sequential pywebpush.webpush() calls, the way
+PushNotificationService sent before the dispatcher.
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+
+import http_ece
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid
+from pywebpush import webpush
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.services.push_dispatcher import PushDispatcher, PushTarget
+
+PAYLOAD = {"title": "📊 Weekly Report Ready", "message": "Your weekly report has been sent.", "url": "/field"}
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+class FakePushService:
+    """Minimal push service: checks headers, records bodies, simulates latency"""
+
+    def __init__(self, latency: float, gone: set, verify: int):
+        self.latency = latency
+        self.gone = gone
+        self.verify = verify
+        self.inflight = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.requests = 0
+        self.bad_headers = 0
+        self.samples = {}
+        self.app = Starlette(routes=[Route("/push/{sub_id:int}", self.push, methods=["POST"])])
+
+    async def push(self, request):
+        host = request.headers["host"].split(":")[0]
+        self.requests += 1
+        self.inflight[host] += 1
+        self.peak[host] = max(self.peak[host], self.inflight[host])
+        try:
+            if (not request.headers.get("authorization", "").startswith("vapid t=")
+                    or request.headers.get("content-encoding") != "aes128gcm"):
+                self.bad_headers += 1
+                return Response(status_code=400)
+            body = await request.body()
+            sub_id = request.path_params["sub_id"]
+            if len(self.samples) < self.verify:
+                self.samples[sub_id] = body
+            await asyncio.sleep(self.latency)
+            return Response(status_code=410 if sub_id in self.gone else 201)
+        finally:
+            self.inflight[host] -= 1
+
+
+def start_server(app):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port
+
+
+def make_subscriptions(count: int, port: int):
+    """PushTargets with real keys, plus the private halves for decryption checks"""
+    targets, keys = [], {}
+    for sub_id in range(1, count + 1):
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        public = private_key.public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+        )
+        auth = os.urandom(16)
+        host = "127.0.0.1" if sub_id % 2 else "localhost"
+        targets.append(PushTarget(
+            subscription_id=sub_id,
+            user_id=sub_id,
+            endpoint=f"http://{host}:{port}/push/{sub_id}",
+            p256dh=b64url(public),
+            auth=b64url(auth)
+        ))
+        keys[sub_id] = (private_key, auth)
+    return targets, keys
+
+
+def run_baseline(targets, vapid, count):
+    started = time.perf_counter()
+    sent = 0
+    for target in targets[:count]:
+        try:
+            webpush(
+                subscription_info={"endpoint": target.endpoint, "keys": {"p256dh": target.p256dh, "auth": target.auth}},
+                data=str(PAYLOAD),
+                vapid_private_key=vapid,
+                vapid_claims={"sub": "mailto:bench@flowhive.app"}
+            )
+            sent += 1
+        except Exception:
+            pass
+    elapsed = time.perf_counter() - started
+    print(f"\nsequential pywebpush: {sent}/{count} in {elapsed:.2f}s ({sent / elapsed:.0f} pushes/s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the fake push service takes per request")
+    parser.add_argument("--gone", type=float, default=0.05, help="Share of subscriptions answered 410")
+    parser.add_argument("--per-host", type=int, default=50, help="Concurrency limit per push host")
+    parser.add_argument("--workers", type=int, default=4, help="Encryption worker threads")
+    parser.add_argument("--verify", type=int, default=20, help="Bodies to decrypt and check")
+    parser.add_argument("--baseline", type=int, default=0, help="Also time N sequential webpush() calls")
+    args = parser.parse_args()
+
+    step = max(1, round(1 / args.gone)) if args.gone else 0
+    gone = set(range(step, args.subscriptions + 1, step)) if step else set()
+    service = FakePushService(args.latency, gone, args.verify)
+    server, port = start_server(service.app)
+
+    print(f"Generating {args.subscriptions} subscriptions...")
+    targets, keys = make_subscriptions(args.subscriptions, port)
+    vapid = Vapid()
+    vapid.generate_keys()
+
+    dispatcher = PushDispatcher(
+        vapid_loader=lambda: vapid,
+        subject="mailto:bench@flowhive.app",
+        max_per_host=args.per_host,
+        workers=args.workers
+    )
+    report = await dispatcher.dispatch(targets, PAYLOAD)
+    await dispatcher.aclose()
+
+    print(f"\ndispatcher: {args.subscriptions} subscriptions, {args.latency * 1000:.0f} ms push service latency, "
+          f"limit {args.per_host}/host, {args.workers} encryption workers")
+    print(f"  sent {report.sent}, failed {report.failed}, gone {len(report.gone)} (expected {len(gone)})")
+    print(f"  {report.elapsed:.2f}s, {report.pushes_per_second:.0f} pushes/s")
+    print(f"  peak in flight per host: {dict(service.peak)}")
+    print(f"  VAPID headers signed: {dispatcher._vapid_headers.signed} (one per host)")
+    print(f"  requests with bad headers: {service.bad_headers}")
+
+    decrypted = 0
+    for sub_id, body in service.samples.items():
+        private_key, auth = keys[sub_id]
+        if b"Weekly Report" in http_ece.decrypt(body, private_key=private_key, auth_secret=auth, version="aes128gcm"):
+            decrypted += 1
+    print(f"  decrypted payload samples: {decrypted}/{len(service.samples)}")
+
+    if args.baseline:
+        run_baseline(targets, vapid, args.baseline)
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
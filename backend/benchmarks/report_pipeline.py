@@ -0,0 +1,242 @@
+"""
+Weekly report pipeline benchmark against a local Resend stand-in
+Run with: python -m benchmarks.report_pipeline [--workspaces 20] [--members 15] [--latency 0.15] [--mode both]
+
+Seeds a throwaway SQLite database with --workspaces workspaces of --members
+members each (one executive, two managers, the rest team members, every one
+with --activities activities last week), starts a stand-in for the Resend
+API on 127.0.0.1 that answers after --latency seconds (and 429 above
+--rate-limit requests/s, if set), then sends the weekly reports:
+
+  pipeline  WeeklyReportPipeline: two queries for all workspaces, each
+            distinct report rendered once, batch sends with bounded
+            concurrency, workspaces in parallel
+  serial    the previous scheduler loop: workspace by workspace, one render
+            and one blocking resend.Emails.send per member
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+from datetime import date, time as dtime, timedelta
+
+import resend
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import app.utils.email as email_utils
+from app.config import settings
+from app.database import Base
+from app.models import FieldActivity, LocationType, User, UserRole, Workspace, WorkspaceMember
+from app.services.field_activity_service import FieldActivityReportService
+from app.services.report_pipeline import ResendMailer, WeeklyReportPipeline
+
+
+class FakeResend:
+    """Accepts /emails and /emails/batch like the Resend API, after a delay"""
+
+    def __init__(self, latency: float, rate_limit: int):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.emails = 0
+        self.rate_limited = 0
+        self._window = (0, 0)
+        self.app = Starlette(routes=[
+            Route("/emails", self.single, methods=["POST"]),
+            Route("/emails/batch", self.batch, methods=["POST"]),
+        ])
+
+    def _limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        second = int(time.monotonic())
+        start, count = self._window
+        self._window = (second, count + 1) if start == second else (second, 1)
+        return self._window[1] > self.rate_limit
+
+    async def _accept(self, count: int):
+        self.requests += 1
+        if self._limited():
+            self.rate_limited += 1
+            return JSONResponse(
+                {"statusCode": 429, "name": "rate_limit_exceeded", "message": "Too many requests"},
+                status_code=429
+            )
+        await asyncio.sleep(self.latency)
+        first = self.emails
+        self.emails += count
+        return [{"id": f"email-{first + i}"} for i in range(count)]
+
+    async def single(self, request):
+        await request.json()
+        result = await self._accept(1)
+        return result if isinstance(result, JSONResponse) else JSONResponse(result[0])
+
+    async def batch(self, request):
+        result = await self._accept(len(await request.json()))
+        return result if isinstance(result, JSONResponse) else JSONResponse({"data": result})
+
+
+def start_server(app):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port
+
+
+def seed(db, workspaces, members, activities, monday):
+    roles = [UserRole.EXECUTIVE, UserRole.MANAGER, UserRole.MANAGER]
+    owner = User(email="owner@example.com", username="owner", hashed_password="x", role=UserRole.EXECUTIVE)
+    db.add(owner)
+    db.flush()
+    for w in range(workspaces):
+        workspace = Workspace(name=f"Workspace {w}", owner_id=owner.id)
+        db.add(workspace)
+        db.flush()
+        for m in range(members):
+            user = User(
+                email=f"user{w}-{m}@example.com",
+                username=f"user{w}-{m}",
+                full_name=f"User {w}-{m}",
+                hashed_password="x",
+                role=roles[m] if m < len(roles) else UserRole.TEAM_MEMBER
+            )
+            db.add(user)
+            db.flush()
+            db.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id))
+            for a in range(activities):
+                db.add(FieldActivity(
+                    workspace_id=workspace.id,
+                    support_staff_id=user.id,
+                    activity_date=monday + timedelta(days=a % 7),
+                    start_time=dtime(9, 0),
+                    end_time=dtime(11, 30),
+                    title=f"Site visit {a}",
+                    customer_name=f"Customer {a % 5}",
+                    location_type=LocationType.ON_SITE,
+                    location="Nairobi",
+                    task_description="Router installation and configuration",
+                    remarks="Completed",
+                    created_by=user.id
+                ))
+    db.commit()
+
+
+async def serial_reports(db, date_from, date_to):
+    """The pre-pipeline scheduler loop (render and blocking send per member)"""
+    emails = 0
+    renders = 0
+    for workspace in db.query(Workspace).all():
+        activities = db.query(FieldActivity).filter(
+            FieldActivity.workspace_id == workspace.id,
+            FieldActivity.activity_date >= date_from,
+            FieldActivity.activity_date <= date_to
+        ).order_by(FieldActivity.activity_date, FieldActivity.start_time).all()
+        if not activities:
+            continue
+        members = db.query(WorkspaceMember, User).join(
+            User, WorkspaceMember.user_id == User.id
+        ).filter(WorkspaceMember.workspace_id == workspace.id).all()
+
+        by_staff = FieldActivityReportService._group_activities_by_staff(activities)
+        full_summary = FieldActivityReportService._calculate_summary(activities, by_staff)
+        for _, user in members:
+            if user.role in [UserRole.MANAGER, UserRole.EXECUTIVE]:
+                staff, summary = list(by_staff.values()), full_summary
+            elif user.id in by_staff:
+                staff = [by_staff[user.id]]
+                summary = {"total_activities": len(staff[0]["activities"]), "total_hours": staff[0]["total_hours"],
+                           "unique_customers": 0, "unique_staff": 1}
+            else:
+                continue
+            result = email_utils.send_activity_report_email(
+                to_emails=[user.email], subject="Weekly Activity Report", activities_by_staff=staff,
+                date_from=date_from, date_to=date_to, summary=summary, resend_api_key="re_benchmark",
+                from_email="reports@example.com", from_name="Reports", frontend_url="https://example.com"
+            )
+            renders += 1
+            emails += result["success"]
+    return emails, renders
+
+
+async def pipeline_reports(db, date_from, date_to, args):
+    mailer = ResendMailer(
+        api_key="re_benchmark",
+        from_email="reports@example.com",
+        from_name="Reports",
+        concurrency=args.concurrency,
+        batch_size=args.batch_size
+    )
+    pipeline = WeeklyReportPipeline(mailer=mailer, frontend_url="https://example.com")
+
+    results = await pipeline.run(db, date_from, date_to)
+    sent = sum(r["sent_count"] for r in results.values() if isinstance(r, dict))
+    failed = sum(r["failed_count"] for r in results.values() if isinstance(r, dict))
+    return sent, pipeline.rendered, failed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspaces", type=int, default=20)
+    parser.add_argument("--members", type=int, default=15)
+    parser.add_argument("--activities", type=int, default=5, help="Activities per member in the week")
+    parser.add_argument("--latency", type=float, default=0.15, help="Seconds the Resend stand-in takes per request")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests/s before the stand-in answers 429")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--mode", choices=["pipeline", "serial", "both"], default="both")
+    args = parser.parse_args()
+
+    fake = FakeResend(args.latency, args.rate_limit)
+    server, port = start_server(fake.app)
+    settings.RESEND_API_URL = f"http://127.0.0.1:{port}"
+    resend.api_url = settings.RESEND_API_URL
+
+    path = os.path.join(tempfile.mkdtemp(), "reports.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    monday = date.today() - timedelta(days=date.today().weekday() + 7)
+    seed(db, args.workspaces, args.members, args.activities, monday)
+    date_from, date_to = str(monday), str(monday + timedelta(days=6))
+
+    modes = ["pipeline", "serial"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        db.expire_all()
+        requests_before, emails_before = fake.requests, fake.emails
+        started = time.perf_counter()
+        if mode == "pipeline":
+            sent, rendered, failed = await pipeline_reports(db, date_from, date_to, args)
+        else:
+            sent, rendered = await serial_reports(db, date_from, date_to)
+            failed = 0
+        elapsed = time.perf_counter() - started
+
+        print(f"\n{mode}: {args.workspaces} workspaces x {args.members} members, "
+              f"{args.latency * 1000:.0f} ms per Resend request")
+        print(f"  {sent} emails sent ({failed} failed), {rendered} reports rendered, "
+              f"{fake.requests - requests_before} Resend requests ({fake.emails - emails_before} emails accepted)")
+        print(f"  {elapsed:.2f}s, {sent / elapsed:.0f} emails/s")
+        if mode == "pipeline":
+            print(f"  concurrency {args.concurrency}, batch size {args.batch_size}, "
+                  f"{fake.rate_limited} request(s) rate limited so far")
+
+    db.close()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,302 @@
+"""
+Uploads over a flaky connection: restarting vs resuming
+Run with: python -m benchmarks.resumable_upload [--size-mb 10] [--mean-drop-mb 4] [--chunk-kb 1024] [--target photo]
+
+Starts the API on 127.0.0.1 against a throwaway SQLite database and upload
+directories, behind a TCP proxy that plays a mobile link: every connection
+is cut after a random number of request bytes (exponentially distributed,
+mean --mean-drop-mb), with no response. Then uploads the same size of file
+to a field activity (or a meeting minute, --target minute) --uploads times
+each way:
+
+  restart    the multipart upload endpoint, sent again from the start after
+             every drop, as the clients did
+  resumable  create, PATCH --chunk-kb chunks, HEAD for the offset after a
+             drop and carry on from there, complete (--checksum adds an
+             Upload-Checksum to every chunk: an interrupted chunk is then
+             dropped rather than kept)
+
+Reports the bytes the server received, requests, drops and time per way,
+and checks every stored file against the original's SHA-256.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from datetime import date, time as dtime
+
+directory = tempfile.mkdtemp()
+# Before anything imports app.config: never the real database or uploads
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'uploads.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(directory, "uploads")
+os.environ["UPLOAD_STAGING_DIR"] = os.path.join(directory, "staging")
+os.environ["FILE_STORAGE"] = "local"
+os.environ["MINUTES_STORAGE"] = "local"
+os.environ["WEEKLY_REPORT_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.field_activity import FieldActivity, LocationType  # noqa: E402
+from app.models.meeting_minute import MeetingMinute  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.workspace import Workspace, WorkspaceMember  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+
+def start_server(app):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port
+
+
+class FlakyProxy:
+    """Forwards to the API, cutting each connection after a random number of request bytes"""
+
+    def __init__(self, upstream_port: int, mean_drop: float, rng: random.Random):
+        self.upstream_port = upstream_port
+        self.mean_drop = mean_drop
+        self.rng = rng
+        self.received = 0  # request bytes that reached the API
+        self.drops = 0
+        self.connections = set()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        if self.connections:
+            await asyncio.wait(self.connections, timeout=10)
+
+    async def handle(self, client_reader, client_writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        task.add_done_callback(self.connections.discard)
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", self.upstream_port)
+        budget = int(self.rng.expovariate(1 / self.mean_drop)) if self.mean_drop else None
+
+        async def requests():
+            nonlocal budget
+            while data := await client_reader.read(64 * 1024):
+                if budget is not None and len(data) >= budget:
+                    upstream_writer.write(data[:budget])
+                    self.received += budget
+                    self.drops += 1
+                    # Gone: no FIN to either side's application, just a reset
+                    client_writer.transport.abort()
+                    upstream_writer.transport.abort()
+                    return
+                upstream_writer.write(data)
+                self.received += len(data)
+                if budget is not None:
+                    budget -= len(data)
+                await upstream_writer.drain()
+            upstream_writer.close()
+
+        async def responses():
+            while data := await upstream_reader.read(64 * 1024):
+                client_writer.write(data)
+                await client_writer.drain()
+            client_writer.close()
+
+        await asyncio.gather(requests(), responses(), return_exceptions=True)
+
+
+def seed(db):
+    user = User(email="field@example.com", username="field", full_name="Field Staff",
+                hashed_password="x", role=UserRole.TEAM_MEMBER)
+    db.add(user)
+    db.flush()
+    workspace = Workspace(name="Field", owner_id=user.id)
+    db.add(workspace)
+    db.flush()
+    db.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id))
+    activity = FieldActivity(
+        workspace_id=workspace.id,
+        support_staff_id=user.id,
+        activity_date=date.today(),
+        start_time=dtime(9, 0),
+        end_time=dtime(11, 30),
+        title="Site visit",
+        customer_name="Customer",
+        location_type=LocationType.ON_SITE,
+        location="Nairobi",
+        created_by=user.id
+    )
+    minute = MeetingMinute(workspace_id=workspace.id, title="Weekly sync",
+                           meeting_date=date.today(), created_by=user.id)
+    db.add_all([activity, minute])
+    db.commit()
+    return user, activity, minute
+
+
+def make_file(size: int, target: str, rng: random.Random) -> bytes:
+    """Incompressible bytes the type sniffer takes for a JPEG (or PDF)"""
+    magic = b"\xff\xd8\xff\xe0" if target == "photo" else b"%PDF-1.7\n"
+    return magic + rng.randbytes(size - len(magic))
+
+
+async def restart(client, base, data, name, content_type, max_attempts):
+    """Multipart upload, from the start after every drop"""
+    requests = 0
+    for _ in range(max_attempts):
+        requests += 1
+        try:
+            response = await client.post(base, files={"file": (name, data, content_type)})
+        except httpx.TransportError:
+            continue
+        response.raise_for_status()
+        return response.json(), requests
+    return None, requests
+
+
+async def resumable(client, base, data, name, content_type, chunk_size, checksum, max_attempts):
+    """create, PATCH chunks (HEAD after a drop), complete"""
+    requests = 0
+    failures = 0
+
+    async def call(method, url, **kwargs):
+        nonlocal requests, failures
+        while True:
+            requests += 1
+            try:
+                return await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                failures += 1
+                if failures >= max_attempts:
+                    raise
+
+    try:
+        created = (await call("POST", f"{base}/resumable", json={
+            "filename": name,
+            "content_type": content_type,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest()
+        })).json()
+        url, offset = created["url"], created["offset"]
+        while offset < len(data):
+            chunk = data[offset:offset + chunk_size]
+            headers = {"Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"}
+            if checksum:
+                headers["Upload-Checksum"] = "sha256 " + base64.b64encode(hashlib.sha256(chunk).digest()).decode()
+            requests += 1
+            try:
+                response = await client.patch(url, content=chunk, headers=headers)
+            except httpx.TransportError:
+                failures += 1
+                if failures >= max_attempts:
+                    return None, requests
+                response = None
+            if response is not None and response.status_code == 204:
+                offset = int(response.headers["Upload-Offset"])
+                continue
+            if response is not None and response.status_code not in (409, 423, 460):
+                response.raise_for_status()
+            if response is not None and response.status_code == 423:
+                # The server has yet to notice the dropped request still holding the upload
+                await asyncio.sleep(0.05)
+            # Where to carry on from: what the server kept
+            offset = int((await call("HEAD", url)).headers["Upload-Offset"])
+        while True:
+            response = await call("POST", f"{base}/resumable/{created['upload_id']}/complete")
+            if response.status_code != 423:
+                break
+            await asyncio.sleep(0.05)
+        response.raise_for_status()
+        return response.json(), requests
+    except httpx.TransportError:
+        return None, requests
+
+
+def stored_sha256(record) -> str:
+    location = record.get("file_path") or record.get("cloudinary_public_id")
+    with open(location, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=9.5)
+    parser.add_argument("--mean-drop-mb", type=float, default=4, help="Mean request bytes before a connection drops (0: never)")
+    parser.add_argument("--chunk-kb", type=int, default=1024)
+    parser.add_argument("--uploads", type=int, default=5)
+    parser.add_argument("--max-attempts", type=int, default=100, help="Dropped requests before an upload gives up")
+    parser.add_argument("--target", choices=["photo", "minute"], default="photo")
+    parser.add_argument("--checksum", action="store_true", help="Send Upload-Checksum with every chunk")
+    parser.add_argument("--mode", choices=["restart", "resumable", "both"], default="both")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    user, activity, minute = seed(db)
+    token = create_access_token({"sub": str(user.id)})
+    if args.target == "photo":
+        base, name, content_type = f"/api/field-activities/{activity.id}/photos", "site.jpg", "image/jpeg"
+    else:
+        base, name, content_type = f"/api/meeting-minutes/{minute.id}/attachments", "minutes.pdf", "application/pdf"
+    db.close()
+
+    server, port = start_server(app)
+    rng = random.Random(args.seed)
+    proxy = FlakyProxy(port, args.mean_drop_mb * 1024 * 1024, rng)
+    proxy_port = await proxy.start()
+    size = int(args.size_mb * 1024 * 1024)
+
+    modes = ["restart", "resumable"] if args.mode == "both" else [args.mode]
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{proxy_port}",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=120
+    ) as client:
+        for mode in modes:
+            received_before, drops_before = proxy.received, proxy.drops
+            requests = completed = verified = 0
+            started = time.perf_counter()
+            for _ in range(args.uploads):
+                data = make_file(size, args.target, rng)
+                if mode == "restart":
+                    record, sent = await restart(client, base, data, name, content_type, args.max_attempts)
+                else:
+                    record, sent = await resumable(
+                        client, base, data, name, content_type, args.chunk_kb * 1024, args.checksum, args.max_attempts
+                    )
+                requests += sent
+                if record is not None:
+                    completed += 1
+                    verified += stored_sha256(record) == hashlib.sha256(data).hexdigest()
+            elapsed = time.perf_counter() - started
+            received = proxy.received - received_before
+
+            print(f"\n{mode}: {args.uploads} x {args.size_mb:g} MB {args.target} uploads, "
+                  f"connections dropped after {args.mean_drop_mb:g} MB on average"
+                  + (f", {args.chunk_kb} KB chunks" + (" with checksums" if args.checksum else "")
+                     if mode == "resumable" else ""))
+            print(f"  {completed} completed ({verified} verified against their SHA-256), {requests} requests, "
+                  f"{proxy.drops - drops_before} dropped")
+            print(f"  {received / 1024 / 1024:.1f} MB received by the server "
+                  f"({received / max(size * completed, 1):.2f}x the files), {elapsed:.2f}s")
+
+    await proxy.close()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
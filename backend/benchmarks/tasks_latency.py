@@ -0,0 +1,105 @@
+"""
+Load benchmark for concurrent /api/tasks/ reads
+Run with: python -m benchmarks.tasks_latency --token <jwt> [--url http://localhost:8000]
+
+Fires --requests GETs at /api/tasks/ with --concurrency in flight and prints
+p50/p95/p99 latency. Pass --background-path to keep a slow endpoint (e.g.
+/api/analytics/executive-dashboard) busy at the same time: with the sync
+Session every blocking query stalls the event loop, so task reads queue up
+behind it. Run once against the old build and once against the new one
+(same worker count) to compare before/after.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+async def run_reads(client, path, total, concurrency, latencies, errors):
+    """Issue `total` GETs against `path` with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+            except httpx.HTTPError:
+                errors.append(1)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+
+
+async def run_background(client, path, stop):
+    """Keep a slow endpoint busy until `stop` is set"""
+    while not stop.is_set():
+        try:
+            await client.get(path)
+        except httpx.HTTPError:
+            pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Bearer token for an active user")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100, help="Page size for /api/tasks/")
+    parser.add_argument("--background-path", default=None, help="Slow endpoint to load in parallel")
+    parser.add_argument("--background-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency + args.background_concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url,
+        headers={"Authorization": f"Bearer {args.token}"},
+        limits=limits,
+        timeout=60.0
+    ) as client:
+        stop = asyncio.Event()
+        background = []
+        if args.background_path:
+            background = [
+                asyncio.create_task(run_background(client, args.background_path, stop))
+                for _ in range(args.background_concurrency)
+            ]
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await run_reads(client, f"/api/tasks/?limit={args.limit}", args.requests, args.concurrency, latencies, errors)
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await asyncio.gather(*background)
+
+    latencies.sort()
+    print("=" * 60)
+    print(f"GET /api/tasks/  requests={args.requests} concurrency={args.concurrency}")
+    if args.background_path:
+        print(f"background load: {args.background_path} x{args.background_concurrency}")
+    print("=" * 60)
+    print(f"ok: {len(latencies)}  errors: {len(errors)}  elapsed: {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        print(f"mean: {statistics.mean(latencies):.1f} ms")
+        print(f"p50:  {percentile(latencies, 50):.1f} ms")
+        print(f"p95:  {percentile(latencies, 95):.1f} ms")
+        print(f"p99:  {percentile(latencies, 99):.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
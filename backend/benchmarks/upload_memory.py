@@ -0,0 +1,146 @@
+"""
+Peak memory of concurrent uploads: whole-file reads vs stream_upload
+Run with: python -m benchmarks.upload_memory [--uploads 20] [--size-mb 9] [--mode both]
+
+For each mode, starts a uvicorn server in a child process with one upload
+route, sends --uploads uploads of --size-mb MB at once, and reports the
+server's peak resident set size (VmHWM from /proc, so Linux only) above
+its idle level:
+
+  read    the previous handlers: await file.read(), check the size, write
+          the bytes out with aiofiles
+  stream  stream_upload: chunked copy from Starlette's spool to the
+          destination, hashed and size-checked on the way
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiofiles
+import httpx
+import uvicorn
+from fastapi import FastAPI, File, HTTPException, UploadFile
+
+from app.utils.uploads import stream_upload, unique_upload_path
+
+ALLOWED = {"image/jpeg"}
+MAX_SIZE = 10 * 1024 * 1024
+
+
+def build_app(mode: str, directory: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        path = unique_upload_path(directory, file.filename)
+        if mode == "read":
+            content = await file.read()
+            if len(content) > MAX_SIZE:
+                raise HTTPException(status_code=413)
+            async with aiofiles.open(path, "wb") as f:
+                await f.write(content)
+            return {"size": len(content)}
+        info = await stream_upload(file, ALLOWED, destination=path, max_size=MAX_SIZE)
+        return {"size": info.size}
+
+    @app.get("/ready")
+    async def ready():
+        return {"pid": os.getpid()}
+
+    return app
+
+
+def serve(mode: str, port: int, directory: str):
+    uvicorn.run(build_app(mode, directory), host="127.0.0.1", port=port, log_level="warning")
+
+
+def peak_rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmHWM not available")
+
+
+def reset_peak(pid: int):
+    # Writing 5 to clear_refs resets VmHWM to the current RSS (Linux >= 4.0)
+    with open(f"/proc/{pid}/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def run_mode(mode: str, args) -> dict:
+    directory = tempfile.mkdtemp()
+    port = free_port()
+    child = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.upload_memory", "--serve", mode, "--port", str(port), "--dir", directory]
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/ready")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+
+            body = b"\xff\xd8\xff" + os.urandom(int(args.size_mb * 1024 * 1024) - 3)
+            # Warm up, then measure from the idle level
+            await client.post("/upload", files={"file": ("w.jpg", body[:4096], "image/jpeg")})
+            reset_peak(child.pid)
+            idle_kb = peak_rss_kb(child.pid)
+
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/upload", files={"file": (f"{i}.jpg", body, "image/jpeg")})
+                for i in range(args.uploads)
+            ))
+            elapsed = time.perf_counter() - started
+            return {
+                "ok": sum(r.status_code == 200 for r in responses),
+                "idle_mb": idle_kb / 1024,
+                "peak_mb": peak_rss_kb(child.pid) / 1024,
+                "elapsed": elapsed
+            }
+    finally:
+        child.terminate()
+        child.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+async def main(args):
+    modes = ["read", "stream"] if args.mode == "both" else [args.mode]
+    print(f"{args.uploads} concurrent uploads of {args.size_mb} MB")
+    for mode in modes:
+        result = await run_mode(mode, args)
+        print(
+            f"  {mode:6}  {result['ok']}/{args.uploads} ok in {result['elapsed']:.2f}s, "
+            f"peak RSS {result['peak_mb']:.0f} MB (+{result['peak_mb'] - result['idle_mb']:.0f} MB over idle)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--size-mb", type=float, default=9)
+    parser.add_argument("--mode", choices=["read", "stream", "both"], default="both")
+    parser.add_argument("--serve", choices=["read", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port, args.dir)
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,172 @@
+"""
+Serving uploads: the plain StaticFiles mount vs UploadFiles
+Run with: python -m benchmarks.upload_serving [--files 50] [--size-kb 300] [--concurrency 20] [--requests 2000]
+
+Writes --files content-addressed blobs (blobs/<2 hex>/<sha256>-<nonce>.jpg)
+to a throwaway directory and serves it from a uvicorn process, mounted three
+ways:
+
+  /static   StaticFiles, as /uploads was mounted before
+  /uploads  UploadFiles, serving the bytes itself (UPLOAD_SERVE_MODE=app)
+  /accel    UploadFiles with UPLOAD_SERVE_MODE=x-accel-redirect: headers
+            only, the bytes are the front proxy's job
+
+and sends --requests GETs, --concurrency at a time, per mount and scenario:
+
+  full        the whole file
+  revalidate  If-None-Match with the ETag of an earlier response: 304
+  range       the first 64 KB (a video player or resumed download); /accel
+              answers 200 with the redirect, the proxy slices the file
+
+Reports requests/s, MB/s of body and the median latency. The biggest
+difference isn't measured here: blobs are now served with immutable
+Cache-Control, so a browser that has a photo makes no request at all for
+it, where StaticFiles' responses had none and every revisit asked again.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+
+from app.utils.upload_serving import SERVE_X_ACCEL_REDIRECT, UploadFiles
+
+MOUNTS = ["static", "uploads", "accel"]
+SCENARIOS = ["full", "revalidate", "range"]
+
+
+def build_app(directory: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ready")
+    async def ready():
+        return {}
+
+    app.mount("/static", StaticFiles(directory=directory))
+    app.mount("/uploads", UploadFiles(directory=directory))
+    app.mount("/accel", UploadFiles(directory=directory, mode=SERVE_X_ACCEL_REDIRECT, accel_prefix="/protected"))
+    return app
+
+
+def serve(port: int, directory: str):
+    uvicorn.run(build_app(directory), host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def write_blobs(directory: str, count: int, size: int) -> list:
+    paths = []
+    for _ in range(count):
+        data = b"\xff\xd8\xff\xe0" + os.urandom(size - 4)
+        sha256 = hashlib.sha256(data).hexdigest()
+        relative = f"blobs/{sha256[:2]}/{sha256}-{os.urandom(4).hex()}.jpg"
+        os.makedirs(os.path.join(directory, os.path.dirname(relative)), exist_ok=True)
+        with open(os.path.join(directory, relative), "wb") as f:
+            f.write(data)
+        paths.append(relative)
+    return paths
+
+
+async def run(client, mount: str, scenario: str, paths: list, etags: dict, args) -> dict:
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(paths[i % len(paths)])
+    latencies = []
+    received = 0
+    unexpected = 0
+    expected = {"full": 200, "revalidate": 304, "range": 206}[scenario]
+    if mount == "accel" and scenario == "range":
+        expected = 200  # the proxy cuts the range from the file it is pointed at
+
+    async def worker():
+        nonlocal received, unexpected
+        while not queue.empty():
+            path = queue.get_nowait()
+            headers = {}
+            if scenario == "revalidate":
+                headers["If-None-Match"] = etags[path]
+            elif scenario == "range":
+                headers["Range"] = "bytes=0-65535"
+            started = time.perf_counter()
+            response = await client.get(f"/{mount}/{path}", headers=headers)
+            latencies.append(time.perf_counter() - started)
+            received += len(response.content)
+            unexpected += response.status_code != expected
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": args.requests / elapsed,
+        "mbps": received / elapsed / 1024 / 1024,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "unexpected": unexpected
+    }
+
+
+async def main(args):
+    directory = tempfile.mkdtemp()
+    paths = write_blobs(directory, args.files, args.size_kb * 1024)
+    port = free_port()
+    child = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.upload_serving", "--serve", "--port", str(port), "--dir", directory]
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/ready")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+
+            print(f"{args.requests} GETs, {args.concurrency} at a time, over {args.files} files of {args.size_kb} KB")
+            for mount in MOUNTS:
+                etags = {}
+                for path in paths:
+                    response = await client.head(f"/{mount}/{path}")
+                    etags[path] = response.headers["etag"]
+                cache_control = response.headers.get("cache-control", "(none)")
+                print(f"\n/{mount}: ETag {response.headers['etag']}, Cache-Control {cache_control}")
+                for scenario in SCENARIOS:
+                    result = await run(client, mount, scenario, paths, etags, args)
+                    note = f", {result['unexpected']} unexpected statuses" if result["unexpected"] else ""
+                    print(f"  {scenario:10}  {result['rps']:7.0f} req/s  {result['mbps']:7.1f} MB/s  "
+                          f"p50 {result['p50_ms']:6.2f} ms{note}")
+    finally:
+        child.terminate()
+        child.wait()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--size-kb", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.dir)
+    else:
+        asyncio.run(main(args))
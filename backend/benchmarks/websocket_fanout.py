@@ -0,0 +1,197 @@
+"""
+In-process benchmark for WebSocket workspace fan-out
+Run with: python -m benchmarks.websocket_fanout [--sockets 1000] [--slow 20] [--mode both]
+
+Connects --sockets simulated clients to one workspace, --slow of which take
+--slow-delay seconds per frame (a phone on a bad network), then broadcasts
+--messages events and reports how long the healthy clients waited for each,
+and how many frames and bytes each one received.
+
+  queued      ConnectionManager: frame serialized once, per-socket send
+              queues and writer tasks, slow consumers dropped per policy
+  sequential  the previous broadcast loop: await send_json on each socket
+              in turn, so every client waits behind the slow ones
+
+Burst traffic (a board drag, a bulk edit): --entities 5 makes the events
+repeated updates of 5 tasks, --coalesce-ms 50 batches them and --protocol
+json/msgpack selects the negotiated subprotocol (legacy = none). Bytes are
+before permessage-deflate, which the server applies on top.
+
+No server or database is involved; only the fan-out itself is measured.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.api.websocket import ConnectionManager
+from app.services.websocket_backplane import InMemoryBackplane
+from app.services.websocket_protocol import PROTOCOL_JSON, PROTOCOL_MSGPACK, decode
+
+WORKSPACE_ID = 1
+
+PROTOCOLS = {"legacy": [], "json": [PROTOCOL_JSON], "msgpack": [PROTOCOL_MSGPACK]}
+
+
+class SimulatedSocket:
+    """Records when each frame arrives; slow sockets sleep before accepting it"""
+
+    def __init__(self, delay: float, subprotocols):
+        self.delay = delay
+        self.scope = {"subprotocols": subprotocols}
+        self.received = []
+        self.closed = False
+
+    async def accept(self, subprotocol: str = None):
+        pass
+
+    async def send_text(self, frame: str):
+        await self._receive({"text": frame})
+
+    async def send_bytes(self, frame: bytes):
+        await self._receive({"bytes": frame})
+
+    async def send_json(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+    async def _receive(self, frame: dict):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append((time.perf_counter(), frame))
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.closed = True
+
+    def events(self):
+        """(arrival time, event) for every event received, batches unpacked"""
+        for arrived, frame in self.received:
+            message = decode(frame)
+            for event in message["events"] if message["type"] == "batch" else [message]:
+                yield arrived, event
+
+
+def frame_size(frame: dict) -> int:
+    if frame.get("text") is not None:
+        return len(frame["text"].encode("utf-8"))
+    return len(frame["bytes"])
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+async def sequential_broadcast(sockets, message):
+    """The pre-queue ConnectionManager.broadcast_to_workspace loop"""
+    for socket in sockets:
+        try:
+            await socket.send_json(message)
+        except Exception:
+            pass
+
+
+def make_message(seq, entities):
+    return {
+        "type": "task_updated",
+        "workspace_id": WORKSPACE_ID,
+        "data": {
+            "id": seq % entities if entities else seq,
+            "seq": seq,
+            "status": "in_progress",
+            "title": "Benchmark task " * 4
+        }
+    }
+
+
+async def run(mode, args):
+    subprotocols = PROTOCOLS[args.protocol]
+    sockets = [
+        SimulatedSocket(args.slow_delay if i < args.slow else 0.0, subprotocols)
+        for i in range(args.sockets)
+    ]
+    manager = ConnectionManager(
+        InMemoryBackplane(),
+        max_queue=args.queue_size,
+        send_timeout=args.send_timeout,
+        overflow_policy=args.policy,
+        coalesce_ms=args.coalesce_ms
+    )
+    if mode == "queued":
+        for socket in sockets:
+            await manager.connect(socket, WORKSPACE_ID)
+
+    sent_at = []
+    call_ms = []
+    for seq in range(args.messages):
+        message = make_message(seq, args.entities)
+        started = time.perf_counter()
+        sent_at.append(started)
+        if mode == "queued":
+            await manager.broadcast_to_workspace(WORKSPACE_ID, message)
+        else:
+            await sequential_broadcast(sockets, message)
+        call_ms.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(args.interval)
+
+    # Let healthy clients drain their queues; the last event is never collapsed
+    healthy = sockets[args.slow:]
+    last = args.messages - 1
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline and not any(
+        event["data"]["seq"] == last for _, event in healthy[-1].events()
+    ):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+
+    latencies = sorted(
+        (arrived - sent_at[event["data"]["seq"]]) * 1000
+        for socket in healthy for arrived, event in socket.events()
+    )
+    frames = sum(len(socket.received) for socket in healthy) / len(healthy)
+    size = sum(frame_size(frame) for socket in healthy for _, frame in socket.received) / len(healthy)
+    events = sum(1 for socket in healthy for _ in socket.events()) / len(healthy)
+
+    for socket in list(manager.connections):
+        manager.disconnect(socket, WORKSPACE_ID)
+    await asyncio.sleep(0)
+
+    print(f"\n{mode}: {args.sockets} sockets ({args.slow} slow at {args.slow_delay * 1000:.0f} ms/frame), "
+          f"{args.messages} broadcasts")
+    print(f"  broadcast call    mean {statistics.mean(call_ms):8.2f} ms   max {max(call_ms):8.2f} ms")
+    print(f"  healthy delivery  p50 {percentile(latencies, 50):8.2f} ms   p95 {percentile(latencies, 95):8.2f} ms"
+          f"   p99 {percentile(latencies, 99):8.2f} ms   max {latencies[-1] if latencies else 0:8.2f} ms")
+    print(f"  per healthy client: {frames:.1f} frames, {events:.1f} events, {size:,.0f} bytes")
+    if mode == "queued":
+        print(f"  protocol {args.protocol}, coalescing {args.coalesce_ms} ms")
+        print(f"  slow clients dropped: {sum(s.closed for s in sockets[:args.slow])}/{args.slow} "
+              f"(policy {args.policy}, queue {args.queue_size})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=1000)
+    parser.add_argument("--slow", type=int, default=20, help="How many sockets are slow")
+    parser.add_argument("--slow-delay", type=float, default=0.1, help="Seconds a slow socket takes per frame")
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between broadcasts")
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--send-timeout", type=float, default=5.0)
+    parser.add_argument("--policy", choices=["disconnect", "drop_oldest"], default="disconnect")
+    parser.add_argument("--entities", type=int, default=0, help="Events update this many entities (0 = all distinct)")
+    parser.add_argument("--coalesce-ms", type=int, default=0)
+    parser.add_argument("--protocol", choices=list(PROTOCOLS), default="legacy")
+    parser.add_argument("--mode", choices=["queued", "sequential", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["queued", "sequential"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        await run(mode, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,368 @@
+"""
+Flag sequential scans in the queries behind the hot API endpoints
+Run with: python check_query_plans.py [--seed] [--scale 1] [--min-rows 10000]
+
+Calls the list/detail endpoints in-process (FastAPI TestClient) against the
+Postgres database in DATABASE_URL, captures every SELECT they send, runs
+EXPLAIN (FORMAT JSON) on it and reports each Seq Scan over a table with at
+least --min-rows rows. Exits with status 1 when anything is flagged, so it
+can gate a migration review.
+
+Use a local/scratch database: --seed bulk-inserts synthetic workspaces,
+users, tasks, field activities, minutes, comments and push subscriptions
+(roughly 200k activities and 200k tasks per --scale) and ANALYZEs them.
+Planners pick sequential scans on small tables regardless of indexes, so
+the check is only meaningful on a seeded database.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+
+import asyncpg
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.database import engine, async_engine
+from app.main import app
+from app.utils.auth import create_access_token, get_password_hash
+
+
+SEED_SQL = [
+    # Users cycle through the three roles; all share one password hash
+    """
+    INSERT INTO users (email, username, hashed_password, full_name, role, is_active, created_at, updated_at)
+    SELECT 'seed' || :run || '.' || g || '@example.com', 'seed' || :run || '_' || g, :password,
+           'Seed User ' || g, (ARRAY['EXECUTIVE', 'MANAGER', 'TEAM_MEMBER'])[1 + g % 3]::userrole,
+           true, now(), now()
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO workspaces (name, owner_id, workspace_type, created_at, updated_at)
+    SELECT 'Seed ' || :run || ' workspace ' || g, (SELECT min(id) FROM users WHERE username LIKE 'seed' || :run || '\\_%'),
+           (ARRAY['FIELD_OPERATIONS', 'PROJECT_MANAGEMENT'])[1 + g % 2]::workspacetype, now(), now()
+    FROM generate_series(1, :workspaces) g
+    """,
+    # Every seeded user joins :memberships consecutive seeded workspaces
+    """
+    WITH u AS (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM users WHERE username LIKE 'seed' || :run || '\\_%'),
+         w AS (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM workspaces WHERE name LIKE 'Seed ' || :run || ' %')
+    INSERT INTO workspace_members (workspace_id, user_id, joined_at)
+    SELECT w.id, u.id, now()
+    FROM u CROSS JOIN generate_series(0, :memberships - 1) k
+    JOIN w ON w.n = (u.n + k) % :workspaces
+    """,
+    """
+    INSERT INTO task_categories (name, title, workspace_id, required_role, is_active, created_at, updated_at)
+    SELECT 'seed-' || c, 'Seed category ' || c, w.id, (ARRAY['team_member', 'manager', 'executive'])[1 + c % 3], true, now(), now()
+    FROM workspaces w CROSS JOIN generate_series(1, 5) c
+    WHERE w.name LIKE 'Seed ' || :run || ' %'
+    """,
+    """
+    INSERT INTO projects (name, workspace_id, created_at, updated_at)
+    SELECT 'Seed project ' || g, w.id, now(), now()
+    FROM workspaces w CROSS JOIN generate_series(1, 10) g
+    WHERE w.name LIKE 'Seed ' || :run || ' %' AND w.workspace_type = 'PROJECT_MANAGEMENT'
+    """,
+    # Tasks are spread over projects; creators/assignees are members of the project's workspace
+    """
+    WITH p AS (SELECT id, workspace_id, row_number() OVER (ORDER BY id) - 1 AS n FROM projects WHERE name LIKE 'Seed project %'
+               AND workspace_id IN (SELECT id FROM workspaces WHERE name LIKE 'Seed ' || :run || ' %')),
+         pc AS (SELECT count(*) AS c FROM p),
+         m AS (SELECT workspace_id, user_id, row_number() OVER (PARTITION BY workspace_id ORDER BY user_id) - 1 AS n FROM workspace_members),
+         mc AS (SELECT workspace_id, count(*) AS c FROM workspace_members GROUP BY workspace_id)
+    INSERT INTO tasks (title, project_id, creator_id, assignee_id, status, priority, position, due_date, completed_at,
+                       created_at, updated_at)
+    SELECT 'Seed task ' || g, p.id, creator.user_id, CASE WHEN g % 5 = 0 THEN NULL ELSE assignee.user_id END,
+           (ARRAY['TODO', 'IN_PROGRESS', 'IN_REVIEW', 'COMPLETED', 'BLOCKED'])[1 + g % 5]::taskstatus,
+           (ARRAY['LOW', 'MEDIUM', 'HIGH', 'URGENT'])[1 + g % 4]::taskpriority, g % 100,
+           now() + (g % 60 - 30) * interval '1 day',
+           CASE WHEN g % 5 = 3 THEN now() - (g % 90) * interval '1 day' END,
+           now() - (g % 365) * interval '1 day', now() - g * interval '1 minute'
+    FROM generate_series(1, :tasks) g
+    CROSS JOIN pc
+    JOIN p ON p.n = g % pc.c
+    JOIN mc ON mc.workspace_id = p.workspace_id
+    JOIN m creator ON creator.workspace_id = p.workspace_id AND creator.n = g % mc.c
+    JOIN m assignee ON assignee.workspace_id = p.workspace_id AND assignee.n = (g / 7) % mc.c
+    """,
+    """
+    WITH t AS (SELECT id, creator_id, row_number() OVER (ORDER BY id) - 1 AS n FROM tasks WHERE title LIKE 'Seed task %'),
+         tc AS (SELECT count(*) AS c FROM t)
+    INSERT INTO comments (content, task_id, user_id, created_at, updated_at)
+    SELECT 'Seed comment ' || g, t.id, t.creator_id, now() - g * interval '1 minute', now()
+    FROM generate_series(1, :comments) g CROSS JOIN tc JOIN t ON t.n = g % tc.c
+    """,
+    """
+    WITH w AS (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM workspaces
+               WHERE name LIKE 'Seed ' || :run || ' %' AND workspace_type = 'FIELD_OPERATIONS'),
+         wc AS (SELECT count(*) AS c FROM w),
+         m AS (SELECT workspace_id, user_id, row_number() OVER (PARTITION BY workspace_id ORDER BY user_id) - 1 AS n FROM workspace_members),
+         mc AS (SELECT workspace_id, count(*) AS c FROM workspace_members GROUP BY workspace_id),
+         c AS (SELECT id, workspace_id, row_number() OVER (PARTITION BY workspace_id ORDER BY id) - 1 AS n FROM task_categories)
+    INSERT INTO field_activities (workspace_id, support_staff_id, activity_date, start_time, end_time, title,
+                                  customer_id, customer_name, location, location_type, task_category_id,
+                                  task_description, status, created_by, created_at, updated_at)
+    SELECT w.id, staff.user_id, current_date - (g % 730), CASE WHEN g % 9 = 0 THEN NULL ELSE time '08:00' + (g % 8) * interval '1 hour' END,
+           CASE WHEN g % 9 = 0 THEN NULL ELSE time '09:30' + (g % 8) * interval '1 hour' END, 'Seed visit ' || g,
+           CASE WHEN g % 6 = 0 THEN NULL ELSE 'SEED-' || (g % 500) END, 'Seed customer ' || (g % 500), 'Site ' || (g % 50),
+           (ARRAY['ON_SITE', 'OFFICE'])[1 + g % 2]::locationtype, CASE WHEN g % 4 = 0 THEN NULL ELSE c.id END,
+           'Seed work item ' || g, (ARRAY['COMPLETED', 'COMPLETED', 'IN_PROGRESS', 'PENDING'])[1 + g % 4]::activitystatus,
+           creator.user_id, now(), now()
+    FROM generate_series(1, :activities) g
+    CROSS JOIN wc
+    JOIN w ON w.n = g % wc.c
+    JOIN mc ON mc.workspace_id = w.id
+    JOIN m staff ON staff.workspace_id = w.id AND staff.n = (g / wc.c) % mc.c
+    JOIN m creator ON creator.workspace_id = w.id AND creator.n = (g / wc.c / 3) % mc.c
+    LEFT JOIN c ON c.workspace_id = w.id AND c.n = g % 5
+    """,
+    """
+    WITH w AS (SELECT id, owner_id, row_number() OVER (ORDER BY id) - 1 AS n FROM workspaces
+               WHERE name LIKE 'Seed ' || :run || ' %' AND workspace_type = 'FIELD_OPERATIONS'),
+         wc AS (SELECT count(*) AS c FROM w)
+    INSERT INTO meeting_minutes (workspace_id, title, meeting_date, agenda, created_by, created_at)
+    SELECT w.id, 'Seed meeting ' || g, current_date - (g % 730), '<p>Agenda ' || g || '</p>', w.owner_id, now()
+    FROM generate_series(1, :minutes) g CROSS JOIN wc JOIN w ON w.n = g % wc.c
+    """,
+    """
+    INSERT INTO push_subscriptions (user_id, endpoint, p256dh_key, auth_key, active, created_at, updated_at)
+    SELECT u.id, 'https://push.example.com/seed/' || u.id || '/' || k, 'p256dh', 'auth', k = 1, now(), now()
+    FROM users u CROSS JOIN generate_series(1, 2) k
+    WHERE u.username LIKE 'seed' || :run || '\\_%'
+    """,
+]
+
+
+def seed(scale: int) -> None:
+    """Bulk-insert a synthetic dataset and refresh planner statistics"""
+    counts = {
+        "users": 2000 * scale,
+        "workspaces": 50,
+        "memberships": 10,
+        "tasks": 200000 * scale,
+        "comments": 100000 * scale,
+        "activities": 200000 * scale,
+        "minutes": 20000 * scale,
+    }
+    with engine.begin() as conn:
+        run = conn.execute(text("SELECT count(*) + 1 FROM workspaces WHERE name LIKE 'Seed %'")).scalar()
+        params = {**counts, "run": str(run), "password": get_password_hash("password123")}
+        for statement in SEED_SQL:
+            conn.execute(text(statement), {k: v for k, v in params.items() if f":{k}" in statement})
+
+    # ANALYZE cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"✓ Seeded run {run}: {counts}")
+
+
+def pick_fixtures(conn) -> dict:
+    """Ids used to build endpoint URLs: the busiest field workspace and an executive member"""
+    fixtures = {}
+    row = conn.execute(text("""
+        SELECT workspace_id FROM field_activities GROUP BY workspace_id ORDER BY count(*) DESC, workspace_id LIMIT 1
+    """)).first()
+    if row is None:
+        return {}
+    fixtures["field_workspace_id"] = row.workspace_id
+
+    row = conn.execute(text("""
+        SELECT u.id FROM users u JOIN field_activities fa ON fa.support_staff_id = u.id
+        WHERE fa.workspace_id = :ws AND u.role = 'EXECUTIVE' AND u.is_active
+        GROUP BY u.id ORDER BY count(*) DESC, u.id LIMIT 1
+    """), {"ws": fixtures["field_workspace_id"]}).first()
+    if row is None:
+        return {}
+    fixtures["user_id"] = row.id  # Executive member who is also support staff in that workspace
+
+    row = conn.execute(text("""
+        SELECT p.id, p.workspace_id, max(t.id) AS task_id FROM projects p
+        JOIN workspace_members wm ON wm.workspace_id = p.workspace_id AND wm.user_id = :uid
+        JOIN tasks t ON t.project_id = p.id
+        GROUP BY p.id, p.workspace_id ORDER BY p.id LIMIT 1
+    """), {"uid": fixtures["user_id"]}).first()
+    if row is None:
+        return {}
+    fixtures.update(project_id=row.id, workspace_id=row.workspace_id, task_id=row.task_id)
+
+    fixtures["activity_id"] = conn.execute(text(
+        "SELECT max(id) FROM field_activities WHERE workspace_id = :ws AND support_staff_id = :uid"
+    ), {"ws": fixtures["field_workspace_id"], "uid": fixtures["user_id"]}).scalar()
+    if fixtures["activity_id"] is None:
+        return {}
+    return fixtures
+
+
+def endpoints(f: dict) -> list:
+    """GET requests exercised by the check (formatted with pick_fixtures ids)"""
+    month_ago = (date.today() - timedelta(days=30)).isoformat()
+    today = date.today().isoformat()
+    return [
+        "/api/workspaces/",
+        f"/api/workspaces/{f['workspace_id']}",
+        f"/api/workspaces/{f['workspace_id']}/members",
+        f"/api/projects/workspace/{f['workspace_id']}",
+        f"/api/projects/{f['project_id']}",
+        "/api/tasks/",
+        f"/api/tasks/?project_id={f['project_id']}",
+        f"/api/tasks/?assignee_id={f['user_id']}&status=todo",
+        "/api/tasks/my-tasks",
+        f"/api/tasks/{f['task_id']}",
+        f"/api/comments/task/{f['task_id']}",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}?date_from={month_ago}&date_to={today}",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}?support_staff_id={f['user_id']}&date_from={month_ago}",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}/pending",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}/assigned-by-me",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}/analytics?date_from={month_ago}",
+        f"/api/field-activities/workspace/{f['field_workspace_id']}/search?q=seed+visit",
+        f"/api/field-activities/{f['activity_id']}",
+        f"/api/field-activities/{f['activity_id']}/comments",
+        f"/api/meeting-minutes/workspace/{f['field_workspace_id']}",
+        f"/api/meeting-minutes/workspace/{f['field_workspace_id']}?date_from={month_ago}",
+        f"/api/meeting-minutes/workspace/{f['field_workspace_id']}/search?q=agenda",
+        f"/api/task-categories/workspace/{f['field_workspace_id']}",
+        "/api/users/search?q=seed",
+        "/api/push/subscription-status",
+    ]
+
+
+def capture_statements(client: TestClient, paths: list, user_id: int) -> dict:
+    """
+    Call each endpoint and record the SELECTs it sends
+
+    Returns:
+        Dict of path -> list of (driver, statement, parameters); driver is
+        "sync" (psycopg2) or "async" (asyncpg), which decides how the
+        statement is explained later.
+    """
+    captured = defaultdict(list)
+    current = {"path": None}
+
+    def listener(driver):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            head = statement.lstrip().upper()
+            if current["path"] and (head.startswith("SELECT") or head.startswith("WITH")):
+                entry = (driver, statement, parameters)
+                if entry not in captured[current["path"]]:
+                    captured[current["path"]].append(entry)
+        return before_cursor_execute
+
+    sync_listener = listener("sync")
+    async_listener = listener("async")
+    event.listen(engine, "before_cursor_execute", sync_listener)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", async_listener)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    try:
+        for path in paths:
+            current["path"] = path
+            response = client.get(path, headers=headers)
+            # Each TestClient request runs on a fresh event loop; asyncpg
+            # connections can't be reused across loops, so drop the pool.
+            async_engine.sync_engine.dispose(close=False)
+            if response.status_code != 200:
+                print(f"! {path} returned {response.status_code}: {response.text[:200]}")
+    finally:
+        current["path"] = None
+        event.remove(engine, "before_cursor_execute", sync_listener)
+        event.remove(async_engine.sync_engine, "before_cursor_execute", async_listener)
+    return captured
+
+
+def seq_scans(plan: dict) -> list:
+    """Relation names of every Seq Scan node in an EXPLAIN (FORMAT JSON) plan"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain_sync(statement: str, parameters) -> dict:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        raw.rollback()
+    finally:
+        raw.close()
+    return plan[0]["Plan"]
+
+
+async def explain_async(statements: list) -> list:
+    """EXPLAIN asyncpg-style ($n) statements on a dedicated connection"""
+    url = async_engine.url.set(drivername="postgresql")
+    conn = await asyncpg.connect(url.render_as_string(hide_password=False), statement_cache_size=0)
+    try:
+        plans = []
+        for statement, parameters in statements:
+            plan = await conn.fetchval("EXPLAIN (FORMAT JSON) " + statement, *(parameters or ()))
+            plans.append(json.loads(plan)[0]["Plan"])
+        return plans
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag sequential scans in hot endpoint queries")
+    parser.add_argument("--seed", action="store_true", help="Insert a synthetic dataset first (scratch databases only)")
+    parser.add_argument("--scale", type=int, default=1, help="Dataset size multiplier for --seed")
+    parser.add_argument("--min-rows", type=int, default=10000, help="Ignore sequential scans on smaller tables")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement, not only flagged ones")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("✗ DATABASE_URL must point at Postgres (query plans are Postgres-specific)")
+        sys.exit(2)
+
+    if args.seed:
+        seed(args.scale)
+
+    with engine.connect() as conn:
+        fixtures = pick_fixtures(conn)
+        row_estimates = dict(conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )).all())
+    if not fixtures:
+        print("✗ No field activities / projects to query, run with --seed first")
+        sys.exit(2)
+
+    captured = capture_statements(TestClient(app, raise_server_exceptions=False), endpoints(fixtures), fixtures["user_id"])
+
+    flagged = 0
+    for path, statements in captured.items():
+        sync_statements = [(s, p) for driver, s, p in statements if driver == "sync"]
+        async_statements = [(s, p) for driver, s, p in statements if driver == "async"]
+        plans = [explain_sync(s, p) for s, p in sync_statements]
+        plans += asyncio.run(explain_async(async_statements)) if async_statements else []
+
+        print(f"\n{path}  ({len(plans)} queries)")
+        for (statement, _), plan in zip(sync_statements + async_statements, plans):
+            scans = [
+                table for table in seq_scans(plan)
+                if row_estimates.get(table, 0) >= args.min_rows
+            ]
+            if scans:
+                flagged += len(scans)
+                for table in scans:
+                    print(f"  ✗ Seq Scan on {table} (~{row_estimates[table]} rows)")
+                print("    " + " ".join(statement.split())[:300])
+            elif args.verbose:
+                print(f"  ✓ {plan['Node Type']} (cost {plan['Total Cost']})  " + " ".join(statement.split())[:120])
+
+    print()
+    if flagged:
+        print(f"✗ {flagged} sequential scan(s) on tables with >= {args.min_rows} rows")
+        sys.exit(1)
+    print(f"✓ No sequential scans on tables with >= {args.min_rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Rebuild the field_activity_daily_stats rollup from field_activities
+Run with: python rebuild_field_activity_stats.py [--workspace-id N]
+
+The rollup is kept up to date incrementally by the field activity endpoints
+and backfilled by its migration. Run this after bulk imports, manual SQL
+edits or anything else that writes field_activities outside the API.
+"""
+
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.services.field_activity_stats_service import FieldActivityStatsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild field activity daily stats")
+    parser.add_argument("--workspace-id", type=int, default=None, help="Only rebuild this workspace")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    scope = f"workspace {args.workspace_id}" if args.workspace_id else "all workspaces"
+    print(f"Rebuilding field activity daily stats for {scope}...")
+
+    db = SessionLocal()
+    try:
+        if not FieldActivityStatsService.is_available(db):
+            print("✗ field_activity_daily_stats does not exist yet, run: alembic upgrade head")
+            return
+
+        started = time.perf_counter()
+        written = FieldActivityStatsService.rebuild(db, args.workspace_id, args.batch_size)
+        db.commit()
+        print(f"✓ Wrote {written} buckets in {time.perf_counter() - started:.2f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
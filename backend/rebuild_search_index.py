@@ -0,0 +1,39 @@
+"""
+Rebuild search_text for field activities and meeting minutes
+Run with: python rebuild_search_index.py
+
+search_text is refreshed by the create/update endpoints and backfilled by
+its migration. Run this after bulk imports or manual SQL edits that change
+activity or minute text outside the API, or after changing which fields
+SearchService indexes. The Postgres search indexes update themselves.
+"""
+
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.services.search_service import SearchService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild search_text for activities and minutes")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print("Rebuilding search text for field activities and meeting minutes...")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        updated = SearchService.rebuild(db, args.batch_size)
+        db.commit()
+        print(f"✓ Updated {updated} rows in {time.perf_counter() - started:.2f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
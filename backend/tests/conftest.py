@@ -0,0 +1,138 @@
+"""
+Test configuration
+Points the app at a throwaway SQLite database before anything imports
+app.config, so tests never touch DATABASE_URL from .env.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+_directory = tempfile.mkdtemp(prefix="flowhive-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory, 'test.db')}"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["UPLOAD_DIR"] = os.path.join(_directory, "uploads")
+os.environ["UPLOAD_STAGING_DIR"] = os.path.join(_directory, "upload_staging")
+os.environ["WEEKLY_REPORT_ENABLED"] = "false"
+os.environ["OUTBOX_WORKER_ENABLED"] = "false"
+
+import pytest  # noqa: E402
+
+from sqlalchemy import event  # noqa: E402
+
+from app.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine  # noqa: E402
+import app.models  # noqa: E402,F401  (registers every table on Base)
+from app.services.access_cache import AccessCache  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once per test run"""
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db():
+    """A session on the test database; every table is emptied afterwards"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+        AccessCache.clear()  # ids are reused once the tables are emptied
+
+
+@pytest.fixture
+async def async_db():
+    """
+    An AsyncSession on the test database (async tests only). The async
+    engine's pool is disposed afterwards: its aiosqlite connections belong
+    to this test's event loop and would keep the interpreter from exiting.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def client():
+    """The API, without running its lifespan (scheduler, outbox worker, backplane)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers():
+    """auth_headers(user): Authorization header of a bearer token for the user"""
+    def headers(user) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    return headers
+
+
+class StatementCount:
+    """SQL statements executed while counting (see count_statements)"""
+
+    def __init__(self):
+        self.total = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, *_):
+        self.total += 1
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def count_statements():
+    """
+    count_statements(): context manager counting the SQL statements run on
+    the sync and the async engine inside it
+
+        with count_statements() as counted:
+            client.get(...)
+        assert counted.total <= 4
+    """
+    @contextmanager
+    def counting():
+        counted = StatementCount()
+        binds = (engine, async_engine.sync_engine)
+        for bind in binds:
+            event.listen(bind, "before_cursor_execute", counted)
+        try:
+            yield counted
+        finally:
+            for bind in binds:
+                event.remove(bind, "before_cursor_execute", counted)
+    return counting
+
+
+@pytest.fixture
+def assert_constant_queries(count_statements):
+    """
+    assert_constant_queries(fetch, grow): fails when a list endpoint's SQL
+    statement count grows with the number of rows it returns
+
+    fetch() requests the list and returns how many items came back; grow()
+    adds rows to it. fetch runs once first to warm the user and membership
+    caches, then is counted before and after grow().
+    """
+    def check(fetch, grow):
+        fetch()
+        with count_statements() as small:
+            small_size = fetch()
+        grow()
+        with count_statements() as large:
+            large_size = fetch()
+
+        assert large_size > small_size, "grow() added nothing to the list"
+        assert large.total == small.total, (
+            f"{small.total} statements for {small_size} rows but {large.total} for {large_size}:\n"
+            + "\n".join(large.statements)
+        )
+    return check
@@ -0,0 +1,84 @@
+"""
+Access cache invalidation reaches every worker process
+
+Two InMemoryBackplanes on one InMemoryBroker stand in for two workers on a
+shared Redis: the cache of this process is bound to one, the other plays the
+worker where the change was made.
+"""
+import asyncio
+
+import pytest
+
+from app.services import access_cache
+from app.services.access_cache import SIGNAL_INVALIDATE, AccessCache, membership_cache, user_cache
+from app.services.websocket_backplane import InMemoryBackplane, InMemoryBroker, RedisBackplane
+
+
+@pytest.fixture
+def workers():
+    broker = InMemoryBroker()
+    here, there = InMemoryBackplane(broker), InMemoryBackplane(broker)
+    AccessCache.bind(here)
+    yield here, there
+    access_cache._backplane = None
+    AccessCache.clear()
+
+
+@pytest.mark.anyio
+async def test_invalidation_from_another_worker_drops_entries(workers):
+    _, there = workers
+    user_cache.set(1, {"id": 1, "is_active": True})
+    membership_cache.set(1, frozenset({10}))
+    membership_cache.set(2, frozenset({10}))
+
+    await there.signal(SIGNAL_INVALIDATE, {"users": [], "memberships": [2]})
+    assert membership_cache.get(2) is None
+    assert membership_cache.get(1) == frozenset({10})
+
+    await there.signal(SIGNAL_INVALIDATE, {"users": [1], "memberships": []})
+    assert user_cache.get(1) is None
+    assert membership_cache.get(1) is None
+
+
+@pytest.mark.anyio
+async def test_invalidation_here_is_sent_to_other_workers(workers):
+    _, there = workers
+    received = []
+    there.on_signal(SIGNAL_INVALIDATE, received.append)
+    membership_cache.set(3, frozenset({10}))
+
+    await AccessCache.invalidate_memberships([3])
+    await AccessCache.invalidate_user(4)
+
+    assert membership_cache.get(3) is None
+    assert received == [
+        {"users": [], "memberships": [3]},
+        {"users": [4], "memberships": []}
+    ]
+
+
+@pytest.mark.anyio
+async def test_invalidation_over_redis(workers):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    here = RedisBackplane(client=fakeredis.FakeAsyncRedis(server=server))
+    there = RedisBackplane(client=fakeredis.FakeAsyncRedis(server=server))
+    AccessCache.bind(here)
+    await here.start()
+    await there.start()
+    try:
+        membership_cache.set(5, frozenset({10}))
+        await there.signal(SIGNAL_INVALIDATE, {"users": [], "memberships": [5]})
+        for _ in range(100):
+            if membership_cache.get(5) is None:
+                break
+            await asyncio.sleep(0.01)
+        assert membership_cache.get(5) is None
+    finally:
+        await here.stop()
+        await there.stop()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
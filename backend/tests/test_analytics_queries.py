@@ -0,0 +1,110 @@
+"""
+The executive dashboard runs a fixed number of queries, however many
+workspaces, projects, tasks and field activities there are; the customer
+timeline reads its totals from the same rollup
+"""
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models.field_activity import FieldActivity, LocationType, TaskCategory
+from app.models.project import Project
+from app.models.task import Task, TaskPriority, TaskStatus
+from app.models.user import User, UserRole
+from app.models.workspace import Workspace, WorkspaceMember
+from app.services.analytics_service import AnalyticsAggregationService
+from app.services.field_activity_stats_service import FieldActivityStatsService
+
+# One statement per grouped aggregate: tasks by status and priority, projects,
+# members, workspaces, top performers, the completion trend and the field
+# activity aggregates. A new query here should be a deliberate change.
+MAX_STATEMENTS = 10
+
+
+def seed(db, workspaces: int, offset: int = 0):
+    """Workspaces with members, projects, tasks in every state and field activities"""
+    now = datetime.utcnow()
+    for w in range(offset, offset + workspaces):
+        users = [
+            User(email=f"w{w}u{i}@example.com", username=f"w{w}u{i}", full_name=f"User {w}-{i}",
+                 hashed_password="x", role=list(UserRole)[i % len(UserRole)])
+            for i in range(3)
+        ]
+        db.add_all(users)
+        db.flush()
+        workspace = Workspace(name=f"Workspace {w}", owner_id=users[0].id)
+        db.add(workspace)
+        db.flush()
+        db.add_all(WorkspaceMember(workspace_id=workspace.id, user_id=user.id) for user in users)
+        category = TaskCategory(name=f"c{w}", title="Installation", workspace_id=workspace.id)
+        projects = [Project(name=f"Project {w}-{p}", workspace_id=workspace.id) for p in range(2)]
+        db.add(category)
+        db.add_all(projects)
+        db.flush()
+
+        for t in range(6):
+            status = list(TaskStatus)[t % len(TaskStatus)]
+            db.add(Task(
+                title=f"Task {w}-{t}", project_id=projects[t % 2].id, creator_id=users[0].id,
+                assignee_id=users[t % 3].id, status=status, priority=list(TaskPriority)[t % len(TaskPriority)],
+                due_date=now - timedelta(days=1) if t % 2 else now + timedelta(days=3),
+                completed_at=now - timedelta(days=t) if status == TaskStatus.COMPLETED else None
+            ))
+        for a in range(4):
+            db.add(FieldActivity(
+                workspace_id=workspace.id, support_staff_id=users[a % 3].id, created_by=users[0].id,
+                activity_date=date.today() - timedelta(days=a), start_time=time(9), end_time=time(11),
+                title=f"Visit {w}-{a}", customer_name=f"Customer {a % 2}", customer_id=f"C{a % 2}",
+                location="On site", location_type=LocationType.ON_SITE if a % 2 else LocationType.OFFICE,
+                task_category_id=category.id if a % 2 else None
+            ))
+    db.flush()
+    FieldActivityStatsService.rebuild(db)
+    db.commit()
+
+
+async def dashboard_statements(async_db, count_statements, workspaces: int) -> int:
+    with count_statements() as counted:
+        dashboard = await AnalyticsAggregationService.build_executive_dashboard(async_db)
+    await async_db.rollback()  # the next seed is seen by a fresh transaction
+    assert len(dashboard.workspaces) == workspaces
+    assert dashboard.overview.total_tasks == workspaces * 6
+    return counted.total
+
+
+@pytest.mark.anyio
+async def test_executive_dashboard_query_count_is_constant(db, async_db, count_statements):
+    seed(db, workspaces=3)
+    await dashboard_statements(async_db, count_statements, 3)  # warm: the rollup table check runs once
+    small = await dashboard_statements(async_db, count_statements, 3)
+
+    seed(db, workspaces=3, offset=3)
+    large = await dashboard_statements(async_db, count_statements, 6)
+
+    assert small == large
+    assert large <= MAX_STATEMENTS
+
+
+def test_customer_timeline_with_rollup_rows_only(db, client, auth_headers):
+    seed(db, workspaces=1)
+    workspace = db.scalar(select(Workspace))
+    user = db.scalar(select(User).filter(User.id == workspace.owner_id))
+    # Raw rows gone while their rollup buckets are left (e.g. before a rebuild)
+    db.execute(delete(FieldActivity).where(FieldActivity.customer_id == "C1"))
+    db.commit()
+
+    response = client.get(
+        f"/api/analytics/customers/C1/timeline?workspace_id={workspace.id}", headers=auth_headers(user)
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["customer_name"] == "Customer 1"
+    assert body["total_visits"] == 2
+    assert body["recent_activities"] == []
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
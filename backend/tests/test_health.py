@@ -0,0 +1,33 @@
+"""
+/health is a public liveness check; the diagnostics next to it are for
+executives only
+"""
+import pytest
+
+from app.models.user import User, UserRole
+
+DIAGNOSTICS = ["/health/cache", "/health/outbox", "/health/scheduler"]
+
+
+@pytest.fixture
+def users(db):
+    """users[role]: a user with that role"""
+    users = {
+        role: User(email=f"{role.value}@example.com", username=role.value, hashed_password="x", role=role)
+        for role in UserRole
+    }
+    db.add_all(users.values())
+    db.commit()
+    return users
+
+
+def test_liveness_is_public(client):
+    assert client.get("/health").json() == {"status": "healthy"}
+
+
+@pytest.mark.parametrize("path", DIAGNOSTICS)
+def test_diagnostics_need_an_executive(client, auth_headers, users, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=auth_headers(users[UserRole.TEAM_MEMBER])).status_code == 403
+    assert client.get(path, headers=auth_headers(users[UserRole.MANAGER])).status_code == 403
+    assert client.get(path, headers=auth_headers(users[UserRole.EXECUTIVE])).status_code == 200
@@ -0,0 +1,48 @@
+"""
+Job ledger: a scheduled period runs once, manual runs always start, and the
+ledger records runs through its own sessions without touching the job's
+"""
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.scheduler import JOB_FAILED, JOB_SUCCEEDED, JOB_TRIGGER_MANUAL, JobRun
+from app.models.user import User
+from app.services.job_ledger import JobLedger
+
+
+def test_a_scheduled_period_starts_once(db):
+    first = JobLedger.start("weekly_reports", "2026-10-05", "worker-1")
+    second = JobLedger.start("weekly_reports", "2026-10-05", "worker-2")
+
+    assert first is not None and first.holder == "worker-1"
+    assert second is None
+    assert db.query(JobRun).count() == 1
+
+
+def test_manual_runs_repeat_and_their_errors_propagate(db):
+    runs = [JobLedger.start("weekly_reports", "2026-10-05", "worker-1", JOB_TRIGGER_MANUAL) for _ in range(2)]
+
+    assert [run.period for run in runs] == [None, None]
+    assert db.query(JobRun).count() == 2
+    # Not mistaken for "period already started"
+    with pytest.raises(IntegrityError):
+        JobLedger.start(None, None, "worker-1", JOB_TRIGGER_MANUAL)
+
+
+def test_closing_a_run_leaves_the_job_session_alone(db):
+    succeeded = JobLedger.start("weekly_reports", "2026-10-05", "worker-1")
+    failed = JobLedger.start("weekly_push_notifications", "2026-W41", "worker-1")
+    pending = User(email="pending@example.com", username="pending", hashed_password="x")
+    db.add(pending)
+
+    JobLedger.finish(succeeded, {"sent": 3})
+    JobLedger.fail(failed, RuntimeError("smtp down"))
+
+    assert pending in db.new  # not rolled back by the ledger
+    db.commit()
+    runs = {run.job_id: run for run in db.query(JobRun)}
+    assert (runs["weekly_reports"].status, runs["weekly_reports"].stats) == (JOB_SUCCEEDED, {"sent": 3})
+    assert (runs["weekly_push_notifications"].status, runs["weekly_push_notifications"].error) == (
+        JOB_FAILED, "RuntimeError: smtp down"
+    )
+    assert db.query(User).filter(User.username == "pending").count() == 1
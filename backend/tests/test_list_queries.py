@@ -0,0 +1,184 @@
+"""
+List endpoints built with ResponseAssembler: the number of SQL statements
+per request stays the same however many rows (and distinct users) they list
+"""
+from datetime import date
+from itertools import count
+
+import pytest
+
+from app.models.field_activity import ActivityStatus, FieldActivity, FieldActivityComment, TaskCategory
+from app.models.meeting_minute import MeetingMinute, MinuteActionItem, MinuteAttachment
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.models.workspace import Workspace, WorkspaceMember
+
+ROWS = 3
+
+_serial = count()
+
+
+def add_user(db, role=UserRole.TEAM_MEMBER) -> User:
+    n = next(_serial)
+    user = User(email=f"list{n}@example.com", username=f"list{n}", full_name=f"List User {n}",
+                hashed_password="x", role=role)
+    db.add(user)
+    db.flush()
+    return user
+
+
+class World:
+    """A workspace with a project, and the manager member who makes the requests"""
+
+    def __init__(self, db):
+        self.db = db
+        self.manager = add_user(db, UserRole.MANAGER)
+        self.workspace = Workspace(name="Lists", owner_id=self.manager.id)
+        db.add(self.workspace)
+        db.flush()
+        db.add(WorkspaceMember(workspace_id=self.workspace.id, user_id=self.manager.id))
+        self.project = Project(name="Lists", workspace_id=self.workspace.id)
+        db.add(self.project)
+        db.commit()
+
+    def category(self) -> TaskCategory:
+        """A category made by someone new (its creator is nested in the response)"""
+        category = TaskCategory(name="visit", title="Visit", workspace_id=self.workspace.id,
+                                created_by=add_user(self.db).id)
+        self.db.add(category)
+        self.db.flush()
+        return category
+
+    def activity(self, support_staff_id: int, created_by: int, status=ActivityStatus.COMPLETED) -> FieldActivity:
+        activity = FieldActivity(
+            workspace_id=self.workspace.id, support_staff_id=support_staff_id, created_by=created_by,
+            updated_by=created_by, activity_date=date.today(), title="Visit", customer_name="Customer",
+            location="On site", task_category_id=self.category().id, status=status
+        )
+        self.db.add(activity)
+        self.db.flush()
+        return activity
+
+
+@pytest.fixture
+def world(db):
+    return World(db)
+
+
+@pytest.fixture
+def listed(client, auth_headers, world):
+    """listed(path): number of items the world's manager gets from a list endpoint"""
+    headers = auth_headers(world.manager)  # not inside the count: commits expire world's rows
+
+    def fetch(path) -> int:
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return len(body["tasks"] if "tasks" in body else body)
+    return fetch
+
+
+def test_tasks(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            db.add(Task(title="Task", project_id=world.project.id,
+                        creator_id=add_user(db).id, assignee_id=add_user(db).id))
+        db.commit()
+
+    grow()
+    path = "/api/tasks/"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_my_tasks(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            db.add(Task(title="Task", project_id=world.project.id,
+                        creator_id=add_user(db).id, assignee_id=world.manager.id))
+        db.commit()
+
+    grow()
+    path = "/api/tasks/my-tasks"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_project_tasks(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            db.add(Task(title="Task", project_id=world.project.id,
+                        creator_id=add_user(db).id, assignee_id=add_user(db).id))
+        db.commit()
+
+    grow()
+    path = f"/api/projects/{world.project.id}"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_workspace_field_activities(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            world.activity(add_user(db).id, add_user(db).id)
+        db.commit()
+
+    grow()
+    path = f"/api/field-activities/workspace/{world.workspace.id}"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_pending_field_activities(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            world.activity(world.manager.id, add_user(db, UserRole.MANAGER).id, ActivityStatus.PENDING)
+        db.commit()
+
+    grow()
+    path = f"/api/field-activities/workspace/{world.workspace.id}/pending"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_field_activities_assigned_by_me(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            world.activity(add_user(db).id, world.manager.id, ActivityStatus.PENDING)
+        db.commit()
+
+    grow()
+    path = f"/api/field-activities/workspace/{world.workspace.id}/assigned-by-me"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_field_activity_comments(db, world, listed, assert_constant_queries):
+    activity = world.activity(add_user(db).id, world.manager.id, ActivityStatus.PENDING)
+    db.commit()
+
+    def grow():
+        for _ in range(ROWS):
+            db.add(FieldActivityComment(field_activity_id=activity.id, user_id=add_user(db).id, content="<p>Noted</p>"))
+        db.commit()
+
+    grow()
+    path = f"/api/field-activities/{activity.id}/comments"
+    assert_constant_queries(lambda: listed(path), grow)
+
+
+def test_meeting_minutes(db, world, listed, assert_constant_queries):
+    def grow():
+        for _ in range(ROWS):
+            author = add_user(db)
+            minute = MeetingMinute(workspace_id=world.workspace.id, title="Weekly", meeting_date=date.today(),
+                                   created_by=author.id, updated_by=add_user(db).id)
+            db.add(minute)
+            db.flush()
+            db.add_all([
+                MinuteAttachment(meeting_minute_id=minute.id, cloudinary_public_id="minutes/notes",
+                                 cloudinary_url="https://example.com/notes.pdf", resource_type="raw",
+                                 file_name="notes.pdf", file_size=1, mime_type="application/pdf",
+                                 uploaded_by=author.id),
+                MinuteActionItem(meeting_minute_id=minute.id, description="Follow up", assigned_to=add_user(db).id)
+            ])
+        db.commit()
+
+    grow()
+    path = f"/api/meeting-minutes/workspace/{world.workspace.id}"
+    assert_constant_queries(lambda: listed(path), grow)
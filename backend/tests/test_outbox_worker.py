@@ -0,0 +1,90 @@
+"""
+Outbox worker: messages run to completion or dead-letter, none of the
+worker's queries run on the event loop thread, and a cron can drain it
+"""
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event, select
+
+from app.database import engine
+from app.models.outbox import OUTBOX_DEAD, OUTBOX_DONE, OutboxMessage
+from app.services.outbox import Outbox, OutboxWorker
+
+handled = []
+
+
+@Outbox.handler("test.record")
+async def record(db, payload):
+    handled.append(await asyncio.to_thread(lambda: db.execute(select(1)).scalar()))
+
+
+@pytest.fixture
+def statement_threads():
+    """Thread ident of every statement executed on the sync engine"""
+    threads = []
+
+    def remember(*_):
+        threads.append(threading.get_ident())
+
+    event.listen(engine, "before_cursor_execute", remember)
+    yield threads
+    event.remove(engine, "before_cursor_execute", remember)
+
+
+@pytest.mark.anyio
+async def test_worker_queries_run_off_the_event_loop(db, statement_threads):
+    Outbox.enqueue(db, "test.record", {})
+    Outbox.enqueue(db, "test.unknown", {})
+    db.commit()
+    handled.clear()
+    statement_threads.clear()
+
+    worker = OutboxWorker(batch_size=10)
+    assert await worker.run_once() == 2
+    await asyncio.to_thread(worker._purge_if_due)
+    worker_threads = list(statement_threads)
+
+    db.expire_all()
+    statuses = dict(db.execute(select(OutboxMessage.topic, OutboxMessage.status)).all())
+    assert statuses == {"test.record": OUTBOX_DONE, "test.unknown": OUTBOX_DEAD}
+    assert handled == [1]
+
+    # Claim, load, handler query, outcome and purge all executed SQL
+    assert worker_threads
+    assert threading.get_ident() not in worker_threads
+
+
+@pytest.mark.anyio
+async def test_drain_runs_batches_until_none_is_due(db):
+    for _ in range(5):
+        Outbox.enqueue(db, "test.record", {})
+    db.commit()
+
+    assert await OutboxWorker(batch_size=2).drain(max_seconds=60) == 5
+    db.expire_all()
+    assert db.scalars(select(OutboxMessage.status)).all() == [OUTBOX_DONE] * 5
+
+
+def test_drain_endpoint_requires_the_cron_secret(db, client, monkeypatch):
+    from app.config import settings
+
+    Outbox.enqueue(db, "test.record", {})
+    db.commit()
+
+    monkeypatch.setattr(settings, "CRON_SECRET", "")
+    assert client.get("/api/outbox/drain", headers={"Authorization": "Bearer "}).status_code == 404
+
+    monkeypatch.setattr(settings, "CRON_SECRET", "cron-secret")
+    assert client.get("/api/outbox/drain").status_code == 401
+    assert client.get("/api/outbox/drain", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/api/outbox/drain", headers={"Authorization": "Bearer cron-secret"})
+    assert response.status_code == 200
+    assert response.json() == {"processed": 1}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,135 @@
+"""
+Keyset pagination: opt-in pages with the cursor in the body, the whole list
+otherwise, the deprecated skip still honoured, and tampered cursors
+rejected with 400
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.field_operations import ACTIVITY_KEYSET_DESC
+from app.api.users import USER_KEYSET
+from app.config import settings
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.models.workspace import Workspace
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def cursor_of(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def users(db):
+    now = datetime.utcnow()
+    rows = [
+        User(
+            email=f"user{i}@example.com", username=f"user{i}", full_name=f"User {i}", hashed_password="x",
+            role=UserRole.MANAGER, updated_at=now - timedelta(minutes=i % 3)
+        )
+        for i in range(7)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_SIZE_DEFAULT", 2)
+
+
+def test_list_is_whole_without_paging_params(client, users, auth_headers, small_pages):
+    response = client.get("/api/users/", headers=auth_headers(users[0]))
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+    assert len(response.json()) == len(users)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_pages_carry_the_cursor_in_the_body(client, users, auth_headers):
+    whole = [user["id"] for user in client.get("/api/users/", headers=auth_headers(users[0])).json()]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/users/", params=params, headers=auth_headers(users[0]))
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body) == {"items", "next_cursor"}
+        seen += [user["id"] for user in body["items"]]
+        cursor = body["next_cursor"]
+        assert response.headers.get(NEXT_CURSOR_HEADER) == cursor
+        if cursor is None:
+            break
+
+    assert seen == whole
+
+
+def test_task_list_is_whole_without_paging_params(db, client, users, auth_headers, small_pages):
+    workspace = Workspace(name="Tasks", owner_id=users[0].id)
+    db.add(workspace)
+    db.flush()
+    project = Project(name="Tasks", workspace_id=workspace.id)
+    db.add(project)
+    db.flush()
+    db.add_all(Task(title=f"Task {i}", project_id=project.id, creator_id=users[0].id) for i in range(5))
+    db.commit()
+
+    response = client.get("/api/tasks/", headers=auth_headers(users[0]))
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_deprecated_skip_keeps_the_plain_list(client, users, auth_headers):
+    headers = auth_headers(users[0])
+    whole = [user["id"] for user in client.get("/api/users/", headers=headers).json()]
+
+    response = client.get("/api/users/", params={"skip": 2}, headers=headers)
+    assert [user["id"] for user in response.json()] == whole[2:]
+
+    response = client.get("/api/users/", params={"skip": 2, "limit": 3}, headers=headers)
+    assert [user["id"] for user in response.json()] == whole[2:5]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    next_page = client.get("/api/users/", params={"cursor": cursor}, headers=headers).json()
+    assert [user["id"] for user in next_page["items"]] == whole[5:]
+
+    response = client.get("/api/users/", params={"skip": 2, "cursor": cursor}, headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("values", [
+    ["not a date", 1],
+    [12, 1],
+    ["2026-10-18T10:00:00", "1"],
+    ["2026-10-18T10:00:00", True],
+    ["2026-10-18T10:00:00", 2 ** 70],
+    ["2026-10-18T10:00:00+02:00", 1],
+    ["2026-10-18T10:00:00", None],
+    ["2026-10-18T10:00:00"],
+])
+def test_tampered_cursor_is_rejected(values):
+    with pytest.raises(HTTPException) as error:
+        USER_KEYSET.decode(cursor_of(values))
+    assert error.value.status_code == 400
+
+
+def test_cursor_values_are_typed():
+    assert USER_KEYSET.decode(cursor_of([None, 5])) == [None, 5]
+    assert ACTIVITY_KEYSET_DESC.decode(cursor_of(["2026-10-18", None, 9]))[0].isoformat() == "2026-10-18"
+    with pytest.raises(HTTPException):
+        ACTIVITY_KEYSET_DESC.decode(cursor_of([None, "09:00:00", 9]))  # activity_date is not nullable
+
+
+def test_tampered_cursor_is_a_400_response(client, users, auth_headers):
+    response = client.get(
+        "/api/users/", params={"cursor": cursor_of(["yesterday", "x"])}, headers=auth_headers(users[0])
+    )
+    assert response.status_code == 400
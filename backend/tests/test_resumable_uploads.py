@@ -0,0 +1,116 @@
+"""
+A resumable upload cut off mid-chunk keeps what arrived: the client asks
+for the offset, sends the rest from there and completes the upload
+"""
+import hashlib
+import os
+from datetime import date
+
+import httpx
+import pytest
+
+from app.database import async_engine
+from app.main import app
+from app.models.field_activity import FieldActivity
+from app.models.user import User
+from app.models.workspace import Workspace, WorkspaceMember
+from app.services.resumable_uploads import PATCH_CONTENT_TYPE, staging_path
+
+PHOTO = b"\xff\xd8\xff\xe0" + os.urandom(64 * 1024)  # JPEG magic, then anything
+CUT = 20 * 1024
+
+
+@pytest.fixture
+def activity(db):
+    user = User(email="field@example.com", username="field", full_name="Field User", hashed_password="x")
+    db.add(user)
+    db.flush()
+    workspace = Workspace(name="Field", owner_id=user.id)
+    db.add(workspace)
+    db.flush()
+    db.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id))
+    activity = FieldActivity(
+        workspace_id=workspace.id, support_staff_id=user.id, created_by=user.id, activity_date=date.today(),
+        title="Visit", customer_name="Customer", location="On site"
+    )
+    db.add(activity)
+    db.commit()
+    return activity
+
+
+async def interrupted_patch(url: str, headers: dict, offset: int, body: bytes) -> int:
+    """
+    PATCH whose client goes away after sending `body` (more was announced);
+    returns the status the app answered with
+    """
+    messages = [
+        {"type": "http.request", "body": body, "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    headers = {**headers, "Upload-Offset": str(offset), "Content-Type": PATCH_CONTENT_TYPE}
+    await app({
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "PATCH", "scheme": "http",
+        "path": url, "raw_path": url.encode(), "root_path": "", "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "server": ("testserver", 80), "client": ("testclient", 50000),
+    }, receive, send)
+    return next(message["status"] for message in sent if message["type"] == "http.response.start")
+
+
+@pytest.mark.anyio
+async def test_interrupted_chunk_resumes_from_the_reported_offset(activity, auth_headers):
+    headers = auth_headers(activity.support_staff)
+    base = f"/api/field-activities/{activity.id}/photos/resumable"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        try:
+            created = await client.post(base, headers=headers, json={
+                "filename": "site.jpg", "content_type": "image/jpeg", "size": len(PHOTO),
+                "sha256": hashlib.sha256(PHOTO).hexdigest()
+            })
+            assert created.status_code == 201
+            url, upload_id = created.json()["url"], created.json()["upload_id"]
+
+            # The connection drops partway through the whole file
+            assert await interrupted_patch(url, headers, 0, PHOTO[:CUT]) == 204
+            head = await client.head(url, headers=headers)
+            offset = int(head.headers["Upload-Offset"])
+            assert offset == CUT
+
+            def patch(at: int, body: bytes):
+                return client.patch(url, content=body, headers={
+                    **headers, "Upload-Offset": str(at), "Content-Type": PATCH_CONTENT_TYPE
+                })
+
+            # Resending from the start instead of the offset is refused
+            conflict = await patch(0, PHOTO)
+            assert conflict.status_code == 409
+            assert (await client.head(url, headers=headers)).headers["Upload-Offset"] == str(CUT)
+
+            resumed = await patch(offset, PHOTO[offset:])
+            assert resumed.status_code == 204
+            assert resumed.headers["Upload-Offset"] == str(len(PHOTO))
+
+            completed = await client.post(f"{base}/{upload_id}/complete", headers=headers)
+            assert completed.status_code == 201
+            photo = completed.json()
+            assert photo["file_size"] == len(PHOTO)
+            with open(photo["file_path"], "rb") as f:
+                assert f.read() == PHOTO
+            assert not os.path.exists(staging_path(upload_id))
+            assert (await client.head(url, headers=headers)).status_code == 404
+        finally:
+            await async_engine.dispose()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
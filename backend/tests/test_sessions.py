@@ -0,0 +1,23 @@
+"""
+Every API route gets its database session from get_async_db, the same one
+get_current_user uses, so a request checks out a single connection
+"""
+from fastapi.routing import APIRoute
+
+from app.database import get_db
+
+
+def dependency_calls(dependant):
+    for sub in dependant.dependencies:
+        yield sub.call
+        yield from dependency_calls(sub)
+
+
+def test_no_route_depends_on_the_sync_session():
+    from app.main import app
+
+    sync_routes = [
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and get_db in dependency_calls(route.dependant)
+    ]
+    assert sync_routes == []
@@ -0,0 +1,70 @@
+"""
+Creating one task and creating tasks in bulk apply the same checks
+(validate_new_task): each invalid task gets the same status and detail
+"""
+import pytest
+
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.models.workspace import Workspace, WorkspaceMember
+
+
+@pytest.fixture
+def setup(db):
+    """A member with a project, a project in another workspace and a task in each"""
+    member = User(email="member@example.com", username="member", hashed_password="x", role=UserRole.TEAM_MEMBER)
+    outsider = User(email="outsider@example.com", username="outsider", hashed_password="x")
+    db.add_all([member, outsider])
+    db.flush()
+    workspaces = [Workspace(name="Mine", owner_id=member.id), Workspace(name="Theirs", owner_id=outsider.id)]
+    db.add_all(workspaces)
+    db.flush()
+    db.add(WorkspaceMember(workspace_id=workspaces[0].id, user_id=member.id))
+    mine, theirs = Project(name="Mine", workspace_id=workspaces[0].id), Project(name="Theirs", workspace_id=workspaces[1].id)
+    db.add_all([mine, theirs])
+    db.flush()
+    other_task = Task(title="Elsewhere", project_id=theirs.id, creator_id=outsider.id)
+    db.add(other_task)
+    db.commit()
+    return member, mine.id, theirs.id, other_task.id
+
+
+def invalid_tasks(mine: int, theirs: int, other_task: int):
+    return [
+        ({"title": "No project", "project_id": 999999}, 404, "Project not found"),
+        ({"title": "Not a member", "project_id": theirs}, 403, "Not a member of this workspace"),
+        ({"title": "Foreign parent", "project_id": mine, "parent_task_id": other_task},
+         400, "Parent task not found in this project"),
+        ({"title": "No assignee", "project_id": mine, "assignee_id": 999999}, 400, "Assignee not found"),
+    ]
+
+
+def test_create_task_runs_the_bulk_checks(db, client, auth_headers, setup):
+    member, mine, theirs, other_task = setup
+    headers = auth_headers(member)
+
+    for payload, status_code, detail in invalid_tasks(mine, theirs, other_task):
+        response = client.post("/api/tasks/", json=payload, headers=headers)
+        assert (response.status_code, response.json()["detail"]) == (status_code, detail), payload["title"]
+
+    response = client.post("/api/tasks/", json={"title": "Fine", "project_id": mine}, headers=headers)
+    assert response.status_code == 201
+
+
+def test_bulk_create_reports_the_same_errors(db, client, auth_headers, setup):
+    member, mine, theirs, other_task = setup
+    cases = invalid_tasks(mine, theirs, other_task)
+
+    response = client.post(
+        "/api/tasks/bulk",
+        json=[payload for payload, _, _ in cases] + [{"title": "Fine", "project_id": mine}],
+        headers=auth_headers(member)
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(e["index"], e["status_code"], e["detail"]) for e in body["errors"]] == [
+        (index, status_code, detail) for index, (_, status_code, detail) in enumerate(cases)
+    ]
+    assert [task["title"] for task in body["tasks"]] == ["Fine"]
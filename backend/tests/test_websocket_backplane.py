@@ -0,0 +1,120 @@
+"""
+Workspace broadcasts reach the sockets of every worker process
+
+Each ConnectionManager stands for one worker. Two InMemoryBackplanes on one
+InMemoryBroker (or two RedisBackplanes on one fakeredis server) stand for
+the shared pub/sub server.
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.api.websocket import ConnectionManager
+from app.services.websocket_backplane import InMemoryBackplane, InMemoryBroker, RedisBackplane
+
+WORKSPACE = 7
+
+
+class RecordingSocket:
+    """The parts of a WebSocket the manager uses; keeps the messages sent to it"""
+
+    def __init__(self):
+        self.scope = {"subprotocols": []}
+        self.messages = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, frame: str):
+        self.messages.append(json.loads(frame))
+
+    async def close(self, code: int = 1000, reason: str = None):
+        pass
+
+
+async def connected(manager: ConnectionManager):
+    """A socket connected to WORKSPACE on the manager, and its connection id"""
+    socket = RecordingSocket()
+    connection = await manager.connect(socket, WORKSPACE)
+    return socket, connection.id
+
+
+async def settle(*sockets, count: int):
+    """Wait until every socket has `count` messages, then a little longer to catch duplicates"""
+    for _ in range(200):
+        if all(len(socket.messages) >= count for socket in sockets):
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+
+
+async def shut_down(*managers: ConnectionManager):
+    for manager in managers:
+        for socket, connection in list(manager.connections.items()):
+            manager.disconnect(socket, connection.workspace_id)
+        await manager.stop()
+
+
+def event(n: int) -> dict:
+    return {"type": "task_updated", "data": {"id": n}}
+
+
+@pytest.mark.anyio
+async def test_event_reaches_a_manager_on_another_in_memory_backplane():
+    broker = InMemoryBroker()
+    here = ConnectionManager(InMemoryBackplane(broker), coalesce_ms=0)
+    there = ConnectionManager(InMemoryBackplane(broker), coalesce_ms=0)
+    local, _ = await connected(here)
+    remote, remote_id = await connected(there)
+
+    await here.broadcast_to_workspace(WORKSPACE, event(1))
+    await settle(local, remote, count=1)
+    assert local.messages == [event(1)]
+    assert remote.messages == [event(1)]
+
+    await here.broadcast_to_workspace(WORKSPACE, event(2), exclude=remote_id)
+    await settle(local, count=2)
+    assert local.messages == [event(1), event(2)]
+    assert remote.messages == [event(1)]
+
+    await shut_down(here, there)
+
+
+@pytest.mark.anyio
+async def test_event_reaches_a_manager_on_another_redis_backplane():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    here = ConnectionManager(RedisBackplane(client=fakeredis.FakeAsyncRedis(server=server)), coalesce_ms=0)
+    there = ConnectionManager(RedisBackplane(client=fakeredis.FakeAsyncRedis(server=server)), coalesce_ms=0)
+    await here.start()
+    await there.start()
+    try:
+        local, local_id = await connected(here)
+        remote, remote_id = await connected(there)
+
+        # Delivered locally at once and remotely through Redis; the
+        # publisher skips its own echo, so nobody gets it twice
+        await here.broadcast_to_workspace(WORKSPACE, event(1))
+        await settle(local, remote, count=1)
+        assert local.messages == [event(1)]
+        assert remote.messages == [event(1)]
+
+        # The excluded connection is skipped on the other worker...
+        await here.broadcast_to_workspace(WORKSPACE, event(2), exclude=remote_id)
+        await settle(local, count=2)
+        assert local.messages == [event(1), event(2)]
+        assert remote.messages == [event(1)]
+
+        # ...and on the publishing one
+        await there.broadcast_to_workspace(WORKSPACE, event(3), exclude=local_id)
+        await settle(remote, count=2)
+        assert local.messages == [event(1), event(2)]
+        assert remote.messages == [event(1), event(3)]
+    finally:
+        await shut_down(here, there)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
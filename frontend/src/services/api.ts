@@ -45,3 +45,31 @@ class ApiClient {
 }
 
 export const apiClient = new ApiClient().getClient();
+
+// A page of a keyset-paginated list endpoint (requested with limit/cursor)
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// Page size getAllPages asks for (the backend caps it at PAGE_SIZE_MAX)
+const ALL_PAGES_LIMIT = 500;
+
+// List endpoints are keyset-paginated on request: with limit (or cursor) the
+// body is a Page whose next_cursor fetches the following one. Follow it to
+// load a complete list in bounded requests.
+export async function getAllPages<T>(
+  url: string,
+  params?: object,
+): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null | undefined;
+  do {
+    const response = await apiClient.get<Page<T>>(url, {
+      params: { ...params, cursor: cursor ?? undefined, limit: ALL_PAGES_LIMIT },
+    });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return items;
+}
@@ -1,4 +1,4 @@
-import { apiClient } from "./api";
+import { apiClient, getAllPages } from "./api";
 import type { CompanyAnalyticsCustomer, Customer, Licence } from "@/types/field";
 
 export const customerService = {
@@ -22,7 +22,6 @@ export const customerService = {
    * Get all customer licences from internal API
    */
   async getLicences(): Promise<Licence[]> {
-    const response = await apiClient.get<Licence[]>("/customers/licences");
-    return response.data;
+    return getAllPages<Licence>("/customers/licences");
   },
 };
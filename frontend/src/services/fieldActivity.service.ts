@@ -1,7 +1,7 @@
 // Field Activity Service
 // Handles all field operations activity tracking API calls
 
-import { apiClient } from "./api";
+import { apiClient, getAllPages } from "./api";
 import type {
   FieldActivity,
   FieldActivityCreate,
@@ -11,6 +11,8 @@ import type {
   FieldAnalytics,
   FieldActivityComment,
   FieldActivityCommentCreate,
+  FieldActivityStatusUpdate,
+  FieldActivityBulkResult,
 } from "@/types/field";
 
 export const fieldActivityService = {
@@ -23,13 +25,10 @@ export const fieldActivityService = {
     workspaceId: number,
     filters?: FieldActivityFilters,
   ): Promise<FieldActivity[]> {
-    const response = await apiClient.get<FieldActivity[]>(
+    return getAllPages<FieldActivity>(
       `/field-activities/workspace/${workspaceId}`,
-      {
-        params: filters,
-      },
+      filters,
     );
-    return response.data;
   },
 
   /**
@@ -62,6 +61,35 @@ export const fieldActivityService = {
     return response.data;
   },
 
+  /**
+   * Create several field activities in one request (e.g. a day's visits)
+   * Rejected items come back in `errors` with their index; the rest are created
+   * @param data - Activity creation data, one per activity
+   */
+  async createActivities(
+    data: FieldActivityCreate[],
+  ): Promise<FieldActivityBulkResult> {
+    const response = await apiClient.post<FieldActivityBulkResult>(
+      "/field-activities/bulk",
+      data,
+    );
+    return response.data;
+  },
+
+  /**
+   * Change the status of several field activities in one request
+   * @param updates - Activity id and new status (with times and description to complete)
+   */
+  async updateActivityStatuses(
+    updates: FieldActivityStatusUpdate[],
+  ): Promise<FieldActivityBulkResult> {
+    const response = await apiClient.patch<FieldActivityBulkResult>(
+      "/field-activities/bulk/status",
+      updates,
+    );
+    return response.data;
+  },
+
   /**
    * Update an existing field activity
    * @param activityId - The activity ID
@@ -122,10 +150,9 @@ export const fieldActivityService = {
    * @param workspaceId - The workspace ID
    */
   async getPendingTasks(workspaceId: number): Promise<FieldActivity[]> {
-    const response = await apiClient.get<FieldActivity[]>(
+    return getAllPages<FieldActivity>(
       `/field-activities/workspace/${workspaceId}/pending`,
     );
-    return response.data;
   },
   /**
    * Get count of pending tasks for current user
@@ -256,8 +283,8 @@ export const fieldActivityService = {
     dateTo?: string,
     supportStaffId?: number,
     sendIndividualReports?: boolean,
-  ): Promise<{ message: string; email_id?: string; sent_count?: number; failed_count?: number }> {
-    const response = await apiClient.post<{ message: string; email_id?: string; sent_count?: number; failed_count?: number }>(
+  ): Promise<{ message: string; status?: string; job_id?: number; email_id?: string; sent_count?: number; failed_count?: number }> {
+    const response = await apiClient.post<{ message: string; status?: string; job_id?: number; email_id?: string; sent_count?: number; failed_count?: number }>(
       `/field-activities/workspace/${workspaceId}/send-report`,
       {
         recipient_emails: recipientEmails,
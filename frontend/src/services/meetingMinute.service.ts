@@ -10,7 +10,7 @@ import type {
   ActionItemCreate,
   ActionItemUpdate,
 } from "@/types/meetingMinute";
-import { apiClient } from "./api";
+import { apiClient, getAllPages } from "./api";
 
 export const meetingMinuteService = {
   /**
@@ -20,11 +20,10 @@ export const meetingMinuteService = {
     workspaceId: number,
     filters?: MeetingMinuteFilters,
   ): Promise<MeetingMinute[]> {
-    const response = await apiClient.get<MeetingMinute[]>(
+    return getAllPages<MeetingMinute>(
       `/meeting-minutes/workspace/${workspaceId}`,
-      { params: filters },
+      filters,
     );
-    return response.data;
   },
 
   /**
@@ -89,6 +88,28 @@ export const meetingMinuteService = {
     return response.data;
   },
 
+  /**
+   * Upload several attachments in one request (all are attached, or none)
+   */
+  async uploadAttachments(
+    minuteId: number,
+    files: File[],
+  ): Promise<MinuteAttachment[]> {
+    const formData = new FormData();
+    for (const file of files) {
+      formData.append("files", file);
+    }
+
+    const response = await apiClient.post<MinuteAttachment[]>(
+      `/meeting-minutes/${minuteId}/attachments/batch`,
+      formData,
+      {
+        headers: { "Content-Type": "multipart/form-data" },
+      },
+    );
+    return response.data;
+  },
+
   /**
    * Delete an attachment from a meeting minute
    */
@@ -1,5 +1,12 @@
-import { apiClient } from "./api";
-import type { Task, TaskDetail, Comment, Attachment } from "@/types/task";
+import { apiClient, getAllPages } from "./api";
+import type {
+  Task,
+  TaskDetail,
+  Comment,
+  Attachment,
+  TaskBulkResult,
+  TaskStatusUpdate,
+} from "@/types/task";
 
 export const taskService = {
   async getTasks(params?: {
@@ -33,6 +40,20 @@ export const taskService = {
     return response.data;
   },
 
+  // Several tasks in one request; rejected items come back in `errors`
+  async createTasks(data: Partial<Task>[]): Promise<TaskBulkResult> {
+    const response = await apiClient.post<TaskBulkResult>("/tasks/bulk", data);
+    return response.data;
+  },
+
+  async updateTaskStatuses(updates: TaskStatusUpdate[]): Promise<TaskBulkResult> {
+    const response = await apiClient.patch<TaskBulkResult>(
+      "/tasks/bulk/status",
+      updates,
+    );
+    return response.data;
+  },
+
   async deleteTask(id: number): Promise<void> {
     await apiClient.delete(`/tasks/${id}`);
   },
@@ -97,8 +118,7 @@ export const taskService = {
 
 export const commentService = {
   async getTaskComments(taskId: number): Promise<Comment[]> {
-    const response = await apiClient.get<Comment[]>(`/comments/task/${taskId}`);
-    return response.data;
+    return getAllPages<Comment>(`/comments/task/${taskId}`);
   },
 
   async createComment(data: Partial<Comment>): Promise<Comment> {
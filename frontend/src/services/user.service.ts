@@ -1,4 +1,4 @@
-import { apiClient } from './api'
+import { apiClient, getAllPages } from './api'
 import type { User } from '@/types/auth'
 
 export interface UserUpdateData {
@@ -12,8 +12,7 @@ export interface UserUpdateData {
 
 export const userService = {
   async getAllUsers(): Promise<User[]> {
-    const response = await apiClient.get('/users/')
-    return response.data
+    return getAllPages<User>('/users/')
   },
 
   async getUser(userId: number): Promise<User> {
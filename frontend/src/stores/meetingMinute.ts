@@ -10,8 +10,12 @@ import type {
   MeetingMinuteFilters,
   ActionItemCreate,
   ActionItemUpdate,
+  MinuteAttachment,
 } from "@/types/meetingMinute";
 
+// Files per batch upload request (the API's MAX_BATCH_UPLOAD_FILES)
+const MAX_BATCH_FILES = 10;
+
 export const useMeetingMinuteStore = defineStore("meetingMinute", () => {
   const minutes = ref<MeetingMinute[]>([]);
   const currentMinute = ref<MeetingMinuteDetail | null>(null);
@@ -173,6 +177,38 @@ export const useMeetingMinuteStore = defineStore("meetingMinute", () => {
     }
   }
 
+  /**
+   * Upload several attachments at once (MAX_BATCH_FILES per request)
+   */
+  async function uploadAttachments(minuteId: number, files: File[]) {
+    loading.value = true;
+    error.value = null;
+
+    try {
+      const attachments: MinuteAttachment[] = [];
+      for (let i = 0; i < files.length; i += MAX_BATCH_FILES) {
+        const batch = await meetingMinuteService.uploadAttachments(
+          minuteId,
+          files.slice(i, i + MAX_BATCH_FILES),
+        );
+        attachments.push(...batch);
+
+        // Update current minute if loaded
+        if (currentMinute.value && currentMinute.value.id === minuteId) {
+          currentMinute.value.attachments.push(...batch);
+          currentMinute.value.attachment_count += batch.length;
+        }
+      }
+
+      return attachments;
+    } catch (err: any) {
+      error.value = err.response?.data?.detail || "Failed to upload attachments";
+      throw err;
+    } finally {
+      loading.value = false;
+    }
+  }
+
   /**
    * Delete an attachment
    */
@@ -300,6 +336,7 @@ export const useMeetingMinuteStore = defineStore("meetingMinute", () => {
     updateMinute,
     deleteMinute,
     uploadAttachment,
+    uploadAttachments,
     deleteAttachment,
     createActionItem,
     updateActionItem,
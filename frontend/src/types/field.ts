@@ -1,6 +1,8 @@
 // Field Operations Type Definitions
 // Used exclusively for field team activity tracking
 
+import type { BulkItemError } from "./task";
+
 export enum WorkspaceType {
   PROJECT_MANAGEMENT = "PROJECT_MANAGEMENT",
   FIELD_OPERATIONS = "FIELD_OPERATIONS",
@@ -117,6 +119,19 @@ export interface FieldActivityPhoto {
   mime_type: string;
   uploaded_by: number;
   uploaded_at: string;
+  // Per-size URLs; the original's until the variants are rendered
+  url: string | null;
+  thumbnail_url: string | null;
+  medium_url: string | null;
+  variants: Record<string, FieldActivityPhotoVariant>; // thumbnail, medium, *_webp
+}
+
+export interface FieldActivityPhotoVariant {
+  url: string | null;
+  width: number;
+  height: number;
+  size: number;
+  mime_type: string;
 }
 
 // Field Activity (core model for field worker logs)
@@ -183,6 +198,20 @@ export interface FieldActivityUpdate {
   status?: ActivityStatus;
 }
 
+// One item of a bulk status update; completing needs times and a description
+export interface FieldActivityStatusUpdate {
+  id: number;
+  status: ActivityStatus;
+  start_time?: string | null;
+  end_time?: string | null;
+  task_description?: string | null;
+}
+
+export interface FieldActivityBulkResult {
+  activities: FieldActivity[];
+  errors: BulkItemError[];
+}
+
 export interface FieldActivityDetail extends FieldActivity {
   photos: FieldActivityPhoto[];
 }
@@ -36,6 +36,7 @@ export interface MinuteAttachment {
   meeting_minute_id: number;
   cloudinary_public_id: string;
   cloudinary_url: string;
+  url?: string | null; // download URL (presigned for private storage)
   resource_type: string;
   file_name: string;
   file_size: number;
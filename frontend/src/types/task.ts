@@ -74,6 +74,24 @@ export interface Attachment {
   uploaded_by: number
   uploader_name?: string
   created_at: string
+  url?: string | null // download URL (presigned for private storage)
+}
+
+// A rejected item of a bulk request: its index in the request array and why
+export interface BulkItemError {
+  index: number
+  status_code: number
+  detail: string
+}
+
+export interface TaskStatusUpdate {
+  id: number
+  status: TaskStatus
+}
+
+export interface TaskBulkResult {
+  tasks: Task[]
+  errors: BulkItemError[]
 }
 
 export interface ActivityLog {